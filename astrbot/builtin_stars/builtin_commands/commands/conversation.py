@@ -188,8 +188,10 @@ class ConversationCommands:
 
         size_per_page = 6
         """获取所有对话列表"""
-        conversations_all = await self.context.conversation_manager.get_conversations(
-            message.unified_msg_origin,
+        conversations_all = (
+            await self.context.conversation_manager.get_conversation_summaries(
+                message.unified_msg_origin,
+            )
         )
         """计算总页数"""
         total_pages = (len(conversations_all) + size_per_page - 1) // size_per_page
@@ -340,8 +342,10 @@ class ConversationCommands:
                 ),
             )
             return
-        conversations = await self.context.conversation_manager.get_conversations(
-            message.unified_msg_origin,
+        conversations = (
+            await self.context.conversation_manager.get_conversation_summaries(
+                message.unified_msg_origin,
+            )
         )
         if index > len(conversations) or index < 1:
             message.set_result(
@@ -382,6 +382,8 @@ class ProviderCommands:
         idx2: int | None = None,
     ) -> None:
         """查看或者切换 LLM Provider"""
+        # 列表序号需要在查看和切换之间保持一致, 先载入全部懒加载的提供商
+        await self.context.provider_manager.ensure_providers_loaded()
         umo = event.unified_msg_origin
         cfg = self.context.get_config(umo).get("provider_settings", {})
         reachability_check_enabled = cfg.get("reachability_check", True)
@@ -3,7 +3,6 @@ import json
 import random
 import uuid
 
-import aiohttp
 from bs4 import BeautifulSoup
 from readability import Document
 
@@ -11,6 +10,7 @@ from astrbot.api import AstrBotConfig, llm_tool, logger, sp, star
 from astrbot.api.event import AstrMessageEvent, filter
 from astrbot.api.provider import ProviderRequest
 from astrbot.core.provider.func_tool_manager import FunctionToolManager
+from astrbot.core.utils.http_client import http_client
 
 from .engines import HEADERS, USER_AGENTS, SearchResult
 from .engines.bing import Bing
@@ -69,7 +69,7 @@ class Main(star.Star):
         """获取网页内容"""
         header = HEADERS
         header.update({"User-Agent": random.choice(USER_AGENTS)})
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        async with http_client.session() as session:
             async with session.get(url, headers=header) as response:
                 html = await response.text(encoding="utf-8")
                 doc = Document(html)
@@ -146,7 +146,7 @@ class Main(star.Star):
             "Authorization": f"Bearer {tavily_key}",
             "Content-Type": "application/json",
         }
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        async with http_client.session() as session:
             async with session.post(
                 url,
                 json=payload,
@@ -177,7 +177,7 @@ class Main(star.Star):
             "Authorization": f"Bearer {tavily_key}",
             "Content-Type": "application/json",
         }
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        async with http_client.session() as session:
             async with session.post(
                 url,
                 json=payload,
@@ -406,7 +406,7 @@ class Main(star.Star):
             "Authorization": f"Bearer {bocha_key}",
             "Content-Type": "application/json",
         }
-        async with aiohttp.ClientSession(trust_env=True) as session:
+        async with http_client.session() as session:
             async with session.post(
                 url,
                 json=payload,
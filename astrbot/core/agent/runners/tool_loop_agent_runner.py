@@ -17,7 +17,7 @@ from mcp.types import (
 
 from astrbot import logger
 from astrbot.core.agent.message import ImageURLPart, TextPart, ThinkPart
-from astrbot.core.agent.tool import ToolSet
+from astrbot.core.agent.tool import FunctionTool, ToolSet
 from astrbot.core.agent.tool_image_cache import tool_image_cache
 from astrbot.core.message.components import Json
 from astrbot.core.message.message_event_result import (
@@ -109,9 +109,14 @@ class ToolLoopAgentRunner(BaseAgentRunner[TContext]):
         custom_compressor: ContextCompressor | None = None,
         tool_schema_mode: str | None = "full",
         fallback_providers: list[Provider] | None = None,
+        # run the tool calls of one assistant message concurrently
+        parallel_tool_calls: bool = False,
+        max_parallel_tool_calls: int = 4,
         **kwargs: T.Any,
     ) -> None:
         self.req = request
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_parallel_tool_calls = max(1, max_parallel_tool_calls)
         self.streaming = streaming
         self.enforce_max_turns = enforce_max_turns
         self.llm_compress_instruction = llm_compress_instruction
@@ -653,8 +658,28 @@ class ToolLoopAgentRunner(BaseAgentRunner[TContext]):
         llm_response: LLMResponse,
     ) -> T.AsyncGenerator[_HandleFunctionToolsResult, None]:
         """处理函数工具调用。"""
-        tool_call_result_blocks: list[ToolCallMessageSegment] = []
         logger.info(f"Agent 使用工具: {llm_response.tools_call_name}")
+        tool_calls = list(
+            zip(
+                llm_response.tools_call_name,
+                llm_response.tools_call_args,
+                llm_response.tools_call_ids,
+            )
+        )
+        if self.parallel_tool_calls and len(tool_calls) > 1 and req.func_tool:
+            handler = self._handle_function_tools_parallel(req, tool_calls)
+        else:
+            handler = self._handle_function_tools_sequential(req, tool_calls)
+        async for result in handler:
+            yield result
+
+    async def _handle_function_tools_sequential(
+        self,
+        req: ProviderRequest,
+        tool_calls: list[tuple[str, dict, str]],
+    ) -> T.AsyncGenerator[_HandleFunctionToolsResult, None]:
+        """逐个执行工具调用。"""
+        tool_call_result_blocks: list[ToolCallMessageSegment] = []
 
         def _append_tool_call_result(tool_call_id: str, content: str) -> None:
             tool_call_result_blocks.append(
@@ -666,113 +691,267 @@ class ToolLoopAgentRunner(BaseAgentRunner[TContext]):
             )
 
         # 执行函数调用
-        for func_tool_name, func_tool_args, func_tool_id in zip(
-            llm_response.tools_call_name,
-            llm_response.tools_call_args,
-            llm_response.tools_call_ids,
-        ):
-            yield _HandleFunctionToolsResult.from_message_chain(
-                MessageChain(
-                    type="tool_call",
-                    chain=[
-                        Json(
-                            data={
-                                "id": func_tool_id,
-                                "name": func_tool_name,
-                                "args": func_tool_args,
-                                "ts": time.time(),
-                            }
-                        )
-                    ],
-                )
+        for func_tool_name, func_tool_args, func_tool_id in tool_calls:
+            yield self._build_tool_call_chain(
+                func_tool_id, func_tool_name, func_tool_args
             )
-            try:
-                if not req.func_tool:
-                    return
+            if not req.func_tool:
+                return
+            async for result in self._execute_tool_call(
+                req,
+                func_tool_name,
+                func_tool_args,
+                func_tool_id,
+                _append_tool_call_result,
+            ):
+                yield result
 
-                if (
-                    self.tool_schema_mode == "skills_like"
-                    and self._skill_like_raw_tool_set
-                ):
-                    # in 'skills_like' mode, raw.func_tool is light schema, does not have handler
-                    # so we need to get the tool from the raw tool set
-                    func_tool = self._skill_like_raw_tool_set.get_tool(func_tool_name)
-                else:
-                    func_tool = req.func_tool.get_tool(func_tool_name)
+        # yield the last tool call result
+        if tool_call_result_blocks:
+            last_tcr_content = str(tool_call_result_blocks[-1].content)
+            yield self._build_tool_call_result_chain(func_tool_id, last_tcr_content)
+            logger.info(f"Tool `{func_tool_name}` Result: {last_tcr_content}")
 
-                logger.info(f"使用工具：{func_tool_name}，参数：{func_tool_args}")
+        # 处理函数调用响应
+        if tool_call_result_blocks:
+            yield _HandleFunctionToolsResult.from_tool_call_result_blocks(
+                tool_call_result_blocks
+            )
 
-                if not func_tool:
-                    logger.warning(f"未找到指定的工具: {func_tool_name}，将跳过。")
-                    _append_tool_call_result(
-                        func_tool_id,
-                        f"error: Tool {func_tool_name} not found.",
-                    )
-                    continue
+    async def _handle_function_tools_parallel(
+        self,
+        req: ProviderRequest,
+        tool_calls: list[tuple[str, dict, str]],
+    ) -> T.AsyncGenerator[_HandleFunctionToolsResult, None]:
+        """并发执行同一条助手消息中的工具调用。
 
-                valid_params = {}  # 参数过滤：只传递函数实际需要的参数
+        并发数不超过 max_parallel_tool_calls。声明了 run_serially 的工具会等待之前的调用全部结束后单独执行，
+        之后的调用也会等待它结束。所有调用结束后，按照模型给出的顺序输出结果，保证输出顺序是确定的。
+        """
+        for func_tool_name, func_tool_args, func_tool_id in tool_calls:
+            yield self._build_tool_call_chain(
+                func_tool_id, func_tool_name, func_tool_args
+            )
 
-                # 获取实际的 handler 函数
-                if func_tool.handler:
-                    logger.debug(
-                        f"工具 {func_tool_name} 期望的参数: {func_tool.parameters}",
-                    )
-                    if func_tool.parameters and func_tool.parameters.get("properties"):
-                        expected_params = set(func_tool.parameters["properties"].keys())
+        # 每个调用各自收集结果 (tool_call_id, content) 和缓存的图片
+        raw_results: list[list[tuple[str, str]]] = [[] for _ in tool_calls]
+        cached_images: list[list[T.Any]] = [[] for _ in tool_calls]
+        semaphore = asyncio.Semaphore(self.max_parallel_tool_calls)
+
+        async def run_one(idx: int) -> None:
+            func_tool_name, func_tool_args, func_tool_id = tool_calls[idx]
+            async with semaphore:
+                async for result in self._execute_tool_call(
+                    req,
+                    func_tool_name,
+                    func_tool_args,
+                    func_tool_id,
+                    lambda tool_call_id, content: raw_results[idx].append(
+                        (tool_call_id, content)
+                    ),
+                ):
+                    if result.kind == "cached_image":
+                        cached_images[idx].append(result.cached_image)
+
+        # 按 run_serially 将调用切分为若干批次，批次之间顺序执行
+        batch: list[int] = []
+        for idx, (func_tool_name, _, _) in enumerate(tool_calls):
+            func_tool = self._get_func_tool(req, func_tool_name)
+            if func_tool and func_tool.run_serially:
+                if batch:
+                    await asyncio.gather(*map(run_one, batch))
+                    batch = []
+                await run_one(idx)
+            else:
+                batch.append(idx)
+        if batch:
+            await asyncio.gather(*map(run_one, batch))
 
-                        valid_params = {
-                            k: v
-                            for k, v in func_tool_args.items()
-                            if k in expected_params
+        tool_call_result_blocks: list[ToolCallMessageSegment] = []
+        for idx, (func_tool_name, _, func_tool_id) in enumerate(tool_calls):
+            for cached_img in cached_images[idx]:
+                yield _HandleFunctionToolsResult.from_cached_image(cached_img)
+            for tool_call_id, content in raw_results[idx]:
+                tool_call_result_blocks.append(
+                    ToolCallMessageSegment(
+                        role="tool",
+                        tool_call_id=tool_call_id,
+                        content=self._merge_follow_up_notice(content),
+                    ),
+                )
+            if raw_results[idx]:
+                tcr_content = str(tool_call_result_blocks[-1].content)
+                yield self._build_tool_call_result_chain(func_tool_id, tcr_content)
+                logger.info(f"Tool `{func_tool_name}` Result: {tcr_content}")
+
+        if tool_call_result_blocks:
+            yield _HandleFunctionToolsResult.from_tool_call_result_blocks(
+                tool_call_result_blocks
+            )
+
+    @staticmethod
+    def _build_tool_call_chain(
+        func_tool_id: str, func_tool_name: str, func_tool_args: dict
+    ) -> _HandleFunctionToolsResult:
+        return _HandleFunctionToolsResult.from_message_chain(
+            MessageChain(
+                type="tool_call",
+                chain=[
+                    Json(
+                        data={
+                            "id": func_tool_id,
+                            "name": func_tool_name,
+                            "args": func_tool_args,
+                            "ts": time.time(),
                         }
+                    )
+                ],
+            )
+        )
 
-                    # 记录被忽略的参数
-                    ignored_params = set(func_tool_args.keys()) - set(
-                        valid_params.keys(),
+    @staticmethod
+    def _build_tool_call_result_chain(
+        func_tool_id: str, content: str
+    ) -> _HandleFunctionToolsResult:
+        return _HandleFunctionToolsResult.from_message_chain(
+            MessageChain(
+                type="tool_call_result",
+                chain=[
+                    Json(
+                        data={
+                            "id": func_tool_id,
+                            "ts": time.time(),
+                            "result": content,
+                        }
                     )
-                    if ignored_params:
-                        logger.warning(
-                            f"工具 {func_tool_name} 忽略非期望参数: {ignored_params}",
-                        )
-                else:
-                    # 如果没有 handler（如 MCP 工具），使用所有参数
-                    valid_params = func_tool_args
-
-                try:
-                    await self.agent_hooks.on_tool_start(
-                        self.run_context,
-                        func_tool,
-                        valid_params,
+                ],
+            )
+        )
+
+    def _get_func_tool(
+        self, req: ProviderRequest, func_tool_name: str
+    ) -> FunctionTool | None:
+        if not req.func_tool:
+            return None
+        if self.tool_schema_mode == "skills_like" and self._skill_like_raw_tool_set:
+            # in 'skills_like' mode, raw.func_tool is light schema, does not have handler
+            # so we need to get the tool from the raw tool set
+            return self._skill_like_raw_tool_set.get_tool(func_tool_name)
+        return req.func_tool.get_tool(func_tool_name)
+
+    async def _execute_tool_call(
+        self,
+        req: ProviderRequest,
+        func_tool_name: str,
+        func_tool_args: dict,
+        func_tool_id: str,
+        append_tool_call_result: T.Callable[[str, str], None],
+    ) -> T.AsyncGenerator[_HandleFunctionToolsResult, None]:
+        """执行单个工具调用，结果通过 append_tool_call_result 回传，缓存的图片通过 yield 返回。"""
+        try:
+            func_tool = self._get_func_tool(req, func_tool_name)
+
+            logger.info(f"使用工具：{func_tool_name}，参数：{func_tool_args}")
+
+            if not func_tool:
+                logger.warning(f"未找到指定的工具: {func_tool_name}，将跳过。")
+                append_tool_call_result(
+                    func_tool_id,
+                    f"error: Tool {func_tool_name} not found.",
+                )
+                return
+
+            valid_params = {}  # 参数过滤：只传递函数实际需要的参数
+
+            # 获取实际的 handler 函数
+            if func_tool.handler:
+                logger.debug(
+                    f"工具 {func_tool_name} 期望的参数: {func_tool.parameters}",
+                )
+                if func_tool.parameters and func_tool.parameters.get("properties"):
+                    expected_params = set(func_tool.parameters["properties"].keys())
+
+                    valid_params = {
+                        k: v for k, v in func_tool_args.items() if k in expected_params
+                    }
+
+                # 记录被忽略的参数
+                ignored_params = set(func_tool_args.keys()) - set(
+                    valid_params.keys(),
+                )
+                if ignored_params:
+                    logger.warning(
+                        f"工具 {func_tool_name} 忽略非期望参数: {ignored_params}",
                     )
-                except Exception as e:
-                    logger.error(f"Error in on_tool_start hook: {e}", exc_info=True)
+            else:
+                # 如果没有 handler（如 MCP 工具），使用所有参数
+                valid_params = func_tool_args
 
-                executor = self.tool_executor.execute(
-                    tool=func_tool,
-                    run_context=self.run_context,
-                    **valid_params,  # 只传递有效的参数
+            try:
+                await self.agent_hooks.on_tool_start(
+                    self.run_context,
+                    func_tool,
+                    valid_params,
                 )
+            except Exception as e:
+                logger.error(f"Error in on_tool_start hook: {e}", exc_info=True)
+
+            executor = self.tool_executor.execute(
+                tool=func_tool,
+                run_context=self.run_context,
+                **valid_params,  # 只传递有效的参数
+            )
 
-                _final_resp: CallToolResult | None = None
-                async for resp in executor:  # type: ignore
-                    if isinstance(resp, CallToolResult):
-                        res = resp
-                        _final_resp = resp
-                        if isinstance(res.content[0], TextContent):
-                            _append_tool_call_result(
+            _final_resp: CallToolResult | None = None
+            async for resp in executor:  # type: ignore
+                if isinstance(resp, CallToolResult):
+                    res = resp
+                    _final_resp = resp
+                    if isinstance(res.content[0], TextContent):
+                        append_tool_call_result(
+                            func_tool_id,
+                            res.content[0].text,
+                        )
+                    elif isinstance(res.content[0], ImageContent):
+                        # Cache the image instead of sending directly
+                        cached_img = tool_image_cache.save_image(
+                            base64_data=res.content[0].data,
+                            tool_call_id=func_tool_id,
+                            tool_name=func_tool_name,
+                            index=0,
+                            mime_type=res.content[0].mimeType or "image/png",
+                        )
+                        append_tool_call_result(
+                            func_tool_id,
+                            (
+                                f"Image returned and cached at path='{cached_img.file_path}'. "
+                                f"Review the image below. Use send_message_to_user to send it to the user if satisfied, "
+                                f"with type='image' and path='{cached_img.file_path}'."
+                            ),
+                        )
+                        # Yield image info for LLM visibility (will be handled in step())
+                        yield _HandleFunctionToolsResult.from_cached_image(cached_img)
+                    elif isinstance(res.content[0], EmbeddedResource):
+                        resource = res.content[0].resource
+                        if isinstance(resource, TextResourceContents):
+                            append_tool_call_result(
                                 func_tool_id,
-                                res.content[0].text,
+                                resource.text,
                             )
-                        elif isinstance(res.content[0], ImageContent):
+                        elif (
+                            isinstance(resource, BlobResourceContents)
+                            and resource.mimeType
+                            and resource.mimeType.startswith("image/")
+                        ):
                             # Cache the image instead of sending directly
                             cached_img = tool_image_cache.save_image(
-                                base64_data=res.content[0].data,
+                                base64_data=resource.blob,
                                 tool_call_id=func_tool_id,
                                 tool_name=func_tool_name,
                                 index=0,
-                                mime_type=res.content[0].mimeType or "image/png",
+                                mime_type=resource.mimeType,
                             )
-                            _append_tool_call_result(
+                            append_tool_call_result(
                                 func_tool_id,
                                 (
                                     f"Image returned and cached at path='{cached_img.file_path}'. "
@@ -780,110 +959,53 @@ class ToolLoopAgentRunner(BaseAgentRunner[TContext]):
                                     f"with type='image' and path='{cached_img.file_path}'."
                                 ),
                             )
-                            # Yield image info for LLM visibility (will be handled in step())
+                            # Yield image info for LLM visibility
                             yield _HandleFunctionToolsResult.from_cached_image(
                                 cached_img
                             )
-                        elif isinstance(res.content[0], EmbeddedResource):
-                            resource = res.content[0].resource
-                            if isinstance(resource, TextResourceContents):
-                                _append_tool_call_result(
-                                    func_tool_id,
-                                    resource.text,
-                                )
-                            elif (
-                                isinstance(resource, BlobResourceContents)
-                                and resource.mimeType
-                                and resource.mimeType.startswith("image/")
-                            ):
-                                # Cache the image instead of sending directly
-                                cached_img = tool_image_cache.save_image(
-                                    base64_data=resource.blob,
-                                    tool_call_id=func_tool_id,
-                                    tool_name=func_tool_name,
-                                    index=0,
-                                    mime_type=resource.mimeType,
-                                )
-                                _append_tool_call_result(
-                                    func_tool_id,
-                                    (
-                                        f"Image returned and cached at path='{cached_img.file_path}'. "
-                                        f"Review the image below. Use send_message_to_user to send it to the user if satisfied, "
-                                        f"with type='image' and path='{cached_img.file_path}'."
-                                    ),
-                                )
-                                # Yield image info for LLM visibility
-                                yield _HandleFunctionToolsResult.from_cached_image(
-                                    cached_img
-                                )
-                            else:
-                                _append_tool_call_result(
-                                    func_tool_id,
-                                    "The tool has returned a data type that is not supported.",
-                                )
-
-                    elif resp is None:
-                        # Tool 直接请求发送消息给用户
-                        # 这里我们将直接结束 Agent Loop
-                        # 发送消息逻辑在 ToolExecutor 中处理了
-                        logger.warning(
-                            f"{func_tool_name} 没有返回值，或者已将结果直接发送给用户。"
-                        )
-                        self._transition_state(AgentState.DONE)
-                        self.stats.end_time = time.time()
-                        _append_tool_call_result(
-                            func_tool_id,
-                            "The tool has no return value, or has sent the result directly to the user.",
-                        )
-                    else:
-                        # 不应该出现其他类型
-                        logger.warning(
-                            f"Tool 返回了不支持的类型: {type(resp)}。",
-                        )
-                        _append_tool_call_result(
-                            func_tool_id,
-                            "*The tool has returned an unsupported type. Please tell the user to check the definition and implementation of this tool.*",
-                        )
+                        else:
+                            append_tool_call_result(
+                                func_tool_id,
+                                "The tool has returned a data type that is not supported.",
+                            )
 
-                try:
-                    await self.agent_hooks.on_tool_end(
-                        self.run_context,
-                        func_tool,
-                        func_tool_args,
-                        _final_resp,
+                elif resp is None:
+                    # Tool 直接请求发送消息给用户
+                    # 这里我们将直接结束 Agent Loop
+                    # 发送消息逻辑在 ToolExecutor 中处理了
+                    logger.warning(
+                        f"{func_tool_name} 没有返回值，或者已将结果直接发送给用户。"
+                    )
+                    self._transition_state(AgentState.DONE)
+                    self.stats.end_time = time.time()
+                    append_tool_call_result(
+                        func_tool_id,
+                        "The tool has no return value, or has sent the result directly to the user.",
+                    )
+                else:
+                    # 不应该出现其他类型
+                    logger.warning(
+                        f"Tool 返回了不支持的类型: {type(resp)}。",
+                    )
+                    append_tool_call_result(
+                        func_tool_id,
+                        "*The tool has returned an unsupported type. Please tell the user to check the definition and implementation of this tool.*",
                     )
-                except Exception as e:
-                    logger.error(f"Error in on_tool_end hook: {e}", exc_info=True)
-            except Exception as e:
-                logger.warning(traceback.format_exc())
-                _append_tool_call_result(
-                    func_tool_id,
-                    f"error: {e!s}",
-                )
 
-        # yield the last tool call result
-        if tool_call_result_blocks:
-            last_tcr_content = str(tool_call_result_blocks[-1].content)
-            yield _HandleFunctionToolsResult.from_message_chain(
-                MessageChain(
-                    type="tool_call_result",
-                    chain=[
-                        Json(
-                            data={
-                                "id": func_tool_id,
-                                "ts": time.time(),
-                                "result": last_tcr_content,
-                            }
-                        )
-                    ],
+            try:
+                await self.agent_hooks.on_tool_end(
+                    self.run_context,
+                    func_tool,
+                    func_tool_args,
+                    _final_resp,
                 )
-            )
-            logger.info(f"Tool `{func_tool_name}` Result: {last_tcr_content}")
-
-        # 处理函数调用响应
-        if tool_call_result_blocks:
-            yield _HandleFunctionToolsResult.from_tool_call_result_blocks(
-                tool_call_result_blocks
+            except Exception as e:
+                logger.error(f"Error in on_tool_end hook: {e}", exc_info=True)
+        except Exception as e:
+            logger.warning(traceback.format_exc())
+            append_tool_call_result(
+                func_tool_id,
+                f"error: {e!s}",
             )
 
     def _build_tool_requery_context(
@@ -63,6 +63,12 @@ class FunctionTool(ToolSchema, Generic[TContext]):
     Declare this tool as a background task. Background tasks return immediately
     with a task identifier while the real work continues asynchronously.
     """
+    run_serially: bool = False
+    """
+    Declare that this tool must not run concurrently with other tool calls.
+    When parallel tool calls are enabled, such a call waits for the earlier
+    calls to finish, and the later calls wait for it.
+    """
 
     def __repr__(self) -> str:
         return f"FuncTool(name={self.name}, parameters={self.parameters}, description={self.description})"
@@ -94,6 +94,10 @@ class MainAgentBuildConfig:
     """
     tool_schema_mode: str = "full"
     """The tool schema mode, can be 'full' or 'skills-like'."""
+    parallel_tool_calls: bool = False
+    """Whether to run the tool calls of one assistant message concurrently."""
+    max_parallel_tool_calls: int = 4
+    """The maximum number of tool calls running at the same time in parallel mode."""
     provider_wake_prefix: str = ""
     """The wake prefix for the provider. If the user message does not start with this prefix,
     the main agent will not be triggered."""
@@ -171,17 +175,23 @@ def _select_provider(
 
 
 async def _get_session_conv(
-    event: AstrMessageEvent, plugin_context: Context
+    event: AstrMessageEvent,
+    plugin_context: Context,
+    history_turns: int | None = None,
 ) -> Conversation:
     conv_mgr = plugin_context.conversation_manager
     umo = event.unified_msg_origin
     cid = await conv_mgr.get_curr_conversation_id(umo)
     if not cid:
         cid = await conv_mgr.new_conversation(umo, event.get_platform_id())
-    conversation = await conv_mgr.get_conversation(umo, cid)
+    conversation = await conv_mgr.get_conversation(
+        umo, cid, history_turns=history_turns
+    )
     if not conversation:
         cid = await conv_mgr.new_conversation(umo, event.get_platform_id())
-        conversation = await conv_mgr.get_conversation(umo, cid)
+        conversation = await conv_mgr.get_conversation(
+            umo, cid, history_turns=history_turns
+        )
     if not conversation:
         raise RuntimeError("无法创建新的对话。")
     return conversation
@@ -1008,7 +1018,7 @@ async def build_main_agent(
                 "provider_request 必须是 ProviderRequest 类型。"
             )
             if req.conversation:
-                req.contexts = json.loads(req.conversation.history)
+                req.contexts = req.conversation.get_history_messages()
         else:
             req = ProviderRequest()
             req.prompt = ""
@@ -1114,9 +1124,15 @@ async def build_main_agent(
                             exc_info=True,
                         )
 
-            conversation = await _get_session_conv(event, plugin_context)
+            # 限制了最大对话轮数时只需读取最近的若干轮对话
+            history_turns = None
+            if config.max_context_length > 0:
+                history_turns = config.max_context_length
+            conversation = await _get_session_conv(
+                event, plugin_context, history_turns=history_turns
+            )
             req.conversation = conversation
-            req.contexts = json.loads(conversation.history)
+            req.contexts = conversation.get_history_messages()
             event.set_extra("provider_request", req)
 
     if isinstance(req.contexts, str):
@@ -1206,6 +1222,8 @@ async def build_main_agent(
         truncate_turns=config.dequeue_context_length,
         enforce_max_turns=config.max_context_length,
         tool_schema_mode=config.tool_schema_mode,
+        parallel_tool_calls=config.parallel_tool_calls,
+        max_parallel_tool_calls=config.max_parallel_tool_calls,
         fallback_providers=_get_fallback_chat_providers(
             provider, plugin_context, config.provider_settings
         ),
@@ -189,6 +189,7 @@ class KnowledgeBaseQueryTool(FunctionTool[AstrAgentContext]):
 class SendMessageToUserTool(FunctionTool[AstrAgentContext]):
     name: str = "send_message_to_user"
     description: str = "Directly send message to the user. Only use this tool when you need to proactively message the user. Otherwise you can directly output the reply in the conversation."
+    run_serially: bool = True
 
     parameters: dict = Field(
         default_factory=lambda: {
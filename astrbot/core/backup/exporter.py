@@ -253,7 +253,7 @@ class AstrBotExporter:
         try:
             from astrbot.core.db.vec_db.faiss_impl.vec_db import FaissVecDB
 
-            vec_db: FaissVecDB = kb_helper.vec_db
+            vec_db: FaissVecDB = await kb_helper.get_vec_db()
             if not vec_db or not vec_db.document_storage:
                 return {"documents": []}
 
@@ -277,6 +277,7 @@ class AstrBotExporter:
     ) -> None:
         """导出 FAISS 索引文件"""
         try:
+            await kb_helper.flush_index()
             index_path = kb_helper.kb_dir / "index.faiss"
             if index_path.exists():
                 archive_path = f"databases/kb_{kb_id}/index.faiss"
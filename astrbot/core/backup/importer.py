@@ -758,6 +758,20 @@ class AstrBotImporter:
                 except Exception as e:
                     result.add_warning(f"导入知识库 {kb_id} 的 FAISS 索引失败: {e}")
 
+            # 旧的稀疏索引与导入的文档不一致，删除后会在首次检索时重建
+            sparse_index_path = kb_dir / "sparse_index.msgpack"
+            if sparse_index_path.exists():
+                sparse_index_path.unlink()
+            # 旧索引的预写日志和墓碑文件不适用于导入的索引
+            for name in (
+                "index.faiss.wal",
+                "index.faiss.wal.flushing",
+                "index.faiss.tombstones.npy",
+            ):
+                stale_path = kb_dir / name
+                if stale_path.exists():
+                    stale_path.unlink()
+
             # 导入媒体文件
             media_prefix = f"files/kb_media/{kb_id}/"
             for name in zf.namelist():
@@ -119,6 +119,8 @@ DEFAULT_CONFIG = {
         "max_agent_step": 30,
         "tool_call_timeout": 60,
         "tool_schema_mode": "full",
+        "parallel_tool_calls": False,
+        "max_parallel_tool_calls": 4,
         "llm_safety_mode": True,
         "safety_mode_strategy": "system_prompt",  # TODO: llm judge
         "file_extract": {
@@ -193,6 +195,8 @@ DEFAULT_CONFIG = {
     "t2i_endpoint": "",
     "t2i_use_file_service": False,
     "t2i_active_template": "base",
+    "t2i_render_workers": 2,  # 本地文转图渲染线程数
+    "t2i_cache_ttl": 600,  # 网络文转图返回的图片 URL 的缓存有效期 (秒), 0 表示不缓存
     "http_proxy": "",
     "no_proxy": ["localhost", "127.0.0.1", "::1", "10.*", "192.168.*"],
     "dashboard": {
@@ -226,6 +230,8 @@ DEFAULT_CONFIG = {
     "log_file_path": "logs/astrbot.log",
     "log_file_max_mb": 20,
     "temp_dir_max_size": 1024,
+    "media_cache_max_size": 256,  # 临时目录中多媒体缓存的大小上限 (MB), 0 表示不缓存
+    "media_cache_url_ttl": 600,  # 从 URL 下载的多媒体文件的缓存有效期 (秒), 0 表示不缓存 URL
     "trace_enable": False,
     "trace_log_enable": False,
     "trace_log_path": "logs/astrbot.trace.log",
@@ -237,10 +243,24 @@ DEFAULT_CONFIG = {
     "callback_api_base": "",
     "default_kb_collection": "",  # 默认知识库名称, 已经过时
     "plugin_set": ["*"],  # "*" 表示使用所有可用的插件, 空列表表示不使用任何插件
+    "plugin_startup_mode": "sequential",  # 插件启动方式: sequential (依次初始化), concurrent (并发检查依赖, 平台载入后并发初始化没有启动钩子的插件)
+    "provider_init_concurrency": 4,  # 启动时同时初始化的提供商数量上限
+    "provider_lazy_load": False,  # 为 True 时只在启动时载入默认和被会话选择的提供商, 其余在首次使用时载入
+    "http_pool_limit": 100,  # 每个共享 HTTP 连接池的最大连接数
+    "http_pool_limit_per_host": 10,  # 每个共享 HTTP 连接池对同一主机的最大连接数, 0 表示不限制
+    "http_dns_cache_ttl": 300,  # 共享 HTTP 连接池的 DNS 缓存有效期 (秒), 0 表示不缓存
+    "http_connect_timeout": 30,  # 共享 HTTP 连接池建立连接的超时时间 (秒)
+    "http_timeout": 300,  # 共享 HTTP 连接池中请求的默认总超时时间 (秒)
     "kb_names": [],  # 默认知识库名称列表
     "kb_fusion_top_k": 20,  # 知识库检索融合阶段返回结果数量
     "kb_final_top_k": 5,  # 知识库检索最终返回结果数量
     "kb_agentic_mode": False,
+    "kb_vec_db_memory_budget_mb": 0,  # 已加载知识库向量索引的内存预算 (MB), 0 表示不限制
+    "kb_parse_workers": 2,  # 知识库文档解析进程数, 0 表示在主进程中解析
+    "event_bus_max_concurrency": 0,  # 同时处理的消息事件数上限, 0 表示不限制且不保证会话内顺序
+    "event_queue_maxsize": 0,  # 事件队列长度上限, 0 表示不限制
+    "event_queue_overflow_policy": "block",  # 事件队列满时的策略: block, drop_oldest, reject
+    "conversation_storage": "json",  # 对话历史存储方式: json (整体保存), message_log (按消息追加保存)
     "disable_builtin_commands": False,
 }
 
@@ -2479,6 +2499,12 @@ CONFIG_METADATA_2 = {
                     "tool_schema_mode": {
                         "type": "string",
                     },
+                    "parallel_tool_calls": {
+                        "type": "bool",
+                    },
+                    "max_parallel_tool_calls": {
+                        "type": "int",
+                    },
                     "file_extract": {
                         "type": "object",
                         "items": {
@@ -2659,6 +2685,24 @@ CONFIG_METADATA_2 = {
             "kb_fusion_top_k": {"type": "int", "default": 20},
             "kb_final_top_k": {"type": "int", "default": 5},
             "kb_agentic_mode": {"type": "bool"},
+            "kb_vec_db_memory_budget_mb": {"type": "int", "default": 0},
+            "kb_parse_workers": {"type": "int", "default": 2},
+            "event_bus_max_concurrency": {"type": "int", "default": 0},
+            "event_queue_maxsize": {"type": "int", "default": 0},
+            "event_queue_overflow_policy": {"type": "string", "default": "block"},
+            "conversation_storage": {"type": "string", "default": "json"},
+            "plugin_startup_mode": {"type": "string", "default": "sequential"},
+            "provider_init_concurrency": {"type": "int", "default": 4},
+            "provider_lazy_load": {"type": "bool", "default": False},
+            "http_pool_limit": {"type": "int", "default": 100},
+            "http_pool_limit_per_host": {"type": "int", "default": 10},
+            "http_dns_cache_ttl": {"type": "int", "default": 300},
+            "http_connect_timeout": {"type": "int", "default": 30},
+            "http_timeout": {"type": "int", "default": 300},
+            "media_cache_max_size": {"type": "int", "default": 256},
+            "media_cache_url_ttl": {"type": "int", "default": 600},
+            "t2i_render_workers": {"type": "int", "default": 2},
+            "t2i_cache_ttl": {"type": "int", "default": 600},
         },
     },
 }
@@ -3235,6 +3279,22 @@ CONFIG_METADATA_3 = {
                             "provider_settings.agent_runner_type": "local",
                         },
                     },
+                    "provider_settings.parallel_tool_calls": {
+                        "description": "并行执行工具调用",
+                        "type": "bool",
+                        "hint": "开启后，模型在同一轮中发起的多个工具调用会并发执行，结果仍按调用顺序返回。",
+                        "condition": {
+                            "provider_settings.agent_runner_type": "local",
+                        },
+                    },
+                    "provider_settings.max_parallel_tool_calls": {
+                        "description": "最大并行工具调用数",
+                        "type": "int",
+                        "condition": {
+                            "provider_settings.agent_runner_type": "local",
+                            "provider_settings.parallel_tool_calls": True,
+                        },
+                    },
                     "provider_settings.wake_prefix": {
                         "description": "LLM 聊天额外唤醒前缀 ",
                         "type": "string",
@@ -6,21 +6,81 @@
 
 import json
 from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
 
 from astrbot.core import sp
 from astrbot.core.agent.message import AssistantMessageSegment, UserMessageSegment
 from astrbot.core.db import BaseDatabase
-from astrbot.core.db.po import Conversation, ConversationV2
+from astrbot.core.db.po import Conversation, ConversationSummary, ConversationV2
 from astrbot.core.utils.datetime_utils import to_utc_timestamp
 
+STORAGE_JSON = "json"
+"""对话历史整体保存在 conversations 表的 content 列中"""
+STORAGE_MESSAGE_LOG = "message_log"
+"""对话历史按消息追加保存在 conversation_messages 表中"""
+
+
+@dataclass
+class _MessageLogSnapshot:
+    """从消息日志加载的历史: messages 由 prefix_len 条前缀消息和 seq 从 start_seq 开始的日志消息组成"""
+
+    start_seq: int
+    prefix_len: int
+    messages: list[dict]
+
+
+def _diff_history(
+    base: list[dict],
+    prefix_len: int,
+    history: list[dict],
+) -> tuple[int, list[dict] | None, list[dict]] | None:
+    """比较新的历史与加载时的历史, 找出可以只追加保存的部分.
+
+    Returns:
+        (dropped, prefix, appended): 新的历史等于 prefix + 日志消息[dropped:] + appended。
+        prefix 为 None 表示前缀不变。无法复用已保存的日志消息时返回 None。
+
+    """
+    if history[: len(base)] == base:
+        return 0, None, history[len(base) :]
+
+    # 截断或压缩会丢弃最早的若干条消息, 并可能在开头插入摘要。
+    # 以最后一条已保存的消息为锚点, 找出新的历史中仍保留的那一段日志消息
+    log = base[prefix_len:]
+    if not log:
+        return None
+    for end in range(len(history) - 1, -1, -1):
+        if history[end] != log[-1]:
+            continue
+        matched = 1
+        while (
+            matched <= end
+            and matched < len(log)
+            and history[end - matched] == log[-1 - matched]
+        ):
+            matched += 1
+        start = end - matched + 1
+        # 前缀比保留的日志消息还长时, 直接重新追加整段历史
+        if start <= matched:
+            return len(log) - matched, history[:start], history[end + 1 :]
+    return None
+
 
 class ConversationManager:
     """负责管理会话与 LLM 的对话，某个会话当前正在用哪个对话。"""
 
-    def __init__(self, db_helper: BaseDatabase) -> None:
+    def __init__(
+        self,
+        db_helper: BaseDatabase,
+        storage: str = STORAGE_JSON,
+    ) -> None:
         self.session_conversations: dict[str, str] = {}
         self.db = db_helper
         self.save_interval = 60  # 每 60 秒保存一次
+        # 为 message_log 时, 对话历史按消息追加保存, 截断和压缩只移动水位线而不重写历史。
+        # 已保存到消息日志中的对话在 json 模式下首次保存历史时会迁回 content 列
+        self.message_log = storage == STORAGE_MESSAGE_LOG
 
         # 会话删除回调函数列表（用于级联清理，如知识库配置）
         self._on_session_deleted_callbacks: list[Callable[[str], Awaitable[None]]] = []
@@ -57,23 +117,97 @@ class ConversationManager:
                     f"会话删除回调执行失败 (session: {unified_msg_origin}): {e}",
                 )
 
-    def _convert_conv_from_v2_to_v1(self, conv_v2: ConversationV2) -> Conversation:
+    def _convert_conv_from_v2_to_v1(
+        self,
+        conv_v2: ConversationV2,
+        message_log: _MessageLogSnapshot | None = None,
+    ) -> Conversation:
         """将 ConversationV2 对象转换为 Conversation 对象"""
         created_ts = to_utc_timestamp(conv_v2.created_at)
         updated_ts = to_utc_timestamp(conv_v2.updated_at)
         created_at = int(created_ts) if created_ts is not None else 0
         updated_at = int(updated_ts) if updated_ts is not None else 0
-        return Conversation(
+        history = message_log.messages if message_log else conv_v2.content
+        conversation = Conversation(
             platform_id=conv_v2.platform_id,
             user_id=conv_v2.user_id,
             cid=conv_v2.conversation_id,
-            history=json.dumps(conv_v2.content or []),
             title=conv_v2.title,
             persona_id=conv_v2.persona_id,
             created_at=created_at,
             updated_at=updated_at,
             token_usage=conv_v2.token_usage,
         )
+        # 直接传递消息列表, history 字符串只在被读取时才序列化
+        conversation.set_history_messages(history or [])
+        # 不作为 dataclass 字段, 避免序列化对话对象时重复输出历史
+        conversation._message_log = message_log
+        return conversation
+
+    @staticmethod
+    def _convert_summary(row) -> ConversationSummary:
+        """将只包含元数据列的查询结果转换为 ConversationSummary 对象"""
+        created_ts = to_utc_timestamp(row.created_at)
+        updated_ts = to_utc_timestamp(row.updated_at)
+        return ConversationSummary(
+            platform_id=row.platform_id,
+            user_id=row.user_id,
+            cid=row.conversation_id,
+            title=row.title,
+            persona_id=row.persona_id,
+            created_at=int(created_ts) if created_ts is not None else 0,
+            updated_at=int(updated_ts) if updated_ts is not None else 0,
+            token_usage=row.token_usage,
+            message_count=row.message_count,
+        )
+
+    @staticmethod
+    def _encode_cursor(row) -> str:
+        return f"{row.created_at.isoformat()}|{row.inner_conversation_id}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+        created_at, _, inner_id = cursor.rpartition("|")
+        try:
+            return datetime.fromisoformat(created_at), int(inner_id)
+        except ValueError:
+            raise ValueError(f"无效的分页游标: {cursor}")
+
+    async def _load_message_log(
+        self,
+        conv_v2: ConversationV2,
+        history_turns: int | None = None,
+    ) -> _MessageLogSnapshot | None:
+        """从消息日志加载对话历史, 对话历史不在消息日志中时返回 None.
+
+        Args:
+            conv_v2 (ConversationV2): 对话对象
+            history_turns (int | None): 最多读取水位线之后的最近多少轮对话 (以用户消息分隔), None 表示全部读取
+
+        """
+        if conv_v2.history_watermark is None:
+            return None
+        start_seq = conv_v2.history_watermark
+        rows = await self.db.get_conversation_messages(
+            conv_v2.conversation_id,
+            start_seq=start_seq,
+            tail_turns=history_turns,
+        )
+        if rows and rows[0].seq > start_seq:
+            # 只读取了最近的若干轮对话。压缩得到的摘要前缀仍然保留在开头
+            start_seq = rows[0].seq
+        prefix = conv_v2.history_prefix or []
+        return _MessageLogSnapshot(
+            start_seq=start_seq,
+            prefix_len=len(prefix),
+            messages=prefix + [row.payload for row in rows],
+        )
+
+    async def _convert_convs(self, convs: list[ConversationV2]) -> list[Conversation]:
+        return [
+            self._convert_conv_from_v2_to_v1(conv, await self._load_message_log(conv))
+            for conv in convs
+        ]
 
     async def new_conversation(
         self,
@@ -178,6 +312,7 @@ class ConversationManager:
         unified_msg_origin: str,
         conversation_id: str,
         create_if_not_exists: bool = False,
+        history_turns: int | None = None,
     ) -> Conversation | None:
         """获取会话的对话.
 
@@ -185,6 +320,7 @@ class ConversationManager:
             unified_msg_origin (str): 统一的消息来源字符串。格式为 platform_name:message_type:session_id
             conversation_id (str): 对话 ID, 是 uuid 格式的字符串
             create_if_not_exists (bool): 如果对话不存在,是否创建一个新的对话
+            history_turns (int | None): 对话历史保存在消息日志中时, 最多读取最近多少轮对话。None 表示全部读取
         Returns:
             conversation (Conversation): 对话对象
 
@@ -196,7 +332,10 @@ class ConversationManager:
             conv = await self.db.get_conversation_by_id(cid=conversation_id)
         conv_res = None
         if conv:
-            conv_res = self._convert_conv_from_v2_to_v1(conv)
+            conv_res = self._convert_conv_from_v2_to_v1(
+                conv,
+                await self._load_message_log(conv, history_turns),
+            )
         return conv_res
 
     async def get_conversations(
@@ -217,11 +356,64 @@ class ConversationManager:
             user_id=unified_msg_origin,
             platform_id=platform_id,
         )
-        convs_res = []
-        for conv in convs:
-            conv_res = self._convert_conv_from_v2_to_v1(conv)
-            convs_res.append(conv_res)
-        return convs_res
+        return await self._convert_convs(convs)
+
+    async def get_conversation_summaries(
+        self,
+        unified_msg_origin: str | None = None,
+        platform_id: str | None = None,
+    ) -> list[ConversationSummary]:
+        """获取对话列表, 只包含对话的元数据, 不读取对话历史.
+
+        Args:
+            unified_msg_origin (str): 统一的消息来源字符串。格式为 platform_name:message_type:session_id，可选
+            platform_id (str): 平台 ID, 可选参数, 用于过滤对话
+        Returns:
+            conversations (list[ConversationSummary]): 对话元数据列表
+
+        """
+        rows = await self.db.get_conversation_summaries(
+            user_id=unified_msg_origin,
+            platform_id=platform_id,
+        )
+        return [self._convert_summary(row) for row in rows]
+
+    async def get_filtered_conversation_summaries(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        platform_ids: list[str] | None = None,
+        search_query: str = "",
+        cursor: str | None = None,
+        **kwargs,
+    ) -> tuple[list[ConversationSummary], int, str | None]:
+        """获取过滤后的对话列表, 只包含对话的元数据, 不读取对话历史.
+
+        Args:
+            page (int): 页码, 默认为 1。提供 cursor 时忽略
+            page_size (int): 每页大小, 默认为 20
+            platform_ids (list[str]): 平台 ID 列表, 可选
+            search_query (str): 搜索查询字符串, 可选。搜索结果按相关度排序, 只支持按页码分页
+            cursor (str | None): 上一页返回的游标, 从该位置继续获取下一页
+        Returns:
+            conversations (list[ConversationSummary]): 对话元数据列表
+            total (int): 对话总数, 搜索时为近似值
+            next_cursor (str | None): 下一页的游标, 没有下一页或搜索时为 None
+
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+        rows, total = await self.db.get_filtered_conversation_summaries(
+            page=page,
+            page_size=page_size,
+            platform_ids=platform_ids,
+            search_query=search_query,
+            after=after,
+            **kwargs,
+        )
+        next_cursor = None
+        if rows and len(rows) == page_size and not search_query:
+            next_cursor = self._encode_cursor(rows[-1])
+        return [self._convert_summary(row) for row in rows], total, next_cursor
 
     async def get_filtered_conversations(
         self,
@@ -249,11 +441,7 @@ class ConversationManager:
             search_query=search_query,
             **kwargs,
         )
-        convs_res = []
-        for conv in convs:
-            conv_res = self._convert_conv_from_v2_to_v1(conv)
-            convs_res.append(conv_res)
-        return convs_res, cnt
+        return await self._convert_convs(convs), cnt
 
     async def update_conversation(
         self,
@@ -263,6 +451,7 @@ class ConversationManager:
         title: str | None = None,
         persona_id: str | None = None,
         token_usage: int | None = None,
+        conversation: Conversation | None = None,
     ) -> None:
         """更新会话的对话.
 
@@ -271,19 +460,81 @@ class ConversationManager:
             conversation_id (str): 对话 ID, 是 uuid 格式的字符串
             history (List[Dict]): 对话历史记录, 是一个字典列表, 每个字典包含 role 和 content 字段
             token_usage (int | None): token 使用量。None 表示不更新
+            conversation (Conversation | None): history 所基于的对话对象。消息日志模式下据此只追加新消息, 不提供时从数据库读取当前历史进行比较
 
         """
         if not conversation_id:
             # 如果没有提供 conversation_id，则获取当前的
             conversation_id = await self.get_curr_conversation_id(unified_msg_origin)
-        if conversation_id:
-            await self.db.update_conversation(
-                cid=conversation_id,
-                title=title,
-                persona_id=persona_id,
-                content=history,
+        if not conversation_id:
+            return
+        if history is not None and self.message_log:
+            await self._save_to_message_log(
+                conversation_id,
+                history,
+                conversation,
+                token_usage,
+            )
+            history = token_usage = None
+            if title is None and persona_id is None:
+                return
+        await self.db.update_conversation(
+            cid=conversation_id,
+            title=title,
+            persona_id=persona_id,
+            content=history,
+            token_usage=token_usage,
+        )
+
+    async def _save_to_message_log(
+        self,
+        conversation_id: str,
+        history: list[dict],
+        conversation: Conversation | None,
+        token_usage: int | None,
+    ) -> None:
+        """将新的对话历史保存到消息日志, 只追加新增的消息"""
+        snapshot = None
+        if conversation and conversation.cid == conversation_id:
+            snapshot = getattr(conversation, "_message_log", None)
+        if not isinstance(snapshot, _MessageLogSnapshot):
+            conv = await self.db.get_conversation_by_id(cid=conversation_id)
+            if not conv:
+                return
+            snapshot = await self._load_message_log(conv)
+
+        diff = None
+        if snapshot is not None:
+            diff = _diff_history(snapshot.messages, snapshot.prefix_len, history)
+        if diff is None:
+            # 对话历史尚未迁移到消息日志, 或历史被整体改写: 追加整段历史并将水位线移到开头
+            first_seq = await self.db.append_conversation_messages(
+                conversation_id,
+                history,
+                reset_history=True,
                 token_usage=token_usage,
             )
+            snapshot = _MessageLogSnapshot(first_seq, 0, list(history))
+        else:
+            dropped, prefix, appended = diff
+            watermark = None
+            if prefix is not None:
+                # 截断或压缩: 记录新的水位线与前缀, 不重写已保存的消息
+                watermark = snapshot.start_seq + dropped
+            await self.db.append_conversation_messages(
+                conversation_id,
+                appended,
+                watermark=watermark,
+                history_prefix=prefix,
+                token_usage=token_usage,
+            )
+            snapshot = _MessageLogSnapshot(
+                start_seq=snapshot.start_seq if watermark is None else watermark,
+                prefix_len=snapshot.prefix_len if prefix is None else len(prefix),
+                messages=list(history),
+            )
+        if conversation and conversation.cid == conversation_id:
+            conversation._message_log = snapshot
 
     async def update_conversation_title(
         self,
@@ -348,7 +599,6 @@ class ConversationManager:
         conv = await self.db.get_conversation_by_id(cid=cid)
         if not conv:
             raise Exception(f"Conversation with id {cid} not found")
-        history = conv.content or []
         if isinstance(user_message, UserMessageSegment):
             user_msg_dict = user_message.model_dump()
         else:
@@ -357,12 +607,17 @@ class ConversationManager:
             assistant_msg_dict = assistant_message.model_dump()
         else:
             assistant_msg_dict = assistant_message
+        if self.message_log and conv.history_watermark is not None:
+            await self.db.append_conversation_messages(
+                cid,
+                [user_msg_dict, assistant_msg_dict],
+            )
+            return
+        snapshot = await self._load_message_log(conv)
+        history = snapshot.messages if snapshot else conv.content or []
         history.append(user_msg_dict)
         history.append(assistant_msg_dict)
-        await self.db.update_conversation(
-            cid=cid,
-            content=history,
-        )
+        await self.update_conversation(conv.user_id, cid, history=history)
 
     async def get_human_readable_context(
         self,
@@ -383,7 +638,7 @@ class ConversationManager:
         conversation = await self.get_conversation(unified_msg_origin, conversation_id)
         if not conversation:
             return [], 0
-        history = json.loads(conversation.history)
+        history = conversation.get_history_messages()
 
         # contexts_groups 存放按顺序的段落（每个段落是一个 str 列表），
         # 之后会被展平成一个扁平的 str 列表返回。
@@ -14,7 +14,6 @@ import os
 import threading
 import time
 import traceback
-from asyncio import Queue
 
 from astrbot.api import logger, sp
 from astrbot.core import LogBroker, LogManager
@@ -35,12 +34,15 @@ from astrbot.core.star.star_manager import PluginManager
 from astrbot.core.subagent_orchestrator import SubAgentOrchestrator
 from astrbot.core.umop_config_router import UmopConfigRouter
 from astrbot.core.updator import AstrBotUpdator
+from astrbot.core.utils.http_client import http_client
 from astrbot.core.utils.llm_metadata import update_llm_metadata
+from astrbot.core.utils.media_cache import media_cache
+from astrbot.core.utils.metrics import Metric
 from astrbot.core.utils.migra_helper import migra
 from astrbot.core.utils.temp_dir_cleaner import TempDirCleaner
 
 from . import astrbot_config, html_renderer
-from .event_bus import EventBus
+from .event_bus import EventBus, EventQueue
 
 
 class AstrBotCoreLifecycle:
@@ -115,6 +117,22 @@ class AstrBotCoreLifecycle:
 
         await self.db.initialize()
 
+        http_client.configure(
+            limit=self.astrbot_config.get("http_pool_limit"),
+            limit_per_host=self.astrbot_config.get("http_pool_limit_per_host"),
+            dns_cache_ttl=self.astrbot_config.get("http_dns_cache_ttl"),
+            connect_timeout=self.astrbot_config.get("http_connect_timeout"),
+            timeout=self.astrbot_config.get("http_timeout"),
+        )
+        media_cache.configure(
+            max_size_mb=self.astrbot_config.get("media_cache_max_size"),
+            url_ttl=self.astrbot_config.get("media_cache_url_ttl"),
+        )
+        html_renderer.configure(
+            render_workers=self.astrbot_config.get("t2i_render_workers"),
+            url_cache_ttl=self.astrbot_config.get("t2i_cache_ttl"),
+        )
+
         await html_renderer.initialize()
 
         # 初始化 UMOP 配置路由器
@@ -147,7 +165,13 @@ class AstrBotCoreLifecycle:
             logger.error(traceback.format_exc())
 
         # 初始化事件队列
-        self.event_queue = Queue()
+        self.event_queue = EventQueue(
+            maxsize=self.astrbot_config.get("event_queue_maxsize", 0),
+            overflow_policy=self.astrbot_config.get(
+                "event_queue_overflow_policy",
+                "block",
+            ),
+        )
 
         # 初始化人格管理器
         self.persona_mgr = PersonaManager(self.db, self.astrbot_config_mgr)
@@ -164,13 +188,23 @@ class AstrBotCoreLifecycle:
         self.platform_manager = PlatformManager(self.astrbot_config, self.event_queue)
 
         # 初始化对话管理器
-        self.conversation_manager = ConversationManager(self.db)
+        self.conversation_manager = ConversationManager(
+            self.db,
+            storage=self.astrbot_config.get("conversation_storage", "json"),
+        )
 
         # 初始化平台消息历史管理器
         self.platform_message_history_manager = PlatformMessageHistoryManager(self.db)
 
         # 初始化知识库管理器
-        self.kb_manager = KnowledgeBaseManager(self.provider_manager)
+        self.kb_manager = KnowledgeBaseManager(
+            self.provider_manager,
+            vec_db_memory_budget_mb=self.astrbot_config.get(
+                "kb_vec_db_memory_budget_mb",
+                0,
+            ),
+            parse_workers=self.astrbot_config.get("kb_parse_workers", 2),
+        )
 
         # 初始化 CronJob 管理器
         self.cron_manager = CronJobManager(self.db)
@@ -198,7 +232,7 @@ class AstrBotCoreLifecycle:
         self.plugin_manager = PluginManager(self.star_context, self.astrbot_config)
 
         # 扫描、注册插件、实例化插件类
-        await self.plugin_manager.reload()
+        await self.plugin_manager.reload(startup=True)
 
         # 根据配置实例化各个 Provider
         await self.provider_manager.initialize()
@@ -216,6 +250,7 @@ class AstrBotCoreLifecycle:
             self.event_queue,
             self.pipeline_scheduler_mapping,
             self.astrbot_config_mgr,
+            max_concurrency=self.astrbot_config.get("event_bus_max_concurrency", 0),
         )
 
         # 记录启动时间
@@ -227,6 +262,9 @@ class AstrBotCoreLifecycle:
         # 根据配置实例化各个平台适配器
         await self.platform_manager.initialize()
 
+        # 初始化在载入插件时被推迟的插件
+        await self.plugin_manager.initialize_deferred_plugins()
+
         # 初始化关闭控制面板的事件
         self.dashboard_shutdown_event = asyncio.Event()
 
@@ -336,6 +374,9 @@ class AstrBotCoreLifecycle:
         await self.provider_manager.terminate()
         await self.platform_manager.terminate()
         await self.kb_manager.terminate()
+        await Metric.shutdown()
+        await sp.flush()
+        await http_client.close()
         self.dashboard_shutdown_event.set()
 
         # 再次遍历curr_tasks等待每个任务真正结束
@@ -352,6 +393,9 @@ class AstrBotCoreLifecycle:
         await self.provider_manager.terminate()
         await self.platform_manager.terminate()
         await self.kb_manager.terminate()
+        await Metric.shutdown()
+        await sp.flush()
+        await http_client.close()
         self.dashboard_shutdown_event.set()
         threading.Thread(
             target=self.astrbot_updator._reboot,
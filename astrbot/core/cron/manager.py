@@ -316,7 +316,7 @@ class CronJobManager:
         conv = await _get_session_conv(event=cron_event, plugin_context=self.ctx)
         req.conversation = conv
         # finetine the messages
-        context = json.loads(conv.history)
+        context = conv.get_history_messages()
         if context:
             req.contexts = context
             context_dump = req._print_friendly_context()
@@ -13,6 +13,7 @@ from astrbot.core.db.po import (
     ChatUIProject,
     CommandConfig,
     CommandConflict,
+    ConversationMessage,
     ConversationV2,
     CronJob,
     Persona,
@@ -87,6 +88,22 @@ class BaseDatabase(abc.ABC):
         """Insert a new platform statistic record."""
         ...
 
+    async def insert_platform_stats_batch(
+        self,
+        stats: list[tuple[datetime.datetime, str, str, int]],
+    ) -> None:
+        """Insert multiple platform statistic records.
+
+        Each item is (timestamp, platform_id, platform_type, count).
+        """
+        for timestamp, platform_id, platform_type, count in stats:
+            await self.insert_platform_stats(
+                platform_id=platform_id,
+                platform_type=platform_type,
+                count=count,
+                timestamp=timestamp,
+            )
+
     @abc.abstractmethod
     async def count_platform_stats(self) -> int:
         """Count the number of platform statistics records."""
@@ -135,6 +152,39 @@ class BaseDatabase(abc.ABC):
         """Get conversations filtered by platform IDs and search query."""
         ...
 
+    @abc.abstractmethod
+    async def get_conversation_summaries(
+        self,
+        user_id: str | None = None,
+        platform_id: str | None = None,
+    ) -> list[T.Any]:
+        """Get the metadata of all conversations for a specific user and platform_id(optional).
+
+        Only the metadata columns are selected: inner_conversation_id,
+        conversation_id, platform_id, user_id, title, persona_id, created_at,
+        updated_at, token_usage and message_count. The history is not loaded.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def get_filtered_conversation_summaries(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        platform_ids: list[str] | None = None,
+        search_query: str = "",
+        after: tuple[datetime.datetime, int] | None = None,
+        **kwargs,
+    ) -> tuple[list[T.Any], int]:
+        """Get the metadata of conversations filtered by platform IDs and search query.
+
+        Rows have the same columns as get_conversation_summaries. When after is a
+        (created_at, inner_conversation_id) keyset cursor, the page starts right
+        after that conversation instead of at an OFFSET. The cursor is ignored
+        when searching, because search results are ordered by relevance.
+        """
+        ...
+
     @abc.abstractmethod
     async def create_conversation(
         self,
@@ -159,7 +209,11 @@ class BaseDatabase(abc.ABC):
         content: list[dict] | None = None,
         token_usage: int | None = None,
     ) -> None:
-        """Update a conversation's history."""
+        """Update a conversation's history.
+
+        Setting content stores the history in the JSON content column again and
+        drops the conversation's message log, if any.
+        """
         ...
 
     @abc.abstractmethod
@@ -172,6 +226,41 @@ class BaseDatabase(abc.ABC):
         """Delete all conversations for a specific user."""
         ...
 
+    @abc.abstractmethod
+    async def get_conversation_messages(
+        self,
+        cid: str,
+        start_seq: int = 0,
+        tail_turns: int | None = None,
+    ) -> list[ConversationMessage]:
+        """Get the logged messages of a conversation with seq >= start_seq, ordered by seq.
+
+        If tail_turns is given, only the messages from the `tail_turns`-th last
+        user message onwards are returned.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def append_conversation_messages(
+        self,
+        cid: str,
+        messages: list[dict],
+        watermark: int | None = None,
+        history_prefix: list[dict] | None = None,
+        reset_history: bool = False,
+        token_usage: int | None = None,
+    ) -> int:
+        """Append messages to a conversation's message log.
+
+        watermark and history_prefix replace the conversation's watermark and
+        prefix when they are not None. With reset_history, the watermark moves to
+        the first appended message and the prefix and JSON content are cleared, so
+        the history becomes exactly the appended messages.
+
+        Returns the seq of the first appended message.
+        """
+        ...
+
     @abc.abstractmethod
     async def insert_platform_message_history(
         self,
@@ -282,6 +371,14 @@ class BaseDatabase(abc.ABC):
         """Update last_used_at of an API key."""
         ...
 
+    async def touch_api_keys(self, last_used: dict[str, datetime.datetime]) -> None:
+        """Update last_used_at of multiple API keys.
+
+        Maps key_id to the time the key was last used.
+        """
+        for key_id in last_used:
+            await self.touch_api_key(key_id)
+
     @abc.abstractmethod
     async def revoke_api_key(self, key_id: str) -> bool:
         """Revoke an API key.
@@ -466,6 +563,23 @@ class BaseDatabase(abc.ABC):
         """Clear all preferences for a specific scope ID."""
         ...
 
+    async def apply_preference_changes(
+        self,
+        changes: list[tuple[str, str, str | None, dict | None]],
+    ) -> None:
+        """Apply multiple preference changes in order.
+
+        Each item is (scope, scope_id, key, value). A None value removes the key,
+        and a None key clears all preferences of the scope ID.
+        """
+        for scope, scope_id, key, value in changes:
+            if key is None:
+                await self.clear_preferences(scope, scope_id)
+            elif value is None:
+                await self.remove_preference(scope, scope_id, key)
+            else:
+                await self.insert_preference_or_update(scope, scope_id, key, value)
+
     @abc.abstractmethod
     async def get_command_configs(self) -> list[CommandConfig]:
         """Get all stored command configurations."""
@@ -1,3 +1,4 @@
+import json
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -59,9 +60,19 @@ class ConversationV2(TimestampMixin, SQLModel, table=True):
     title: str | None = Field(default=None, max_length=255)
     persona_id: str | None = Field(default=None)
     token_usage: int = Field(default=0, nullable=False)
+    history_watermark: int | None = Field(default=None)
+    history_prefix: list | None = Field(default=None, sa_type=JSON)
+    message_count: int = Field(default=0, nullable=False)
     """content is a list of OpenAI-formated messages in list[dict] format.
     token_usage is the total token value of the messages.
     when 0, will use estimated token counter.
+    message_count is the number of messages in the history, kept in sync on
+    every write so listing conversations does not need to read the history.
+
+    When history_watermark is not None, the history is stored in the
+    `conversation_messages` table instead of content: the effective history is
+    history_prefix (e.g. a compression summary) followed by the messages whose
+    seq >= history_watermark.
     """
 
     __table_args__ = (
@@ -72,6 +83,36 @@ class ConversationV2(TimestampMixin, SQLModel, table=True):
     )
 
 
+class ConversationMessage(SQLModel, table=True):
+    """Append-only message log of a conversation.
+
+    Each row is one OpenAI-formatted message. seq is increasing within a
+    conversation and rows are never rewritten; truncation and compression move
+    ConversationV2.history_watermark instead.
+    """
+
+    __tablename__: str = "conversation_messages"
+
+    id: int | None = Field(
+        default=None,
+        primary_key=True,
+        sa_column_kwargs={"autoincrement": True},
+    )
+    conversation_id: str = Field(max_length=36, nullable=False)
+    seq: int = Field(nullable=False)
+    role: str = Field(max_length=32, nullable=False)
+    payload: dict = Field(sa_type=JSON, nullable=False)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint(
+            "conversation_id",
+            "seq",
+            name="uix_conversation_message_seq",
+        ),
+    )
+
+
 class PersonaFolder(TimestampMixin, SQLModel, table=True):
     """Persona 文件夹，支持递归层级结构。
 
@@ -435,6 +476,26 @@ class CommandConflict(TimestampMixin, SQLModel, table=True):
     )
 
 
+class _ConversationHistory:
+    """Conversation.history 的描述符。
+
+    以消息列表设置历史时不立即序列化, 首次读取 history 字符串时才转换为 JSON。
+    """
+
+    def __get__(self, obj, objtype=None) -> str:
+        if obj is None:
+            return ""
+        history = obj.__dict__.get("_history")
+        if history is None:
+            history = json.dumps(obj.__dict__.get("_history_messages") or [])
+            obj.__dict__["_history"] = history
+        return history
+
+    def __set__(self, obj, value: str) -> None:
+        obj.__dict__["_history"] = value
+        obj.__dict__["_history_messages"] = None
+
+
 @dataclass
 class Conversation:
     """LLM 对话类
@@ -449,7 +510,7 @@ class Conversation:
     user_id: str
     cid: str
     """对话 ID, 是 uuid 格式的字符串"""
-    history: str = ""
+    history: str = _ConversationHistory()  # type: ignore[assignment]
     """字符串格式的对话列表。"""
     title: str | None = ""
     persona_id: str | None = ""
@@ -458,6 +519,35 @@ class Conversation:
     token_usage: int = 0
     """对话的总 token 数量。AstrBot 会保留最近一次 LLM 请求返回的总 token 数，方便统计。token_usage 可能为 0，表示未知。"""
 
+    def set_history_messages(self, messages: list[dict]) -> None:
+        """以消息列表设置对话历史, history 字符串在首次读取时才生成"""
+        self.__dict__["_history"] = None
+        self.__dict__["_history_messages"] = messages
+
+    def get_history_messages(self) -> list[dict]:
+        """以消息列表的形式获取对话历史。返回新的列表, 调用方可以增删其中的消息"""
+        messages = self.__dict__.get("_history_messages")
+        if messages is not None:
+            return list(messages)
+        return json.loads(self.history or "[]")
+
+
+@dataclass
+class ConversationSummary:
+    """对话列表中的一项, 只包含对话的元数据, 不包含对话历史"""
+
+    platform_id: str
+    user_id: str
+    cid: str
+    """对话 ID, 是 uuid 格式的字符串"""
+    title: str | None = ""
+    persona_id: str | None = ""
+    created_at: int = 0
+    updated_at: int = 0
+    token_usage: int = 0
+    message_count: int = 0
+    """对话历史中的消息数量"""
+
 
 class Personality(TypedDict):
     """LLM 人格类。
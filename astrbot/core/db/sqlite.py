@@ -4,9 +4,9 @@ import typing as T
 from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import CursorResult, Row
+from sqlalchemy import CursorResult, Row, column, literal_column, table
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import col, delete, desc, func, or_, select, text, update
+from sqlmodel import and_, col, delete, desc, func, or_, select, text, update
 
 from astrbot.core.db import BaseDatabase
 from astrbot.core.db.po import (
@@ -15,6 +15,7 @@ from astrbot.core.db.po import (
     ChatUIProject,
     CommandConfig,
     CommandConflict,
+    ConversationMessage,
     ConversationV2,
     CronJob,
     Persona,
@@ -37,12 +38,248 @@ from astrbot.core.sentinels import NOT_GIVEN
 TxResult = T.TypeVar("TxResult")
 CRON_FIELD_NOT_SET = object()
 
+_CONVERSATION_SUMMARY_COLUMNS = (
+    ConversationV2.inner_conversation_id,
+    ConversationV2.conversation_id,
+    ConversationV2.platform_id,
+    ConversationV2.user_id,
+    ConversationV2.title,
+    ConversationV2.persona_id,
+    ConversationV2.created_at,
+    ConversationV2.updated_at,
+    ConversationV2.token_usage,
+    ConversationV2.message_count,
+)
+"""对话列表只查询的元数据列"""
+
+SEARCH_COUNT_LIMIT = 1000
+"""搜索结果的计数上限, 超过后返回该值作为近似总数"""
+
+# 对话全文索引。每个对话占用一段 rowid (从 inner_conversation_id * _SEARCH_ROWID_STRIDE 开始):
+# 偏移 0 为标题行, 之后是 history_prefix 与 content 中的消息, 每条消息一行;
+# 消息日志中水位线之后的每条消息一行 (rowid 为 conversation_messages.id 的相反数)。
+# 按消息建立索引, 追加消息时只需为新消息建立索引。
+# trigram 分词不依赖空格分词, 可以检索中日韩文本的任意子串
+CONVERSATION_SEARCH_TABLE = "conversation_search"
+_conversation_search = table(
+    CONVERSATION_SEARCH_TABLE,
+    column("conversation_id"),
+    column("title"),
+    column("body"),
+    column("rank"),
+)
+_SEARCH_ROWID_STRIDE = 1 << 24
+"""每个对话在全文索引中占用的 rowid 数量"""
+_SEARCH_CONTENT_OFFSET = 1 << 16
+"""content 中的消息在对话 rowid 区间内的起始偏移, 之前为标题行与 history_prefix 中的消息"""
+
+
+def _message_text_sql(message: str) -> str:
+    """从一条 OpenAI 格式的消息 JSON 中提取用户和助手文本的 SQL 表达式"""
+    return f"""CASE WHEN json_extract({message}, '$.role') IN ('user', 'assistant')
+        THEN CASE json_type({message}, '$.content')
+            WHEN 'text' THEN json_extract({message}, '$.content')
+            WHEN 'array' THEN (
+                SELECT group_concat(json_extract(part.value, '$.text'), ' ')
+                FROM json_each({message}, '$.content') AS part
+                WHERE json_extract(part.value, '$.type') = 'text'
+            )
+        END
+    END"""
+
+
+def _delete_search_rows_sql(inner_id: str, start: int, end: int) -> str:
+    """删除对话 rowid 区间内偏移为 [start, end) 的索引行"""
+    base = f"{inner_id} * {_SEARCH_ROWID_STRIDE}"
+    return (
+        f"DELETE FROM {CONVERSATION_SEARCH_TABLE} "
+        f"WHERE rowid >= {base} + {start} AND rowid < {base} + {end}"
+    )
+
+
+def _index_title_sql(prefix: str = "NEW.", source: str = "") -> str:
+    """为标题建立索引。prefix 为列名前缀 (触发器中为 NEW.), source 为批量建立索引时的数据来源"""
+    return f"""INSERT INTO {CONVERSATION_SEARCH_TABLE} (rowid, conversation_id, title)
+        SELECT {prefix}inner_conversation_id * {_SEARCH_ROWID_STRIDE},
+            {prefix}conversation_id, {prefix}title
+        {f"FROM {source}" if source else ""}
+        WHERE {prefix}title IS NOT NULL"""
+
+
+def _index_messages_sql(
+    messages: str,
+    offset: int,
+    limit: int,
+    prefix: str = "NEW.",
+    source: str = "",
+    first_key: str = "0",
+) -> str:
+    """为 JSON 数组 messages 中的消息建立索引。
+
+    第 i 条消息的偏移为 offset + first_key + i, 偏移达到 limit 的消息不建立索引。
+    偏移只需在对话的 rowid 区间内不重复, 追加消息时 first_key 接在已有的索引行之后。
+    prefix 为对话列名的前缀 (触发器中为 NEW.), source 为批量建立索引时的数据来源。
+    """
+    return f"""INSERT INTO {CONVERSATION_SEARCH_TABLE} (rowid, conversation_id, body)
+        SELECT msg.inner_id * {_SEARCH_ROWID_STRIDE} + {offset} + msg.key,
+            msg.conversation_id, msg.body
+        FROM (
+            SELECT {prefix}inner_conversation_id AS inner_id,
+                {prefix}conversation_id AS conversation_id,
+                {first_key} + m.key AS key, {_message_text_sql("m.value")} AS body
+            FROM {f"{source}, " if source else ""}json_each(
+                CASE WHEN json_valid({messages}) THEN {messages} END
+            ) AS m
+        ) AS msg
+        WHERE msg.key < {limit - offset} AND msg.body IS NOT NULL"""
+
+
+def _index_prefix_sql(prefix: str = "NEW.", source: str = "") -> str:
+    return _index_messages_sql(
+        f"{prefix}history_prefix",
+        1,
+        _SEARCH_CONTENT_OFFSET,
+        prefix,
+        source,
+    )
+
+
+def _index_content_sql(
+    prefix: str = "NEW.",
+    source: str = "",
+    messages: str | None = None,
+    first_key: str = "0",
+) -> str:
+    return _index_messages_sql(
+        messages or f"{prefix}content",
+        _SEARCH_CONTENT_OFFSET,
+        _SEARCH_ROWID_STRIDE,
+        prefix,
+        source,
+        first_key,
+    )
+
+
+# NEW.content 是否是在 OLD.content 末尾追加消息得到的。两者由同一个 JSON 序列化器生成,
+# 按字节比较即可, 不必解析整段历史
+_OLD_CONTENT_BYTES = "CAST(OLD.content AS BLOB)"
+_NEW_CONTENT_BYTES = "CAST(NEW.content AS BLOB)"
+_CONTENT_APPENDED_SQL = f"""(
+    substr(OLD.content, 1, 1) = '[' AND OLD.content != '[]'
+    AND length({_NEW_CONTENT_BYTES}) > length({_OLD_CONTENT_BYTES})
+    AND substr({_NEW_CONTENT_BYTES}, length({_OLD_CONTENT_BYTES}), 1)
+        = CAST(',' AS BLOB)
+    AND substr({_NEW_CONTENT_BYTES}, 1, length({_OLD_CONTENT_BYTES}) - 1)
+        = substr({_OLD_CONTENT_BYTES}, 1, length({_OLD_CONTENT_BYTES}) - 1)
+)"""
+# 追加的消息组成的 JSON 数组
+_APPENDED_CONTENT_SQL = f"""'[' || CAST(
+    substr({_NEW_CONTENT_BYTES}, length({_OLD_CONTENT_BYTES}) + 1) AS TEXT
+)"""
+# 追加的消息排在该对话已有的 content 索引行之后
+_NEW_CONTENT_ROWID_START = (
+    f"NEW.inner_conversation_id * {_SEARCH_ROWID_STRIDE} + {_SEARCH_CONTENT_OFFSET}"
+)
+_APPENDED_FIRST_KEY_SQL = f"""(
+    SELECT coalesce(max(rowid) + 1, {_NEW_CONTENT_ROWID_START})
+        - ({_NEW_CONTENT_ROWID_START})
+    FROM {CONVERSATION_SEARCH_TABLE}
+    WHERE rowid >= {_NEW_CONTENT_ROWID_START}
+        AND rowid < (NEW.inner_conversation_id + 1) * {_SEARCH_ROWID_STRIDE}
+)"""
+
+_CONVERSATION_SEARCH_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_insert
+    AFTER INSERT ON conversations BEGIN
+        {_index_title_sql()};
+        {_index_prefix_sql()};
+        {_index_content_sql()};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_title
+    AFTER UPDATE OF title ON conversations
+    WHEN NEW.title IS NOT OLD.title BEGIN
+        {_delete_search_rows_sql("OLD.inner_conversation_id", 0, 1)};
+        {_index_title_sql()};
+    END""",
+    # 在末尾追加消息时只为新消息建立索引
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_content_append
+    AFTER UPDATE OF content ON conversations
+    WHEN NEW.content IS NOT OLD.content AND {_CONTENT_APPENDED_SQL} BEGIN
+        {
+        _index_content_sql(
+            messages=_APPENDED_CONTENT_SQL,
+            first_key=_APPENDED_FIRST_KEY_SQL,
+        )
+    };
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_content_rewrite
+    AFTER UPDATE OF content ON conversations
+    WHEN NEW.content IS NOT OLD.content
+    AND NOT coalesce({_CONTENT_APPENDED_SQL}, 0) BEGIN
+        {
+        _delete_search_rows_sql(
+            "OLD.inner_conversation_id",
+            _SEARCH_CONTENT_OFFSET,
+            _SEARCH_ROWID_STRIDE,
+        )
+    };
+        {_index_content_sql()};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_prefix
+    AFTER UPDATE OF history_prefix ON conversations
+    WHEN NEW.history_prefix IS NOT OLD.history_prefix BEGIN
+        {
+        _delete_search_rows_sql(
+            "OLD.inner_conversation_id",
+            1,
+            _SEARCH_CONTENT_OFFSET,
+        )
+    };
+        {_index_prefix_sql()};
+    END""",
+    # 水位线之前的日志消息已不在对话历史中
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_watermark
+    AFTER UPDATE OF history_watermark ON conversations
+    WHEN NEW.history_watermark > coalesce(OLD.history_watermark, 0) BEGIN
+        DELETE FROM {CONVERSATION_SEARCH_TABLE} WHERE rowid IN (
+            SELECT -id FROM conversation_messages
+            WHERE conversation_id = NEW.conversation_id
+                AND seq >= coalesce(OLD.history_watermark, 0)
+                AND seq < NEW.history_watermark
+        );
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversations_search_delete
+    AFTER DELETE ON conversations BEGIN
+        {
+        _delete_search_rows_sql(
+            "OLD.inner_conversation_id",
+            0,
+            _SEARCH_ROWID_STRIDE,
+        )
+    };
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversation_messages_search_insert
+    AFTER INSERT ON conversation_messages
+    WHEN NEW.role IN ('user', 'assistant') AND json_valid(NEW.payload) BEGIN
+        INSERT INTO {CONVERSATION_SEARCH_TABLE} (rowid, conversation_id, body)
+        VALUES (-NEW.id, NEW.conversation_id, {_message_text_sql("NEW.payload")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversation_messages_search_delete
+    AFTER DELETE ON conversation_messages BEGIN
+        DELETE FROM {CONVERSATION_SEARCH_TABLE} WHERE rowid = -OLD.id;
+    END""",
+)
+_LEGACY_CONVERSATION_SEARCH_TRIGGER = "conversations_search_update"
+"""旧版索引 (每个对话一行, 每次保存历史都重建整行) 的触发器"""
+
 
 class SQLiteDatabase(BaseDatabase):
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
         self.DATABASE_URL = f"sqlite+aiosqlite:///{db_path}"
         self.inited = False
+        # SQLite 不支持 FTS5 或 trigram 分词时为 False, 搜索回退为 LIKE 匹配
+        self.conversation_search_enabled = False
         super().__init__()
 
     async def initialize(self) -> None:
@@ -59,6 +296,9 @@ class SQLiteDatabase(BaseDatabase):
             await self._ensure_persona_folder_columns(conn)
             await self._ensure_persona_skills_column(conn)
             await self._ensure_persona_custom_error_message_column(conn)
+            await self._ensure_conversation_message_log_columns(conn)
+            await self._ensure_conversation_listing_columns(conn)
+            await self._ensure_conversation_search_index(conn)
             await conn.commit()
 
     async def _ensure_persona_folder_columns(self, conn) -> None:
@@ -103,6 +343,158 @@ class SQLiteDatabase(BaseDatabase):
                 text("ALTER TABLE personas ADD COLUMN custom_error_message TEXT")
             )
 
+    async def _ensure_conversation_message_log_columns(self, conn) -> None:
+        """确保 conversations 表有 history_watermark 和 history_prefix 列。"""
+        result = await conn.execute(text("PRAGMA table_info(conversations)"))
+        columns = {row[1] for row in result.fetchall()}
+
+        if "history_watermark" not in columns:
+            await conn.execute(
+                text("ALTER TABLE conversations ADD COLUMN history_watermark INTEGER")
+            )
+        if "history_prefix" not in columns:
+            await conn.execute(
+                text("ALTER TABLE conversations ADD COLUMN history_prefix JSON")
+            )
+
+    async def _ensure_conversation_listing_columns(self, conn) -> None:
+        """确保 conversations 表有 message_count 列和用于列表分页的索引。"""
+        result = await conn.execute(text("PRAGMA table_info(conversations)"))
+        columns = {row[1] for row in result.fetchall()}
+
+        if "message_count" not in columns:
+            await conn.execute(
+                text(
+                    "ALTER TABLE conversations "
+                    "ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0"
+                )
+            )
+            await conn.execute(
+                text(
+                    "UPDATE conversations SET message_count = CASE "
+                    "WHEN history_watermark IS NULL THEN "
+                    "CASE WHEN json_valid(content) "
+                    "THEN coalesce(json_array_length(content), 0) ELSE 0 END "
+                    "ELSE CASE WHEN json_valid(history_prefix) "
+                    "THEN coalesce(json_array_length(history_prefix), 0) ELSE 0 END "
+                    "+ (SELECT count(*) FROM conversation_messages AS m "
+                    "WHERE m.conversation_id = conversations.conversation_id "
+                    "AND m.seq >= conversations.history_watermark) END"
+                )
+            )
+        await conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_conversations_created_at "
+                "ON conversations (created_at, inner_conversation_id)"
+            )
+        )
+
+    async def _ensure_conversation_search_index(self, conn) -> None:
+        """创建对话全文索引及维护索引的触发器, 首次创建时为已有对话建立索引。"""
+        result = await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": CONVERSATION_SEARCH_TABLE},
+        )
+        exists = result.first() is not None
+        if exists:
+            result = await conn.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'trigger' AND name = :name"
+                ),
+                {"name": _LEGACY_CONVERSATION_SEARCH_TRIGGER},
+            )
+            if result.first() is not None:
+                # 旧版的索引布局, 删除后按消息重新建立索引
+                result = await conn.execute(
+                    text(
+                        "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                        "AND name LIKE 'conversation%search%'"
+                    )
+                )
+                for (name,) in result.fetchall():
+                    await conn.execute(text(f"DROP TRIGGER {name}"))
+                await conn.execute(text(f"DROP TABLE {CONVERSATION_SEARCH_TABLE}"))
+                exists = False
+        if not exists:
+            try:
+                await conn.execute(
+                    text(
+                        f"CREATE VIRTUAL TABLE {CONVERSATION_SEARCH_TABLE} USING fts5("
+                        "conversation_id UNINDEXED, title, body, tokenize = 'trigram')"
+                    )
+                )
+            except Exception as e:
+                from astrbot.core import logger
+
+                logger.warning(
+                    f"当前 SQLite 不支持 FTS5 trigram 分词, 对话搜索将使用 LIKE 匹配: {e}"
+                )
+                self.conversation_search_enabled = False
+                return
+        for trigger in _CONVERSATION_SEARCH_TRIGGERS:
+            await conn.execute(text(trigger))
+        if not exists:
+            for statement in (
+                _index_title_sql("c.", "conversations AS c"),
+                _index_prefix_sql("c.", "conversations AS c"),
+                _index_content_sql("c.", "conversations AS c"),
+                f"""INSERT INTO {CONVERSATION_SEARCH_TABLE} (rowid, conversation_id, body)
+                SELECT -m.id, m.conversation_id, {_message_text_sql("m.payload")}
+                FROM conversation_messages AS m
+                JOIN conversations AS c ON c.conversation_id = m.conversation_id
+                WHERE m.role IN ('user', 'assistant') AND json_valid(m.payload)
+                    AND m.seq >= coalesce(c.history_watermark, 0)""",
+            ):
+                await conn.execute(text(statement))
+        self.conversation_search_enabled = True
+
+    @staticmethod
+    def _conversation_search_subquery(search_query: str, title_only: bool = False):
+        """全文检索匹配的对话, 返回 (conversation_id, score) 子查询, score 越小越相关。
+
+        查询词不少于 3 个字符时使用 trigram 索引并按 bm25 排序,
+        更短的查询词无法使用索引, 在索引的文本上逐行匹配并按命中次数排序。
+        """
+        search = _conversation_search
+        if len(search_query) >= 3:
+            phrase = '"' + search_query.replace('"', '""') + '"'
+            if title_only:
+                phrase = f"title : {phrase}"
+            condition = literal_column(CONVERSATION_SEARCH_TABLE).op("MATCH")(phrase)
+            score = func.min(search.c.rank)
+        else:
+            escaped = (
+                search_query.lower()
+                .replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            pattern = f"%{escaped}%"
+            condition = func.lower(search.c.title).like(pattern, escape="\\")
+            if not title_only:
+                condition = or_(
+                    condition,
+                    func.lower(search.c.body).like(pattern, escape="\\"),
+                )
+            score = -func.count()
+        return (
+            select(search.c.conversation_id, score.label("score"))
+            .where(condition)
+            .group_by(search.c.conversation_id)
+            .subquery()
+        )
+
+    @staticmethod
+    async def _count(session: AsyncSession, query, approximate: bool = False) -> int:
+        """统计查询结果的行数。approximate 为 True 时最多计数到 SEARCH_COUNT_LIMIT"""
+        if approximate:
+            query = query.limit(SEARCH_COUNT_LIMIT)
+        result = await session.execute(
+            select(func.count()).select_from(query.subquery()),
+        )
+        return result.scalar_one()
+
     # ====
     # Platform Statistics
     # ====
@@ -140,6 +532,34 @@ class SQLiteDatabase(BaseDatabase):
                     },
                 )
 
+    async def insert_platform_stats_batch(
+        self,
+        stats: list[tuple[datetime, str, str, int]],
+    ) -> None:
+        """Insert multiple platform statistic records in a single transaction."""
+        if not stats:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                await session.execute(
+                    text("""
+                    INSERT INTO platform_stats (timestamp, platform_id, platform_type, count)
+                    VALUES (:timestamp, :platform_id, :platform_type, :count)
+                    ON CONFLICT(timestamp, platform_id, platform_type) DO UPDATE SET
+                        count = platform_stats.count + EXCLUDED.count
+                    """),
+                    [
+                        {
+                            "timestamp": timestamp,
+                            "platform_id": platform_id,
+                            "platform_type": platform_type,
+                            "count": count,
+                        }
+                        for timestamp, platform_id, platform_type, count in stats
+                    ],
+                )
+
     async def count_platform_stats(self) -> int:
         """Count the number of platform statistics records."""
         async with self.get_db() as session:
@@ -207,6 +627,58 @@ class SQLiteDatabase(BaseDatabase):
             )
             return result.scalars().all()
 
+    def _filter_conversations(
+        self,
+        base_query,
+        platform_ids=None,
+        search_query="",
+        **kwargs,
+    ):
+        """为对话查询添加筛选条件, 返回 (查询, 排序字段列表)"""
+        order_by = [
+            desc(ConversationV2.created_at),
+            desc(ConversationV2.inner_conversation_id),
+        ]
+
+        if platform_ids:
+            base_query = base_query.where(
+                col(ConversationV2.platform_id).in_(platform_ids),
+            )
+        if search_query and self.conversation_search_enabled:
+            matched = self._conversation_search_subquery(search_query)
+            base_query = base_query.outerjoin(
+                matched,
+                matched.c.conversation_id == ConversationV2.conversation_id,
+            ).where(
+                or_(
+                    matched.c.conversation_id.is_not(None),
+                    col(ConversationV2.user_id).ilike(f"%{search_query}%"),
+                    col(ConversationV2.conversation_id).ilike(f"%{search_query}%"),
+                ),
+            )
+            # 按相关度排序, 仅 ID 匹配的对话排在最后
+            order_by.insert(0, matched.c.score.asc().nulls_last())
+        elif search_query:
+            search_query = search_query.encode("unicode_escape").decode("utf-8")
+            base_query = base_query.where(
+                or_(
+                    col(ConversationV2.title).ilike(f"%{search_query}%"),
+                    col(ConversationV2.content).ilike(f"%{search_query}%"),
+                    col(ConversationV2.user_id).ilike(f"%{search_query}%"),
+                    col(ConversationV2.conversation_id).ilike(f"%{search_query}%"),
+                ),
+            )
+        if "message_types" in kwargs and len(kwargs["message_types"]) > 0:
+            for msg_type in kwargs["message_types"]:
+                base_query = base_query.where(
+                    col(ConversationV2.user_id).ilike(f"%:{msg_type}:%"),
+                )
+        if "platforms" in kwargs and len(kwargs["platforms"]) > 0:
+            base_query = base_query.where(
+                col(ConversationV2.platform_id).in_(kwargs["platforms"]),
+            )
+        return base_query, order_by
+
     async def get_filtered_conversations(
         self,
         page=1,
@@ -217,50 +689,84 @@ class SQLiteDatabase(BaseDatabase):
     ):
         async with self.get_db() as session:
             session: AsyncSession
-            # Build the base query with filters
-            base_query = select(ConversationV2)
-
-            if platform_ids:
-                base_query = base_query.where(
-                    col(ConversationV2.platform_id).in_(platform_ids),
-                )
-            if search_query:
-                search_query = search_query.encode("unicode_escape").decode("utf-8")
-                base_query = base_query.where(
-                    or_(
-                        col(ConversationV2.title).ilike(f"%{search_query}%"),
-                        col(ConversationV2.content).ilike(f"%{search_query}%"),
-                        col(ConversationV2.user_id).ilike(f"%{search_query}%"),
-                        col(ConversationV2.conversation_id).ilike(f"%{search_query}%"),
-                    ),
-                )
-            if "message_types" in kwargs and len(kwargs["message_types"]) > 0:
-                for msg_type in kwargs["message_types"]:
-                    base_query = base_query.where(
-                        col(ConversationV2.user_id).ilike(f"%:{msg_type}:%"),
-                    )
-            if "platforms" in kwargs and len(kwargs["platforms"]) > 0:
-                base_query = base_query.where(
-                    col(ConversationV2.platform_id).in_(kwargs["platforms"]),
-                )
+            base_query, order_by = self._filter_conversations(
+                select(ConversationV2),
+                platform_ids=platform_ids,
+                search_query=search_query,
+                **kwargs,
+            )
 
             # Get total count matching the filters
-            count_query = select(func.count()).select_from(base_query.subquery())
-            total_count = await session.execute(count_query)
-            total = total_count.scalar_one()
+            total = await self._count(
+                session,
+                base_query,
+                approximate=bool(search_query),
+            )
 
             # Get paginated results
             offset = (page - 1) * page_size
             result_query = (
-                base_query.order_by(desc(ConversationV2.created_at))
-                .offset(offset)
-                .limit(page_size)
+                base_query.order_by(*order_by).offset(offset).limit(page_size)
             )
             result = await session.execute(result_query)
             conversations = result.scalars().all()
 
             return conversations, total
 
+    async def get_conversation_summaries(self, user_id=None, platform_id=None):
+        async with self.get_db() as session:
+            session: AsyncSession
+            query = select(*_CONVERSATION_SUMMARY_COLUMNS)
+
+            if user_id:
+                query = query.where(ConversationV2.user_id == user_id)
+            if platform_id:
+                query = query.where(ConversationV2.platform_id == platform_id)
+            query = query.order_by(desc(ConversationV2.created_at))
+            result = await session.execute(query)
+            return list(result.all())
+
+    async def get_filtered_conversation_summaries(
+        self,
+        page=1,
+        page_size=20,
+        platform_ids=None,
+        search_query="",
+        after=None,
+        **kwargs,
+    ):
+        async with self.get_db() as session:
+            session: AsyncSession
+            base_query, order_by = self._filter_conversations(
+                select(*_CONVERSATION_SUMMARY_COLUMNS),
+                platform_ids=platform_ids,
+                search_query=search_query,
+                **kwargs,
+            )
+            total = await self._count(
+                session,
+                base_query,
+                approximate=bool(search_query),
+            )
+
+            result_query = base_query.order_by(*order_by).limit(page_size)
+            if after is not None and not search_query:
+                # 键集分页: 从游标对应的对话之后开始, 无需跳过前面的行
+                created_at, inner_id = after
+                result_query = result_query.where(
+                    or_(
+                        col(ConversationV2.created_at) < created_at,
+                        and_(
+                            col(ConversationV2.created_at) == created_at,
+                            col(ConversationV2.inner_conversation_id) < inner_id,
+                        ),
+                    ),
+                )
+            else:
+                result_query = result_query.offset((page - 1) * page_size)
+            result = await session.execute(result_query)
+            return list(result.all()), total
+
     async def create_conversation(
         self,
         user_id,
@@ -285,6 +791,7 @@ class SQLiteDatabase(BaseDatabase):
                 new_conversation = ConversationV2(
                     user_id=user_id,
                     content=content or [],
+                    message_count=len(content or []),
                     platform_id=platform_id,
                     title=title,
                     persona_id=persona_id,
@@ -308,7 +815,16 @@ class SQLiteDatabase(BaseDatabase):
                 if persona_id is not None:
                     values["persona_id"] = persona_id
                 if content is not None:
+                    # 历史重新整体保存到 content 列, 不再使用消息日志
                     values["content"] = content
+                    values["message_count"] = len(content)
+                    values["history_watermark"] = None
+                    values["history_prefix"] = None
+                    await session.execute(
+                        delete(ConversationMessage).where(
+                            col(ConversationMessage.conversation_id) == cid,
+                        ),
+                    )
                 if token_usage is not None:
                     values["token_usage"] = token_usage
                 if not values:
@@ -321,6 +837,11 @@ class SQLiteDatabase(BaseDatabase):
         async with self.get_db() as session:
             session: AsyncSession
             async with session.begin():
+                await session.execute(
+                    delete(ConversationMessage).where(
+                        col(ConversationMessage.conversation_id) == cid,
+                    ),
+                )
                 await session.execute(
                     delete(ConversationV2).where(
                         col(ConversationV2.conversation_id) == cid,
@@ -331,12 +852,118 @@ class SQLiteDatabase(BaseDatabase):
         async with self.get_db() as session:
             session: AsyncSession
             async with session.begin():
+                await session.execute(
+                    delete(ConversationMessage).where(
+                        col(ConversationMessage.conversation_id).in_(
+                            select(ConversationV2.conversation_id).where(
+                                col(ConversationV2.user_id) == user_id,
+                            ),
+                        ),
+                    ),
+                )
                 await session.execute(
                     delete(ConversationV2).where(
                         col(ConversationV2.user_id) == user_id
                     ),
                 )
 
+    async def get_conversation_messages(self, cid, start_seq=0, tail_turns=None):
+        async with self.get_db() as session:
+            session: AsyncSession
+            if tail_turns is not None:
+                # 以倒数第 tail_turns 条用户消息作为起点, 保证读取的是完整的对话轮次
+                result = await session.execute(
+                    select(ConversationMessage.seq)
+                    .where(
+                        col(ConversationMessage.conversation_id) == cid,
+                        col(ConversationMessage.seq) >= start_seq,
+                        col(ConversationMessage.role) == "user",
+                    )
+                    .order_by(desc(ConversationMessage.seq))
+                    .offset(max(tail_turns, 1) - 1)
+                    .limit(1),
+                )
+                boundary = result.scalar_one_or_none()
+                if boundary is not None:
+                    start_seq = boundary
+            query = select(ConversationMessage).where(
+                col(ConversationMessage.conversation_id) == cid,
+                col(ConversationMessage.seq) >= start_seq,
+            )
+            result = await session.execute(query.order_by(ConversationMessage.seq))
+            return list(result.scalars().all())
+
+    async def append_conversation_messages(
+        self,
+        cid,
+        messages,
+        watermark=None,
+        history_prefix=None,
+        reset_history=False,
+        token_usage=None,
+    ):
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                result = await session.execute(
+                    select(func.max(ConversationMessage.seq)).where(
+                        col(ConversationMessage.conversation_id) == cid,
+                    ),
+                )
+                max_seq = result.scalar_one_or_none()
+                first_seq = 0 if max_seq is None else max_seq + 1
+                session.add_all(
+                    ConversationMessage(
+                        conversation_id=cid,
+                        seq=first_seq + i,
+                        role=str(message.get("role", "")),
+                        payload=message,
+                    )
+                    for i, message in enumerate(messages)
+                )
+
+                end_seq = first_seq + len(messages)
+                values: dict[str, T.Any] = {}
+                if reset_history:
+                    values["history_watermark"] = first_seq
+                    values["history_prefix"] = []
+                    values["content"] = []
+                    values["message_count"] = len(messages)
+                else:
+                    if watermark is not None:
+                        values["history_watermark"] = watermark
+                    if history_prefix is not None:
+                        values["history_prefix"] = history_prefix
+                    # 历史中的消息数为前缀消息数加上水位线之后的日志消息数
+                    values["message_count"] = (
+                        end_seq
+                        - (
+                            watermark
+                            if watermark is not None
+                            else col(ConversationV2.history_watermark)
+                        )
+                        + (
+                            len(history_prefix)
+                            if history_prefix is not None
+                            else func.coalesce(
+                                func.json_array_length(
+                                    col(ConversationV2.history_prefix)
+                                ),
+                                0,
+                            )
+                        )
+                    )
+                if token_usage is not None:
+                    values["token_usage"] = token_usage
+                # 同时刷新 updated_at
+                values["updated_at"] = datetime.now(timezone.utc)
+                await session.execute(
+                    update(ConversationV2)
+                    .where(col(ConversationV2.conversation_id) == cid)
+                    .values(**values),
+                )
+                return first_seq
+
     async def get_session_conversations(
         self,
         page=1,
@@ -375,10 +1002,21 @@ class SQLiteDatabase(BaseDatabase):
             # 搜索筛选
             if search_query:
                 search_pattern = f"%{search_query}%"
+                if self.conversation_search_enabled:
+                    title_condition = col(ConversationV2.conversation_id).in_(
+                        select(
+                            self._conversation_search_subquery(
+                                search_query,
+                                title_only=True,
+                            ).c.conversation_id,
+                        ),
+                    )
+                else:
+                    title_condition = col(ConversationV2.title).ilike(search_pattern)
                 base_query = base_query.where(
                     or_(
                         col(Preference.scope_id).ilike(search_pattern),
-                        col(ConversationV2.title).ilike(search_pattern),
+                        title_condition,
                         col(Persona.persona_id).ilike(search_pattern),
                     ),
                 )
@@ -390,50 +1028,20 @@ class SQLiteDatabase(BaseDatabase):
                     col(Preference.scope_id).like(platform_pattern),
                 )
 
-            # 排序
-            base_query = base_query.order_by(Preference.scope_id)
-
             # 分页结果
-            result_query = base_query.offset(offset).limit(page_size)
+            result_query = (
+                base_query.order_by(Preference.scope_id).offset(offset).limit(page_size)
+            )
             result = await session.execute(result_query)
             rows = result.fetchall()
 
             # 查询总数（应用相同的筛选条件）
-            count_base_query = (
-                select(func.count(col(Preference.scope_id)))
-                .select_from(Preference)
-                .outerjoin(
-                    ConversationV2,
-                    func.json_extract(Preference.value, "$.val")
-                    == ConversationV2.conversation_id,
-                )
-                .outerjoin(
-                    Persona,
-                    col(ConversationV2.persona_id) == Persona.persona_id,
-                )
-                .where(Preference.scope == "umo", Preference.key == "sel_conv_id")
+            total = await self._count(
+                session,
+                base_query,
+                approximate=bool(search_query),
             )
 
-            # 应用相同的搜索和平台筛选条件到计数查询
-            if search_query:
-                search_pattern = f"%{search_query}%"
-                count_base_query = count_base_query.where(
-                    or_(
-                        col(Preference.scope_id).ilike(search_pattern),
-                        col(ConversationV2.title).ilike(search_pattern),
-                        col(Persona.persona_id).ilike(search_pattern),
-                    ),
-                )
-
-            if platform:
-                platform_pattern = f"{platform}:%"
-                count_base_query = count_base_query.where(
-                    col(Preference.scope_id).like(platform_pattern),
-                )
-
-            total_result = await session.execute(count_base_query)
-            total = total_result.scalar() or 0
-
             sessions_data = [
                 {
                     "session_id": row.session_id,
@@ -653,6 +1261,20 @@ class SQLiteDatabase(BaseDatabase):
                     .values(last_used_at=datetime.now(timezone.utc)),
                 )
 
+    async def touch_api_keys(self, last_used: dict[str, datetime]) -> None:
+        """Update last_used_at of multiple API keys in a single transaction."""
+        if not last_used:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                for key_id, used_at in last_used.items():
+                    await session.execute(
+                        update(ApiKey)
+                        .where(col(ApiKey.key_id) == key_id)
+                        .values(last_used_at=used_at),
+                    )
+
     async def revoke_api_key(self, key_id: str) -> bool:
         """Revoke an API key."""
         async with self.get_db() as session:
@@ -1041,6 +1663,39 @@ class SQLiteDatabase(BaseDatabase):
                 )
             await session.commit()
 
+    async def apply_preference_changes(self, changes) -> None:
+        """Apply multiple preference changes in order in a single transaction."""
+        if not changes:
+            return
+        async with self.get_db() as session:
+            session: AsyncSession
+            async with session.begin():
+                for scope, scope_id, key, value in changes:
+                    conditions = [
+                        col(Preference.scope) == scope,
+                        col(Preference.scope_id) == scope_id,
+                    ]
+                    if key is not None:
+                        conditions.append(col(Preference.key) == key)
+                    if value is None:
+                        await session.execute(delete(Preference).where(*conditions))
+                        continue
+                    result = await session.execute(
+                        select(Preference).where(*conditions),
+                    )
+                    existing_preference = result.scalar_one_or_none()
+                    if existing_preference:
+                        existing_preference.value = value
+                    else:
+                        session.add(
+                            Preference(
+                                scope=scope,
+                                scope_id=scope_id,
+                                key=key,
+                                value=value,
+                            ),
+                        )
+
     # ====
     # Command Configuration & Conflict Tracking
     # ====
@@ -1,3 +1,4 @@
+from .index_factory import SUPPORTED_INDEX_TYPES, IndexConfig
 from .vec_db import FaissVecDB
 
-__all__ = ["FaissVecDB"]
+__all__ = ["SUPPORTED_INDEX_TYPES", "FaissVecDB", "IndexConfig"]
@@ -3,10 +3,11 @@ import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from sqlalchemy import Column, Text
+import numpy as np
+from sqlalchemy import Column, LargeBinary, Text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlmodel import Field, MetaData, SQLModel, col, func, select, text
+from sqlmodel import Field, MetaData, SQLModel, col, func, insert, select, text
 
 from astrbot.core import logger
 
@@ -32,6 +33,24 @@ class Document(BaseDocModel, table=True):
     updated_at: datetime | None = Field(default=None)
 
 
+class EmbeddingCacheEntry(BaseDocModel, table=True):
+    """文本向量缓存, 键为 (模型, 文本的 SHA-256)。
+
+    删除文档块时不清理缓存, 重新上传相同内容时可直接复用。
+    """
+
+    __tablename__ = "embedding_cache"  # type: ignore
+
+    model: str = Field(primary_key=True)
+    content_hash: str = Field(primary_key=True)
+    embedding: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    created_at: datetime | None = Field(default=None)
+
+
+EMBEDDING_CACHE_QUERY_CHUNK = 500
+"""查询向量缓存时每条 SQL 中的最大参数数量"""
+
+
 class DocumentStorage:
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
@@ -211,6 +230,75 @@ class DocumentStorage:
             await session.flush()  # Flush to get all IDs
             return [doc.id for doc in documents]  # type: ignore
 
+    async def get_cached_embeddings(
+        self,
+        model: str,
+        content_hashes: list[str],
+    ) -> dict[str, np.ndarray]:
+        """Retrieve cached embeddings by content hash.
+
+        Args:
+            model (str): The embedding model key.
+            content_hashes (list[str]): SHA-256 hashes of the texts.
+
+        Returns:
+            dict: Mapping from content hash to the cached float32 vector.
+
+        """
+        assert self.engine is not None, "Database connection is not initialized."
+
+        hashes = list(dict.fromkeys(content_hashes))
+        cached: dict[str, np.ndarray] = {}
+        async with self.get_session() as session:
+            for i in range(0, len(hashes), EMBEDDING_CACHE_QUERY_CHUNK):
+                query = select(
+                    EmbeddingCacheEntry.content_hash,
+                    EmbeddingCacheEntry.embedding,
+                ).where(
+                    col(EmbeddingCacheEntry.model) == model,
+                    col(EmbeddingCacheEntry.content_hash).in_(
+                        hashes[i : i + EMBEDDING_CACHE_QUERY_CHUNK],
+                    ),
+                )
+                result = await session.execute(query)
+                for content_hash, embedding in result.all():
+                    cached[content_hash] = np.frombuffer(embedding, dtype=np.float32)
+        return cached
+
+    async def put_cached_embeddings(
+        self,
+        model: str,
+        items: list[tuple[str, list[float]]],
+    ) -> None:
+        """Store embeddings in the cache, replacing existing entries.
+
+        Args:
+            model (str): The embedding model key.
+            items (list[tuple[str, list[float]]]): (content hash, embedding) pairs.
+
+        """
+        assert self.engine is not None, "Database connection is not initialized."
+
+        if not items:
+            return
+        now = datetime.now()
+        async with self.get_session() as session, session.begin():
+            await session.execute(
+                insert(EmbeddingCacheEntry).prefix_with("OR REPLACE"),
+                [
+                    {
+                        "model": model,
+                        "content_hash": content_hash,
+                        "embedding": np.asarray(
+                            embedding,
+                            dtype=np.float32,
+                        ).tobytes(),
+                        "created_at": now,
+                    }
+                    for content_hash, embedding in items
+                ],
+            )
+
     async def delete_document_by_doc_id(self, doc_id: str) -> None:
         """Delete a document by its doc_id.
 
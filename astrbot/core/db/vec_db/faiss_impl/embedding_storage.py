@@ -4,21 +4,97 @@ except ModuleNotFoundError:
     raise ImportError(
         "faiss 未安装。请使用 'pip install faiss-cpu' 或 'pip install faiss-gpu' 安装。",
     )
+import asyncio
 import os
 
 import numpy as np
 
+from astrbot import logger
+
+from .index_factory import (
+    INDEX_TYPE_FLAT,
+    INDEX_TYPE_HNSW,
+    IndexConfig,
+    build_index,
+    create_empty_index,
+    detect_index_type,
+    estimate_memory_bytes,
+    extract_vectors,
+    make_search_params,
+    supports_mmap,
+)
+from .wal import OP_ADD, VectorWAL
+
+HNSW_COMPACT_RATIO = 0.1
+"""HNSW 索引中已删除向量占比超过该值时触发后台重建"""
+FLUSH_INTERVAL = 5.0
+"""索引变更后延迟落盘的时间 (秒)"""
+FLUSH_THRESHOLD = 10000
+"""未落盘的变更向量数量达到该值时立即落盘"""
+
 
 class EmbeddingStorage:
-    def __init__(self, dimension: int, path: str | None = None) -> None:
+    def __init__(
+        self,
+        dimension: int,
+        path: str | None = None,
+        index_config: IndexConfig | None = None,
+        flush_interval: float = FLUSH_INTERVAL,
+        flush_threshold: int = FLUSH_THRESHOLD,
+        mmap: bool = False,
+    ) -> None:
         self.dimension = dimension
         self.path = path
+        self.index_config = index_config or IndexConfig()
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
         self.index = None
+        # 以内存映射方式加载时，向量数据在首次写入前不会读入内存
+        self._mmapped = False
         if path and os.path.exists(path):
-            self.index = faiss.read_index(path)
+            if mmap:
+                self.index = faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC)
+                self._mmapped = supports_mmap(detect_index_type(self.index))
+            else:
+                self.index = faiss.read_index(path)
         else:
-            base_index = faiss.IndexFlatL2(dimension)
-            self.index = faiss.IndexIDMap(base_index)
+            self.index = create_empty_index(
+                self.index_config,
+                INDEX_TYPE_FLAT,
+                dimension,
+            )
+        self.index_type = detect_index_type(self.index)
+        # HNSW 不支持删除，已删除向量在 HNSW 内部的位置记录在这里，检索时过滤，重建时清理
+        self._tombstones: set[int] = self._load_tombstones()
+        self._rebuild_task: asyncio.Task | None = None
+        # 后台重建期间发生的变更，重建完成后重放到新索引上
+        self._pending_ops: list[tuple[str, np.ndarray | None, np.ndarray]] | None = None
+
+        # 索引变更先写入 WAL 并标记为脏，由后台任务在工作线程中批量落盘
+        self.wal = VectorWAL(f"{path}.wal") if path else None
+        self._write_lock = asyncio.Lock()
+        self._unflushed = 0
+        self._flush_task: asyncio.Task | None = None
+        self._flush_now = asyncio.Event()
+
+    @property
+    def vector_count(self) -> int:
+        """有效向量数量 (不含已删除但尚未清理的 HNSW 向量)"""
+        assert self.index is not None, "FAISS index is not initialized."
+        return self.index.ntotal - len(self._tombstones)
+
+    @property
+    def is_rebuilding(self) -> bool:
+        return self._rebuild_task is not None and not self._rebuild_task.done()
+
+    @property
+    def is_mmapped(self) -> bool:
+        return self._mmapped
+
+    def memory_usage(self) -> int:
+        """估算索引常驻内存大小 (字节)"""
+        assert self.index is not None, "FAISS index is not initialized."
+        return estimate_memory_bytes(self.index, self._mmapped)
 
     async def insert(self, vector: np.ndarray, id: int) -> None:
         """插入向量
@@ -35,8 +111,11 @@ class EmbeddingStorage:
             raise ValueError(
                 f"向量维度不匹配, 期望: {self.dimension}, 实际: {vector.shape[0]}",
             )
-        self.index.add_with_ids(vector.reshape(1, -1), np.array([id]))
-        await self.save_index()
+        async with self._write_lock:
+            await self._ensure_writable()
+            self._add(vector.reshape(1, -1), np.array([id], dtype=np.int64))
+        self._mark_dirty(1)
+        self.schedule_rebuild()
 
     async def insert_batch(self, vectors: np.ndarray, ids: list[int]) -> None:
         """批量插入向量
@@ -53,23 +132,51 @@ class EmbeddingStorage:
             raise ValueError(
                 f"向量维度不匹配, 期望: {self.dimension}, 实际: {vectors.shape[1]}",
             )
-        self.index.add_with_ids(vectors, np.array(ids))
-        await self.save_index()
+        async with self._write_lock:
+            await self._ensure_writable()
+            self._add(vectors, np.array(ids, dtype=np.int64))
+        self._mark_dirty(len(ids))
+        self.schedule_rebuild()
 
-    async def search(self, vector: np.ndarray, k: int) -> tuple:
+    async def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+    ) -> tuple:
         """搜索最相似的向量
 
         Args:
             vector (np.ndarray): 查询向量
             k (int): 返回的最相似向量的数量
+            nprobe (int | None): IVF 索引探查的聚类数量, 默认使用索引配置
+            ef_search (int | None): HNSW 索引的候选队列长度, 默认使用索引配置
         Returns:
             tuple: (距离, 索引)
 
         """
         assert self.index is not None, "FAISS index is not initialized."
         faiss.normalize_L2(vector)
-        distances, indices = self.index.search(vector, k)
-        return distances, indices
+        nprobe = nprobe or self.index_config.nprobe
+        ef_search = ef_search or self.index_config.ef_search
+
+        if self.index_type == INDEX_TYPE_HNSW and self._tombstones:
+            # 在 HNSW 内部位置上过滤已删除向量，再映射回外部 ID
+            params = make_search_params(
+                INDEX_TYPE_HNSW,
+                ef_search=ef_search,
+                excluded_ids=self._tombstones,
+            )
+            distances, positions = self.index.index.search(vector, k, params=params)
+            id_map = self._id_map_view()
+            indices = np.where(positions >= 0, id_map[np.maximum(positions, 0)], -1)
+            return distances, indices
+
+        params = make_search_params(self.index_type, nprobe, ef_search)
+        if params is None:
+            return self.index.search(vector, k)
+        return self.index.search(vector, k, params=params)
 
     async def delete(self, ids: list[int]) -> None:
         """删除向量
@@ -80,16 +187,258 @@ class EmbeddingStorage:
         """
         assert self.index is not None, "FAISS index is not initialized."
         id_array = np.array(ids, dtype=np.int64)
-        self.index.remove_ids(id_array)
-        await self.save_index()
+        async with self._write_lock:
+            await self._ensure_writable()
+            if self._pending_ops is not None:
+                self._pending_ops.append(("remove", None, id_array))
+            if self.wal:
+                self.wal.append_remove(id_array)
+            self._tombstones = self._remove_from(
+                self.index,
+                self.index_type,
+                self._tombstones,
+                id_array,
+            )
+        self._mark_dirty(len(ids))
+        self.schedule_rebuild()
+
+    async def recover(self) -> int:
+        """重放 WAL 中尚未落盘的变更，返回重放的记录数。应在初始化时调用。"""
+        if not self.wal or not self.wal.has_records():
+            return 0
+        replayed = 0
+        async with self._write_lock:
+            await self._ensure_writable()
+            for op, ids, vectors in self.wal.replay():
+                # 记录可能已经包含在索引文件中 (落盘后、清理 WAL 前崩溃)，
+                # 因此添加前先删除同 ID 的向量，保证重放是幂等的
+                self._tombstones = self._remove_from(
+                    self.index,
+                    self.index_type,
+                    self._tombstones,
+                    ids,
+                )
+                if op == OP_ADD:
+                    self.index.add_with_ids(vectors, ids)  # type: ignore
+                replayed += 1
+        logger.info(f"Recovered {replayed} WAL records for FAISS index {self.path}.")
+        self._unflushed += replayed
+        await self.flush()
+        return replayed
+
+    def set_index_config(self, index_config: IndexConfig) -> None:
+        """更新索引配置。如果目标索引类型发生变化，会在后台迁移。"""
+        self.index_config = index_config
+        self.schedule_rebuild()
+
+    def schedule_rebuild(self) -> None:
+        """按需在后台将索引迁移到目标类型，或清理 HNSW 中已删除的向量"""
+        if self.is_rebuilding:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        target = self.index_config.resolve_index_type(self.vector_count)
+        compact = self.index_type == INDEX_TYPE_HNSW and len(self._tombstones) > max(
+            1,
+            int(self.index.ntotal * HNSW_COMPACT_RATIO),  # type: ignore
+        )
+        if target == self.index_type and not compact:
+            return
+        self._rebuild_task = asyncio.create_task(self._rebuild(target))
+
+    async def wait_for_rebuild(self) -> None:
+        """等待正在进行的后台重建完成"""
+        if self._rebuild_task:
+            await asyncio.shield(self._rebuild_task)
+
+    async def _rebuild(self, target: str) -> None:
+        assert self.index is not None, "FAISS index is not initialized."
+        source_type = self.index_type
+        logger.info(
+            f"Rebuilding FAISS index {self.path}: {source_type} -> {target}, "
+            f"{self.vector_count} vectors.",
+        )
+        try:
+            async with self._write_lock:
+                # 复制索引在工作线程中进行, 持有写锁保证快照与之后记录的变更衔接
+                snapshot = await asyncio.to_thread(faiss.clone_index, self.index)
+                dead_positions = set(self._tombstones)
+                self._pending_ops = []
+            new_index = await asyncio.to_thread(
+                self._build_from_snapshot,
+                snapshot,
+                dead_positions,
+                target,
+            )
+            async with self._write_lock:
+                # 重放重建期间的变更
+                ops, self._pending_ops = self._pending_ops, None
+                new_tombstones: set[int] = set()
+                for op, vectors, op_ids in ops:
+                    if op == "add":
+                        new_index.add_with_ids(vectors, op_ids)
+                    else:
+                        new_tombstones = self._remove_from(
+                            new_index,
+                            target,
+                            new_tombstones,
+                            op_ids,
+                        )
+                self.index = new_index
+                self.index_type = target
+                self._tombstones = new_tombstones
+                self._mmapped = False
+            self._unflushed += 1
+            await self.flush()
+            logger.info(f"FAISS index {self.path} rebuilt as {target}.")
+        except asyncio.CancelledError:
+            self._pending_ops = None
+            raise
+        except Exception as e:
+            self._pending_ops = None
+            logger.error(f"Failed to rebuild FAISS index {self.path}: {e}")
+
+    def _build_from_snapshot(
+        self,
+        snapshot: faiss.Index,
+        dead_positions: set[int],
+        target: str,
+    ) -> faiss.Index:
+        ids, vectors = extract_vectors(snapshot)
+        if dead_positions:
+            alive = np.ones(len(ids), dtype=bool)
+            alive[np.fromiter(dead_positions, dtype=np.int64)] = False
+            ids, vectors = ids[alive], vectors[alive]
+        return build_index(
+            self.index_config,
+            target,
+            self.dimension,
+            np.ascontiguousarray(vectors, dtype=np.float32),
+            ids,
+        )
+
+    async def _ensure_writable(self) -> None:
+        """内存映射的索引是只读的，写入前将其完整读入内存"""
+        if not self._mmapped:
+            return
+        self.index = await asyncio.to_thread(faiss.read_index, self.path)
+        self._mmapped = False
+
+    def _add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        assert self.index is not None, "FAISS index is not initialized."
+        if self._pending_ops is not None:
+            self._pending_ops.append(("add", vectors, ids))
+        if self.wal:
+            self.wal.append_add(ids, vectors)
+        self.index.add_with_ids(vectors, ids)
+
+    def _mark_dirty(self, n_vectors: int) -> None:
+        """记录未落盘的变更，并确保后台落盘任务已启动"""
+        self._unflushed += n_vectors
+        if self._unflushed >= self.flush_threshold:
+            self._flush_now.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        try:
+            await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._flush_now.clear()
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to persist FAISS index {self.path}: {e}")
+        if self._unflushed:
+            # 落盘期间又有新的变更
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> None:
+        """将未落盘的变更写入磁盘。写入在工作线程中进行，期间检索不受影响，写操作会等待。"""
+        if self.index is None or not self.path:
+            return
+        async with self._write_lock:
+            if not self._unflushed:
+                return
+            unflushed, self._unflushed = self._unflushed, 0
+            if self.wal:
+                self.wal.rotate()
+            try:
+                await asyncio.to_thread(
+                    self._write_files,
+                    self.index,
+                    set(self._tombstones),
+                )
+            except BaseException:
+                self._unflushed += unflushed
+                raise
+            if self.wal:
+                self.wal.commit_rotated()
+
+    @staticmethod
+    def _remove_from(
+        index: faiss.Index,
+        index_type: str,
+        tombstones: set[int],
+        ids: np.ndarray,
+    ) -> set[int]:
+        """从索引中删除向量，返回更新后的墓碑集合"""
+        if index_type != INDEX_TYPE_HNSW:
+            index.remove_ids(ids)
+            return tombstones
+        id_map = faiss.rev_swig_ptr(index.id_map.data(), index.ntotal)
+        positions = np.nonzero(np.isin(id_map, ids))[0]
+        return tombstones | {int(pos) for pos in positions}
+
+    def _id_map_view(self) -> np.ndarray:
+        assert self.index is not None, "FAISS index is not initialized."
+        return faiss.rev_swig_ptr(self.index.id_map.data(), self.index.ntotal)
+
+    def _tombstone_path(self) -> str | None:
+        return f"{self.path}.tombstones.npy" if self.path else None
+
+    def _load_tombstones(self) -> set[int]:
+        path = self._tombstone_path()
+        if self.index_type != INDEX_TYPE_HNSW or not path or not os.path.exists(path):
+            return set()
+        return {int(pos) for pos in np.load(path)}
+
+    async def close(self) -> None:
+        """取消正在进行的后台重建，并将未落盘的变更写入磁盘"""
+        if self.is_rebuilding:
+            self._rebuild_task.cancel()  # type: ignore
+            try:
+                await self._rebuild_task  # type: ignore
+            except asyncio.CancelledError:
+                pass
+        if self._flush_task and not self._flush_task.done():
+            # 不取消落盘任务，避免其工作线程仍在写文件时再次写入
+            self._flush_now.set()
+            await self._flush_task
+        await self.flush()
+        if self.wal:
+            self.wal.close()
 
     async def save_index(self) -> None:
-        """保存索引
+        """立即保存索引"""
+        self._unflushed += 1
+        await self.flush()
 
-        Args:
-            path (str): 保存索引的路径
+    def _write_files(self, index: faiss.Index, tombstones: set[int]) -> None:
+        """原子地写入索引文件和墓碑文件 (先写临时文件再替换)"""
+        tmp_path = f"{self.path}.tmp"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, self.path)  # type: ignore
 
-        """
-        if self.index is None:
+        tombstone_path = self._tombstone_path()
+        if not tombstone_path:
             return
-        faiss.write_index(self.index, self.path)
+        if tombstones:
+            tmp_tombstone_path = f"{self.path}.tombstones.tmp.npy"
+            np.save(tmp_tombstone_path, np.fromiter(tombstones, dtype=np.int64))
+            os.replace(tmp_tombstone_path, tombstone_path)
+        elif os.path.exists(tombstone_path):
+            os.remove(tombstone_path)
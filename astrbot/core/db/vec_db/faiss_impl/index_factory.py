@@ -0,0 +1,219 @@
+"""FAISS 索引类型的构建、识别与向量导出
+
+支持的索引类型:
+- flat: IndexIDMap(IndexFlatL2)，精确检索
+- ivf_flat: IndexIVFFlat，倒排 + 原始向量
+- ivf_pq: IndexIVFPQ，倒排 + 乘积量化，显著降低内存占用
+- hnsw: IndexIDMap(IndexHNSWFlat)，图索引。HNSW 不支持删除，删除通过墓碑 + 后台重建实现
+"""
+
+import math
+from dataclasses import dataclass
+
+import faiss
+import numpy as np
+
+INDEX_TYPE_FLAT = "flat"
+INDEX_TYPE_IVF_FLAT = "ivf_flat"
+INDEX_TYPE_IVF_PQ = "ivf_pq"
+INDEX_TYPE_HNSW = "hnsw"
+
+SUPPORTED_INDEX_TYPES = (
+    INDEX_TYPE_FLAT,
+    INDEX_TYPE_IVF_FLAT,
+    INDEX_TYPE_IVF_PQ,
+    INDEX_TYPE_HNSW,
+)
+
+
+@dataclass
+class IndexConfig:
+    """向量索引配置"""
+
+    index_type: str = INDEX_TYPE_FLAT
+    """目标索引类型。向量数量低于 migrate_threshold 时始终使用 flat"""
+    migrate_threshold: int = 10000
+    """向量数量达到该阈值后，才从 flat 迁移到目标索引类型"""
+    nprobe: int = 16
+    """IVF 索引检索时探查的聚类数量"""
+    ef_search: int = 64
+    """HNSW 索引检索时的候选队列长度"""
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 64
+    max_train_samples: int = 100000
+    """IVF 训练时最多使用的采样向量数量"""
+
+    def __post_init__(self) -> None:
+        if self.index_type not in SUPPORTED_INDEX_TYPES:
+            raise ValueError(
+                f"不支持的索引类型: {self.index_type}, "
+                f"可选值: {', '.join(SUPPORTED_INDEX_TYPES)}",
+            )
+
+    def resolve_index_type(self, n_vectors: int) -> str:
+        """根据当前向量数量决定实际应使用的索引类型"""
+        if n_vectors < self.migrate_threshold:
+            return INDEX_TYPE_FLAT
+        return self.index_type
+
+
+def detect_index_type(index: faiss.Index) -> str:
+    """识别一个已加载索引的类型"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return INDEX_TYPE_IVF_PQ
+    if isinstance(index, faiss.IndexIVFFlat):
+        return INDEX_TYPE_IVF_FLAT
+    if isinstance(index, faiss.IndexIDMap):
+        inner = faiss.downcast_index(index.index)
+        if isinstance(inner, faiss.IndexHNSW):
+            return INDEX_TYPE_HNSW
+    return INDEX_TYPE_FLAT
+
+
+def choose_nlist(n_vectors: int) -> int:
+    """IVF 聚类数量，经验值约为 4 * sqrt(N)，且保证每个聚类至少有 39 个训练点"""
+    nlist = min(int(4 * math.sqrt(max(n_vectors, 1))), n_vectors // 39)
+    return max(1, min(65536, nlist))
+
+
+def choose_pq_nbits(n_vectors: int) -> int:
+    """PQ 每个子量化器的编码位数，训练数据不足时降低位数"""
+    return max(4, min(8, int(math.log2(max(n_vectors // 39, 1)))))
+
+
+def choose_pq_m(dimension: int) -> int:
+    """PQ 子空间数量，需要整除向量维度"""
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2):
+        if dimension % m == 0 and dimension // m >= 2:
+            return m
+    return 1
+
+
+def create_empty_index(config: IndexConfig, index_type: str, dimension: int):
+    """创建一个空索引。IVF 类索引返回未训练的索引，由调用方训练。"""
+    if index_type == INDEX_TYPE_HNSW:
+        hnsw = faiss.IndexHNSWFlat(dimension, config.hnsw_m)
+        hnsw.hnsw.efConstruction = config.hnsw_ef_construction
+        hnsw.hnsw.efSearch = config.ef_search
+        return faiss.IndexIDMap(hnsw)
+    if index_type in (INDEX_TYPE_IVF_FLAT, INDEX_TYPE_IVF_PQ):
+        raise ValueError("IVF 索引需要训练数据，请使用 build_index 构建")
+    return faiss.IndexIDMap(faiss.IndexFlatL2(dimension))
+
+
+def build_index(
+    config: IndexConfig,
+    index_type: str,
+    dimension: int,
+    vectors: np.ndarray,
+    ids: np.ndarray,
+):
+    """构建指定类型的索引，按需在采样向量上训练，并添加全部向量。
+
+    该函数是 CPU 密集型的，应在工作线程中调用。
+    """
+    if index_type in (INDEX_TYPE_IVF_FLAT, INDEX_TYPE_IVF_PQ):
+        nlist = choose_nlist(len(vectors))
+        quantizer = faiss.IndexFlatL2(dimension)
+        if index_type == INDEX_TYPE_IVF_PQ:
+            index = faiss.IndexIVFPQ(
+                quantizer,
+                dimension,
+                nlist,
+                choose_pq_m(dimension),
+                choose_pq_nbits(len(vectors)),
+            )
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+        index.nprobe = config.nprobe
+        if len(vectors) > config.max_train_samples:
+            rng = np.random.default_rng()
+            sample = vectors[
+                rng.choice(len(vectors), config.max_train_samples, replace=False)
+            ]
+        else:
+            sample = vectors
+        index.train(sample)
+    else:
+        index = create_empty_index(config, index_type, dimension)
+
+    if len(vectors):
+        index.add_with_ids(vectors, ids.astype(np.int64))
+    return index
+
+
+def extract_vectors(index: faiss.Index) -> tuple[np.ndarray, np.ndarray]:
+    """导出索引中的全部 (ids, vectors)。PQ 索引导出的是量化后的近似向量。"""
+    index = faiss.downcast_index(index)
+    if index.ntotal == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, index.d), dtype=np.float32)
+
+    if isinstance(index, faiss.IndexIVF):
+        invlists = index.invlists
+        ids = np.concatenate(
+            [
+                faiss.rev_swig_ptr(invlists.get_ids(i), invlists.list_size(i)).copy()
+                for i in range(index.nlist)
+                if invlists.list_size(i) > 0
+            ],
+        ).astype(np.int64)
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        try:
+            vectors = index.reconstruct_batch(ids)
+        finally:
+            index.set_direct_map_type(faiss.DirectMap.NoMap)
+        return ids, vectors
+
+    ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+    vectors = index.index.reconstruct_n(0, index.ntotal)
+    return ids, vectors
+
+
+def supports_mmap(index_type: str) -> bool:
+    """flat 和 hnsw 的向量数据存放在 IndexFlatCodes 中，可以通过 IO_FLAG_MMAP_IFC 映射"""
+    return index_type in (INDEX_TYPE_FLAT, INDEX_TYPE_HNSW)
+
+
+def estimate_memory_bytes(index: faiss.Index, mmapped: bool = False) -> int:
+    """估算索引常驻内存大小。内存映射的向量数据由操作系统按需换入换出，不计入。"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        # 倒排表中的编码和 ID，以及聚类中心
+        return index.ntotal * (index.code_size + 8) + index.nlist * index.d * 4
+
+    id_map_bytes = index.ntotal * 8
+    inner = faiss.downcast_index(index.index)
+    if isinstance(inner, faiss.IndexHNSW):
+        graph_bytes = inner.hnsw.neighbors.size() * 4 + inner.hnsw.levels.size() * 4
+        codes_bytes = faiss.downcast_index(inner.storage).code_size * inner.ntotal
+        return id_map_bytes + graph_bytes + (0 if mmapped else codes_bytes)
+    codes_bytes = inner.code_size * inner.ntotal
+    return id_map_bytes + (0 if mmapped else codes_bytes)
+
+
+def make_search_params(
+    index_type: str,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+    excluded_ids: set[int] | None = None,
+):
+    """构造检索参数。返回 None 表示使用索引默认参数。"""
+    selector = None
+    if excluded_ids:
+        selector = faiss.IDSelectorNot(
+            faiss.IDSelectorBatch(np.fromiter(excluded_ids, dtype=np.int64)),
+        )
+
+    if index_type in (INDEX_TYPE_IVF_FLAT, INDEX_TYPE_IVF_PQ) and nprobe:
+        params = faiss.SearchParametersIVF(nprobe=nprobe)
+    elif index_type == INDEX_TYPE_HNSW and ef_search:
+        params = faiss.SearchParametersHNSW(efSearch=ef_search)
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+
+    if selector is not None:
+        params.sel = selector
+    return params
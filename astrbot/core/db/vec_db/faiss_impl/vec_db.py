@@ -1,3 +1,4 @@
+import hashlib
 import time
 import uuid
 
@@ -9,6 +10,11 @@ from astrbot.core.provider.provider import EmbeddingProvider, RerankProvider
 from ..base import BaseVecDB, Result
 from .document_storage import DocumentStorage
 from .embedding_storage import EmbeddingStorage
+from .index_factory import IndexConfig
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
 class FaissVecDB(BaseVecDB):
@@ -20,6 +26,8 @@ class FaissVecDB(BaseVecDB):
         index_store_path: str,
         embedding_provider: EmbeddingProvider,
         rerank_provider: RerankProvider | None = None,
+        index_config: IndexConfig | None = None,
+        mmap: bool = False,
     ) -> None:
         self.doc_store_path = doc_store_path
         self.index_store_path = index_store_path
@@ -28,12 +36,18 @@ class FaissVecDB(BaseVecDB):
         self.embedding_storage = EmbeddingStorage(
             embedding_provider.get_dim(),
             index_store_path,
+            index_config=index_config,
+            mmap=mmap,
         )
         self.embedding_provider = embedding_provider
         self.rerank_provider = rerank_provider
 
     async def initialize(self) -> None:
         await self.document_storage.initialize()
+        # 重放上次运行中尚未落盘的索引变更
+        await self.embedding_storage.recover()
+        # 索引类型配置可能在上次运行后发生了变化
+        self.embedding_storage.schedule_rebuild()
 
     async def insert(
         self,
@@ -67,6 +81,9 @@ class FaissVecDB(BaseVecDB):
     ) -> list[int]:
         """批量插入文本和其对应向量，自动生成 ID 并保持一致性。
 
+        文本向量按 (模型, 内容哈希) 缓存在文档数据库中, 内容未变化的文本块不会重复请求 Embedding Provider。
+        每个批次完成后立即写入缓存, 上传中途失败时, 重新上传会从已完成的批次之后继续。
+
         Args:
             progress_callback: 进度回调函数，接收参数 (current, total)
 
@@ -74,18 +91,48 @@ class FaissVecDB(BaseVecDB):
         metadatas = metadatas or [{} for _ in contents]
         ids = ids or [str(uuid.uuid4()) for _ in contents]
 
+        model_key = self._embedding_model_key()
+        hashes = [content_hash(content) for content in contents]
+        cached = await self.document_storage.get_cached_embeddings(model_key, hashes)
+        missing = list(
+            dict.fromkeys(
+                content
+                for content, digest in zip(contents, hashes)
+                if digest not in cached
+            ),
+        )
+        hits = len(contents) - len(missing)
+
+        async def save_batch(texts: list[str], embeddings: list[list[float]]) -> None:
+            await self.document_storage.put_cached_embeddings(
+                model_key,
+                [(content_hash(t), e) for t, e in zip(texts, embeddings)],
+            )
+
+        async def embedding_progress(current: int, total: int) -> None:
+            if progress_callback:
+                await progress_callback(hits + current, hits + total)
+
         start = time.time()
-        logger.debug(f"Generating embeddings for {len(contents)} contents...")
-        vectors = await self.embedding_provider.get_embeddings_batch(
-            contents,
-            batch_size=batch_size,
-            tasks_limit=tasks_limit,
-            max_retries=max_retries,
-            progress_callback=progress_callback,
+        logger.debug(
+            f"Generating embeddings for {len(missing)} contents ({hits} cached)...",
         )
+        if missing:
+            vectors = await self.embedding_provider.get_embeddings_batch(
+                missing,
+                batch_size=batch_size,
+                tasks_limit=tasks_limit,
+                max_retries=max_retries,
+                progress_callback=embedding_progress,
+                batch_callback=save_batch,
+            )
+            for content, vector in zip(missing, vectors):
+                cached[content_hash(content)] = np.asarray(vector, dtype=np.float32)
+        elif progress_callback:
+            await progress_callback(len(contents), len(contents))
         end = time.time()
         logger.debug(
-            f"Generated embeddings for {len(contents)} contents in {end - start:.2f} seconds.",
+            f"Generated embeddings for {len(missing)} contents in {end - start:.2f} seconds.",
         )
 
         # 使用 DocumentStorage 的批量插入方法
@@ -96,10 +143,20 @@ class FaissVecDB(BaseVecDB):
         )
 
         # 批量插入向量到 FAISS
-        vectors_array = np.array(vectors).astype("float32")
+        vectors_array = np.array([cached[digest] for digest in hashes]).astype(
+            "float32",
+        )
         await self.embedding_storage.insert_batch(vectors_array, int_ids)
         return int_ids
 
+    def _embedding_model_key(self) -> str:
+        """向量缓存的模型键, 不同 Provider、模型或维度的向量互不复用"""
+        provider = self.embedding_provider
+        config = getattr(provider, "provider_config", None) or {}
+        provider_id = config.get("id", "")
+        model = config.get("embedding_model") or provider.get_model()
+        return f"{provider_id}/{model}/{provider.get_dim()}"
+
     async def retrieve(
         self,
         query: str,
@@ -107,6 +164,9 @@ class FaissVecDB(BaseVecDB):
         fetch_k: int = 20,
         rerank: bool = False,
         metadata_filters: dict | None = None,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+        query_embedding: list[float] | None = None,
     ) -> list[Result]:
         """搜索最相似的文档。
 
@@ -116,15 +176,22 @@ class FaissVecDB(BaseVecDB):
             fetch_k (int): 在根据 metadata 过滤前从 FAISS 中获取的数量
             rerank (bool): 是否使用重排序。这需要在实例化时提供 rerank_provider, 如果未提供并且 rerank 为 True, 不会抛出异常。
             metadata_filters (dict): 元数据过滤器
+            nprobe (int | None): IVF 索引探查的聚类数量
+            ef_search (int | None): HNSW 索引的候选队列长度
+            query_embedding (list[float] | None): 预先计算好的查询向量, 提供时不再调用 Embedding Provider
 
         Returns:
             List[Result]: 查询结果
 
         """
-        embedding = await self.embedding_provider.get_embedding(query)
+        embedding = query_embedding
+        if embedding is None:
+            embedding = await self.embedding_provider.get_embedding(query)
         scores, indices = await self.embedding_storage.search(
             vector=np.array([embedding]).astype("float32"),
             k=fetch_k if metadata_filters else k,
+            nprobe=nprobe,
+            ef_search=ef_search,
         )
         if len(indices[0]) == 0 or indices[0][0] == -1:
             return []
@@ -177,7 +244,12 @@ class FaissVecDB(BaseVecDB):
         await self.document_storage.delete_document_by_doc_id(doc_id)
         await self.embedding_storage.delete([int_id])
 
+    async def flush(self) -> None:
+        """将尚未落盘的索引变更写入磁盘"""
+        await self.embedding_storage.flush()
+
     async def close(self) -> None:
+        await self.embedding_storage.close()
         await self.document_storage.close()
 
     async def count_documents(self, metadata_filter: dict | None = None) -> int:
@@ -0,0 +1,116 @@
+"""FAISS 索引的预写日志 (WAL)
+
+索引改为延迟落盘后，两次落盘之间的变更记录在 WAL 中，进程崩溃后可在下次初始化时重放。
+
+文件格式: 连续的记录，每条记录为
+    header: op (1 字节, b"a" 添加 / b"r" 删除), count (uint32), dim (uint32)
+    ids: int64 * count
+    vectors: float32 * count * dim (仅添加记录)
+
+落盘时当前 WAL 会被轮转为 ``<path>.flushing``，索引文件写入成功后再删除，
+写入失败时保留，以便下次落盘或重放时使用。重放时先重放 ``.flushing`` 再重放当前 WAL。
+"""
+
+import os
+import struct
+from collections.abc import Iterator
+
+import numpy as np
+
+from astrbot import logger
+
+_HEADER = struct.Struct("<cII")
+OP_ADD = b"a"
+OP_REMOVE = b"r"
+
+
+class VectorWAL:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.flushing_path = f"{path}.flushing"
+        self._file = None
+
+    def append_add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        self._append(OP_ADD, ids, vectors)
+
+    def append_remove(self, ids: np.ndarray) -> None:
+        self._append(OP_REMOVE, ids, None)
+
+    def rotate(self) -> None:
+        """将当前 WAL 轮转为 .flushing，之后的变更写入新的 WAL"""
+        self._close_file()
+        if not os.path.exists(self.path):
+            return
+        if os.path.exists(self.flushing_path):
+            # 上一次落盘失败，合并到未提交的 .flushing 之后，保持顺序
+            with open(self.flushing_path, "ab") as dst, open(self.path, "rb") as src:
+                dst.write(src.read())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.flushing_path)
+
+    def commit_rotated(self) -> None:
+        """索引已成功落盘，丢弃 .flushing"""
+        if os.path.exists(self.flushing_path):
+            os.remove(self.flushing_path)
+
+    def has_records(self) -> bool:
+        return any(
+            os.path.exists(p) and os.path.getsize(p) > 0
+            for p in (self.flushing_path, self.path)
+        )
+
+    def replay(self) -> Iterator[tuple[bytes, np.ndarray, np.ndarray | None]]:
+        """按写入顺序读取全部记录"""
+        self._close_file()
+        for path in (self.flushing_path, self.path):
+            if os.path.exists(path):
+                yield from self._read(path)
+
+    def close(self) -> None:
+        self._close_file()
+
+    def _append(
+        self,
+        op: bytes,
+        ids: np.ndarray,
+        vectors: np.ndarray | None,
+    ) -> None:
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        dim = 0 if vectors is None else vectors.shape[1]
+        self._file.write(_HEADER.pack(op, len(ids), dim))
+        self._file.write(ids.tobytes())
+        if vectors is not None:
+            self._file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        # 写入操作系统缓冲区即可保证进程崩溃后可恢复
+        self._file.flush()
+
+    def _read(self, path: str) -> Iterator[tuple[bytes, np.ndarray, np.ndarray | None]]:
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if not header:
+                    return
+                if len(header) < _HEADER.size:
+                    logger.warning(f"WAL {path} has a truncated record, ignoring it.")
+                    return
+                op, count, dim = _HEADER.unpack(header)
+                ids_bytes = f.read(count * 8)
+                vec_bytes = f.read(count * dim * 4)
+                if len(ids_bytes) < count * 8 or len(vec_bytes) < count * dim * 4:
+                    logger.warning(f"WAL {path} has a truncated record, ignoring it.")
+                    return
+                ids = np.frombuffer(ids_bytes, dtype=np.int64)
+                vectors = (
+                    np.frombuffer(vec_bytes, dtype=np.float32).reshape(count, dim)
+                    if op == OP_ADD
+                    else None
+                )
+                yield op, ids, vectors
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
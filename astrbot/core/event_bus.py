@@ -3,22 +3,123 @@
 其中包含了一个无限循环的调度函数, 用于从事件队列中获取新的事件, 并创建一个新的异步任务来执行管道调度器的处理逻辑
 
 class:
+    EventQueue: 有界事件队列, 支持溢出策略与排队指标
     EventBus: 事件总线, 用于处理事件的分发和处理
 
 工作流程:
 1. 维护一个异步队列, 来接受各种消息事件
 2. 无限循环的调度函数, 从事件队列中获取新的事件, 打印日志并创建一个新的异步任务来执行管道调度器的处理逻辑
+3. 设置了最大并发数时, 同一会话 (unified_msg_origin) 的事件按顺序串行处理, 不同会话并行处理, 且同时处理的事件数不超过最大并发数。
+   会话中正在处理的事件在等待用户的后续消息 (会话控制器、Agent 追问或中止) 时, 该会话的新事件会立即处理
 """
 
 import asyncio
+import time
 from asyncio import Queue
+from collections import deque
 
 from astrbot.core import logger
 from astrbot.core.astrbot_config_mgr import AstrBotConfigManager
+from astrbot.core.pipeline.process_stage.follow_up import has_active_runner
 from astrbot.core.pipeline.scheduler import PipelineScheduler
+from astrbot.core.utils.session_waiter import FILTERS, USER_SESSIONS
 
 from .platform import AstrMessageEvent
 
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_REJECT = "reject"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT)
+
+
+class _WaitStats:
+    """排队等待时间统计"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+
+    def to_dict(self) -> dict:
+        return {
+            "avg_wait_ms": round(self.total / self.count * 1000, 2)
+            if self.count
+            else 0.0,
+            "max_wait_ms": round(self.max * 1000, 2),
+        }
+
+
+class EventQueue(Queue):
+    """有界事件队列
+
+    队列已满时, 按 overflow_policy 处理 put_nowait:
+    - block: 事件暂存, 等待队列有空位后再入队 (使用 await put() 的生产者会被阻塞)
+    - drop_oldest: 丢弃队列中最早的事件
+    - reject: 丢弃新事件
+    """
+
+    def __init__(self, maxsize: int = 0, overflow_policy: str = OVERFLOW_BLOCK):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            logger.warning(
+                f"未知的事件队列溢出策略: {overflow_policy}, 已使用 {OVERFLOW_BLOCK}",
+            )
+            overflow_policy = OVERFLOW_BLOCK
+        super().__init__(maxsize)
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.wait_stats = _WaitStats()
+        self._deferred_puts: set[asyncio.Task] = set()
+
+    # asyncio.Queue 的存取钩子, 与 LifoQueue / PriorityQueue 的扩展方式相同
+    def _init(self, maxsize: int) -> None:
+        self._queue: deque[tuple[float, object]] = deque()
+
+    def _put(self, item) -> None:
+        self._queue.append((time.monotonic(), item))
+        self.max_depth = max(self.max_depth, len(self._queue))
+
+    def _get(self):
+        enqueued_at, item = self._queue.popleft()
+        self.wait_stats.record(time.monotonic() - enqueued_at)
+        return item
+
+    def put_nowait(self, item) -> None:
+        if not self.full():
+            super().put_nowait(item)
+            return
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            self.get_nowait()
+            self.dropped += 1
+            logger.warning("事件队列已满, 已丢弃最早的事件。")
+            super().put_nowait(item)
+        elif self.overflow_policy == OVERFLOW_REJECT:
+            self.rejected += 1
+            logger.warning("事件队列已满, 已拒绝新事件。")
+        else:
+            # 同步调用方无法等待, 暂存为等待入队的任务
+            task = asyncio.get_running_loop().create_task(self.put(item))
+            self._deferred_puts.add(task)
+            task.add_done_callback(self._deferred_puts.discard)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.qsize(),
+            "maxsize": self.maxsize,
+            "max_depth": self.max_depth,
+            "overflow_policy": self.overflow_policy,
+            "blocked": len(self._deferred_puts),
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            **self.wait_stats.to_dict(),
+        }
+
 
 class EventBus:
     """用于处理事件的分发和处理"""
@@ -28,14 +129,39 @@ class EventBus:
         event_queue: Queue,
         pipeline_scheduler_mapping: dict[str, PipelineScheduler],
         astrbot_config_mgr: AstrBotConfigManager,
+        max_concurrency: int = 0,
     ) -> None:
         self.event_queue = event_queue  # 事件队列
         # abconf uuid -> scheduler
         self.pipeline_scheduler_mapping = pipeline_scheduler_mapping
         self.astrbot_config_mgr = astrbot_config_mgr
+        # 最大并发数, <= 0 表示不限制, 每个事件各自创建一个任务
+        self.max_concurrency = max_concurrency
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        )
+        # 事件队列有界时, 总线最多持有的事件数 (排队中 + 处理中)。
+        # 达到上限后不再从事件队列取事件, 由事件队列的溢出策略对生产者施加背压
+        self._max_pending = (
+            max(event_queue.maxsize, max_concurrency) if event_queue.maxsize > 0 else 0
+        )
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        # unified_msg_origin -> 待处理事件 (事件, 调度器, 取出时间)
+        self._session_queues: dict[
+            str, deque[tuple[AstrMessageEvent, PipelineScheduler, float]]
+        ] = {}
+        self._session_workers: dict[str, asyncio.Task] = {}
+        self._pending = 0
+        self._running = 0
+        self._processed = 0
+        self._bypassed = 0
+        self._wait_stats = _WaitStats()
 
     async def dispatch(self) -> None:
         while True:
+            if self._semaphore:
+                await self._capacity.wait()
             event: AstrMessageEvent = await self.event_queue.get()
             conf_info = self.astrbot_config_mgr.get_conf_info(event.unified_msg_origin)
             conf_id = conf_info["id"]
@@ -47,7 +173,90 @@ class EventBus:
                     f"PipelineScheduler not found for id: {conf_id}, event ignored."
                 )
                 continue
-            asyncio.create_task(scheduler.execute(event))
+            if self._semaphore:
+                self._submit(event, scheduler)
+            else:
+                asyncio.create_task(scheduler.execute(event))
+
+    def _submit(self, event: AstrMessageEvent, scheduler: PipelineScheduler) -> None:
+        """将事件放入所属会话的队列, 必要时为该会话启动处理任务"""
+        umo = event.unified_msg_origin
+        if umo in self._session_workers and self._awaits_follow_up(event):
+            # 正在处理的事件在等待这条消息, 排队会导致死锁
+            self._bypassed += 1
+            asyncio.create_task(self._execute(event, scheduler))
+            return
+        session_queue = self._session_queues.setdefault(umo, deque())
+        session_queue.append((event, scheduler, time.monotonic()))
+        self._pending += 1
+        if self._max_pending and self._pending >= self._max_pending:
+            self._capacity.clear()
+        if umo not in self._session_workers:
+            self._session_workers[umo] = asyncio.create_task(
+                self._run_session(umo),
+                name=f"event_bus_session({umo})",
+            )
+
+    @staticmethod
+    def _awaits_follow_up(event: AstrMessageEvent) -> bool:
+        """会话中是否有处理中的事件在等待用户的后续消息"""
+        if has_active_runner(event.unified_msg_origin):
+            return True
+        for session_filter in FILTERS:
+            try:
+                if session_filter.filter(event) in USER_SESSIONS:
+                    return True
+            except Exception:
+                continue
+        return False
+
+    async def _run_session(self, umo: str) -> None:
+        """按顺序处理同一会话的事件"""
+        session_queue = self._session_queues[umo]
+        semaphore = self._semaphore or asyncio.Semaphore(1)
+        try:
+            while session_queue:
+                event, scheduler, dispatched_at = session_queue[0]
+                async with semaphore:
+                    self._wait_stats.record(time.monotonic() - dispatched_at)
+                    session_queue.popleft()
+                    self._running += 1
+                    try:
+                        await self._execute(event, scheduler)
+                    finally:
+                        self._running -= 1
+                        self._pending -= 1
+                        self._processed += 1
+                        if not self._max_pending or self._pending < self._max_pending:
+                            self._capacity.set()
+        finally:
+            self._session_workers.pop(umo, None)
+            if not session_queue:
+                self._session_queues.pop(umo, None)
+
+    @staticmethod
+    async def _execute(event: AstrMessageEvent, scheduler: PipelineScheduler) -> None:
+        try:
+            await scheduler.execute(event)
+        except Exception as e:
+            logger.error(f"处理事件时发生错误: {e}", exc_info=True)
+
+    def stats(self) -> dict:
+        """事件总线的队列深度与等待时间指标"""
+        stats = {
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "pending": self._pending - self._running,
+            "active_sessions": len(self._session_workers),
+            "processed": self._processed,
+            "bypassed": self._bypassed,
+            **self._wait_stats.to_dict(),
+        }
+        if isinstance(self.event_queue, EventQueue):
+            stats["queue"] = self.event_queue.stats()
+        else:
+            stats["queue"] = {"depth": self.event_queue.qsize()}
+        return stats
 
     def _print_event(self, event: AstrMessageEvent, conf_name: str) -> None:
         """用于记录事件信息
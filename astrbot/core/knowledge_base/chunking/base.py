@@ -4,6 +4,10 @@
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator
+
+STREAM_WINDOW_CHUNKS = 32
+"""流式分块时, 缓冲区累积到约多少个块的长度后进行一次分块"""
 
 
 class BaseChunker(ABC):
@@ -23,3 +27,36 @@ class BaseChunker(ABC):
             list[str]: 分块后的文本列表
 
         """
+
+    async def chunk_stream(
+        self,
+        texts: AsyncIterable[str],
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """对文本流分块
+
+        文本累积到窗口大小后分块并产出除最后一块以外的所有块, 最后一块 (可能不完整)
+        及其之后的文本留在缓冲区中与后续文本一起分块, 缓冲区大小与文本总长度无关。
+
+        Args:
+            texts: 输入文本流
+            chunk_size: 每个文本块的最大大小
+
+        """
+        chunk_size = kwargs.get("chunk_size") or getattr(self, "chunk_size", 512)
+        window = max(chunk_size, 1) * STREAM_WINDOW_CHUNKS
+        buffer = ""
+        async for text in texts:
+            buffer += text
+            if len(buffer) < window:
+                continue
+            chunks = await self.chunk(buffer, **kwargs)
+            if len(chunks) < 2:
+                continue
+            for chunk in chunks[:-1]:
+                yield chunk
+            tail_start = buffer.rfind(chunks[-1])
+            buffer = buffer[tail_start:] if tail_start >= 0 else chunks[-1]
+        if buffer:
+            for chunk in await self.chunk(buffer, **kwargs):
+                yield chunk
@@ -1,14 +1,19 @@
 import asyncio
+import functools
+import itertools
 import json
 import re
 import time
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
 from pathlib import Path
 
 import aiofiles
 
 from astrbot.core import logger
 from astrbot.core.db.vec_db.base import BaseVecDB
+from astrbot.core.db.vec_db.faiss_impl.index_factory import IndexConfig
 from astrbot.core.db.vec_db.faiss_impl.vec_db import FaissVecDB
 from astrbot.core.provider.manager import ProviderManager
 from astrbot.core.provider.provider import (
@@ -25,7 +30,10 @@ from .kb_db_sqlite import KBSQLiteDatabase
 from .models import KBDocument, KBMedia, KnowledgeBase
 from .parsers.url_parser import extract_text_from_url
 from .parsers.util import select_parser
+from .parsers.worker_pool import ParserPool
 from .prompts import TEXT_REPAIR_SYSTEM_PROMPT
+from .retrieval.sparse_index import SparseIndex
+from .vec_db_pool import VecDBPool
 
 
 class RateLimiter:
@@ -105,8 +113,22 @@ Text chunk to process:
     return [chunk]
 
 
+_version_counter = itertools.count(1)
+
+
+def _uses_vec_db(func):
+    """在方法执行期间加载并占用向量数据库，避免其被 LRU 策略卸载"""
+
+    @functools.wraps(func)
+    async def wrapper(self: "KBHelper", *args, **kwargs):
+        async with self.use_vec_db():
+            return await func(self, *args, **kwargs)
+
+    return wrapper
+
+
 class KBHelper:
-    vec_db: BaseVecDB
+    vec_db: BaseVecDB | None
     kb: KnowledgeBase
 
     def __init__(
@@ -116,6 +138,8 @@ class KBHelper:
         provider_manager: ProviderManager,
         kb_root_dir: str,
         chunker: BaseChunker,
+        vec_db_pool: VecDBPool | None = None,
+        parser_pool: ParserPool | None = None,
     ) -> None:
         self.kb_db = kb_db
         self.kb = kb
@@ -130,8 +154,22 @@ class KBHelper:
         self.kb_medias_dir.mkdir(parents=True, exist_ok=True)
         self.kb_files_dir.mkdir(parents=True, exist_ok=True)
 
+        self.sparse_index = SparseIndex(str(self.kb_dir / "sparse_index.msgpack"))
+
+        # 向量数据库在首次使用时才加载，并可能被 vec_db_pool 按 LRU 策略卸载
+        self.vec_db = None
+        self.vec_db_pool = vec_db_pool
+        # 流式上传时在进程池中解析文档, 未提供时在当前进程中解析
+        self.parser_pool = parser_pool or ParserPool(0)
+        self._vec_db_lock = asyncio.Lock()
+        self._vec_db_users = 0
+        # 知识库内容或设置每次变化都会得到一个新的全局唯一版本号，用于使检索缓存失效
+        self.version = next(_version_counter)
+
     async def initialize(self) -> None:
-        await self._ensure_vec_db()
+        """校验知识库配置。向量数据库会在首次使用时加载。"""
+        await self.get_ep()
+        await self.get_rp()
 
     async def get_ep(self) -> EmbeddingProvider:
         if not self.kb.embedding_provider_id:
@@ -157,22 +195,92 @@ class KBHelper:
             )
         return rp
 
-    async def _ensure_vec_db(self) -> FaissVecDB:
+    def get_index_config(self) -> IndexConfig:
+        """根据知识库设置构造向量索引配置"""
+        return IndexConfig(
+            index_type=self.kb.index_type or "flat",
+            nprobe=self.kb.index_nprobe or 16,
+            ef_search=self.kb.index_ef_search or 64,
+        )
+
+    def apply_index_config(self) -> None:
+        """将知识库的索引设置应用到已加载的向量数据库，必要时在后台迁移索引"""
+        if isinstance(self.vec_db, FaissVecDB):
+            self.vec_db.embedding_storage.set_index_config(self.get_index_config())
+
+    async def flush_index(self) -> None:
+        """将尚未落盘的向量索引变更写入磁盘，在直接读取索引文件前调用"""
+        if isinstance(self.vec_db, FaissVecDB):
+            await self.vec_db.flush()
+
+    def bump_version(self) -> None:
+        self.version = next(_version_counter)
+
+    @property
+    def vec_db_in_use(self) -> bool:
+        return self._vec_db_users > 0
+
+    def vec_db_memory_usage(self) -> int:
+        """已加载向量索引的估算内存占用 (字节)，未加载时为 0"""
+        if isinstance(self.vec_db, FaissVecDB):
+            return self.vec_db.embedding_storage.memory_usage()
+        return 0
+
+    async def get_vec_db(self) -> FaissVecDB:
+        """获取向量数据库，未加载时从磁盘加载"""
+        async with self._vec_db_lock:
+            vec_db, loaded = await self._ensure_vec_db()
+        if self.vec_db_pool:
+            self.vec_db_pool.touch(self)
+            if loaded:
+                await self.vec_db_pool.enforce_budget()
+        return vec_db
+
+    @asynccontextmanager
+    async def use_vec_db(self) -> AsyncIterator[FaissVecDB]:
+        """获取向量数据库，并在使用期间阻止其被卸载"""
+        self._vec_db_users += 1
+        try:
+            yield await self.get_vec_db()
+        finally:
+            self._vec_db_users -= 1
+
+    async def unload_vec_db(self) -> None:
+        """关闭并释放已加载的向量数据库和稀疏索引，下次使用时重新加载"""
+        async with self._vec_db_lock:
+            if self.vec_db_pool:
+                self.vec_db_pool.discard(self.kb.kb_id)
+            if self.vec_db:
+                await self.vec_db.close()
+                self.vec_db = None
+            await self.sparse_index.unload()
+
+    async def _ensure_vec_db(self) -> tuple[FaissVecDB, bool]:
+        """返回 (向量数据库, 是否为新加载)"""
         if not self.kb.embedding_provider_id:
             raise ValueError(f"知识库 {self.kb.kb_name} 未配置 Embedding Provider")
 
         ep = await self.get_ep()
         rp = await self.get_rp()
 
+        current = self.vec_db
+        if isinstance(current, FaissVecDB):
+            if current.embedding_provider is ep and current.rerank_provider is rp:
+                return current, False
+            # Provider 发生变化，关闭旧实例 (包括其后台索引重建任务) 后重新创建
+            await current.close()
+
         vec_db = FaissVecDB(
             doc_store_path=str(self.kb_dir / "doc.db"),
             index_store_path=str(self.kb_dir / "index.faiss"),
             embedding_provider=ep,
             rerank_provider=rp,
+            index_config=self.get_index_config(),
+            mmap=True,
         )
         await vec_db.initialize()
         self.vec_db = vec_db
-        return vec_db
+        return vec_db, True
 
     async def delete_vec_db(self) -> None:
         """删除知识库的向量数据库和所有相关文件"""
@@ -183,9 +291,9 @@ class KBHelper:
             shutil.rmtree(self.kb_dir)
 
     async def terminate(self) -> None:
-        if self.vec_db:
-            await self.vec_db.close()
+        await self.unload_vec_db()
 
+    @_uses_vec_db
     async def upload_document(
         self,
         file_name: str,
@@ -198,6 +306,7 @@ class KBHelper:
         max_retries: int = 3,
         progress_callback=None,
         pre_chunked_text: list[str] | None = None,
+        file_path: str | None = None,
     ) -> KBDocument:
         """上传并处理文档（带原子性保证和失败清理）
 
@@ -210,18 +319,35 @@ class KBHelper:
         6. 保存元数据（事务）
         7. 更新统计
 
+        提供 file_path 而不提供 file_content 时, 以流式方式从磁盘读取文件,
+        边解析边分块, 并按窗口批量生成向量和写入, 内存占用与文件大小无关。
+
         Args:
             progress_callback: 进度回调函数，接收参数 (stage, current, total)
                 - stage: 当前阶段 ('parsing', 'chunking', 'embedding')
                 - current: 当前进度
                 - total: 总数
+            file_path: 待上传文件在磁盘上的路径
 
         """
-        await self._ensure_vec_db()
         doc_id = str(uuid.uuid4())
         media_paths: list[Path] = []
         file_size = 0
 
+        if pre_chunked_text is None and file_content is None and file_path:
+            return await self._upload_document_stream(
+                doc_id=doc_id,
+                file_name=file_name,
+                file_path=file_path,
+                file_type=file_type,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                batch_size=batch_size,
+                tasks_limit=tasks_limit,
+                max_retries=max_retries,
+                progress_callback=progress_callback,
+            )
+
         # file_path = self.kb_files_dir / f"{doc_id}.{file_type}"
         # async with aiofiles.open(file_path, "wb") as f:
         #     await f.write(file_content)
@@ -297,7 +423,7 @@ class KBHelper:
                 if progress_callback:
                     await progress_callback("embedding", current, total)
 
-            await self.vec_db.insert_batch(
+            int_ids = await self.vec_db.insert_batch(
                 contents=contents,
                 metadatas=metadatas,
                 batch_size=batch_size,
@@ -305,6 +431,12 @@ class KBHelper:
                 max_retries=max_retries,
                 progress_callback=embedding_progress_callback,
             )
+            await self.sparse_index.add_documents(
+                ids=int_ids,
+                texts=contents,
+                kb_doc_ids=[doc_id] * len(contents),
+            )
+            self.bump_version()
 
             # 保存文档的元数据
             doc = KBDocument(
@@ -318,34 +450,155 @@ class KBHelper:
                 chunk_count=len(chunks_text),
                 media_count=0,
             )
-            async with self.kb_db.get_db() as session:
-                async with session.begin():
-                    session.add(doc)
-                    for media in saved_media:
-                        session.add(media)
-                    await session.commit()
-
-                await session.refresh(doc)
-
-            vec_db: FaissVecDB = self.vec_db  # type: ignore
-            await self.kb_db.update_kb_stats(kb_id=self.kb.kb_id, vec_db=vec_db)
-            await self.refresh_kb()
-            await self.refresh_document(doc_id)
-            return doc
+            return await self._save_document(doc, saved_media)
         except Exception as e:
             logger.error(f"上传文档失败: {e}")
             # if file_path.exists():
             #     file_path.unlink()
 
-            for media_path in media_paths:
-                try:
-                    if media_path.exists():
-                        media_path.unlink()
-                except Exception as me:
-                    logger.warning(f"清理多媒体文件失败 {media_path}: {me}")
+            self._cleanup_media(media_paths)
+            raise e
+
+    async def _upload_document_stream(
+        self,
+        doc_id: str,
+        file_name: str,
+        file_path: str,
+        file_type: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        batch_size: int,
+        tasks_limit: int,
+        max_retries: int,
+        progress_callback=None,
+    ) -> KBDocument:
+        """流式上传文档
+
+        解析器逐页/逐段产出文本, 分块器消费文本流, 每累积一个窗口的文本块就生成向量并写入,
+        同一时刻内存中只保留一个窗口的文本块。上传失败或被取消时删除已写入的文本块。
+        """
+        media_paths: list[Path] = []
+        saved_media: list[KBMedia] = []
+        chunk_count = 0
+        parse_progress = (0, 0)
+        window_size = max(batch_size * tasks_limit, batch_size, 1)
+        vec_db: FaissVecDB = self.vec_db  # type: ignore
 
+        async def texts() -> AsyncIterator[str]:
+            nonlocal parse_progress
+            segments = self.parser_pool.parse_stream(file_path, file_name, file_type)
+            async with aclosing(segments):
+                async for segment in segments:
+                    for media_item in segment.media:
+                        media = await self._save_media(
+                            doc_id=doc_id,
+                            media_type=media_item.media_type,
+                            file_name=media_item.file_name,
+                            content=media_item.content,
+                            mime_type=media_item.mime_type,
+                        )
+                        saved_media.append(media)
+                        media_paths.append(Path(media.file_path))
+                    parse_progress = (segment.current, segment.total)
+                    if progress_callback:
+                        await progress_callback("parsing", *parse_progress)
+                    yield segment.text
+
+        async def flush(window: list[str]) -> None:
+            nonlocal chunk_count
+            metadatas = [
+                {
+                    "kb_id": self.kb.kb_id,
+                    "kb_doc_id": doc_id,
+                    "chunk_index": chunk_count + idx,
+                }
+                for idx in range(len(window))
+            ]
+            int_ids = await vec_db.insert_batch(
+                contents=window,
+                metadatas=metadatas,
+                batch_size=batch_size,
+                tasks_limit=tasks_limit,
+                max_retries=max_retries,
+            )
+            await self.sparse_index.add_documents(
+                ids=int_ids,
+                texts=window,
+                kb_doc_ids=[doc_id] * len(window),
+            )
+            chunk_count += len(window)
+            if progress_callback:
+                await progress_callback("embedding", *parse_progress)
+
+        try:
+            window: list[str] = []
+            # flush 抛出异常时及时关闭解析与分块的生成器, 释放文件句柄并停止解析任务
+            text_stream = texts()
+            chunks = self.chunker.chunk_stream(
+                text_stream,
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+            )
+            async with aclosing(text_stream), aclosing(chunks):
+                async for chunk in chunks:
+                    window.append(chunk)
+                    if len(window) >= window_size:
+                        await flush(window)
+                        window = []
+            if window:
+                await flush(window)
+            self.bump_version()
+
+            doc = KBDocument(
+                doc_id=doc_id,
+                kb_id=self.kb.kb_id,
+                doc_name=file_name,
+                file_type=file_type,
+                file_size=Path(file_path).stat().st_size,
+                file_path="",
+                chunk_count=chunk_count,
+                media_count=0,
+            )
+            return await self._save_document(doc, saved_media)
+        except (Exception, asyncio.CancelledError) as e:
+            logger.error(f"上传文档失败: {e!r}")
+            if chunk_count:
+                await vec_db.delete_documents(metadata_filters={"kb_doc_id": doc_id})
+                await self.sparse_index.remove_by_kb_doc_id(doc_id)
+                self.bump_version()
+            self._cleanup_media(media_paths)
             raise e
 
+    async def _save_document(
+        self,
+        doc: KBDocument,
+        saved_media: list[KBMedia],
+    ) -> KBDocument:
+        """保存文档及其多媒体资源的元数据，并更新统计"""
+        async with self.kb_db.get_db() as session:
+            async with session.begin():
+                session.add(doc)
+                for media in saved_media:
+                    session.add(media)
+                await session.commit()
+
+            await session.refresh(doc)
+
+        vec_db: FaissVecDB = self.vec_db  # type: ignore
+        await self.kb_db.update_kb_stats(kb_id=self.kb.kb_id, vec_db=vec_db)
+        await self.refresh_kb()
+        await self.refresh_document(doc.doc_id)
+        return doc
+
+    @staticmethod
+    def _cleanup_media(media_paths: list[Path]) -> None:
+        for media_path in media_paths:
+            try:
+                if media_path.exists():
+                    media_path.unlink()
+            except Exception as me:
+                logger.warning(f"清理多媒体文件失败 {media_path}: {me}")
+
     async def list_documents(
         self,
         offset: int = 0,
@@ -360,22 +613,30 @@ class KBHelper:
         doc = await self.kb_db.get_document_by_id(doc_id)
         return doc
 
+    @_uses_vec_db
     async def delete_document(self, doc_id: str) -> None:
         """删除单个文档及其相关数据"""
         await self.kb_db.delete_document_by_id(
             doc_id=doc_id,
             vec_db=self.vec_db,  # type: ignore
         )
+        await self.sparse_index.remove_by_kb_doc_id(doc_id)
+        self.bump_version()
         await self.kb_db.update_kb_stats(
             kb_id=self.kb.kb_id,
             vec_db=self.vec_db,  # type: ignore
         )
         await self.refresh_kb()
 
+    @_uses_vec_db
     async def delete_chunk(self, chunk_id: str, doc_id: str) -> None:
         """删除单个文本块及其相关数据"""
         vec_db: FaissVecDB = self.vec_db  # type: ignore
+        chunk = await vec_db.document_storage.get_document_by_doc_id(chunk_id)
         await vec_db.delete(chunk_id)
+        if chunk:
+            await self.sparse_index.remove_documents([chunk["id"]])
+        self.bump_version()
         await self.kb_db.update_kb_stats(
             kb_id=self.kb.kb_id,
             vec_db=self.vec_db,  # type: ignore
@@ -402,6 +663,7 @@ class KBHelper:
                 await session.commit()
             await session.refresh(doc)
 
+    @_uses_vec_db
     async def get_chunks_by_doc_id(
         self,
         doc_id: str,
@@ -430,6 +692,7 @@ class KBHelper:
             )
         return result
 
+    @_uses_vec_db
     async def get_chunk_count_by_doc_id(self, doc_id: str) -> int:
         """获取文档的块数量"""
         vec_db: FaissVecDB = self.vec_db  # type: ignore
@@ -2,6 +2,7 @@ import traceback
 from pathlib import Path
 
 from astrbot.core import logger
+from astrbot.core.db.vec_db.faiss_impl import SUPPORTED_INDEX_TYPES
 from astrbot.core.provider.manager import ProviderManager
 from astrbot.core.utils.astrbot_path import get_astrbot_knowledge_base_path
 
@@ -10,9 +11,11 @@ from .chunking.recursive import RecursiveCharacterChunker
 from .kb_db_sqlite import KBSQLiteDatabase
 from .kb_helper import KBHelper
 from .models import KBDocument, KnowledgeBase
+from .parsers.worker_pool import ParserPool
 from .retrieval.manager import RetrievalManager, RetrievalResult
 from .retrieval.rank_fusion import RankFusion
 from .retrieval.sparse_retriever import SparseRetriever
+from .vec_db_pool import VecDBPool
 
 FILES_PATH = get_astrbot_knowledge_base_path()
 DB_PATH = Path(FILES_PATH) / "kb.db"
@@ -27,12 +30,16 @@ class KnowledgeBaseManager:
     def __init__(
         self,
         provider_manager: ProviderManager,
+        vec_db_memory_budget_mb: int = 0,
+        parse_workers: int = 2,
     ) -> None:
         DB_PATH.parent.mkdir(parents=True, exist_ok=True)
         self.provider_manager = provider_manager
         self._session_deleted_callback_registered = False
 
         self.kb_insts: dict[str, KBHelper] = {}
+        self.vec_db_pool = VecDBPool(vec_db_memory_budget_mb)
+        self.parser_pool = ParserPool(parse_workers)
 
     async def initialize(self) -> None:
         """初始化知识库模块"""
@@ -66,18 +73,18 @@ class KnowledgeBaseManager:
         logger.info(f"KnowledgeBase database initialized: {DB_PATH}")
 
     async def load_kbs(self) -> None:
-        """加载所有知识库实例"""
+        """加载所有知识库实例。向量数据库在首次检索或修改时才会加载。"""
         kb_records = await self.kb_db.list_kbs()
         for record in kb_records:
-            kb_helper = KBHelper(
+            self.kb_insts[record.kb_id] = KBHelper(
                 kb_db=self.kb_db,
                 kb=record,
                 provider_manager=self.provider_manager,
                 kb_root_dir=FILES_PATH,
                 chunker=CHUNKER,
+                vec_db_pool=self.vec_db_pool,
+                parser_pool=self.parser_pool,
             )
-            await kb_helper.initialize()
-            self.kb_insts[record.kb_id] = kb_helper
 
     async def create_kb(
         self,
@@ -91,10 +98,14 @@ class KnowledgeBaseManager:
         top_k_dense: int | None = None,
         top_k_sparse: int | None = None,
         top_m_final: int | None = None,
+        index_type: str | None = None,
+        index_nprobe: int | None = None,
+        index_ef_search: int | None = None,
     ) -> KBHelper:
         """创建新的知识库实例"""
         if embedding_provider_id is None:
             raise ValueError("创建知识库时必须提供embedding_provider_id")
+        self._check_index_type(index_type)
         kb = KnowledgeBase(
             kb_name=kb_name,
             description=description,
@@ -106,6 +117,9 @@ class KnowledgeBaseManager:
             top_k_dense=top_k_dense if top_k_dense is not None else 50,
             top_k_sparse=top_k_sparse if top_k_sparse is not None else 50,
             top_m_final=top_m_final if top_m_final is not None else 5,
+            index_type=index_type or "flat",
+            index_nprobe=index_nprobe if index_nprobe is not None else 16,
+            index_ef_search=index_ef_search if index_ef_search is not None else 64,
         )
         try:
             async with self.kb_db.get_db() as session:
@@ -118,6 +132,8 @@ class KnowledgeBaseManager:
                     provider_manager=self.provider_manager,
                     kb_root_dir=FILES_PATH,
                     chunker=CHUNKER,
+                    vec_db_pool=self.vec_db_pool,
+                    parser_pool=self.parser_pool,
                 )
                 await kb_helper.initialize()
                 await session.commit()
@@ -172,8 +188,12 @@ class KnowledgeBaseManager:
         top_k_dense: int | None = None,
         top_k_sparse: int | None = None,
         top_m_final: int | None = None,
+        index_type: str | None = None,
+        index_nprobe: int | None = None,
+        index_ef_search: int | None = None,
     ) -> KBHelper | None:
         """更新知识库实例"""
+        self._check_index_type(index_type)
         kb_helper = await self.get_kb(kb_id)
         if not kb_helper:
             return None
@@ -198,13 +218,29 @@ class KnowledgeBaseManager:
             kb.top_k_sparse = top_k_sparse
         if top_m_final is not None:
             kb.top_m_final = top_m_final
+        if index_type is not None:
+            kb.index_type = index_type
+        if index_nprobe is not None:
+            kb.index_nprobe = index_nprobe
+        if index_ef_search is not None:
+            kb.index_ef_search = index_ef_search
         async with self.kb_db.get_db() as session:
             session.add(kb)
             await session.commit()
             await session.refresh(kb)
 
+        kb_helper.apply_index_config()
+        kb_helper.bump_version()
         return kb_helper
 
+    @staticmethod
+    def _check_index_type(index_type: str | None) -> None:
+        if index_type is not None and index_type not in SUPPORTED_INDEX_TYPES:
+            raise ValueError(
+                f"不支持的索引类型: {index_type}, "
+                f"可选值: {', '.join(SUPPORTED_INDEX_TYPES)}",
+            )
+
     async def retrieve(
         self,
         query: str,
@@ -285,6 +321,7 @@ class KnowledgeBaseManager:
                 logger.error(f"关闭知识库 {kb_id} 失败: {e}")
 
         self.kb_insts.clear()
+        self.parser_pool.shutdown()
 
         # 关闭元数据数据库
         if hasattr(self, "kb_db") and self.kb_db:
@@ -1,6 +1,6 @@
 """文档解析器模块"""
 
-from .base import BaseParser, MediaItem, ParseResult
+from .base import BaseParser, MediaItem, ParseResult, ParseSegment
 from .pdf_parser import PDFParser
 from .text_parser import TextParser
 
@@ -9,5 +9,6 @@ __all__ = [
     "MediaItem",
     "PDFParser",
     "ParseResult",
+    "ParseSegment",
     "TextParser",
 ]
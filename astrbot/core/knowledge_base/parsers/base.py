@@ -3,8 +3,10 @@
 定义了文档解析器的抽象接口和相关数据类。
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -31,6 +33,19 @@ class ParseResult:
     media: list[MediaItem]
 
 
+@dataclass
+class ParseSegment:
+    """流式解析的片段
+
+    表示文档中的一页或一段文本, 以及其中提取的多媒体资源。
+    """
+
+    text: str
+    media: list[MediaItem] = field(default_factory=list)
+    current: int = 0  # 已解析的进度, 单位由解析器决定 (页数、字节数等)
+    total: int = 0
+
+
 class BaseParser(ABC):
     """文档解析器基类
 
@@ -49,3 +64,27 @@ class BaseParser(ABC):
             ParseResult: 解析结果
 
         """
+
+    async def parse_stream(
+        self,
+        file_path: str,
+        file_name: str,
+    ) -> AsyncIterator[ParseSegment]:
+        """流式解析文档, 逐段产出文本
+
+        默认实现读取整个文件后调用 parse, 支持增量解析的解析器应重写此方法。
+
+        Args:
+            file_path: 文件路径
+            file_name: 文件名
+
+        """
+        file_content = await asyncio.to_thread(_read_file, file_path)
+        result = await self.parse(file_content, file_name)
+        del file_content
+        yield ParseSegment(text=result.text, media=result.media, current=1, total=1)
+
+
+def _read_file(file_path: str) -> bytes:
+    with open(file_path, "rb") as f:
+        return f.read()
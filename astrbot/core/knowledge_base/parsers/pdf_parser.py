@@ -3,14 +3,17 @@
 支持解析 PDF 文件中的文本和图片资源。
 """
 
+import asyncio
 import io
+from collections.abc import AsyncIterator
 
-from pypdf import PdfReader
+from pypdf import PageObject, PdfReader
 
 from astrbot.core.knowledge_base.parsers.base import (
     BaseParser,
     MediaItem,
     ParseResult,
+    ParseSegment,
 )
 
 
@@ -31,6 +34,9 @@ class PDFParser(BaseParser):
             ParseResult: 包含文本和图片的解析结果
 
         """
+        return await asyncio.to_thread(self._parse_sync, file_content)
+
+    def _parse_sync(self, file_content: bytes) -> ParseResult:
         pdf_file = io.BytesIO(file_content)
         reader = PdfReader(pdf_file)
 
@@ -44,58 +50,115 @@ class PDFParser(BaseParser):
                 text_parts.append(text)
 
         # 提取图片
-        image_counter = 0
         for page_num, page in enumerate(reader.pages):
-            try:
-                # 安全检查 Resources
-                if "/Resources" not in page:
-                    continue
+            media_items.extend(
+                self._extract_images(page, page_num, len(media_items)),
+            )
 
-                resources = page["/Resources"]
-                if not resources or "/XObject" not in resources:  # type: ignore
-                    continue
+        full_text = "\n\n".join(text_parts)
+        return ParseResult(text=full_text, media=media_items)
 
-                xobjects = resources["/XObject"].get_object()  # type: ignore
-                if not xobjects:
-                    continue
+    async def parse_stream(
+        self,
+        file_path: str,
+        file_name: str,
+    ) -> AsyncIterator[ParseSegment]:
+        """逐页解析 PDF 文件
+
+        直接从磁盘读取, 每页产出一个片段, 不在内存中保留整个文件。
+        页面的文本与图片提取在工作线程中进行, 不阻塞事件循环。
+
+        Args:
+            file_path: 文件路径
+            file_name: 文件名
 
-                for obj_name in xobjects:
-                    try:
-                        obj = xobjects[obj_name]
-
-                        if obj.get("/Subtype") != "/Image":
-                            continue
-
-                        # 提取图片数据
-                        image_data = obj.get_data()
-
-                        # 确定格式
-                        filter_type = obj.get("/Filter", "")
-                        if filter_type == "/DCTDecode":
-                            ext = "jpg"
-                            mime_type = "image/jpeg"
-                        elif filter_type == "/FlateDecode":
-                            ext = "png"
-                            mime_type = "image/png"
-                        else:
-                            ext = "png"
-                            mime_type = "image/png"
-
-                        image_counter += 1
-                        media_items.append(
-                            MediaItem(
-                                media_type="image",
-                                file_name=f"page_{page_num}_img_{image_counter}.{ext}",
-                                content=image_data,
-                                mime_type=mime_type,
-                            ),
-                        )
-                    except Exception:
-                        # 单个图片提取失败不影响整体
+        """
+        with open(file_path, "rb") as pdf_file:
+            reader = await asyncio.to_thread(PdfReader, pdf_file)
+            page_count = await asyncio.to_thread(len, reader.pages)
+            image_count = 0
+            for page_num in range(page_count):
+                text, media = await asyncio.to_thread(
+                    self._extract_page,
+                    reader,
+                    page_num,
+                    image_count,
+                )
+                image_count += len(media)
+                yield ParseSegment(
+                    # 与 parse 相同, 页与页之间以空行分隔
+                    text=f"{text}\n\n" if text else "",
+                    media=media,
+                    current=page_num + 1,
+                    total=page_count,
+                )
+
+    @classmethod
+    def _extract_page(
+        cls,
+        reader: PdfReader,
+        page_num: int,
+        image_counter: int,
+    ) -> tuple[str, list[MediaItem]]:
+        page = reader.pages[page_num]
+        return page.extract_text(), cls._extract_images(page, page_num, image_counter)
+
+    @staticmethod
+    def _extract_images(
+        page: PageObject,
+        page_num: int,
+        image_counter: int,
+    ) -> list[MediaItem]:
+        """提取单页中嵌入的图片, 单个图片或页面提取失败不影响整体"""
+        media_items = []
+        try:
+            # 安全检查 Resources
+            if "/Resources" not in page:
+                return media_items
+
+            resources = page["/Resources"]
+            if not resources or "/XObject" not in resources:  # type: ignore
+                return media_items
+
+            xobjects = resources["/XObject"].get_object()  # type: ignore
+            if not xobjects:
+                return media_items
+
+            for obj_name in xobjects:
+                try:
+                    obj = xobjects[obj_name]
+
+                    if obj.get("/Subtype") != "/Image":
                         continue
-            except Exception:
-                # 页面处理失败不影响其他页面
-                continue
 
-        full_text = "\n\n".join(text_parts)
-        return ParseResult(text=full_text, media=media_items)
+                    # 提取图片数据
+                    image_data = obj.get_data()
+
+                    # 确定格式
+                    filter_type = obj.get("/Filter", "")
+                    if filter_type == "/DCTDecode":
+                        ext = "jpg"
+                        mime_type = "image/jpeg"
+                    elif filter_type == "/FlateDecode":
+                        ext = "png"
+                        mime_type = "image/png"
+                    else:
+                        ext = "png"
+                        mime_type = "image/png"
+
+                    image_counter += 1
+                    media_items.append(
+                        MediaItem(
+                            media_type="image",
+                            file_name=f"page_{page_num}_img_{image_counter}.{ext}",
+                            content=image_data,
+                            mime_type=mime_type,
+                        ),
+                    )
+                except Exception:
+                    # 单个图片提取失败不影响整体
+                    continue
+        except Exception:
+            # 页面处理失败不影响其他页面
+            pass
+        return media_items
@@ -3,7 +3,23 @@
 支持解析 TXT 和 Markdown 文件。
 """
 
-from astrbot.core.knowledge_base.parsers.base import BaseParser, ParseResult
+import asyncio
+import codecs
+import hashlib
+import os
+from collections.abc import AsyncIterator
+
+from astrbot.core.knowledge_base.parsers.base import (
+    BaseParser,
+    ParseResult,
+    ParseSegment,
+)
+
+ENCODINGS = ["utf-8", "gbk", "gb2312", "gb18030"]
+STREAM_BLOCK_SIZE = 256 * 1024
+"""流式解析时每次读取的字节数"""
+DETECT_ENCODING_BYTES = 1024 * 1024
+"""流式解析时用于检测编码的文件开头字节数"""
 
 
 class TextParser(BaseParser):
@@ -29,7 +45,7 @@ class TextParser(BaseParser):
 
         """
         # 尝试多种编码
-        for encoding in ["utf-8", "gbk", "gb2312", "gb18030"]:
+        for encoding in ENCODINGS:
             try:
                 text = file_content.decode(encoding)
                 break
@@ -40,3 +56,114 @@ class TextParser(BaseParser):
 
         # 文本文件无多媒体资源
         return ParseResult(text=text, media=[])
+
+    async def parse_stream(
+        self,
+        file_path: str,
+        file_name: str,
+    ) -> AsyncIterator[ParseSegment]:
+        """按块读取并解码文本文件
+
+        根据文件开头的 DETECT_ENCODING_BYTES 字节确定编码 (候选编码的顺序与 parse 一致), 再逐块解码产出。
+        如果之后出现了不符合该编码的内容 (例如开头全部是 ASCII 的 GBK 文件), 换用之后的候选编码从断点继续,
+        前提是已产出的内容在新编码下解码结果不变。读取与解码在工作线程中进行, 不阻塞事件循环。
+
+        Args:
+            file_path: 文件路径
+            file_name: 文件名
+
+        Raises:
+            ValueError: 如果无法解码文件
+
+        """
+        encoding = await asyncio.to_thread(_detect_encoding, file_path)
+        if encoding is None:
+            raise ValueError(f"无法解码文件: {file_name}")
+
+        total = os.path.getsize(file_path)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        # 已产出的文本对应的字节数与文本摘要, 换用其他编码时用于从断点继续
+        consumed = 0
+        digest = hashlib.sha1()
+
+        def read_block(f, decoder) -> tuple[str, int, int]:
+            block = f.read(STREAM_BLOCK_SIZE)
+            text = decoder.decode(block, final=not block)
+            # 块末尾被截断的多字节字符留在解码器中, 尚未产出
+            return text, len(block), f.tell() - len(decoder.getstate()[0])
+
+        with open(file_path, "rb") as f:
+            while True:
+                try:
+                    text, size, end = await asyncio.to_thread(read_block, f, decoder)
+                except UnicodeDecodeError as e:
+                    fallback = await asyncio.to_thread(
+                        _find_fallback_encoding,
+                        file_path,
+                        encoding,
+                        consumed,
+                        digest.digest(),
+                    )
+                    if fallback is None:
+                        raise ValueError(
+                            f"无法解码文件: {file_name}, 文件中途出现了不符合 {encoding} 编码的内容",
+                        ) from e
+                    encoding = fallback
+                    decoder = codecs.getincrementaldecoder(encoding)()
+                    f.seek(consumed)
+                    continue
+                consumed = end
+                if text:
+                    digest.update(text.encode("utf-8"))
+                    yield ParseSegment(
+                        text=text,
+                        current=f.tell() if size else total,
+                        total=total,
+                    )
+                if not size:
+                    break
+
+
+def _detect_encoding(file_path: str) -> str | None:
+    """返回第一个能解码文件开头 DETECT_ENCODING_BYTES 字节的编码"""
+    with open(file_path, "rb") as f:
+        prefix = f.read(DETECT_ENCODING_BYTES)
+        at_end = not f.read(1)
+    for encoding in ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            # 文件未读完时, 开头末尾被截断的多字节字符留在解码器中, 不视为错误
+            decoder.decode(prefix, final=at_end)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return None
+
+
+def _find_fallback_encoding(
+    file_path: str,
+    failed: str,
+    consumed: int,
+    digest: bytes,
+) -> str | None:
+    """文件中途出现不符合 failed 编码的内容时, 返回之后的候选编码中第一个能解码整个文件,
+    且对已产出的前 consumed 字节解码结果不变的编码"""
+    for encoding in ENCODINGS[ENCODINGS.index(failed) + 1 :]:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        head = hashlib.sha1()
+        try:
+            with open(file_path, "rb") as f:
+                while (remaining := consumed - f.tell()) > 0:
+                    block = f.read(min(STREAM_BLOCK_SIZE, remaining))
+                    head.update(decoder.decode(block).encode("utf-8"))
+                head.update(decoder.decode(b"", final=True).encode("utf-8"))
+                if head.digest() != digest:
+                    continue
+                decoder = codecs.getincrementaldecoder(encoding)()
+                while block := f.read(STREAM_BLOCK_SIZE):
+                    decoder.decode(block)
+                decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return None
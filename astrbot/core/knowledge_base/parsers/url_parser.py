@@ -2,6 +2,8 @@ import asyncio
 
 import aiohttp
 
+from astrbot.core.utils.http_client import http_client
+
 
 class URLExtractor:
     """URL 内容提取器，封装了 Tavily API 调用和密钥管理"""
@@ -59,7 +61,7 @@ class URLExtractor:
         }
 
         try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
+            async with http_client.session() as session:
                 async with session.post(
                     api_url,
                     json=payload,
@@ -11,3 +11,15 @@ async def select_parser(ext: str) -> BaseParser:
 
         return PDFParser()
     raise ValueError(f"暂时不支持的文件格式: {ext}")
+
+
+async def select_stream_parser(ext: str) -> BaseParser:
+    """选择流式解析使用的解析器
+
+    纯文本文件使用可按块读取的 TextParser, 其余格式与 select_parser 相同。
+    """
+    if ext in {".md", ".txt", ".markdown"}:
+        from .text_parser import TextParser
+
+        return TextParser()
+    return await select_parser(ext)
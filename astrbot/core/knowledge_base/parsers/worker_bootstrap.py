@@ -0,0 +1,28 @@
+"""文档解析子进程的启动脚本
+
+ParserPool 在每个解析子进程启动时通过 runpy.run_path 执行本文件。
+
+导入 astrbot 包的任意模块都会先执行 astrbot.core 的初始化: 读写配置文件、配置日志、创建数据库连接与
+SharedPreferences 的后台线程等。解析子进程只需要 parsers 包, 这里预先以空的包对象占位 astrbot、
+astrbot.core 与 astrbot.core.knowledge_base, 之后导入解析器时不会执行这些包的 __init__。
+"""
+
+import os
+import sys
+import types
+
+
+def install_placeholder_packages() -> None:
+    path = os.path.dirname(os.path.abspath(__file__))
+    for name in ("astrbot.core.knowledge_base", "astrbot.core", "astrbot"):
+        path = os.path.dirname(path)
+        if name in sys.modules:
+            # 已经导入过 (例如在当前进程中直接导入本模块), 不再替换
+            break
+        package = types.ModuleType(name)
+        package.__path__ = [path]
+        package.__package__ = name
+        sys.modules[name] = package
+
+
+install_placeholder_packages()
@@ -0,0 +1,232 @@
+"""文档解析进程池
+
+PDF、Office 文档的解析是 CPU 密集型操作, 在事件循环中执行会阻塞所有平台的消息处理。
+ParserPool 将解析任务提交到进程池, 多个文档可以同时解析:
+
+- 子进程以流式方式解析文档, 每解析出一段就以 JSON 行追加写入任务目录中的结果文件, 多媒体资源写入同一目录
+- 主进程读取结果文件, 在解析的同时产出 ParseSegment, 内存占用与文件大小无关
+- 取消任务时, 排队中的任务直接从进程池中撤销, 运行中的任务在解析下一段之前检查取消标记后停止
+
+子进程会导入本模块, 因此这里只导入标准库与解析器模块, 不导入 astrbot.core (见 worker_bootstrap)。
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import runpy
+import shutil
+import tempfile
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import aclosing
+
+from .base import MediaItem, ParseSegment
+from .util import select_stream_parser
+
+logger = logging.getLogger("astrbot")
+
+WORKER_BOOTSTRAP = os.path.join(os.path.dirname(__file__), "worker_bootstrap.py")
+
+RECORDS_FILE = "segments.jsonl"
+CANCEL_FILE = "cancelled"
+POLL_INTERVAL = 0.05
+"""等待子进程写入新片段时的轮询间隔 (秒)"""
+READ_SIZE = 1024 * 1024
+"""每次从结果文件读取的最大字节数"""
+
+
+class ParseCancelledError(Exception):
+    """解析任务已被取消"""
+
+
+class ParserPool:
+    def __init__(self, max_workers: int = 2, temp_dir: str | None = None) -> None:
+        """
+        Args:
+            max_workers: 解析进程数量，<= 0 表示不使用进程池，在当前进程中解析
+            temp_dir: 存放解析结果的临时目录，默认为 AstrBot 的临时目录
+        """
+        self.max_workers = max(0, max_workers)
+        self.temp_dir = temp_dir
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0  # 已提交且尚未结束的任务数
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn 在各平台上行为一致, 也避免在多线程进程中 fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=runpy.run_path,
+                initargs=(WORKER_BOOTSTRAP,),
+            )
+        return self._executor
+
+    async def parse_stream(
+        self,
+        file_path: str,
+        file_name: str,
+        file_type: str,
+    ) -> AsyncIterator[ParseSegment]:
+        """在进程池中流式解析文档
+
+        未启用进程池时在当前进程中解析。迭代被中断 (例如所在任务被取消) 时, 解析任务随之取消。
+        """
+        if not self.enabled:
+            parser = await select_stream_parser(f".{file_type}")
+            async with aclosing(parser.parse_stream(file_path, file_name)) as segments:
+                async for segment in segments:
+                    yield segment
+            return
+
+        temp_dir = self.temp_dir
+        if not temp_dir:
+            from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+
+            temp_dir = get_astrbot_temp_path()
+        os.makedirs(temp_dir, exist_ok=True)
+        job_dir = tempfile.mkdtemp(prefix="kb_parse_", dir=temp_dir)
+        records_path = os.path.join(job_dir, RECORDS_FILE)
+        open(records_path, "wb").close()
+        future = self._submit(file_path, file_name, file_type, job_dir)
+        try:
+            with open(records_path, "rb") as records:
+                pending = b""
+                while True:
+                    finished = future.done()
+                    data = records.read(READ_SIZE)
+                    if not data:
+                        if finished:
+                            break
+                        await asyncio.sleep(POLL_INTERVAL)
+                        continue
+                    lines = (pending + data).split(b"\n")
+                    pending = lines.pop()
+                    for line in lines:
+                        yield await asyncio.to_thread(_load_segment, line)
+            await asyncio.wrap_future(future)
+        finally:
+            if future.done():
+                shutil.rmtree(job_dir, ignore_errors=True)
+            else:
+                # 排队中的任务直接撤销, 运行中的任务由子进程检查取消标记后停止
+                open(os.path.join(job_dir, CANCEL_FILE), "wb").close()
+                future.cancel()
+                future.add_done_callback(
+                    lambda _: shutil.rmtree(job_dir, ignore_errors=True),
+                )
+
+    def _submit(
+        self,
+        file_path: str,
+        file_name: str,
+        file_type: str,
+        job_dir: str,
+    ) -> Future:
+        """提交解析任务, 进程池中没有空闲进程时任务在队列中等待"""
+        with self._lock:
+            self._pending += 1
+        future = self._get_executor().submit(
+            _parse_worker,
+            file_path,
+            file_name,
+            file_type,
+            job_dir,
+        )
+
+        def on_done(_: Future) -> None:
+            # 在进程池的管理线程中调用
+            with self._lock:
+                self._pending -= 1
+
+        future.add_done_callback(on_done)
+        return future
+
+    def stats(self) -> dict:
+        running = min(self._pending, self.max_workers)
+        return {
+            "max_workers": self.max_workers,
+            "running": running,
+            "queued": self._pending - running,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("文档解析进程池已关闭。")
+
+
+def _load_segment(line: bytes) -> ParseSegment:
+    record = json.loads(line)
+    media = []
+    for item in record["media"]:
+        with open(item["path"], "rb") as f:
+            content = f.read()
+        media.append(
+            MediaItem(
+                media_type=item["media_type"],
+                file_name=item["file_name"],
+                content=content,
+                mime_type=item["mime_type"],
+            ),
+        )
+    return ParseSegment(
+        text=record["text"],
+        media=media,
+        current=record["current"],
+        total=record["total"],
+    )
+
+
+def _parse_worker(file_path: str, file_name: str, file_type: str, job_dir: str):
+    """子进程入口"""
+    asyncio.run(_parse_to_dir(file_path, file_name, file_type, job_dir))
+
+
+async def _parse_to_dir(
+    file_path: str,
+    file_name: str,
+    file_type: str,
+    job_dir: str,
+) -> None:
+    parser = await select_stream_parser(f".{file_type}")
+    cancel_path = os.path.join(job_dir, CANCEL_FILE)
+    media_count = 0
+    records_path = os.path.join(job_dir, RECORDS_FILE)
+    with open(records_path, "a", encoding="utf-8") as records:
+        async with aclosing(parser.parse_stream(file_path, file_name)) as segments:
+            async for segment in segments:
+                if os.path.exists(cancel_path):
+                    raise ParseCancelledError(f"解析任务已取消: {file_name}")
+                media = []
+                for item in segment.media:
+                    media_count += 1
+                    media_path = os.path.join(job_dir, f"media_{media_count}")
+                    with open(media_path, "wb") as f:
+                        f.write(item.content)
+                    media.append(
+                        {
+                            "media_type": item.media_type,
+                            "file_name": item.file_name,
+                            "mime_type": item.mime_type,
+                            "path": media_path,
+                        },
+                    )
+                record = {
+                    "text": segment.text,
+                    "media": media,
+                    "current": segment.current,
+                    "total": segment.total,
+                }
+                # 整行写入后再刷新, 主进程只读取完整的行
+                records.write(json.dumps(record, ensure_ascii=False) + "\n")
+                records.flush()
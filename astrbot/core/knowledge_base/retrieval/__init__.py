@@ -2,6 +2,7 @@
 
 from .manager import RetrievalManager, RetrievalResult
 from .rank_fusion import FusedResult, RankFusion
+from .sparse_index import SparseIndex
 from .sparse_retriever import SparseResult, SparseRetriever
 
 __all__ = [
@@ -9,6 +10,7 @@ __all__ = [
     "RankFusion",
     "RetrievalManager",
     "RetrievalResult",
+    "SparseIndex",
     "SparseResult",
     "SparseRetriever",
 ]
@@ -0,0 +1,97 @@
+"""检索缓存
+
+- QueryEmbeddingCache: 缓存查询文本的向量, 键为 (Embedding Provider ID, 模型, 规范化后的查询文本)
+- 检索结果缓存: 由 RetrievalManager 使用, 键中包含各知识库的版本号, 知识库内容变化后旧条目自然失效
+"""
+
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Generic, TypeVar
+
+from astrbot.core.provider.provider import EmbeddingProvider
+
+V = TypeVar("V")
+
+
+def normalize_query(query: str) -> str:
+    """统一 Unicode 形式并合并空白字符"""
+    return " ".join(unicodedata.normalize("NFKC", query).split())
+
+
+class LRUTTLCache(Generic[V]):
+    """带过期时间的 LRU 缓存, 记录命中与未命中次数"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 600) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._store: OrderedDict[Any, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def get(self, key: Any) -> V | None:
+        entry = self._store.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._store[key]
+            self.misses += 1
+            return None
+        self._store.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Any, value: V) -> None:
+        if self.max_size <= 0:
+            return
+        self._store[key] = (time.monotonic(), value)
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_size:
+            self._store.popitem(last=False)
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._store),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class QueryEmbeddingCache:
+    """查询向量缓存, 同一问题重复出现时不再调用 Embedding Provider"""
+
+    def __init__(self, max_size: int = 2048, ttl: float = 3600) -> None:
+        self._cache: LRUTTLCache[list[float]] = LRUTTLCache(max_size, ttl)
+
+    async def get_embedding(
+        self,
+        provider: EmbeddingProvider,
+        query: str,
+    ) -> list[float]:
+        key = self._make_key(provider, query)
+        embedding = self._cache.get(key)
+        if embedding is None:
+            embedding = await provider.get_embedding(query)
+            self._cache.set(key, embedding)
+        return embedding
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    @staticmethod
+    def _make_key(provider: EmbeddingProvider, query: str) -> tuple:
+        config = getattr(provider, "provider_config", None) or {}
+        provider_id = config.get("id") or id(provider)
+        model = config.get("embedding_model") or provider.get_model()
+        return provider_id, model, normalize_query(query)
@@ -3,8 +3,11 @@
 协调稠密检索、稀疏检索和 Rerank,提供统一的检索接口
 """
 
+import asyncio
 import time
-from dataclasses import dataclass
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING
 
 from astrbot import logger
 from astrbot.core.db.vec_db.base import Result
@@ -14,7 +17,10 @@ from astrbot.core.knowledge_base.retrieval.rank_fusion import RankFusion
 from astrbot.core.knowledge_base.retrieval.sparse_retriever import SparseRetriever
 from astrbot.core.provider.provider import RerankProvider
 
-from ..kb_helper import KBHelper
+from .cache import LRUTTLCache, QueryEmbeddingCache, normalize_query
+
+if TYPE_CHECKING:
+    from ..kb_helper import KBHelper
 
 
 @dataclass
@@ -57,12 +63,18 @@ class RetrievalManager:
         self.sparse_retriever = sparse_retriever
         self.rank_fusion = rank_fusion
         self.kb_db = kb_db
+        self.embedding_cache = QueryEmbeddingCache()
+        # 键中包含各知识库的版本号, 知识库内容或设置变化后旧的缓存条目不会再被命中
+        self.result_cache: LRUTTLCache[list[RetrievalResult]] = LRUTTLCache(
+            max_size=256,
+            ttl=300,
+        )
 
     async def retrieve(
         self,
         query: str,
         kb_ids: list[str],
-        kb_id_helper_map: dict[str, KBHelper],
+        kb_id_helper_map: dict[str, "KBHelper"],
         top_k_fusion: int = 20,
         top_m_final: int = 5,
     ) -> list[RetrievalResult]:
@@ -87,48 +99,83 @@ class RetrievalManager:
         if not kb_ids:
             return []
 
+        cache_key = (
+            normalize_query(query),
+            tuple(kb_ids),
+            tuple(
+                kb_id_helper_map[kb_id].version if kb_id in kb_id_helper_map else None
+                for kb_id in kb_ids
+            ),
+            top_k_fusion,
+            top_m_final,
+        )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return self._copy_results(cached)
+
         kb_options: dict = {}
         new_kb_ids = []
-        for kb_id in kb_ids:
-            kb_helper = kb_id_helper_map.get(kb_id)
-            if kb_helper:
+        # 加载或检索失败的知识库, 结果不完整时不写入缓存
+        failed_kb_ids: set[str] = set()
+        # 检索期间占用各知识库的向量数据库，避免其被 LRU 策略卸载
+        async with AsyncExitStack() as stack:
+            for kb_id in kb_ids:
+                kb_helper = kb_id_helper_map.get(kb_id)
+                if not kb_helper:
+                    logger.warning(
+                        f"知识库 ID {kb_id} 实例未找到, 已跳过该知识库的检索"
+                    )
+                    continue
+                try:
+                    vec_db = await stack.enter_async_context(kb_helper.use_vec_db())
+                except Exception as e:
+                    logger.warning(f"知识库 {kb_id} 向量数据库加载失败, 已跳过: {e}")
+                    failed_kb_ids.add(kb_id)
+                    continue
                 kb = kb_helper.kb
                 kb_options[kb_id] = {
                     "top_k_dense": kb.top_k_dense or 50,
                     "top_k_sparse": kb.top_k_sparse or 50,
                     "top_m_final": kb.top_m_final or 5,
-                    "vec_db": kb_helper.vec_db,
+                    "vec_db": vec_db,
+                    "sparse_index": kb_helper.sparse_index,
                     "rerank_provider_id": kb.rerank_provider_id,
+                    "index_nprobe": kb.index_nprobe,
+                    "index_ef_search": kb.index_ef_search,
                 }
                 new_kb_ids.append(kb_id)
-            else:
-                logger.warning(f"知识库 ID {kb_id} 实例未找到, 已跳过该知识库的检索")
-
-        kb_ids = new_kb_ids
-
-        # 1. 稠密检索
-        time_start = time.time()
-        dense_results = await self._dense_retrieve(
-            query=query,
-            kb_ids=kb_ids,
-            kb_options=kb_options,
-        )
-        time_end = time.time()
-        logger.debug(
-            f"Dense retrieval across {len(kb_ids)} bases took {time_end - time_start:.2f}s and returned {len(dense_results)} results.",
-        )
 
-        # 2. 稀疏检索
-        time_start = time.time()
-        sparse_results = await self.sparse_retriever.retrieve(
-            query=query,
-            kb_ids=kb_ids,
-            kb_options=kb_options,
-        )
-        time_end = time.time()
-        logger.debug(
-            f"Sparse retrieval across {len(kb_ids)} bases took {time_end - time_start:.2f}s and returned {len(sparse_results)} results.",
-        )
+            kb_ids = new_kb_ids
+
+            # 1. 稠密检索与 2. 稀疏检索并发执行
+            time_start = time.perf_counter()
+            (
+                (dense_results, dense_time),
+                (sparse_results, sparse_time),
+            ) = await asyncio.gather(
+                self._timed(
+                    self._dense_retrieve(
+                        query=query,
+                        kb_ids=kb_ids,
+                        kb_options=kb_options,
+                        failed_kb_ids=failed_kb_ids,
+                    ),
+                ),
+                self._timed(
+                    self.sparse_retriever.retrieve(
+                        query=query,
+                        kb_ids=kb_ids,
+                        kb_options=kb_options,
+                        failed_kb_ids=failed_kb_ids,
+                    ),
+                ),
+            )
+            logger.debug(
+                f"Retrieval across {len(kb_ids)} bases took "
+                f"{time.perf_counter() - time_start:.2f}s "
+                f"(dense: {dense_time:.2f}s, {len(dense_results)} results; "
+                f"sparse: {sparse_time:.2f}s, {len(sparse_results)} results).",
+            )
 
         # 3. 结果融合
         time_start = time.time()
@@ -191,54 +238,104 @@ class RetrievalManager:
                 rerank_provider=first_rerank,
             )
 
-        return retrieval_results[:top_m_final]
+        retrieval_results = retrieval_results[:top_m_final]
+        if failed_kb_ids:
+            logger.debug(
+                f"知识库 {', '.join(sorted(failed_kb_ids))} 检索失败, 本次结果不缓存"
+            )
+        else:
+            self.result_cache.set(cache_key, self._copy_results(retrieval_results))
+        return retrieval_results
+
+    def cache_stats(self) -> dict:
+        """查询向量缓存与检索结果缓存的命中统计"""
+        return {
+            "query_embedding": self.embedding_cache.stats(),
+            "retrieval_result": self.result_cache.stats(),
+        }
+
+    @staticmethod
+    def _copy_results(results: list[RetrievalResult]) -> list[RetrievalResult]:
+        # Rerank 会原地修改分数, 缓存中保存和返回的都是副本
+        return [replace(r, metadata=dict(r.metadata)) for r in results]
 
     async def _dense_retrieve(
         self,
         query: str,
         kb_ids: list[str],
         kb_options: dict,
+        failed_kb_ids: set[str] | None = None,
     ):
         """稠密检索 (向量相似度)
 
-        为每个知识库使用独立的向量数据库进行检索,然后合并结果。
+        每个 Embedding Provider 只计算一次查询向量, 然后并发检索各知识库的向量数据库并合并结果。
 
         Args:
             query: 查询文本
             kb_ids: 知识库 ID 列表
-            top_k: 返回结果数量
+            kb_options: 每个知识库的检索选项
+            failed_kb_ids: 检索失败的知识库 ID 会被加入该集合
 
         Returns:
             List[Result]: 检索结果列表
 
         """
-        all_results: list[Result] = []
+        kb_ids = [kb_id for kb_id in kb_ids if kb_id in kb_options]
+
+        # 使用同一个 Embedding Provider 的知识库共享一次查询向量计算
+        providers = {}
         for kb_id in kb_ids:
-            if kb_id not in kb_options:
-                continue
+            provider = kb_options[kb_id]["vec_db"].embedding_provider
+            providers[id(provider)] = provider
+        provider_keys = list(providers)
+        embeddings = await asyncio.gather(
+            *(
+                self.embedding_cache.get_embedding(providers[key], query)
+                for key in provider_keys
+            ),
+            return_exceptions=True,
+        )
+        embedding_map = dict(zip(provider_keys, embeddings))
+
+        async def retrieve_one(kb_id: str) -> list[Result]:
             try:
                 vec_db: FaissVecDB = kb_options[kb_id]["vec_db"]
+                embedding = embedding_map[id(vec_db.embedding_provider)]
+                if isinstance(embedding, BaseException):
+                    raise embedding
                 dense_k = int(kb_options[kb_id]["top_k_dense"])
-                vec_results = await vec_db.retrieve(
+                return await vec_db.retrieve(
                     query=query,
                     k=dense_k,
                     fetch_k=dense_k * 2,
                     rerank=False,  # 稠密检索阶段不进行 rerank
                     metadata_filters={"kb_id": kb_id},
+                    nprobe=kb_options[kb_id].get("index_nprobe"),
+                    ef_search=kb_options[kb_id].get("index_ef_search"),
+                    query_embedding=embedding,
                 )
-
-                all_results.extend(vec_results)
             except Exception as e:
-                from astrbot.core import logger
-
                 logger.warning(f"知识库 {kb_id} 稠密检索失败: {e}")
-                continue
+                if failed_kb_ids is not None:
+                    failed_kb_ids.add(kb_id)
+                return []
+
+        all_results: list[Result] = []
+        for vec_results in await asyncio.gather(*map(retrieve_one, kb_ids)):
+            all_results.extend(vec_results)
 
         # 按相似度排序并返回 top_k
         all_results.sort(key=lambda x: x.similarity, reverse=True)
         # return all_results[: len(all_results) // len(kb_ids)]
         return all_results
 
+    @staticmethod
+    async def _timed(coro):
+        """执行协程并返回 (结果, 耗时秒数)"""
+        time_start = time.perf_counter()
+        result = await coro
+        return result, time.perf_counter() - time_start
+
     async def _rerank(
         self,
         query: str,
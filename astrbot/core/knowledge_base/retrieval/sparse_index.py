@@ -0,0 +1,370 @@
+"""持久化 BM25 倒排索引
+
+每个知识库维护一个独立的倒排索引 (term -> {chunk int id: tf})，与 FAISS 索引存放在同一目录下。
+索引只在首次使用且磁盘上不存在时从文档存储全量构建一次，之后随文档的上传和删除增量更新。
+增量更新先标记为脏，由后台任务延迟合并写入磁盘，连续的上传和删除只重写一次索引文件。
+查询时只遍历查询词的倒排链，耗时与语料规模无关。
+"""
+
+import asyncio
+import heapq
+import json
+import math
+import os
+from collections import Counter
+from functools import lru_cache
+
+import jieba
+import ormsgpack
+
+from astrbot import logger
+from astrbot.core.db.vec_db.faiss_impl.document_storage import DocumentStorage
+
+INDEX_FORMAT_VERSION = 1
+BUILD_PAGE_SIZE = 1000
+FLUSH_INTERVAL = 5.0
+"""索引变更后延迟落盘的时间 (秒)"""
+
+
+@lru_cache(maxsize=1)
+def load_stopwords() -> frozenset[str]:
+    """加载哈工大停用词表"""
+    with open(
+        os.path.join(os.path.dirname(__file__), "hit_stopwords.txt"),
+        encoding="utf-8",
+    ) as f:
+        return frozenset(word.strip() for word in f.read().splitlines() if word.strip())
+
+
+def tokenize(text: str, stopwords: frozenset[str] | set[str]) -> list[str]:
+    """使用 jieba 分词并过滤停用词"""
+    return [word for word in jieba.cut(text) if word not in stopwords]
+
+
+class SparseIndex:
+    """单个知识库的 BM25 倒排索引
+
+    磁盘上只保存正排信息 (chunk int id, 所属文档 ID, 词频表)，倒排链在加载时重建，
+    因此无需在加载时重新分词。
+
+    BM25 的 IDF 采用 log(1 + (N - df + 0.5) / (df + 0.5)) 形式，保证非负，
+    这样增量更新时无需重新计算全部词项的平均 IDF。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        k1: float = 1.5,
+        b: float = 0.75,
+        stopwords: frozenset[str] | set[str] | None = None,
+        flush_interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.k1 = k1
+        self.b = b
+        self.stopwords = stopwords if stopwords is not None else load_stopwords()
+
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        # 存在未落盘的变更。落盘前磁盘上留有标记文件，进程异常退出后下次加载时据此全量重建
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+
+        # 正排: chunk int id -> {term: tf}
+        self._doc_terms: dict[int, dict[str, int]] = {}
+        # chunk int id -> 文档长度
+        self._doc_len: dict[int, int] = {}
+        # chunk int id -> 所属文档 (kb_doc_id)
+        self._doc_owner: dict[int, str] = {}
+        # kb_doc_id -> chunk int ids
+        self._owner_docs: dict[str, set[int]] = {}
+        # 倒排: term -> {chunk int id: tf}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._total_len = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def doc_count(self) -> int:
+        return len(self._doc_len)
+
+    async def ensure_ready(self, document_storage: DocumentStorage) -> None:
+        """确保索引可用。优先从磁盘加载，磁盘索引缺失或与文档存储不一致时全量重建。"""
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            if await self._load_locked():
+                stored_count = await document_storage.count_documents()
+                if stored_count == self.doc_count:
+                    return
+                logger.info(
+                    f"Sparse index {self.path} is out of sync "
+                    f"({self.doc_count} indexed, {stored_count} stored), rebuilding.",
+                )
+            await self._build_locked(document_storage)
+
+    async def add_documents(
+        self,
+        ids: list[int],
+        texts: list[str],
+        kb_doc_ids: list[str],
+    ) -> None:
+        """增量添加文本块。已存在的 ID 会被覆盖。
+
+        如果索引尚未加载且磁盘上没有索引文件，则跳过，下一次查询时会从文档存储全量构建。
+        """
+        async with self._lock:
+            if not await self._load_locked():
+                return
+            tokenized = await asyncio.to_thread(self._tokenize_many, texts)
+            for int_id, tokens, kb_doc_id in zip(ids, tokenized, kb_doc_ids):
+                self._add_locked(int(int_id), tokens, kb_doc_id)
+            await self._mark_dirty_locked()
+
+    async def remove_documents(self, ids: list[int]) -> None:
+        """按 chunk int id 删除文本块"""
+        async with self._lock:
+            if not await self._load_locked():
+                return
+            for int_id in ids:
+                self._remove_locked(int(int_id))
+            await self._mark_dirty_locked()
+
+    async def remove_by_kb_doc_id(self, kb_doc_id: str) -> None:
+        """删除某个文档的全部文本块"""
+        async with self._lock:
+            if not await self._load_locked():
+                return
+            for int_id in list(self._owner_docs.get(kb_doc_id, ())):
+                self._remove_locked(int_id)
+            await self._mark_dirty_locked()
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """BM25 检索
+
+        Returns:
+            list[tuple[int, float]]: (chunk int id, score)，按分数降序
+
+        """
+        n_docs = self.doc_count
+        if not n_docs or top_k <= 0:
+            return []
+        avgdl = self._total_len / n_docs or 1.0
+        k1, b = self.k1, self.b
+
+        scores: dict[int, float] = {}
+        for term, qtf in Counter(tokenize(query, self.stopwords)).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)) * qtf
+            for int_id, tf in postings.items():
+                norm = k1 * (1.0 - b + b * self._doc_len[int_id] / avgdl)
+                scores[int_id] = scores.get(int_id, 0.0) + idf * (
+                    tf * (k1 + 1.0) / (tf + norm)
+                )
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    async def flush(self) -> None:
+        """将未落盘的变更写入磁盘"""
+        async with self._lock:
+            await self._flush_locked()
+
+    async def unload(self) -> None:
+        """将未落盘的变更写入磁盘，然后释放内存中的索引，下次使用时从磁盘重新加载"""
+        async with self._lock:
+            self._cancel_flush_task()
+            try:
+                await self._flush_locked()
+            except Exception as e:
+                # 标记文件仍然存在，下次加载时会全量重建
+                logger.error(f"Failed to persist sparse index {self.path}: {e}")
+            self._dirty = False
+            self._reset_locked()
+            self._loaded = False
+
+    def delete_file(self) -> None:
+        self._cancel_flush_task()
+        self._dirty = False
+        for path in (self.path, self._dirty_marker_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _tokenize_many(self, texts: list[str]) -> list[list[str]]:
+        return [tokenize(text, self.stopwords) for text in texts]
+
+    def _reset_locked(self) -> None:
+        self._doc_terms.clear()
+        self._doc_len.clear()
+        self._doc_owner.clear()
+        self._owner_docs.clear()
+        self._postings.clear()
+        self._total_len = 0
+
+    def _add_locked(self, int_id: int, tokens: list[str], kb_doc_id: str) -> None:
+        if int_id in self._doc_len:
+            self._remove_locked(int_id)
+        terms = dict(Counter(tokens))
+        self._insert_locked(int_id, terms, len(tokens), kb_doc_id)
+
+    def _insert_locked(
+        self,
+        int_id: int,
+        terms: dict[str, int],
+        length: int,
+        kb_doc_id: str,
+    ) -> None:
+        self._doc_terms[int_id] = terms
+        self._doc_len[int_id] = length
+        self._doc_owner[int_id] = kb_doc_id
+        self._owner_docs.setdefault(kb_doc_id, set()).add(int_id)
+        self._total_len += length
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[int_id] = tf
+
+    def _remove_locked(self, int_id: int) -> None:
+        terms = self._doc_terms.pop(int_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(int_id, 0)
+        kb_doc_id = self._doc_owner.pop(int_id, None)
+        if kb_doc_id is not None:
+            owned = self._owner_docs.get(kb_doc_id)
+            if owned is not None:
+                owned.discard(int_id)
+                if not owned:
+                    del self._owner_docs[kb_doc_id]
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(int_id, None)
+            if not postings:
+                del self._postings[term]
+
+    async def _load_locked(self) -> bool:
+        """从磁盘加载索引。返回索引是否可用。"""
+        if self._loaded:
+            return True
+        if not os.path.exists(self.path):
+            return False
+        if os.path.exists(self._dirty_marker_path):
+            logger.info(f"Sparse index {self.path} has unsaved changes, rebuilding.")
+            return False
+        try:
+            data = await asyncio.to_thread(self._read_file)
+        except Exception as e:
+            logger.warning(f"Failed to load sparse index {self.path}: {e}")
+            return False
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            return False
+
+        self._reset_locked()
+        for int_id, kb_doc_id, terms in data.get("docs", []):
+            self._insert_locked(int(int_id), terms, sum(terms.values()), kb_doc_id)
+        self._loaded = True
+        return True
+
+    async def _build_locked(self, document_storage: DocumentStorage) -> None:
+        logger.info(f"Building sparse index {self.path} from document storage...")
+        self._reset_locked()
+        offset = 0
+        while True:
+            docs = await document_storage.get_documents(
+                metadata_filters={},
+                offset=offset,
+                limit=BUILD_PAGE_SIZE,
+            )
+            if not docs:
+                break
+            tokenized = await asyncio.to_thread(
+                self._tokenize_many,
+                [doc["text"] for doc in docs],
+            )
+            for doc, tokens in zip(docs, tokenized):
+                kb_doc_id = _parse_kb_doc_id(doc["metadata"])
+                self._add_locked(int(doc["id"]), tokens, kb_doc_id)
+            offset += len(docs)
+        self._loaded = True
+        self._dirty = True
+        await self._flush_locked()
+        logger.info(f"Sparse index {self.path} built with {self.doc_count} chunks.")
+
+    @property
+    def _dirty_marker_path(self) -> str:
+        return f"{self.path}.dirty"
+
+    async def _mark_dirty_locked(self) -> None:
+        """记录未落盘的变更，并确保后台落盘任务已启动"""
+        if not self._dirty:
+            self._dirty = True
+            await asyncio.to_thread(self._write_dirty_marker)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to persist sparse index {self.path}: {e}")
+            # 稍后重试
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    def _cancel_flush_task(self) -> None:
+        task = self._flush_task
+        self._flush_task = None
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _flush_locked(self) -> None:
+        if not self._dirty:
+            return
+        await self._save_locked()
+        self._dirty = False
+        await asyncio.to_thread(self._remove_dirty_marker)
+
+    async def _save_locked(self) -> None:
+        docs = [
+            [int_id, self._doc_owner.get(int_id, ""), terms]
+            for int_id, terms in self._doc_terms.items()
+        ]
+        payload = {"version": INDEX_FORMAT_VERSION, "docs": docs}
+        await asyncio.to_thread(self._write_file, payload)
+
+    def _read_file(self) -> dict:
+        with open(self.path, "rb") as f:
+            return ormsgpack.unpackb(f.read())
+
+    def _write_file(self, payload: dict) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(ormsgpack.packb(payload))
+        os.replace(tmp_path, self.path)
+
+    def _write_dirty_marker(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self._dirty_marker_path, "wb"):
+            pass
+
+    def _remove_dirty_marker(self) -> None:
+        if os.path.exists(self._dirty_marker_path):
+            os.remove(self._dirty_marker_path)
+
+
+def _parse_kb_doc_id(metadata: str | None) -> str:
+    """从文本块元数据 JSON 中取出 kb_doc_id"""
+    if not metadata:
+        return ""
+    try:
+        return json.loads(metadata).get("kb_doc_id", "") or ""
+    except (TypeError, ValueError):
+        return ""
@@ -3,16 +3,16 @@
 使用 BM25 算法进行基于关键词的文档检索
 """
 
+import asyncio
 import json
-import os
 from dataclasses import dataclass
 
-import jieba
-from rank_bm25 import BM25Okapi
-
+from astrbot import logger
 from astrbot.core.db.vec_db.faiss_impl import FaissVecDB
 from astrbot.core.knowledge_base.kb_db_sqlite import KBSQLiteDatabase
 
+from .sparse_index import SparseIndex, load_stopwords
+
 
 @dataclass
 class SparseResult:
@@ -31,7 +31,7 @@ class SparseRetriever:
 
     职责:
     - 基于关键词的文档检索
-    - 使用 BM25 算法计算相关度
+    - 使用每个知识库持久化的 BM25 倒排索引计算相关度
     """
 
     def __init__(self, kb_db: KBSQLiteDatabase) -> None:
@@ -42,95 +42,95 @@ class SparseRetriever:
 
         """
         self.kb_db = kb_db
-        self._index_cache = {}  # 缓存 BM25 索引
-
-        with open(
-            os.path.join(os.path.dirname(__file__), "hit_stopwords.txt"),
-            encoding="utf-8",
-        ) as f:
-            self.hit_stopwords = {
-                word.strip() for word in set(f.read().splitlines()) if word.strip()
-            }
+        self.hit_stopwords = load_stopwords()
 
     async def retrieve(
         self,
         query: str,
         kb_ids: list[str],
         kb_options: dict,
+        failed_kb_ids: set[str] | None = None,
     ) -> list[SparseResult]:
         """执行稀疏检索
 
         Args:
             query: 查询文本
             kb_ids: 知识库 ID 列表
-            kb_options: 每个知识库的检索选项
+            kb_options: 每个知识库的检索选项, 需包含 vec_db 与 sparse_index
+            failed_kb_ids: 稀疏索引加载失败的知识库 ID 会被加入该集合
 
         Returns:
             List[SparseResult]: 检索结果列表
 
         """
-        # 1. 获取所有相关块
         top_k_sparse = 0
-        chunks = []
+        tasks = []
         for kb_id in kb_ids:
-            vec_db: FaissVecDB = kb_options.get(kb_id, {}).get("vec_db")
-            if not vec_db:
+            options = kb_options.get(kb_id, {})
+            vec_db: FaissVecDB = options.get("vec_db")
+            sparse_index: SparseIndex | None = options.get("sparse_index")
+            if not vec_db or not sparse_index:
                 continue
-            result = await vec_db.document_storage.get_documents(
-                metadata_filters={},
-                limit=None,
-                offset=None,
+            kb_top_k = options.get("top_k_sparse", 50)
+            top_k_sparse += kb_top_k
+            tasks.append(
+                self._retrieve_kb(
+                    query, kb_id, kb_top_k, vec_db, sparse_index, failed_kb_ids
+                ),
             )
-            chunk_mds = [json.loads(doc["metadata"]) for doc in result]
-            result = [
-                {
-                    "chunk_id": doc["doc_id"],
-                    "chunk_index": chunk_md["chunk_index"],
-                    "doc_id": chunk_md["kb_doc_id"],
-                    "kb_id": kb_id,
-                    "text": doc["text"],
-                }
-                for doc, chunk_md in zip(result, chunk_mds)
-            ]
-            chunks.extend(result)
-            top_k_sparse += kb_options.get(kb_id, {}).get("top_k_sparse", 50)
-
-        if not chunks:
+
+        # 各知识库并发检索
+        results: list[SparseResult] = []
+        for kb_results in await asyncio.gather(*tasks):
+            results.extend(kb_results)
+
+        # 3. 排序并返回 Top-K
+        results.sort(key=lambda x: x.score, reverse=True)
+        return results[:top_k_sparse]
+
+    async def _retrieve_kb(
+        self,
+        query: str,
+        kb_id: str,
+        top_k: int,
+        vec_db: FaissVecDB,
+        sparse_index: SparseIndex,
+        failed_kb_ids: set[str] | None = None,
+    ) -> list[SparseResult]:
+        # 1. 查询倒排索引 (首次使用时从文档存储构建)
+        try:
+            await sparse_index.ensure_ready(vec_db.document_storage)
+        except Exception as e:
+            logger.warning(f"知识库 {kb_id} 稀疏索引加载失败: {e}")
+            if failed_kb_ids is not None:
+                failed_kb_ids.add(kb_id)
+            return []
+        hits = sparse_index.search(query, top_k)
+        if not hits:
             return []
 
-        # 2. 准备文档和索引
-        corpus = [chunk["text"] for chunk in chunks]
-        tokenized_corpus = [list(jieba.cut(doc)) for doc in corpus]
-        tokenized_corpus = [
-            [word for word in doc if word not in self.hit_stopwords]
-            for doc in tokenized_corpus
-        ]
-
-        # 3. 构建 BM25 索引
-        bm25 = BM25Okapi(tokenized_corpus)
-
-        # 4. 执行检索
-        tokenized_query = list(jieba.cut(query))
-        tokenized_query = [
-            word for word in tokenized_query if word not in self.hit_stopwords
-        ]
-        scores = bm25.get_scores(tokenized_query)
-
-        # 5. 排序并返回 Top-K
+        # 2. 只取回命中的文本块
+        docs = await vec_db.document_storage.get_documents(
+            metadata_filters={},
+            ids=[int_id for int_id, _ in hits],
+            limit=None,
+            offset=None,
+        )
+        doc_map = {doc["id"]: doc for doc in docs}
         results = []
-        for idx, score in enumerate(scores):
-            chunk = chunks[idx]
+        for int_id, score in hits:
+            doc = doc_map.get(int_id)
+            if not doc:
+                continue
+            chunk_md = json.loads(doc["metadata"])
             results.append(
                 SparseResult(
-                    chunk_id=chunk["chunk_id"],
-                    chunk_index=chunk["chunk_index"],
-                    doc_id=chunk["doc_id"],
-                    kb_id=chunk["kb_id"],
-                    content=chunk["text"],
+                    chunk_id=doc["doc_id"],
+                    chunk_index=chunk_md["chunk_index"],
+                    doc_id=chunk_md["kb_doc_id"],
+                    kb_id=kb_id,
+                    content=doc["text"],
                     score=float(score),
                 ),
             )
-
-        results.sort(key=lambda x: x.score, reverse=True)
-        # return results[: len(results) // len(kb_ids)]
-        return results[:top_k_sparse]
+        return results
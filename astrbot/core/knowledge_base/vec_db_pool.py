@@ -0,0 +1,64 @@
+"""知识库向量数据库的 LRU 缓存
+
+知识库的向量数据库在首次使用时才加载，已加载的向量数据库按最近使用顺序记录在这里。
+所有已加载索引的估算内存占用超过预算时，从最久未使用的知识库开始卸载，
+正在使用中的知识库不会被卸载。
+"""
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from astrbot.core import logger
+
+if TYPE_CHECKING:
+    from .kb_helper import KBHelper
+
+
+class VecDBPool:
+    def __init__(self, memory_budget_mb: int = 0) -> None:
+        """
+        Args:
+            memory_budget_mb: 已加载向量索引的内存预算 (MB)，0 表示不限制
+        """
+        self.memory_budget = max(0, memory_budget_mb) * 1024 * 1024
+        self._loaded: OrderedDict[str, KBHelper] = OrderedDict()
+
+    @property
+    def loaded_kb_ids(self) -> list[str]:
+        """已加载的知识库 ID，按最近使用顺序从旧到新排列"""
+        return list(self._loaded)
+
+    def memory_usage(self) -> int:
+        return sum(
+            kb_helper.vec_db_memory_usage() for kb_helper in self._loaded.values()
+        )
+
+    def touch(self, kb_helper: "KBHelper") -> None:
+        """记录一次访问"""
+        self._loaded[kb_helper.kb.kb_id] = kb_helper
+        self._loaded.move_to_end(kb_helper.kb.kb_id)
+
+    def discard(self, kb_id: str) -> None:
+        self._loaded.pop(kb_id, None)
+
+    async def enforce_budget(self) -> None:
+        """卸载最久未使用且空闲的向量数据库，直到内存占用不超过预算"""
+        if not self.memory_budget:
+            return
+        usage = self.memory_usage()
+        if usage <= self.memory_budget:
+            return
+        # 最近使用的知识库始终保留
+        for kb_id, kb_helper in list(self._loaded.items())[:-1]:
+            # 卸载时会让出事件循环, 其他知识库可能在此期间被卸载或重新加载
+            if self._loaded.get(kb_id) is not kb_helper or kb_helper.vec_db_in_use:
+                continue
+            freed = kb_helper.vec_db_memory_usage()
+            await kb_helper.unload_vec_db()
+            usage -= freed
+            logger.debug(
+                f"Unloaded vector store of knowledge base {kb_id} "
+                f"({freed / 1024 / 1024:.1f} MB) to stay within memory budget.",
+            )
+            if usage <= self.memory_budget:
+                break
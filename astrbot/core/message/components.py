@@ -36,7 +36,19 @@ else:
 
 from astrbot.core import astrbot_config, file_token_service, logger
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
-from astrbot.core.utils.io import download_file, download_image_by_url, file_to_base64
+from astrbot.core.utils.io import download_file
+from astrbot.core.utils.media_cache import media_cache
+
+
+async def _base64_to_cached_file(data: str) -> str:
+    """将 base64:// 数据解码到媒体缓存中, 相同的数据只解码一次"""
+    bs64_data = data.removeprefix("base64://")
+
+    async def write(path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(base64.b64decode(bs64_data))
+
+    return await media_cache.fetch(media_cache.key("base64", bs64_data), ".jpg", write)
 
 
 class ComponentType(str, Enum):
@@ -157,17 +169,11 @@ class Record(BaseMessageComponent):
         if self.file.startswith("file:///"):
             return self.file[8:]
         if self.file.startswith("http"):
-            file_path = await download_image_by_url(self.file)
-            return os.path.abspath(file_path)
+            file_path = await media_cache.download(self.file)
+            return await media_cache.checkout(file_path, "recordseg")
         if self.file.startswith("base64://"):
-            bs64_data = self.file.removeprefix("base64://")
-            image_bytes = base64.b64decode(bs64_data)
-            file_path = os.path.join(
-                get_astrbot_temp_path(), f"recordseg_{uuid.uuid4()}.jpg"
-            )
-            with open(file_path, "wb") as f:
-                f.write(image_bytes)
-            return os.path.abspath(file_path)
+            file_path = await _base64_to_cached_file(self.file)
+            return await media_cache.checkout(file_path, "recordseg")
         if os.path.exists(self.file):
             return os.path.abspath(self.file)
         raise Exception(f"not a valid file: {self.file}")
@@ -183,14 +189,14 @@ class Record(BaseMessageComponent):
         if not self.file:
             raise Exception(f"not a valid file: {self.file}")
         if self.file.startswith("file:///"):
-            bs64_data = file_to_base64(self.file[8:])
+            bs64_data = media_cache.base64_of(self.file[8:])
         elif self.file.startswith("http"):
-            file_path = await download_image_by_url(self.file)
-            bs64_data = file_to_base64(file_path)
+            file_path = await media_cache.download(self.file)
+            bs64_data = media_cache.base64_of(file_path)
         elif self.file.startswith("base64://"):
             bs64_data = self.file
         elif os.path.exists(self.file):
-            bs64_data = file_to_base64(self.file)
+            bs64_data = media_cache.base64_of(self.file)
         else:
             raise Exception(f"not a valid file: {self.file}")
         bs64_data = bs64_data.removeprefix("base64://")
@@ -252,12 +258,9 @@ class Video(BaseMessageComponent):
         if url and url.startswith("file:///"):
             return url[8:]
         if url and url.startswith("http"):
-            video_file_path = os.path.join(
-                get_astrbot_temp_path(), f"videoseg_{uuid.uuid4().hex}"
-            )
-            await download_file(url, video_file_path)
+            video_file_path = await media_cache.download(url, suffix="", image=False)
             if os.path.exists(video_file_path):
-                return os.path.abspath(video_file_path)
+                return await media_cache.checkout(video_file_path, "videoseg")
             raise Exception(f"download failed: {url}")
         if os.path.exists(url):
             return os.path.abspath(url)
@@ -448,17 +451,11 @@ class Image(BaseMessageComponent):
         if url.startswith("file:///"):
             return url[8:]
         if url.startswith("http"):
-            image_file_path = await download_image_by_url(url)
-            return os.path.abspath(image_file_path)
+            image_file_path = await media_cache.download(url)
+            return await media_cache.checkout(image_file_path, "imgseg")
         if url.startswith("base64://"):
-            bs64_data = url.removeprefix("base64://")
-            image_bytes = base64.b64decode(bs64_data)
-            image_file_path = os.path.join(
-                get_astrbot_temp_path(), f"imgseg_{uuid.uuid4()}.jpg"
-            )
-            with open(image_file_path, "wb") as f:
-                f.write(image_bytes)
-            return os.path.abspath(image_file_path)
+            image_file_path = await _base64_to_cached_file(url)
+            return await media_cache.checkout(image_file_path, "imgseg")
         if os.path.exists(url):
             return os.path.abspath(url)
         raise Exception(f"not a valid file: {url}")
@@ -475,14 +472,14 @@ class Image(BaseMessageComponent):
         if not url:
             raise ValueError("No valid file or URL provided")
         if url.startswith("file:///"):
-            bs64_data = file_to_base64(url[8:])
+            bs64_data = media_cache.base64_of(url[8:])
         elif url.startswith("http"):
-            image_file_path = await download_image_by_url(url)
-            bs64_data = file_to_base64(image_file_path)
+            image_file_path = await media_cache.download(url)
+            bs64_data = media_cache.base64_of(image_file_path)
         elif url.startswith("base64://"):
             bs64_data = url
         elif os.path.exists(url):
-            bs64_data = file_to_base64(url)
+            bs64_data = media_cache.base64_of(url)
         else:
             raise Exception(f"not a valid file: {url}")
         bs64_data = bs64_data.removeprefix("base64://")
@@ -1,7 +1,8 @@
 from collections.abc import AsyncGenerator
 
 from astrbot.core import logger
-from astrbot.core.message.message_event_result import MessageEventResult
+from astrbot.core.message.components import Plain
+from astrbot.core.message.message_event_result import MessageChain, MessageEventResult
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
 
 from ..context import PipelineContext
@@ -39,3 +40,34 @@ class ContentSafetyCheckStage(Stage):
             event.stop_event()
             logger.info(f"内容安全检查不通过，原因：{info}")
             return
+
+    async def guard_stream(
+        self,
+        event: AstrMessageEvent,
+        stream: AsyncGenerator[MessageChain, None],
+    ) -> AsyncGenerator[MessageChain, None]:
+        """逐块检查流式输出, 命中后不再转发后续内容
+
+        每一块只增量检查新到达的文本。命中后仍会消费完原始的输出流, 保证 Agent 正常结束。
+        """
+        checker = self.strategy_selector.create_stream_checker()
+        if checker is None:
+            async for chain in stream:
+                yield chain
+            return
+
+        blocked = False
+        async for chain in stream:
+            if blocked:
+                continue
+            text = "".join(comp.text for comp in chain.chain if isinstance(comp, Plain))
+            if text:
+                ok, info = checker.feed(text)
+                if not ok:
+                    blocked = True
+                    logger.info(f"内容安全检查不通过，原因：{info}")
+                    yield MessageChain().message(
+                        "你的消息或者大模型的响应中包含不适当的内容，已被屏蔽。",
+                    )
+                    continue
+            yield chain
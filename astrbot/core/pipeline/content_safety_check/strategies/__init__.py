@@ -1,7 +1,19 @@
 import abc
 
 
+class ContentSafetyStreamChecker(abc.ABC):
+    """逐块检查流式输出, 每个输出流使用一个独立的实例"""
+
+    @abc.abstractmethod
+    def feed(self, chunk: str) -> tuple[bool, str]:
+        raise NotImplementedError
+
+
 class ContentSafetyStrategy(abc.ABC):
     @abc.abstractmethod
     def check(self, content: str) -> tuple[bool, str]:
         raise NotImplementedError
+
+    def create_stream_checker(self) -> ContentSafetyStreamChecker | None:
+        """创建流式检查器, 不支持增量检查的策略返回 None"""
+        return None
@@ -1,6 +1,175 @@
+"""关键词内容安全检查
+
+敏感词列表可能有上万条, 逐条 ``re.search`` 的开销随词表线性增长。这里在载入配置时一次性构建匹配器:
+
+- 不含正则元字符的关键词按字面量处理, 合并为一个 Aho–Corasick 自动机, 一次扫描即可匹配全部关键词
+- 真正的正则表达式合并为一个交替表达式, 命中后再确定具体是哪一条关键词
+- 相同词表的匹配器在多个流水线之间共用, 配置变更后词表不同时才会重新构建
+
+流式输出可以通过 ``KeywordStreamChecker`` 逐块检查, 字面量关键词沿用上一块结束时的自动机状态,
+正则只需要重新扫描上一块末尾的少量字符, 不需要重复扫描整个缓冲区。
+"""
+
+import functools
 import re
+from collections.abc import Iterable
+
+from astrbot import logger
+
+from . import ContentSafetyStrategy, ContentSafetyStreamChecker
+
+REGEX_META_CHARS = frozenset(".^$*+?{}[]\\|()")
+STREAM_REGEX_WINDOW = 256
+"""流式检查时, 正则表达式在上一块末尾回看的字符数"""
+MATCHER_CACHE_SIZE = 8
+
+
+def _is_literal(keyword: str) -> bool:
+    return not any(c in REGEX_META_CHARS for c in keyword)
+
+
+def _can_combine(pattern: re.Pattern) -> bool:
+    """带全局标志或反向引用的正则合并后语义会改变, 需要单独匹配"""
+    source = pattern.pattern
+    return not (
+        re.match(r"\(\?[aiLmsux]+\)", source) or re.search(r"\\\d|\(\?P=", source)
+    )
+
+
+class AhoCorasick:
+    """字面量关键词的 Aho–Corasick 自动机"""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[str | None] = [None]
+        for keyword in keywords:
+            self._add(keyword)
+        self._build()
+
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = nxt
+        if self._output[state] is None:
+            self._output[state] = keyword
+
+    def _build(self) -> None:
+        goto, fail, output = self._goto, self._fail, self._output
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if output[nxt] is None:
+                    # 后缀状态上的关键词同样在此处结束
+                    output[nxt] = output[fail[nxt]]
+
+    def search(self, text: str, state: int = 0) -> tuple[str | None, int]:
+        """从 state 开始扫描 text, 返回第一个命中的关键词与扫描结束时的状态"""
+        goto, fail, output = self._goto, self._fail, self._output
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state] is not None:
+                return output[state], state
+        return None, state
 
-from . import ContentSafetyStrategy
+
+class KeywordMatcher:
+    """由关键词列表构建的匹配器, 构建后只读, 可以在多个策略实例之间共用"""
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        literals: list[str] = []
+        self.patterns: list[re.Pattern] = []
+        for keyword in keywords:
+            if not isinstance(keyword, str) or not keyword:
+                continue
+            if _is_literal(keyword):
+                literals.append(keyword)
+                continue
+            try:
+                self.patterns.append(re.compile(keyword))
+            except re.error as e:
+                logger.warning(
+                    f"敏感词 {keyword} 不是合法的正则表达式, 将按字面量匹配: {e}"
+                )
+                literals.append(keyword)
+
+        self.literal_count = len(literals)
+        self.automaton = AhoCorasick(literals) if literals else None
+
+        combinable = [p for p in self.patterns if _can_combine(p)]
+        self.separate_patterns = [p for p in self.patterns if not _can_combine(p)]
+        self.combined: re.Pattern | None = None
+        if combinable:
+            try:
+                self.combined = re.compile(
+                    "|".join(f"(?:{p.pattern})" for p in combinable),
+                )
+            except re.error:
+                self.separate_patterns = self.patterns
+
+    def search(self, text: str) -> str | None:
+        """返回 text 中命中的关键词, 未命中时返回 None"""
+        if self.automaton is not None:
+            keyword, _ = self.automaton.search(text)
+            if keyword is not None:
+                return keyword
+        return self.search_patterns(text)
+
+    def search_patterns(self, text: str) -> str | None:
+        if self.combined is not None and self.combined.search(text):
+            # 合并后的表达式只说明有命中, 逐条确认具体的关键词
+            for pattern in self.patterns:
+                if pattern.search(text):
+                    return pattern.pattern
+        for pattern in self.separate_patterns:
+            if pattern.search(text):
+                return pattern.pattern
+        return None
+
+    @property
+    def has_patterns(self) -> bool:
+        return bool(self.patterns)
+
+
+@functools.lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def _get_matcher(keywords: tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+class KeywordStreamChecker(ContentSafetyStreamChecker):
+    """逐块检查流式输出"""
+
+    def __init__(self, matcher: KeywordMatcher) -> None:
+        self.matcher = matcher
+        self._state = 0
+        self._tail = ""
+
+    def feed(self, chunk: str) -> tuple[bool, str]:
+        matcher = self.matcher
+        keyword = None
+        if matcher.automaton is not None:
+            keyword, self._state = matcher.automaton.search(chunk, self._state)
+        if keyword is None and matcher.has_patterns:
+            window = self._tail + chunk
+            keyword = matcher.search_patterns(window)
+            self._tail = window[-STREAM_REGEX_WINDOW:]
+        if keyword is not None:
+            return False, f"内容安全检查不通过，匹配到敏感词：{keyword}"
+        return True, ""
 
 
 class KeywordsStrategy(ContentSafetyStrategy):
@@ -16,9 +185,18 @@ class KeywordsStrategy(ContentSafetyStrategy):
         #         self.keywords.extend(
         #             json.loads(base64.b64decode(f.read()).decode("utf-8"))["keywords"]
         #         )
+        self.matcher = _get_matcher(tuple(self.keywords))
+
+    def update_keywords(self, keywords: list) -> None:
+        """替换关键词列表并重新构建匹配器"""
+        self.keywords = list(keywords or [])
+        self.matcher = _get_matcher(tuple(self.keywords))
 
     def check(self, content: str) -> tuple[bool, str]:
-        for keyword in self.keywords:
-            if re.search(keyword, content):
-                return False, "内容安全检查不通过，匹配到敏感词。"
+        keyword = self.matcher.search(content)
+        if keyword is not None:
+            return False, f"内容安全检查不通过，匹配到敏感词：{keyword}"
         return True, ""
+
+    def create_stream_checker(self) -> KeywordStreamChecker:
+        return KeywordStreamChecker(self.matcher)
@@ -1,6 +1,6 @@
 from astrbot import logger
 
-from . import ContentSafetyStrategy
+from . import ContentSafetyStrategy, ContentSafetyStreamChecker
 
 
 class StrategySelector:
@@ -32,3 +32,24 @@ class StrategySelector:
             if not ok:
                 return False, info
         return True, ""
+
+    def create_stream_checker(self) -> "StreamCheckerGroup | None":
+        """为一次流式输出创建检查器, 没有策略支持增量检查时返回 None"""
+        checkers = [
+            checker
+            for strategy in self.enabled_strategies
+            if (checker := strategy.create_stream_checker()) is not None
+        ]
+        return StreamCheckerGroup(checkers) if checkers else None
+
+
+class StreamCheckerGroup(ContentSafetyStreamChecker):
+    def __init__(self, checkers: list[ContentSafetyStreamChecker]) -> None:
+        self.checkers = checkers
+
+    def feed(self, chunk: str) -> tuple[bool, str]:
+        for checker in self.checkers:
+            ok, info = checker.feed(chunk)
+            if not ok:
+                return False, info
+        return True, ""
@@ -43,6 +43,10 @@ def unregister_active_runner(umo: str, runner: AgentRunner) -> None:
         _ACTIVE_AGENT_RUNNERS.pop(umo, None)
 
 
+def has_active_runner(umo: str) -> bool:
+    return umo in _ACTIVE_AGENT_RUNNERS
+
+
 def _get_follow_up_order_state(umo: str) -> dict[str, object]:
     state = _FOLLOW_UP_ORDER_STATE.get(umo)
     if state is None:
@@ -62,6 +62,8 @@ class InternalAgentSubStage(Stage):
                 self.tool_schema_mode,
             )
             self.tool_schema_mode = "full"
+        self.parallel_tool_calls: bool = settings.get("parallel_tool_calls", False)
+        self.max_parallel_tool_calls: int = settings.get("max_parallel_tool_calls", 4)
         if isinstance(self.max_step, bool):  # workaround: #2622
             self.max_step = 30
         self.show_tool_use: bool = settings.get("show_tool_use_status", True)
@@ -116,6 +118,8 @@ class InternalAgentSubStage(Stage):
         self.main_agent_cfg = MainAgentBuildConfig(
             tool_call_timeout=self.tool_call_timeout,
             tool_schema_mode=self.tool_schema_mode,
+            parallel_tool_calls=self.parallel_tool_calls,
+            max_parallel_tool_calls=self.max_parallel_tool_calls,
             sanitize_context_by_modalities=self.sanitize_context_by_modalities,
             kb_agentic_mode=self.kb_agentic_mode,
             file_extract_enabled=self.file_extract_enabled,
@@ -445,6 +449,7 @@ class InternalAgentSubStage(Stage):
             req.conversation.cid,
             history=message_to_save,
             token_usage=token_usage,
+            conversation=req.conversation,
         )
 
 
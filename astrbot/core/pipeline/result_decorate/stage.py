@@ -1,6 +1,5 @@
 import random
 import re
-import time
 import traceback
 from collections.abc import AsyncGenerator
 
@@ -128,10 +127,24 @@ class ResultDecorateStage(Stage):
         event: AstrMessageEvent,
     ) -> None | AsyncGenerator[None, None]:
         result = event.get_result()
-        if result is None or not result.chain:
+        if result is None:
             return
 
+        # 流式结果的 chain 为空, 内容在 async_stream 中, 需要在检查 chain 之前处理
         if result.result_content_type == ResultContentType.STREAMING_RESULT:
+            # 流式输出在发送时逐块检查内容安全
+            if (
+                self.content_safe_check_reply
+                and isinstance(self.content_safe_check_stage, ContentSafetyCheckStage)
+                and result.async_stream is not None
+            ):
+                result.async_stream = self.content_safe_check_stage.guard_stream(
+                    event,
+                    result.async_stream,
+                )
+            return
+
+        if not result.chain:
             return
 
         is_stream = result.result_content_type == ResultContentType.STREAMING_FINISH
@@ -340,24 +353,20 @@ class ResultDecorateStage(Stage):
                         break
                 plain_str = "".join(parts)
                 if plain_str and len(plain_str) > self.t2i_word_threshold:
-                    render_start = time.time()
                     try:
-                        url = await html_renderer.render_t2i(
+                        # 本地渲染时过长的文本会被分成多张图片
+                        urls = await html_renderer.render_t2i_images(
                             plain_str,
-                            return_url=True,
                             use_network=self.t2i_use_network,
                             template_name=self.t2i_active_template,
                         )
                     except BaseException:
                         logger.error("文本转图片失败，使用文本发送。")
                         return
-                    if time.time() - render_start > 3:
-                        logger.warning(
-                            "文本转图片耗时超过了 3 秒，如果觉得很慢可以使用 /t2i 关闭文本转图片模式。",
-                        )
-                    if url:
+                    images = []
+                    for url in urls:
                         if url.startswith("http"):
-                            result.chain = [Image.fromURL(url)]
+                            images.append(Image.fromURL(url))
                         elif (
                             self.ctx.astrbot_config["t2i_use_file_service"]
                             and self.ctx.astrbot_config["callback_api_base"]
@@ -365,9 +374,11 @@ class ResultDecorateStage(Stage):
                             token = await file_token_service.register_file(url)
                             url = f"{self.ctx.astrbot_config['callback_api_base']}/api/file/{token}"
                             logger.debug(f"已注册：{url}")
-                            result.chain = [Image.fromURL(url)]
+                            images.append(Image.fromURL(url))
                         else:
-                            result.chain = [Image.fromFileSystem(url)]
+                            images.append(Image.fromFileSystem(url))
+                    if images:
+                        result.chain = images
 
             # 触发转发消息
             if event.get_platform_name() == "aiocqhttp":
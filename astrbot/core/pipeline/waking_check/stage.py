@@ -1,3 +1,4 @@
+import re
 from collections.abc import AsyncGenerator, Callable
 
 from astrbot import logger
@@ -156,6 +157,13 @@ class WakingCheckStage(Stage):
             event.plugins_name = enabled_plugins_name
         logger.debug(f"enabled_plugins_name: {enabled_plugins_name}")
 
+        # 通过指令名前缀索引预先筛选指令 Handler，指令名不可能匹配的 Handler 无需执行过滤器
+        command_index = star_handlers_registry.get_command_index()
+        matched_commands = command_index.match(
+            re.sub(r"\s+", " ", event.message_str),
+            event.message_str,
+        )
+
         for handler in star_handlers_registry.get_handlers_by_event_type(
             EventType.AdapterMessageEvent,
             plugins_name=event.plugins_name,
@@ -166,6 +174,8 @@ class WakingCheckStage(Stage):
                 == "astrbot.builtin_stars.builtin_commands.main"
             ):
                 continue
+            if not command_index.may_match(handler, matched_commands):
+                continue
 
             # filter 需满足 AND 逻辑关系
             passed = True
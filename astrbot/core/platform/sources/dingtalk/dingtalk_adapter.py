@@ -22,6 +22,7 @@ from astrbot.api.platform import (
 from astrbot.core import sp
 from astrbot.core.platform.astr_message_event import MessageSesion
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.http_client import http_client
 from astrbot.core.utils.io import download_file
 from astrbot.core.utils.media_utils import (
     convert_audio_format,
@@ -257,7 +258,7 @@ class DingtalkPlatformAdapter(Platform):
         temp_dir.mkdir(parents=True, exist_ok=True)
         f_path = temp_dir / f"dingtalk_{uuid.uuid4()}.{ext}"
         async with (
-            aiohttp.ClientSession() as session,
+            http_client.session(trust_env=False) as session,
             session.post(
                 "https://api.dingtalk.com/v1.0/robot/messageFiles/download",
                 headers=headers,
@@ -286,7 +287,7 @@ class DingtalkPlatformAdapter(Platform):
             logger.warning(f"通过 dingtalk_stream 获取 access_token 失败: {e}")
 
         payload = {"appKey": self.client_id, "appSecret": self.client_secret}
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.post(
                 "https://api.dingtalk.com/v1.0/oauth2/accessToken",
                 json=payload,
@@ -334,7 +335,7 @@ class DingtalkPlatformAdapter(Platform):
             "Content-Type": "application/json",
             "x-acs-dingtalk-access-token": access_token,
         }
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.post(
                 "https://api.dingtalk.com/v1.0/robot/groupMessages/send",
                 headers=headers,
@@ -367,7 +368,7 @@ class DingtalkPlatformAdapter(Platform):
             "Content-Type": "application/json",
             "x-acs-dingtalk-access-token": access_token,
         }
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.post(
                 "https://api.dingtalk.com/v1.0/robot/oToMessages/batchSend",
                 headers=headers,
@@ -416,7 +417,7 @@ class DingtalkPlatformAdapter(Platform):
             filename=media_file_path.name,
             content_type="application/octet-stream",
         )
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.post(
                 f"https://oapi.dingtalk.com/media/upload?access_token={access_token}&type={media_type}",
                 data=form,
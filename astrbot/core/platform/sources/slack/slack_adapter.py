@@ -5,7 +5,6 @@ import time
 import uuid
 from typing import Any, cast
 
-import aiohttp
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.web.async_client import AsyncWebClient
 
@@ -20,6 +19,7 @@ from astrbot.api.platform import (
     PlatformMetadata,
 )
 from astrbot.core.platform.astr_message_event import MessageSesion
+from astrbot.core.utils.http_client import http_client
 from astrbot.core.utils.webhook_utils import log_webhook_info
 
 from ...register import register_platform_adapter
@@ -314,7 +314,7 @@ class SlackAdapter(Platform):
     async def get_file_base64(self, url: str) -> str:
         """下载 Slack 文件并返回 Base64 编码的内容"""
         headers = {"Authorization": f"Bearer {self.bot_token}"}
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.get(url, headers=headers) as resp:
                 if resp.status == 200:
                     content = await resp.read()
@@ -11,6 +11,7 @@ import aiohttp
 from Crypto.Cipher import AES
 
 from astrbot import logger
+from astrbot.core.utils.http_client import http_client
 
 from .wecomai_utils import WecomAIBotConstants
 from .WXBizJsonMsgCrypt import WXBizJsonMsgCrypt
@@ -167,7 +168,7 @@ class WecomAIBotAPIClient:
             # 下载图片
             logger.info(f"开始下载加密图片: {image_url}")
 
-            async with aiohttp.ClientSession() as session:
+            async with http_client.session(trust_env=False) as session:
                 async with session.get(image_url, timeout=15) as response:
                     if response.status != 200:
                         error_msg = f"图片下载失败，状态码: {response.status}"
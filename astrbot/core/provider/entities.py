@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import base64
 import enum
 import json
 from dataclasses import dataclass, field
@@ -21,7 +20,7 @@ from astrbot.core.agent.message import (
 from astrbot.core.agent.tool import ToolSet
 from astrbot.core.db.po import Conversation
 from astrbot.core.message.message_event_result import MessageChain
-from astrbot.core.utils.io import download_image_by_url
+from astrbot.core.utils.media_cache import media_cache
 
 
 class ProviderType(enum.Enum):
@@ -188,7 +187,7 @@ class ProviderRequest:
         if self.image_urls:
             for image_url in self.image_urls:
                 if image_url.startswith("http"):
-                    image_path = await download_image_by_url(image_url)
+                    image_path = await media_cache.download(image_url)
                     image_data = await self._encode_image_bs64(image_path)
                 elif image_url.startswith("file:///"):
                     image_path = image_url.replace("file:///", "")
@@ -218,10 +217,7 @@ class ProviderRequest:
         """将图片转换为 base64"""
         if image_url.startswith("base64://"):
             return image_url.replace("base64://", "data:image/jpeg;base64,")
-        with open(image_url, "rb") as f:
-            image_bs64 = base64.b64encode(f.read()).decode("utf-8")
-            return "data:image/jpeg;base64," + image_bs64
-        return ""
+        return "data:image/jpeg;base64," + media_cache.base64_of(image_url)
 
 
 @dataclass
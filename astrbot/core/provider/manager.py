@@ -1,6 +1,7 @@
 import asyncio
 import copy
 import os
+import time
 import traceback
 from collections.abc import Callable
 from typing import Protocol, runtime_checkable
@@ -28,6 +29,19 @@ class HasInitialize(Protocol):
     async def initialize(self) -> None: ...
 
 
+PROVIDER_BASE_CLASSES: dict[ProviderType, type] = {
+    ProviderType.CHAT_COMPLETION: Provider,
+    ProviderType.SPEECH_TO_TEXT: STTProvider,
+    ProviderType.TEXT_TO_SPEECH: TTSProvider,
+    ProviderType.EMBEDDING: EmbeddingProvider,
+    ProviderType.RERANK: RerankProvider,
+}
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
 class ProviderManager:
     def __init__(
         self,
@@ -45,6 +59,13 @@ class ProviderManager:
         self.provider_settings: dict = config["provider_settings"]
         self.provider_stt_settings: dict = config.get("provider_stt_settings", {})
         self.provider_tts_settings: dict = config.get("provider_tts_settings", {})
+        self.init_concurrency: int = max(
+            1,
+            config.get("provider_init_concurrency", 4),
+        )
+        """启动时同时初始化的提供商数量上限"""
+        self.lazy_load: bool = config.get("provider_lazy_load", False)
+        """懒加载模式。启动时只载入被选为默认或被会话选择的提供商，其余在首次获取时载入"""
 
         # 人格相关属性，v4.0.0 版本后被废弃，推荐使用 PersonaManager
         self.default_persona_name = persona_mgr.default_persona
@@ -65,6 +86,12 @@ class ProviderManager:
         ] = {}
         """Provider 实例映射. key: provider_id, value: Provider 实例"""
         self.llm_tools = llm_tools
+        self.load_timings: dict[str, dict] = {}
+        """各提供商载入的耗时（毫秒）和状态，键为提供商 ID"""
+        self._lazy_provider_configs: dict[str, dict] = {}
+        """懒加载模式下尚未载入的提供商配置（已合并），键为提供商 ID"""
+        self._lazy_init_tasks: dict[str, asyncio.Task] = {}
+        """正在后台执行 initialize() 的懒加载提供商"""
 
         self.curr_provider_inst: Provider | None = None
         """默认的 Provider 实例。已弃用，请使用 get_using_provider() 方法获取当前使用的 Provider 实例。"""
@@ -155,7 +182,7 @@ class ProviderManager:
         Version 4.0.0: 这个版本下已经默认隔离提供商
 
         """
-        if provider_id not in self.inst_map:
+        if not await self.get_provider_by_id(provider_id):
             raise ValueError(f"提供商 {provider_id} 不存在，无法设置。")
         if umo:
             await sp.session_put(
@@ -206,9 +233,47 @@ class ProviderManager:
             self._notify_provider_changed(provider_id, provider_type, umo)
 
     async def get_provider_by_id(self, provider_id: str) -> Providers | None:
-        """根据提供商 ID 获取提供商实例"""
+        """根据提供商 ID 获取提供商实例。懒加载的提供商在首次获取时载入"""
+        if provider_id in self._lazy_provider_configs:
+            self._instantiate_lazy_provider(provider_id)
+        task = self._lazy_init_tasks.get(provider_id)
+        if task:
+            await asyncio.shield(task)
         return self.inst_map.get(provider_id)
 
+    def get_provider_instance(self, provider_id: str | None) -> Providers | None:
+        """根据提供商 ID 获取提供商实例的同步版本。
+
+        懒加载的提供商在首次获取时载入。需要异步初始化的提供商在后台完成初始化前返回 None。
+        """
+        if not provider_id:
+            return None
+        if provider_id in self._lazy_provider_configs:
+            self._instantiate_lazy_provider(provider_id)
+        return self.inst_map.get(provider_id)
+
+    def load_lazy_providers(self, provider_type: ProviderType | None = None) -> None:
+        """载入所有尚未载入的懒加载提供商, 用于枚举提供商列表。
+
+        需要异步初始化的提供商在后台完成初始化后才会出现在列表中, 需要完整列表时使用 ensure_providers_loaded。
+        """
+        for provider_id, provider_config in list(self._lazy_provider_configs.items()):
+            if (
+                provider_type is None
+                or provider_cls_map[provider_config["type"]].provider_type
+                == provider_type
+            ):
+                self._instantiate_lazy_provider(provider_id)
+
+    async def ensure_providers_loaded(
+        self, provider_type: ProviderType | None = None
+    ) -> None:
+        """载入所有懒加载的提供商并等待其初始化完成"""
+        self.load_lazy_providers(provider_type)
+        tasks = list(self._lazy_init_tasks.values())
+        if tasks:
+            await asyncio.gather(*(asyncio.shield(t) for t in tasks))
+
     def get_using_provider(
         self, provider_type: ProviderType, umo=None
     ) -> Providers | None:
@@ -232,20 +297,20 @@ class ProviderManager:
                 scope_id=umo,
             )
             if provider_id:
-                provider = self.inst_map.get(provider_id)
+                provider = self.get_provider_instance(provider_id)
         if not provider:
             # default setting
             config = self.acm.get_conf(umo)
             if provider_type == ProviderType.CHAT_COMPLETION:
                 provider_id = config["provider_settings"].get("default_provider_id")
-                provider = self.inst_map.get(provider_id)
+                provider = self.get_provider_instance(provider_id)
                 if not provider:
                     provider = self.provider_insts[0] if self.provider_insts else None
             elif provider_type == ProviderType.SPEECH_TO_TEXT:
                 provider_id = config["provider_stt_settings"].get("provider_id")
                 if not provider_id:
                     return None
-                provider = self.inst_map.get(provider_id)
+                provider = self.get_provider_instance(provider_id)
                 if not provider:
                     provider = (
                         self.stt_provider_insts[0] if self.stt_provider_insts else None
@@ -254,7 +319,7 @@ class ProviderManager:
                 provider_id = config["provider_tts_settings"].get("provider_id")
                 if not provider_id:
                     return None
-                provider = self.inst_map.get(provider_id)
+                provider = self.get_provider_instance(provider_id)
                 if not provider:
                     provider = (
                         self.tts_provider_insts[0] if self.tts_provider_insts else None
@@ -270,13 +335,15 @@ class ProviderManager:
         return provider
 
     async def initialize(self) -> None:
-        # 逐个初始化提供商
-        for provider_config in self.providers_config:
-            try:
-                await self.load_provider(provider_config)
-            except Exception as e:
-                logger.error(traceback.format_exc())
-                logger.error(e)
+        # 提供商与 MCP 服务互不依赖，同时初始化
+        results = await asyncio.gather(
+            self._load_providers(),
+            self._init_mcp_clients(),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
         selected_provider_id = await sp.get_async(
             key="curr_provider",
@@ -330,6 +397,84 @@ class ProviderManager:
         if not self.curr_tts_provider_inst and self.tts_provider_insts:
             self.curr_tts_provider_inst = self.tts_provider_insts[0]
 
+    async def _load_providers(self) -> None:
+        """并发载入配置中的提供商，同时初始化的数量不超过 init_concurrency。
+
+        实例按配置中的顺序注册，与逐个载入时一致。
+        """
+        start = time.perf_counter()
+        self.load_timings = {}
+        pinned_ids = await self._get_pinned_provider_ids() if self.lazy_load else set()
+        fallback_chat_id = None
+
+        to_load = []
+        for provider_config in self.providers_config:
+            merged_config = self._prepare_provider_config(provider_config)
+            if merged_config is None:
+                continue
+            provider_id = merged_config["id"]
+            if (
+                fallback_chat_id is None
+                and merged_config.get("provider_type") == "chat_completion"
+            ):
+                # 未设置默认提供商时使用第一个文本生成提供商
+                fallback_chat_id = provider_id
+                pinned_ids.add(provider_id)
+            if self.lazy_load and provider_id not in pinned_ids:
+                self._lazy_provider_configs[provider_id] = merged_config
+                self.load_timings[provider_id] = self._new_timing(
+                    merged_config,
+                    status="lazy",
+                )
+                continue
+            to_load.append(merged_config)
+
+        semaphore = asyncio.Semaphore(self.init_concurrency)
+
+        async def create(merged_config: dict) -> Providers | None:
+            async with semaphore:
+                try:
+                    return await self._create_provider_with_timing(merged_config)
+                except Exception as e:
+                    logger.error(traceback.format_exc())
+                    logger.error(e)
+                    return None
+
+        insts = await asyncio.gather(*(create(config) for config in to_load))
+        for merged_config, inst in zip(to_load, insts):
+            if inst is not None:
+                self._register_provider(merged_config, inst)
+
+        loaded = sum(inst is not None for inst in insts)
+        logger.info(
+            f"已载入 {loaded} 个提供商，{len(self._lazy_provider_configs)} 个提供商将在首次使用时载入，耗时 {_elapsed_ms(start)} ms。",
+        )
+
+    async def _get_pinned_provider_ids(self) -> set[str]:
+        """懒加载模式下仍需在启动时载入的提供商：各配置文件中的默认提供商，以及全局和会话中选择的提供商"""
+        ids = set()
+        for conf in self.acm.confs.values():
+            ids.add(conf.get("provider_settings", {}).get("default_provider_id"))
+            ids.add(conf.get("provider_stt_settings", {}).get("provider_id"))
+            ids.add(conf.get("provider_tts_settings", {}).get("provider_id"))
+        for key in ("curr_provider", "curr_provider_stt", "curr_provider_tts"):
+            ids.add(
+                await sp.get_async(
+                    key=key,
+                    default=None,
+                    scope="global",
+                    scope_id="global",
+                ),
+            )
+        for provider_type in ProviderType:
+            prefs = await sp.range_get_async(
+                "umo",
+                key=f"provider_perf_{provider_type.value}",
+            )
+            ids.update(pref.value["val"] for pref in prefs)
+        return {provider_id for provider_id in ids if isinstance(provider_id, str)}
+
+    async def _init_mcp_clients(self) -> None:
         # 初始化 MCP Client 连接（等待完成以确保工具可用）
         strict_mcp_init = os.getenv("ASTRBOT_MCP_INIT_STRICT", "").strip().lower() in {
             "1",
@@ -517,7 +662,8 @@ class ProviderManager:
         provider_config["key"] = resolved_keys
         return provider_config
 
-    async def load_provider(self, provider_config: dict) -> None:
+    def _prepare_provider_config(self, provider_config: dict) -> dict | None:
+        """合并 provider_source 配置并解析环境变量。提供商未启用时返回 None"""
         # 如果 provider_source_id 存在且不为空，则从 provider_sources 中找到对应的配置并合并
         provider_config = self.get_merged_provider_config(provider_config)
 
@@ -526,15 +672,33 @@ class ProviderManager:
 
         if not provider_config["enable"]:
             logger.info(f"Provider {provider_config['id']} is disabled, skipping")
-            return
+            return None
         if provider_config.get("provider_type", "") == "agent_runner":
-            return
+            return None
+        return provider_config
+
+    @staticmethod
+    def _new_timing(provider_config: dict, status: str = "loading") -> dict:
+        return {
+            "id": provider_config["id"],
+            "type": provider_config["type"],
+            "import": 0.0,
+            "instantiate": 0.0,
+            "initialize": 0.0,
+            "status": status,
+        }
 
+    def _create_provider(self, provider_config: dict, timing: dict) -> Providers | None:
+        """导入提供商适配器并实例化提供商，不执行 initialize()
+
+        导入失败或找不到适配器时记录日志并返回 None，实例化失败时抛出异常。
+        """
         logger.info(
             f"载入 {provider_config['type']}({provider_config['id']}) 服务提供商 ...",
         )
 
         # 动态导入
+        start = time.perf_counter()
         try:
             self.dynamic_import_provider(provider_config["type"])
         except (ImportError, ModuleNotFoundError) as e:
@@ -542,20 +706,22 @@ class ProviderManager:
                 f"加载 {provider_config['type']}({provider_config['id']}) 提供商适配器失败：{e}。可能是因为有未安装的依赖。",
                 exc_info=True,
             )
-            return
+            return None
         except Exception as e:
             logger.critical(
                 f"加载 {provider_config['type']}({provider_config['id']}) 提供商适配器失败：{e}。未知原因",
                 exc_info=True,
             )
-            return
+            return None
+        finally:
+            timing["import"] = _elapsed_ms(start)
 
         if provider_config["type"] not in provider_cls_map:
             logger.error(
                 f"未找到适用于 {provider_config['type']}({provider_config['id']}) 的提供商适配器，请检查是否已经安装或者名称填写错误。已跳过。",
                 exc_info=True,
             )
-            return
+            return None
 
         provider_metadata = provider_cls_map[provider_config["type"]]
         try:
@@ -563,109 +729,42 @@ class ProviderManager:
             cls_type = provider_metadata.cls_type
             if not cls_type:
                 logger.error(f"无法找到 {provider_metadata.type} 的类")
-                return
+                return None
 
             provider_metadata.id = provider_config["id"]
 
-            match provider_metadata.provider_type:
-                case ProviderType.SPEECH_TO_TEXT:
-                    # STT 任务
-                    if not issubclass(cls_type, STTProvider):
-                        raise TypeError(
-                            f"Provider class {cls_type} is not a subclass of STTProvider"
-                        )
-                    inst = cls_type(provider_config, self.provider_settings)
-
-                    if isinstance(inst, HasInitialize):
-                        await inst.initialize()
-
-                    self.stt_provider_insts.append(inst)
-                    if (
-                        self.provider_stt_settings.get("provider_id")
-                        == provider_config["id"]
-                    ):
-                        self.curr_stt_provider_inst = inst
-                        logger.info(
-                            f"已选择 {provider_config['type']}({provider_config['id']}) 作为当前语音转文本提供商适配器。",
-                        )
-                    if not self.curr_stt_provider_inst:
-                        self.curr_stt_provider_inst = inst
-
-                case ProviderType.TEXT_TO_SPEECH:
-                    # TTS 任务
-                    if not issubclass(cls_type, TTSProvider):
-                        raise TypeError(
-                            f"Provider class {cls_type} is not a subclass of TTSProvider"
-                        )
-                    inst = cls_type(provider_config, self.provider_settings)
-
-                    if isinstance(inst, HasInitialize):
-                        await inst.initialize()
-
-                    self.tts_provider_insts.append(inst)
-                    if (
-                        self.provider_settings.get("provider_id")
-                        == provider_config["id"]
-                    ):
-                        self.curr_tts_provider_inst = inst
-                        logger.info(
-                            f"已选择 {provider_config['type']}({provider_config['id']}) 作为当前文本转语音提供商适配器。",
-                        )
-                    if not self.curr_tts_provider_inst:
-                        self.curr_tts_provider_inst = inst
-
-                case ProviderType.CHAT_COMPLETION:
-                    # 文本生成任务
-                    if not issubclass(cls_type, Provider):
-                        raise TypeError(
-                            f"Provider class {cls_type} is not a subclass of Provider"
-                        )
-                    inst = cls_type(
-                        provider_config,
-                        self.provider_settings,
-                    )
-
-                    if isinstance(inst, HasInitialize):
-                        await inst.initialize()
-
-                    self.provider_insts.append(inst)
-                    if (
-                        self.provider_settings.get("default_provider_id")
-                        == provider_config["id"]
-                    ):
-                        self.curr_provider_inst = inst
-                        logger.info(
-                            f"已选择 {provider_config['type']}({provider_config['id']}) 作为当前提供商适配器。",
-                        )
-                    if not self.curr_provider_inst:
-                        self.curr_provider_inst = inst
-
-                case ProviderType.EMBEDDING:
-                    if not issubclass(cls_type, EmbeddingProvider):
-                        raise TypeError(
-                            f"Provider class {cls_type} is not a subclass of EmbeddingProvider"
-                        )
-                    inst = cls_type(provider_config, self.provider_settings)
-                    if isinstance(inst, HasInitialize):
-                        await inst.initialize()
-                    self.embedding_provider_insts.append(inst)
-                case ProviderType.RERANK:
-                    if not issubclass(cls_type, RerankProvider):
-                        raise TypeError(
-                            f"Provider class {cls_type} is not a subclass of RerankProvider"
-                        )
-                    inst = cls_type(provider_config, self.provider_settings)
-                    if isinstance(inst, HasInitialize):
-                        await inst.initialize()
-                    self.rerank_provider_insts.append(inst)
-                case _:
-                    # 未知供应商抛出异常，确保inst初始化
-                    # Should be unreachable
-                    raise Exception(
-                        f"未知的提供商类型：{provider_metadata.provider_type}"
-                    )
+            base_cls = PROVIDER_BASE_CLASSES.get(provider_metadata.provider_type)
+            if base_cls is None:
+                # 未知供应商抛出异常
+                # Should be unreachable
+                raise Exception(f"未知的提供商类型：{provider_metadata.provider_type}")
+            if not issubclass(cls_type, base_cls):
+                raise TypeError(
+                    f"Provider class {cls_type} is not a subclass of {base_cls.__name__}"
+                )
+            start = time.perf_counter()
+            inst = cls_type(provider_config, self.provider_settings)
+            timing["instantiate"] = _elapsed_ms(start)
+            return inst
+        except Exception as e:
+            logger.error(
+                f"实例化 {provider_config['type']}({provider_config['id']}) 提供商适配器失败：{e}",
+            )
+            raise Exception(
+                f"实例化 {provider_config['type']}({provider_config['id']}) 提供商适配器失败：{e}",
+            )
 
-            self.inst_map[provider_config["id"]] = inst
+    async def _initialize_provider(
+        self,
+        provider_config: dict,
+        inst: Providers,
+        timing: dict,
+    ) -> None:
+        if not isinstance(inst, HasInitialize):
+            return
+        start = time.perf_counter()
+        try:
+            await inst.initialize()
         except Exception as e:
             logger.error(
                 f"实例化 {provider_config['type']}({provider_config['id']}) 提供商适配器失败：{e}",
@@ -673,6 +772,116 @@ class ProviderManager:
             raise Exception(
                 f"实例化 {provider_config['type']}({provider_config['id']}) 提供商适配器失败：{e}",
             )
+        finally:
+            timing["initialize"] = _elapsed_ms(start)
+
+    async def _create_provider_with_timing(
+        self,
+        provider_config: dict,
+    ) -> Providers | None:
+        """实例化并初始化提供商，记录各阶段耗时。provider_config 为合并后的配置"""
+        timing = self._new_timing(provider_config)
+        self.load_timings[provider_config["id"]] = timing
+        try:
+            inst = self._create_provider(provider_config, timing)
+            if inst is not None:
+                await self._initialize_provider(provider_config, inst, timing)
+        except BaseException:
+            timing["status"] = "failed"
+            raise
+        timing["status"] = "loaded" if inst is not None else "failed"
+        return inst
+
+    def _register_provider(self, provider_config: dict, inst: Providers) -> None:
+        """将初始化完成的提供商实例加入对应的列表"""
+        match provider_cls_map[provider_config["type"]].provider_type:
+            case ProviderType.SPEECH_TO_TEXT:
+                assert isinstance(inst, STTProvider)
+                self.stt_provider_insts.append(inst)
+                if (
+                    self.provider_stt_settings.get("provider_id")
+                    == provider_config["id"]
+                ):
+                    self.curr_stt_provider_inst = inst
+                    logger.info(
+                        f"已选择 {provider_config['type']}({provider_config['id']}) 作为当前语音转文本提供商适配器。",
+                    )
+                if not self.curr_stt_provider_inst:
+                    self.curr_stt_provider_inst = inst
+
+            case ProviderType.TEXT_TO_SPEECH:
+                assert isinstance(inst, TTSProvider)
+                self.tts_provider_insts.append(inst)
+                if self.provider_settings.get("provider_id") == provider_config["id"]:
+                    self.curr_tts_provider_inst = inst
+                    logger.info(
+                        f"已选择 {provider_config['type']}({provider_config['id']}) 作为当前文本转语音提供商适配器。",
+                    )
+                if not self.curr_tts_provider_inst:
+                    self.curr_tts_provider_inst = inst
+
+            case ProviderType.CHAT_COMPLETION:
+                assert isinstance(inst, Provider)
+                self.provider_insts.append(inst)
+                if (
+                    self.provider_settings.get("default_provider_id")
+                    == provider_config["id"]
+                ):
+                    self.curr_provider_inst = inst
+                    logger.info(
+                        f"已选择 {provider_config['type']}({provider_config['id']}) 作为当前提供商适配器。",
+                    )
+                if not self.curr_provider_inst:
+                    self.curr_provider_inst = inst
+
+            case ProviderType.EMBEDDING:
+                assert isinstance(inst, EmbeddingProvider)
+                self.embedding_provider_insts.append(inst)
+            case ProviderType.RERANK:
+                assert isinstance(inst, RerankProvider)
+                self.rerank_provider_insts.append(inst)
+
+        self.inst_map[provider_config["id"]] = inst
+
+    def _instantiate_lazy_provider(self, provider_id: str) -> None:
+        """载入懒加载的提供商。需要异步初始化的提供商在后台任务中初始化完成后才会注册"""
+        provider_config = self._lazy_provider_configs.pop(provider_id, None)
+        if provider_config is None:
+            return
+        timing = self._new_timing(provider_config)
+        self.load_timings[provider_id] = timing
+        try:
+            inst = self._create_provider(provider_config, timing)
+        except Exception:
+            inst = None
+        if inst is None:
+            timing["status"] = "failed"
+            return
+        if not isinstance(inst, HasInitialize):
+            self._register_provider(provider_config, inst)
+            timing["status"] = "loaded"
+            return
+
+        async def finish() -> None:
+            try:
+                await self._initialize_provider(provider_config, inst, timing)
+            except Exception:
+                timing["status"] = "failed"
+                return
+            self._register_provider(provider_config, inst)
+            timing["status"] = "loaded"
+
+        task = asyncio.create_task(finish(), name=f"provider_lazy_init_{provider_id}")
+        self._lazy_init_tasks[provider_id] = task
+        task.add_done_callback(lambda _: self._lazy_init_tasks.pop(provider_id, None))
+
+    async def load_provider(self, provider_config: dict) -> None:
+        provider_config = self._prepare_provider_config(provider_config)
+        if provider_config is None:
+            return
+        inst = await self._create_provider_with_timing(provider_config)
+        if inst is not None:
+            self._register_provider(provider_config, inst)
 
     async def reload(self, provider_config: dict) -> None:
         async with self.reload_lock:
@@ -688,6 +897,9 @@ class ProviderManager:
             for key in list(self.inst_map.keys()):
                 if key not in config_ids:
                     await self.terminate_provider(key)
+            for key in list(self._lazy_provider_configs):
+                if key not in config_ids:
+                    await self.terminate_provider(key)
 
             if len(self.provider_insts) == 0:
                 self.curr_provider_inst = None
@@ -721,6 +933,12 @@ class ProviderManager:
         return self.provider_insts
 
     async def terminate_provider(self, provider_id: str) -> None:
+        if self._lazy_provider_configs.pop(provider_id, None):
+            self.load_timings.pop(provider_id, None)
+        task = self._lazy_init_tasks.get(provider_id)
+        if task:
+            # 等待后台初始化完成后再终止
+            await asyncio.shield(task)
         if provider_id in self.inst_map:
             logger.info(
                 f"终止 {provider_id} 提供商适配器({len(self.provider_insts)}, {len(self.stt_provider_insts)}, {len(self.tts_provider_insts)}) ...",
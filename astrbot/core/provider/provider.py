@@ -315,52 +315,81 @@ class EmbeddingProvider(AbstractProvider):
         tasks_limit: int = 3,
         max_retries: int = 3,
         progress_callback=None,
+        batch_callback=None,
     ) -> list[list[float]]:
         """批量获取文本的向量，分批处理以节省内存
 
+        相同的文本只请求一次；返回的向量与输入文本按下标一一对应。
+        遇到限流响应时会降低并发数并拆小批次后重试，请求恢复成功后逐步提高并发数。
+
         Args:
             texts: 文本列表
             batch_size: 每批处理的文本数量
             tasks_limit: 并发任务数量限制
             max_retries: 失败时的最大重试次数
             progress_callback: 进度回调函数，接收参数 (current, total)
+            batch_callback: 每个批次完成后的回调函数，接收参数 (texts, embeddings)，可用于保存进度
 
         Returns:
             向量列表
 
         """
-        semaphore = asyncio.Semaphore(tasks_limit)
-        all_embeddings: list[list[float]] = []
-        failed_batches: list[tuple[int, list[str]]] = []
+        unique_texts = list(dict.fromkeys(texts))
+        positions = {text: idx for idx, text in enumerate(unique_texts)}
+        unique_embeddings: list[list[float] | None] = [None] * len(unique_texts)
+        limiter = _AdaptiveLimiter(tasks_limit)
         completed_count = 0
-        total_count = len(texts)
+        total_count = len(unique_texts)
 
-        async def process_batch(batch_idx: int, batch_texts: list[str]) -> None:
-            nonlocal completed_count
-            async with semaphore:
-                for attempt in range(max_retries):
+        async def embed(batch_texts: list[str], retries: int) -> list[list[float]]:
+            attempt = 0
+            while True:
+                async with limiter:
                     try:
                         batch_embeddings = await self.get_embeddings(batch_texts)
-                        all_embeddings.extend(batch_embeddings)
-                        completed_count += len(batch_texts)
-                        if progress_callback:
-                            await progress_callback(completed_count, total_count)
-                        return
-                    except Exception as e:
-                        if attempt == max_retries - 1:
-                            # 最后一次重试失败，记录失败的批次
-                            failed_batches.append((batch_idx, batch_texts))
-                            raise Exception(
-                                f"批次 {batch_idx} 处理失败，已重试 {max_retries} 次: {e!s}",
+                        if len(batch_embeddings) != len(batch_texts):
+                            raise ValueError(
+                                f"返回的向量数量 ({len(batch_embeddings)}) 与文本数量 ({len(batch_texts)}) 不一致",
                             )
-                        # 等待一段时间后重试，使用指数退避
-                        await asyncio.sleep(2**attempt)
+                        limiter.on_success()
+                        return batch_embeddings
+                    except Exception as e:
+                        error = e
+                        rate_limited = _is_rate_limit_error(e)
+                        if rate_limited:
+                            limiter.on_rate_limited()
+                attempt += 1
+                if attempt >= retries:
+                    raise error
+                # 等待一段时间后重试，使用指数退避
+                await asyncio.sleep(2 ** (attempt - 1))
+                if rate_limited and len(batch_texts) > 1:
+                    # 被限流时拆成两个较小的批次依次请求
+                    mid = len(batch_texts) // 2
+                    left = await embed(batch_texts[:mid], retries - attempt)
+                    right = await embed(batch_texts[mid:], retries - attempt)
+                    return left + right
+
+        async def process_batch(batch_idx: int, start: int, batch_texts: list[str]):
+            nonlocal completed_count
+            try:
+                batch_embeddings = await embed(batch_texts, max_retries)
+            except Exception as e:
+                raise Exception(
+                    f"批次 {batch_idx} 处理失败，已重试 {max_retries} 次: {e!s}",
+                ) from e
+            unique_embeddings[start : start + len(batch_texts)] = batch_embeddings
+            if batch_callback:
+                await batch_callback(batch_texts, batch_embeddings)
+            completed_count += len(batch_texts)
+            if progress_callback:
+                await progress_callback(completed_count, total_count)
 
         tasks = []
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i : i + batch_size]
+        for i in range(0, len(unique_texts), batch_size):
+            batch_texts = unique_texts[i : i + batch_size]
             batch_idx = i // batch_size
-            tasks.append(process_batch(batch_idx, batch_texts))
+            tasks.append(process_batch(batch_idx, i, batch_texts))
 
         # 收集所有任务的结果，包括失败的任务
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -373,7 +402,52 @@ class EmbeddingProvider(AbstractProvider):
             )
             raise Exception(error_msg)
 
-        return all_embeddings
+        return [unique_embeddings[positions[text]] for text in texts]  # type: ignore
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """判断异常是否为服务端的限流响应"""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return any(
+        keyword in message
+        for keyword in ("429", "rate limit", "ratelimit", "too many requests")
+    )
+
+
+class _AdaptiveLimiter:
+    """并发数限制，被限流时减半，连续成功后逐步恢复到上限"""
+
+    def __init__(self, max_limit: int) -> None:
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._active = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def on_rate_limited(self) -> None:
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+
+    def on_success(self) -> None:
+        if self.limit >= self.max_limit:
+            return
+        self._successes += 1
+        if self._successes >= self.limit:
+            self.limit += 1
+            self._successes = 0
 
 
 class RerankProvider(AbstractProvider):
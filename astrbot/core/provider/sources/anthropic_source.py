@@ -14,7 +14,7 @@ from astrbot.api.provider import Provider
 from astrbot.core.agent.message import ContentPart, ImageURLPart, TextPart
 from astrbot.core.provider.entities import LLMResponse, TokenUsage
 from astrbot.core.provider.func_tool_manager import ToolSet
-from astrbot.core.utils.io import download_image_by_url
+from astrbot.core.utils.media_cache import media_cache
 from astrbot.core.utils.network_utils import (
     create_proxy_client,
     is_connection_error,
@@ -558,7 +558,7 @@ class ProviderAnthropic(Provider):
 
         async def resolve_image_url(image_url: str) -> dict | None:
             if image_url.startswith("http"):
-                image_path = await download_image_by_url(image_url)
+                image_path = await media_cache.download(image_url)
                 image_data, mime_type = await self.encode_image_bs64(image_path)
             elif image_url.startswith("file:///"):
                 image_path = image_url.replace("file:///", "")
@@ -637,12 +637,10 @@ class ProviderAnthropic(Provider):
             except Exception:
                 mime_type = "image/jpeg"
             return f"data:{mime_type};base64,{raw_base64}", mime_type
-        with open(image_url, "rb") as f:
-            image_bytes = f.read()
-            mime_type = self._detect_image_mime_type(image_bytes)
-            image_bs64 = base64.b64encode(image_bytes).decode("utf-8")
-            return f"data:{mime_type};base64,{image_bs64}", mime_type
-        return "", "image/jpeg"
+        image_bs64 = media_cache.base64_of(image_url)
+        # magic bytes 位于文件开头, 只需解码前 16 个字符 (12 字节)
+        mime_type = self._detect_image_mime_type(base64.b64decode(image_bs64[:16]))
+        return f"data:{mime_type};base64,{image_bs64}", mime_type
 
     def get_current_key(self) -> str:
         return self.chosen_api_key
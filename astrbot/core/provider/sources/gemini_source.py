@@ -17,7 +17,7 @@ from astrbot.core.agent.message import ContentPart, ImageURLPart, TextPart
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.core.provider.entities import LLMResponse, TokenUsage
 from astrbot.core.provider.func_tool_manager import ToolSet
-from astrbot.core.utils.io import download_image_by_url
+from astrbot.core.utils.media_cache import media_cache
 from astrbot.core.utils.network_utils import is_connection_error, log_connection_failure
 
 from ..register import register_provider_adapter
@@ -860,7 +860,7 @@ class ProviderGoogleGenAI(Provider):
 
         async def resolve_image_part(image_url: str) -> dict | None:
             if image_url.startswith("http"):
-                image_path = await download_image_by_url(image_url)
+                image_path = await media_cache.download(image_url)
                 image_data = await self.encode_image_bs64(image_path)
             elif image_url.startswith("file:///"):
                 image_path = image_url.replace("file:///", "")
@@ -924,9 +924,7 @@ class ProviderGoogleGenAI(Provider):
         """将图片转换为 base64"""
         if image_url.startswith("base64://"):
             return image_url.replace("base64://", "data:image/jpeg;base64,")
-        with open(image_url, "rb") as f:
-            image_bs64 = base64.b64encode(f.read()).decode("utf-8")
-            return "data:image/jpeg;base64," + image_bs64
+        return "data:image/jpeg;base64," + media_cache.base64_of(image_url)
 
     async def terminate(self) -> None:
         if self.client:
@@ -2,9 +2,8 @@ import os
 import urllib.parse
 import uuid
 
-import aiohttp
-
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.http_client import http_client
 
 from ..entities import ProviderType
 from ..provider import TTSProvider
@@ -45,7 +44,7 @@ class ProviderGSVITTS(TTSProvider):
 
         url = f"{self.api_base}/tts?{'&'.join(query_parts)}"
 
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.get(url) as response:
                 if response.status == 200:
                     with open(path, "wb") as f:
@@ -7,6 +7,7 @@ import aiohttp
 
 from astrbot.api import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.http_client import http_client
 
 from ..entities import ProviderType
 from ..provider import TTSProvider
@@ -94,7 +95,7 @@ class ProviderMiniMaxTTSAPI(TTSProvider):
         """进行流式请求"""
         try:
             async with (
-                aiohttp.ClientSession() as session,
+                http_client.session(trust_env=False) as session,
                 session.post(
                     self.concat_base_url,
                     headers=self.headers,
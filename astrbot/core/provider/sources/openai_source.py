@@ -1,5 +1,4 @@
 import asyncio
-import base64
 import inspect
 import json
 import random
@@ -22,7 +21,7 @@ from astrbot.core.agent.message import ContentPart, ImageURLPart, Message, TextP
 from astrbot.core.agent.tool import ToolSet
 from astrbot.core.message.message_event_result import MessageChain
 from astrbot.core.provider.entities import LLMResponse, TokenUsage, ToolCallsResult
-from astrbot.core.utils.io import download_image_by_url
+from astrbot.core.utils.media_cache import media_cache
 from astrbot.core.utils.network_utils import (
     create_proxy_client,
     is_connection_error,
@@ -885,7 +884,7 @@ class ProviderOpenAIOfficial(Provider):
 
         async def resolve_image_part(image_url: str) -> dict | None:
             if image_url.startswith("http"):
-                image_path = await download_image_by_url(image_url)
+                image_path = await media_cache.download(image_url)
                 image_data = await self.encode_image_bs64(image_path)
             elif image_url.startswith("file:///"):
                 image_path = image_url.replace("file:///", "")
@@ -949,9 +948,7 @@ class ProviderOpenAIOfficial(Provider):
         """将图片转换为 base64"""
         if image_url.startswith("base64://"):
             return image_url.replace("base64://", "data:image/jpeg;base64,")
-        with open(image_url, "rb") as f:
-            image_bs64 = base64.b64encode(f.read()).decode("utf-8")
-            return "data:image/jpeg;base64," + image_bs64
+        return "data:image/jpeg;base64," + media_cache.base64_of(image_url)
 
     async def terminate(self):
         if self.client:
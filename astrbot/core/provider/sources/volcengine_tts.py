@@ -5,10 +5,9 @@ import os
 import traceback
 import uuid
 
-import aiohttp
-
 from astrbot import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.http_client import http_client
 
 from ..entities import ProviderType
 from ..provider import TTSProvider
@@ -74,7 +73,7 @@ class ProviderVolcengineTTS(TTSProvider):
 
         try:
             async with (
-                aiohttp.ClientSession() as session,
+                http_client.session(trust_env=False) as session,
                 session.post(
                     self.api_base,
                     data=json.dumps(payload),
@@ -8,6 +8,7 @@ from xinference_client.client.restful.async_restful_client import (
 
 from astrbot.core import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.http_client import http_client
 from astrbot.core.utils.tencent_record_helper import (
     convert_to_pcm_wav,
     tencent_silk_to_wav,
@@ -93,7 +94,7 @@ class ProviderXinferenceSTT(STTProvider):
             if audio_url.startswith("http"):
                 if "multimedia.nt.qq.com.cn" in audio_url:
                     is_tencent = True
-                async with aiohttp.ClientSession() as session:
+                async with http_client.session(trust_env=False) as session:
                     async with session.get(audio_url, timeout=self.timeout) as resp:
                         if resp.status == 200:
                             audio_bytes = await resp.read()
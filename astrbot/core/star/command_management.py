@@ -446,6 +446,8 @@ def _apply_config_to_runtime(
                 descriptor.filter_ref,
                 [str(x) for x in resolved_aliases if str(x).strip()],
             )
+    # 启用状态或指令名可能已变化
+    star_handlers_registry.invalidate()
 
 
 def _bind_configs_to_descriptors(
@@ -319,7 +319,7 @@ class Context:
         Note:
             如果提供者 ID 存在但未找到提供者，会记录警告日志。
         """
-        prov = self.provider_manager.inst_map.get(provider_id)
+        prov = self.provider_manager.get_provider_instance(provider_id)
         if provider_id and not prov:
             logger.warning(
                 f"没有找到 ID 为 {provider_id} 的提供商，这可能是由于您修改了提供商（模型）ID 导致的。"
@@ -328,18 +328,22 @@ class Context:
 
     def get_all_providers(self) -> list[Provider]:
         """获取所有用于文本生成任务的 LLM Provider(Chat_Completion 类型)。"""
+        self.provider_manager.load_lazy_providers(ProviderType.CHAT_COMPLETION)
         return self.provider_manager.provider_insts
 
     def get_all_tts_providers(self) -> list[TTSProvider]:
         """获取所有用于 TTS 任务的 Provider。"""
+        self.provider_manager.load_lazy_providers(ProviderType.TEXT_TO_SPEECH)
         return self.provider_manager.tts_provider_insts
 
     def get_all_stt_providers(self) -> list[STTProvider]:
         """获取所有用于 STT 任务的 Provider。"""
+        self.provider_manager.load_lazy_providers(ProviderType.SPEECH_TO_TEXT)
         return self.provider_manager.stt_provider_insts
 
     def get_all_embedding_providers(self) -> list[EmbeddingProvider]:
         """获取所有用于 Embedding 任务的 Provider。"""
+        self.provider_manager.load_lazy_providers(ProviderType.EMBEDDING)
         return self.provider_manager.embedding_provider_insts
 
     def get_using_provider(self, umo: str | None = None) -> Provider | None:
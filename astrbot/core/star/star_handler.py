@@ -11,10 +11,77 @@ from .star import star_map
 T = TypeVar("T", bound="StarHandlerMetadata")
 
 
+class _CommandTrieNode:
+    __slots__ = ("children", "handler_names")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _CommandTrieNode] = {}
+        self.handler_names: set[str] = set()
+
+
+class CommandPrefixIndex:
+    """指令名前缀树。
+
+    以指令（组）的完整指令名（包括别名）建立字符前缀树，用于根据消息文本快速找出可能匹配的指令 Handler，
+    从而跳过指令名不可能匹配的 Handler，不必逐个执行它们的 CommandFilter / CommandGroupFilter。
+    """
+
+    def __init__(self, handlers: list[StarHandlerMetadata]) -> None:
+        self._root = _CommandTrieNode()
+        self.command_handler_names: set[str] = set()
+        """被索引的指令 Handler。未在其中的 Handler 不受索引约束。"""
+
+        for handler in handlers:
+            names = []
+            for event_filter in handler.event_filters:
+                get_names = getattr(event_filter, "get_complete_command_names", None)
+                if get_names is not None:
+                    names.extend(get_names())
+            # 空指令名可以匹配任意消息，这类 Handler 不参与索引
+            if not names or not all(names):
+                continue
+            self.command_handler_names.add(handler.handler_full_name)
+            for name in names:
+                node = self._root
+                for char in name:
+                    node = node.children.setdefault(char, _CommandTrieNode())
+                node.handler_names.add(handler.handler_full_name)
+
+    def match(self, *message_strs: str) -> set[str]:
+        """返回完整指令名是任一消息文本前缀的指令 Handler 全名"""
+        matched: set[str] = set()
+        for message_str in message_strs:
+            node = self._root
+            for char in message_str:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                matched.update(node.handler_names)
+        return matched
+
+    def may_match(self, handler: StarHandlerMetadata, matched: set[str]) -> bool:
+        """判断 Handler 是否可能通过指令过滤器。matched 为 match() 的返回值。"""
+        name = handler.handler_full_name
+        return name not in self.command_handler_names or name in matched
+
+
 class StarHandlerRegistry(Generic[T]):
     def __init__(self) -> None:
         self.star_handlers_map: dict[str, StarHandlerMetadata] = {}
         self._handlers: list[StarHandlerMetadata] = []
+        # 按事件类型分组的 Handler 以及查询结果缓存，在 Handler 增删、插件启停、指令配置变化时失效
+        self._handlers_by_event_type: dict[EventType, list[StarHandlerMetadata]] = {}
+        self._query_cache: dict[tuple, list[StarHandlerMetadata]] = {}
+        self._command_index: CommandPrefixIndex | None = None
+
+    def invalidate(self) -> None:
+        """使预先计算的 Handler 列表与指令索引失效。
+
+        Handler 的增删会自动调用；插件启用/禁用、Handler 启用状态或指令名变化后需要手动调用。
+        """
+        self._handlers_by_event_type.clear()
+        self._query_cache.clear()
+        self._command_index = None
 
     def append(self, handler: StarHandlerMetadata) -> None:
         """添加一个 Handler，并保持按优先级有序"""
@@ -24,6 +91,7 @@ class StarHandlerRegistry(Generic[T]):
         self.star_handlers_map[handler.handler_full_name] = handler
         self._handlers.append(handler)
         self._handlers.sort(key=lambda h: -h.extras_configs["priority"])
+        self.invalidate()
 
     def _print_handlers(self) -> None:
         for handler in self._handlers:
@@ -137,11 +205,31 @@ class StarHandlerRegistry(Generic[T]):
         only_activated=True,
         plugins_name: list[str] | None = None,
     ) -> list[StarHandlerMetadata]:
+        cache_key = (
+            event_type,
+            bool(only_activated),
+            None if plugins_name is None else tuple(plugins_name),
+        )
+        handlers = self._query_cache.get(cache_key)
+        if handlers is None:
+            handlers = self._filter_handlers(event_type, only_activated, plugins_name)
+            self._query_cache[cache_key] = handlers
+        return list(handlers)
+
+    def _filter_handlers(
+        self,
+        event_type: EventType,
+        only_activated: bool,
+        plugins_name: list[str] | None,
+    ) -> list[StarHandlerMetadata]:
+        if not self._handlers_by_event_type:
+            for handler in self._handlers:
+                self._handlers_by_event_type.setdefault(handler.event_type, []).append(
+                    handler
+                )
+
         handlers = []
-        for handler in self._handlers:
-            # 过滤事件类型
-            if handler.event_type != event_type:
-                continue
+        for handler in self._handlers_by_event_type.get(event_type, []):
             if not handler.enabled:
                 continue
             # 过滤启用状态
@@ -169,6 +257,18 @@ class StarHandlerRegistry(Generic[T]):
             handlers.append(handler)
         return handlers
 
+    def get_command_index(self) -> CommandPrefixIndex:
+        """获取消息事件 Handler 的指令名前缀索引"""
+        if self._command_index is None:
+            self._command_index = CommandPrefixIndex(
+                [
+                    handler
+                    for handler in self._handlers
+                    if handler.event_type == EventType.AdapterMessageEvent
+                ],
+            )
+        return self._command_index
+
     def get_handler_by_full_name(self, full_name: str) -> StarHandlerMetadata | None:
         return self.star_handlers_map.get(full_name, None)
 
@@ -185,10 +285,12 @@ class StarHandlerRegistry(Generic[T]):
     def clear(self) -> None:
         self.star_handlers_map.clear()
         self._handlers.clear()
+        self.invalidate()
 
     def remove(self, handler: StarHandlerMetadata) -> None:
         self.star_handlers_map.pop(handler.handler_full_name, None)
         self._handlers = [h for h in self._handlers if h != handler]
+        self.invalidate()
 
     def __iter__(self):
         return iter(self._handlers)
@@ -7,6 +7,7 @@ import json
 import logging
 import os
 import sys
+import time
 import traceback
 from types import ModuleType
 
@@ -27,6 +28,7 @@ from astrbot.core.utils.astrbot_path import (
 )
 from astrbot.core.utils.io import remove_dir
 from astrbot.core.utils.metrics import Metric
+from astrbot.core.utils.pip_installer import find_missing_requirements
 
 from . import StarMetadata
 from .command_management import sync_command_configs
@@ -48,6 +50,23 @@ class PluginVersionIncompatibleError(Exception):
     """Raised when plugin astrbot_version is incompatible with current AstrBot."""
 
 
+PLUGIN_STARTUP_SEQUENTIAL = "sequential"
+PLUGIN_STARTUP_CONCURRENT = "concurrent"
+
+STARTUP_HOOK_EVENT_TYPES = frozenset(
+    {
+        EventType.OnAstrBotLoadedEvent,
+        EventType.OnPlatformLoadedEvent,
+        EventType.OnPluginLoadedEvent,
+    },
+)
+"""声明了这些事件钩子的插件在启动时不推迟 initialize()"""
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
 class PluginManager:
     def __init__(self, context: Context, config: AstrBotConfig) -> None:
         from .star_tools import StarTools
@@ -77,6 +96,13 @@ class PluginManager:
         """加载失败插件的信息，用于后续可能的热重载"""
 
         self.failed_plugin_info = ""
+
+        self.startup_mode = config.get("plugin_startup_mode", PLUGIN_STARTUP_SEQUENTIAL)
+        """插件启动方式。concurrent 时并发检查依赖，并推迟没有启动钩子的插件的 initialize()"""
+        self.load_timings: dict[str, dict] = {}
+        """最近一次载入插件时各阶段的耗时（毫秒），键为插件目录名"""
+        self._deferred_plugins: list[tuple[StarMetadata, str, bool, dict]] = []
+        """启动时被推迟初始化的插件: (元数据, 插件目录, 是否为保留插件, 耗时记录)"""
         if os.getenv("ASTRBOT_RELOAD", "0") == "1":
             asyncio.create_task(self._watch_plugins_changes())
 
@@ -422,7 +448,7 @@ class PluginManager:
         root_dir_name: str,
         plugin_dir_path: str,
         reserved: bool,
-        error: Exception | str,
+        error: BaseException | str,
         error_trace: str,
     ) -> dict:
         record: dict = {
@@ -503,12 +529,13 @@ class PluginManager:
             else:
                 return False, error
 
-    async def reload(self, specified_plugin_name=None):
+    async def reload(self, specified_plugin_name=None, startup: bool = False):
         """重新加载插件
 
         Args:
             specified_plugin_name (str, optional): 要重载的特定插件名称。
                                                  如果为 None，则重载所有插件。
+            startup (bool): 是否为 AstrBot 启动时的首次载入，见 load()。
 
         Returns:
             tuple: 返回 load() 方法的结果，包含 (success, error_message)
@@ -555,7 +582,7 @@ class PluginManager:
                     if smd.name:
                         await self._unbind_plugin(smd.name, specified_module_path)
 
-            result = await self.load(specified_module_path)
+            result = await self.load(specified_module_path, startup=startup)
 
             return result
 
@@ -564,6 +591,7 @@ class PluginManager:
         specified_module_path=None,
         specified_dir_name=None,
         ignore_version_check: bool = False,
+        startup: bool = False,
     ):
         """载入插件。
         当 specified_module_path 或者 specified_dir_name 不为 None 时，只载入指定的插件。
@@ -571,6 +599,10 @@ class PluginManager:
         Args:
             specified_module_path (str, optional): 指定要加载的插件模块路径。例如: "data.plugins.my_plugin.main"
             specified_dir_name (str, optional): 指定要加载的插件目录名。例如: "my_plugin"
+            startup (bool): 是否为 AstrBot 启动时的首次载入。启动方式为 concurrent 时，
+                先并发检查所有插件的依赖，没有启动钩子的插件的 initialize() 推迟到
+                initialize_deferred_plugins() 中并发执行。插件模块仍按顺序导入，
+                因为导入时注册 handler 的顺序决定了 handler 的执行顺序。
 
         Returns:
             tuple: (success, error_message)
@@ -588,6 +620,19 @@ class PluginManager:
 
         has_load_error = False
 
+        load_all = not specified_module_path and not specified_dir_name
+        concurrent_startup = (
+            startup and load_all and self.startup_mode == PLUGIN_STARTUP_CONCURRENT
+        )
+        if load_all:
+            self.load_timings = {}
+            self._deferred_plugins = []
+        dependency_timings = {}
+        if concurrent_startup:
+            dependency_timings = await self._resolve_plugin_dependencies(
+                plugin_modules,
+            )
+
         # 导入插件模块，并尝试实例化插件类
         for plugin_module in plugin_modules:
             try:
@@ -615,8 +660,20 @@ class PluginManager:
                     continue
 
                 logger.info(f"正在载入插件 {root_dir_name} ...")
+                timing = {
+                    "plugin": root_dir_name,
+                    "dependency": dependency_timings.get(root_dir_name, 0.0),
+                    "import": 0.0,
+                    "config": 0.0,
+                    "instantiate": 0.0,
+                    "initialize": 0.0,
+                    "deferred": False,
+                    "status": "loading",
+                }
+                self.load_timings[root_dir_name] = timing
 
                 # 尝试导入模块
+                stage_start = time.perf_counter()
                 try:
                     module = await self._import_plugin_with_dependency_recovery(
                         path=path,
@@ -625,27 +682,24 @@ class PluginManager:
                         requirements_path=requirements_path,
                     )
                 except Exception as e:
+                    timing["import"] = _elapsed_ms(stage_start)
                     error_trace = traceback.format_exc()
                     logger.error(error_trace)
                     logger.error(f"插件 {root_dir_name} 导入失败。原因：{e!s}")
                     has_load_error = True
-                    self.failed_plugin_dict[root_dir_name] = (
-                        self._build_failed_plugin_record(
-                            root_dir_name=root_dir_name,
-                            plugin_dir_path=plugin_dir_path,
-                            reserved=reserved,
-                            error=e,
-                            error_trace=error_trace,
-                        )
+                    self._record_plugin_load_failure(
+                        root_dir_name=root_dir_name,
+                        plugin_dir_path=plugin_dir_path,
+                        reserved=reserved,
+                        error=e,
+                        error_trace=error_trace,
+                        module_path=path,
                     )
-                    if path in star_map:
-                        logger.info("失败插件依旧在插件列表中，正在清理...")
-                        metadata = star_map.pop(path)
-                        if metadata in star_registry:
-                            star_registry.remove(metadata)
                     continue
+                timing["import"] = _elapsed_ms(stage_start)
 
                 # 检查 _conf_schema.json
+                stage_start = time.perf_counter()
                 plugin_config = None
                 plugin_schema_path = os.path.join(
                     plugin_dir_path,
@@ -662,7 +716,9 @@ class PluginManager:
                             schema=json.loads(f.read()),
                         )
                 logo_path = os.path.join(plugin_dir_path, self.logo_fname)
+                timing["config"] = _elapsed_ms(stage_start)
 
+                stage_start = time.perf_counter()
                 if path in star_map:
                     # 通过 __init__subclass__ 注册插件
                     metadata = star_map[path]
@@ -834,6 +890,7 @@ class PluginManager:
                 # 禁用/启用插件
                 if metadata.module_path in inactivated_plugins:
                     metadata.activated = False
+                    star_handlers_registry.invalidate()
 
                 # Plugin logo path
                 if os.path.exists(logo_path):
@@ -879,23 +936,18 @@ class PluginManager:
                         )
 
                 metadata.star_handler_full_names = full_names
-
-                # 执行 initialize() 方法
-                if hasattr(metadata.star_cls, "initialize") and metadata.star_cls:
-                    await metadata.star_cls.initialize()
-
-                # 触发插件加载事件
-                handlers = star_handlers_registry.get_handlers_by_event_type(
-                    EventType.OnPluginLoadedEvent,
-                )
-                for handler in handlers:
-                    try:
-                        logger.info(
-                            f"hook(on_plugin_loaded) -> {star_map[handler.handler_module_path].name} - {handler.handler_name}",
-                        )
-                        await handler.handler(metadata)
-                    except Exception:
-                        logger.error(traceback.format_exc())
+                timing["instantiate"] = _elapsed_ms(stage_start)
+
+                if concurrent_startup and self._can_defer_initialize(metadata):
+                    # 平台适配器载入后再与其他插件并发初始化
+                    timing["deferred"] = True
+                    timing["status"] = "deferred"
+                    self._deferred_plugins.append(
+                        (metadata, plugin_dir_path, reserved, timing),
+                    )
+                else:
+                    await self._initialize_plugin(metadata, timing)
+                    timing["status"] = "loaded"
 
             except BaseException as e:
                 logger.error(f"----- 插件 {root_dir_name} 载入失败 -----")
@@ -904,21 +956,14 @@ class PluginManager:
                     logger.error(f"| {line}")
                 logger.error("----------------------------------")
                 has_load_error = True
-                self.failed_plugin_dict[root_dir_name] = (
-                    self._build_failed_plugin_record(
-                        root_dir_name=root_dir_name,
-                        plugin_dir_path=plugin_dir_path,
-                        reserved=reserved,
-                        error=e,
-                        error_trace=errors,
-                    )
+                self._record_plugin_load_failure(
+                    root_dir_name=root_dir_name,
+                    plugin_dir_path=plugin_dir_path,
+                    reserved=reserved,
+                    error=e,
+                    error_trace=errors,
+                    module_path=path,
                 )
-                # 记录注册失败的插件名称，以便后续重载插件
-                if path in star_map:
-                    logger.info("失败插件依旧在插件列表中，正在清理...")
-                    metadata = star_map.pop(path)
-                    if metadata in star_registry:
-                        star_registry.remove(metadata)
 
         # 清除 pip.main 导致的多余的 logging handlers
         for handler in logging.root.handlers[:]:
@@ -934,6 +979,167 @@ class PluginManager:
             return False, self.failed_plugin_info
         return True, None
 
+    def _record_plugin_load_failure(
+        self,
+        *,
+        root_dir_name: str,
+        plugin_dir_path: str,
+        reserved: bool,
+        error: BaseException,
+        error_trace: str,
+        module_path: str | None,
+    ) -> None:
+        self.failed_plugin_dict[root_dir_name] = self._build_failed_plugin_record(
+            root_dir_name=root_dir_name,
+            plugin_dir_path=plugin_dir_path,
+            reserved=reserved,
+            error=error,
+            error_trace=error_trace,
+        )
+        if root_dir_name in self.load_timings:
+            self.load_timings[root_dir_name]["status"] = "failed"
+        # 记录注册失败的插件名称，以便后续重载插件
+        if module_path in star_map:
+            logger.info("失败插件依旧在插件列表中，正在清理...")
+            metadata = star_map.pop(module_path)
+            if metadata in star_registry:
+                star_registry.remove(metadata)
+
+    async def _resolve_plugin_dependencies(
+        self,
+        plugin_modules: list[dict],
+    ) -> dict[str, float]:
+        """并发检查插件的依赖是否已安装，并一次性安装所有缺失的依赖
+
+        只预先安装完全没有安装的依赖。已安装但版本不满足要求的依赖通常仍可使用，
+        与串行模式一样在导入插件失败时再安装，避免每次启动都调用 pip。
+
+        Returns:
+            dict[str, float]: 各插件检查依赖的耗时（毫秒），键为插件目录名
+
+        """
+        requirements = {}
+        for plugin_module in plugin_modules:
+            if plugin_module.get("reserved", False):
+                continue
+            requirements_path = os.path.join(
+                self.plugin_store_path,
+                plugin_module["pname"],
+                "requirements.txt",
+            )
+            if os.path.exists(requirements_path):
+                requirements[plugin_module["pname"]] = requirements_path
+
+        async def check(root_dir_name: str, requirements_path: str):
+            start = time.perf_counter()
+            try:
+                missing = await asyncio.to_thread(
+                    find_missing_requirements,
+                    requirements_path,
+                    check_versions=False,
+                )
+            except Exception as e:
+                # 导入插件失败时仍会尝试安装依赖
+                logger.warning(f"检查插件 {root_dir_name} 的依赖失败: {e!s}")
+                missing = []
+            return root_dir_name, missing, _elapsed_ms(start)
+
+        results = await asyncio.gather(
+            *(check(name, path) for name, path in requirements.items()),
+        )
+        timings = {name: elapsed for name, _, elapsed in results}
+        missing = {name: packages for name, packages, _ in results if packages}
+        if not missing:
+            return timings
+
+        packages = list(
+            dict.fromkeys(package for items in missing.values() for package in items),
+        )
+        logger.info(f"插件 {', '.join(missing)} 缺少依赖，正在安装: {packages}")
+        start = time.perf_counter()
+        try:
+            # pip 无法在同一进程中并发运行，合并为一次安装
+            await pip_installer.install(packages=packages)
+        except Exception as e:
+            logger.warning(f"批量安装插件依赖失败，将逐个安装: {e!s}")
+            for root_dir_name in missing:
+                await self._check_plugin_dept_update(target_plugin=root_dir_name)
+        logger.info(f"插件依赖安装完成，耗时 {_elapsed_ms(start)} ms。")
+        return timings
+
+    @staticmethod
+    def _can_defer_initialize(metadata: StarMetadata) -> bool:
+        """插件没有声明启动相关的事件钩子时，initialize() 可以推迟到平台适配器载入之后"""
+        if not metadata.star_cls or not metadata.module_path:
+            return False
+        return not any(
+            handler.event_type in STARTUP_HOOK_EVENT_TYPES
+            for handler in star_handlers_registry.get_handlers_by_module_name(
+                metadata.module_path,
+            )
+        )
+
+    async def _initialize_plugin(self, metadata: StarMetadata, timing: dict) -> None:
+        """执行插件的 initialize() 方法，并触发插件加载事件"""
+        start = time.perf_counter()
+        try:
+            if hasattr(metadata.star_cls, "initialize") and metadata.star_cls:
+                await metadata.star_cls.initialize()
+        finally:
+            timing["initialize"] = _elapsed_ms(start)
+
+        handlers = star_handlers_registry.get_handlers_by_event_type(
+            EventType.OnPluginLoadedEvent,
+        )
+        for handler in handlers:
+            try:
+                logger.info(
+                    f"hook(on_plugin_loaded) -> {star_map[handler.handler_module_path].name} - {handler.handler_name}",
+                )
+                await handler.handler(metadata)
+            except Exception:
+                logger.error(traceback.format_exc())
+
+    async def initialize_deferred_plugins(self) -> None:
+        """并发执行启动时被推迟的插件 initialize()。在平台适配器载入后调用"""
+        async with self._pm_lock:
+            deferred, self._deferred_plugins = self._deferred_plugins, []
+            if not deferred:
+                return
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(
+                    self._initialize_plugin(metadata, timing)
+                    for metadata, _, _, timing in deferred
+                ),
+                return_exceptions=True,
+            )
+            for (metadata, plugin_dir_path, reserved, timing), result in zip(
+                deferred,
+                results,
+            ):
+                if not isinstance(result, BaseException):
+                    timing["status"] = "loaded"
+                    continue
+                root_dir_name = metadata.root_dir_name or timing["plugin"]
+                logger.error(f"----- 插件 {root_dir_name} 初始化失败 -----")
+                errors = "".join(traceback.format_exception(result))
+                for line in errors.split("\n"):
+                    logger.error(f"| {line}")
+                logger.error("----------------------------------")
+                self._record_plugin_load_failure(
+                    root_dir_name=root_dir_name,
+                    plugin_dir_path=plugin_dir_path,
+                    reserved=reserved,
+                    error=result,
+                    error_trace=errors,
+                    module_path=metadata.module_path,
+                )
+            self._rebuild_failed_plugin_info()
+            logger.info(
+                f"已并发初始化 {len(deferred)} 个插件，耗时 {_elapsed_ms(start)} ms。",
+            )
+
     async def _cleanup_failed_plugin_install(
         self,
         dir_name: str,
@@ -1359,6 +1565,7 @@ class PluginManager:
             await sp.global_put("inactivated_llm_tools", inactivated_llm_tools)
 
             plugin.activated = False
+            star_handlers_registry.invalidate()
 
     @staticmethod
     async def _terminate_plugin(star_metadata: StarMetadata) -> None:
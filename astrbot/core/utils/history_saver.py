@@ -1,5 +1,3 @@
-import json
-
 from astrbot import logger
 from astrbot.core.conversation_mgr import ConversationManager
 from astrbot.core.platform.astr_message_event import AstrMessageEvent
@@ -19,7 +17,7 @@ async def persist_agent_history(
 
     history = []
     try:
-        history = json.loads(req.conversation.history or "[]")
+        history = req.conversation.get_history_messages()
     except Exception as exc:  # noqa: BLE001
         logger.warning("Failed to parse conversation history: %s", exc)
     history.append({"role": "user", "content": "Output your last task result below."})
@@ -28,4 +26,5 @@ async def persist_agent_history(
         event.unified_msg_origin,
         req.conversation.cid,
         history=history,
+        conversation=req.conversation,
     )
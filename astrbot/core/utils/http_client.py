@@ -0,0 +1,335 @@
+"""进程级共享的 HTTP 客户端
+
+为每个请求新建 ``aiohttp.ClientSession`` 意味着每次都要重新建立 TCP 连接、完成 TLS 握手并解析域名。
+HTTPClientRegistry 按代理配置维护一组长期存活的会话:
+
+- 相同 (代理, trust_env, 是否校验证书) 的调用方共用一个带 keep-alive 连接池的会话
+- 所有连接池共享同一份 DNS 缓存, 同一域名的并发解析只会发起一次查询
+- 连接数上限、单主机连接数上限、超时时间可以通过配置调整
+- 每个连接池统计请求数、新建/复用的连接数、排队次数等指标, 供 WebUI 查看
+
+会话与创建它的事件循环绑定, 在其他线程的事件循环中调用时会为该循环单独创建连接池。
+"""
+
+import asyncio
+import logging
+import socket
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+
+import aiohttp
+from aiohttp.abc import AbstractResolver, ResolveResult
+from aiohttp.resolver import DefaultResolver
+
+from astrbot.core.utils.http_ssl import build_ssl_context_with_certifi
+
+logger = logging.getLogger("astrbot")
+
+DEFAULT_LIMIT = 100
+"""每个连接池的最大连接数"""
+DEFAULT_LIMIT_PER_HOST = 10
+"""每个连接池对同一主机的最大连接数, 0 表示不限制"""
+DEFAULT_DNS_CACHE_TTL = 300
+"""DNS 缓存有效期 (秒), 0 表示不缓存"""
+DEFAULT_CONNECT_TIMEOUT = 30
+"""建立连接的超时时间 (秒)"""
+DEFAULT_TIMEOUT = 300
+"""单个请求的默认总超时时间 (秒), 调用方可以在请求时覆盖"""
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+"""空闲连接保留的时间 (秒)"""
+
+
+class DNSCache:
+    """在所有连接池之间共享的 DNS 解析结果缓存"""
+
+    def __init__(self, ttl: float = DEFAULT_DNS_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._entries: dict[tuple, tuple[float, list[ResolveResult]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> list[ResolveResult] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return results
+
+    def set(self, key: tuple, results: list[ResolveResult]) -> None:
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self._entries) >= 1024:
+            # 清理过期的记录, 避免长期运行时缓存无限增长
+            for k, (expires_at, _) in list(self._entries.items()):
+                if expires_at <= now:
+                    self._entries.pop(k, None)
+        self._entries[key] = (now + self.ttl, results)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CachingResolver(AbstractResolver):
+    """带共享缓存的域名解析器, 缓存未命中时交给 aiohttp 默认的解析器"""
+
+    def __init__(self, cache: DNSCache) -> None:
+        self.cache = cache
+        self._resolver: AbstractResolver | None = None
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    async def resolve(
+        self,
+        host: str,
+        port: int = 0,
+        family: socket.AddressFamily = socket.AF_INET,
+    ) -> list[ResolveResult]:
+        key = (host, port, family)
+        results = self.cache.get(key)
+        if results is not None:
+            self.cache.hits += 1
+            return results
+        if key in self._inflight:
+            # 同一域名正在解析, 等待已有的查询结果
+            self.cache.hits += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.cache.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self._resolver is None:
+                self._resolver = DefaultResolver()
+            results = await self._resolver.resolve(host, port, family)
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            self.cache.set(key, results)
+            future.set_result(results)
+            return results
+        finally:
+            self._inflight.pop(key, None)
+
+    async def close(self) -> None:
+        if self._resolver is not None:
+            await self._resolver.close()
+            self._resolver = None
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    """已发出的请求数 (重定向的每一跳分别计数)"""
+    in_flight: int = 0
+    """正在进行的请求数"""
+    errors: int = 0
+    """以异常结束的请求数"""
+    connections_created: int = 0
+    """新建的连接数"""
+    connections_reused: int = 0
+    """复用 keep-alive 连接的次数"""
+    queued: int = 0
+    """因达到连接数上限而排队等待连接的次数"""
+
+
+@dataclass
+class _HTTPPool:
+    session: aiohttp.ClientSession
+    resolver: CachingResolver
+    loop: asyncio.AbstractEventLoop
+    stats: PoolStats = field(default_factory=PoolStats)
+
+
+def _build_trace_config(stats: PoolStats) -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_start(session, ctx, params) -> None:
+        stats.requests += 1
+        stats.in_flight += 1
+
+    async def on_request_done(session, ctx, params) -> None:
+        stats.in_flight -= 1
+
+    async def on_request_exception(session, ctx, params) -> None:
+        stats.in_flight -= 1
+        stats.errors += 1
+
+    async def on_connection_create_end(session, ctx, params) -> None:
+        stats.connections_created += 1
+
+    async def on_connection_reuseconn(session, ctx, params) -> None:
+        stats.connections_reused += 1
+
+    async def on_connection_queued_start(session, ctx, params) -> None:
+        stats.queued += 1
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_done)
+    trace_config.on_request_redirect.append(on_request_done)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_connection_queued_start.append(on_connection_queued_start)
+    return trace_config
+
+
+class HTTPClientRegistry:
+    """按代理配置管理共享的 aiohttp 会话"""
+
+    def __init__(self) -> None:
+        self.limit = DEFAULT_LIMIT
+        self.limit_per_host = DEFAULT_LIMIT_PER_HOST
+        self.connect_timeout = DEFAULT_CONNECT_TIMEOUT
+        self.timeout = DEFAULT_TIMEOUT
+        self.keepalive_timeout = DEFAULT_KEEPALIVE_TIMEOUT
+        self.dns_cache = DNSCache()
+        self._pools: dict[tuple, _HTTPPool] = {}
+
+    def configure(
+        self,
+        *,
+        limit: int | None = None,
+        limit_per_host: int | None = None,
+        dns_cache_ttl: float | None = None,
+        connect_timeout: float | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        """更新连接池参数。已经创建的连接池保持原有参数, 新参数对之后创建的连接池生效。"""
+        if limit is not None:
+            self.limit = max(0, int(limit))
+        if limit_per_host is not None:
+            self.limit_per_host = max(0, int(limit_per_host))
+        if dns_cache_ttl is not None:
+            self.dns_cache.ttl = max(0.0, float(dns_cache_ttl))
+            self.dns_cache.clear()
+        if connect_timeout is not None:
+            self.connect_timeout = float(connect_timeout) or None
+        if timeout is not None:
+            self.timeout = float(timeout) or None
+
+    def get_session(
+        self,
+        proxy: str | None = None,
+        *,
+        trust_env: bool = True,
+        verify_ssl: bool = True,
+    ) -> aiohttp.ClientSession:
+        """获取共享的会话。
+
+        返回的会话由 HTTPClientRegistry 统一关闭, 调用方不应关闭它。
+
+        Args:
+            proxy: 会话默认使用的代理地址, 请求时传入的 proxy 参数优先
+            trust_env: 是否读取环境变量中的代理配置 (HTTP_PROXY 等)
+            verify_ssl: 是否校验服务端证书
+        """
+        loop = asyncio.get_running_loop()
+        key = (loop, proxy or None, trust_env, verify_ssl)
+        pool = self._pools.get(key)
+        if pool is None or pool.session.closed:
+            self._prune_closed_loops()
+            pool = self._create_pool(loop, proxy or None, trust_env, verify_ssl)
+            self._pools[key] = pool
+        return pool.session
+
+    @asynccontextmanager
+    async def session(
+        self,
+        proxy: str | None = None,
+        *,
+        trust_env: bool = True,
+        verify_ssl: bool = True,
+    ) -> AsyncIterator[aiohttp.ClientSession]:
+        """以 ``async with`` 的形式获取共享的会话, 退出时不会关闭会话。
+
+        用于替换 ``async with aiohttp.ClientSession() as session:`` 的写法。
+        """
+        yield self.get_session(proxy, trust_env=trust_env, verify_ssl=verify_ssl)
+
+    def _create_pool(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        proxy: str | None,
+        trust_env: bool,
+        verify_ssl: bool,
+    ) -> _HTTPPool:
+        resolver = CachingResolver(self.dns_cache)
+        stats = PoolStats()
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ssl=build_ssl_context_with_certifi() if verify_ssl else False,
+            resolver=resolver,
+            use_dns_cache=False,  # 由 CachingResolver 统一缓存
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            trust_env=trust_env,
+            proxy=proxy,
+            timeout=aiohttp.ClientTimeout(
+                total=self.timeout,
+                sock_connect=self.connect_timeout,
+            ),
+            trace_configs=[_build_trace_config(stats)],
+        )
+        return _HTTPPool(session=session, resolver=resolver, loop=loop, stats=stats)
+
+    def _prune_closed_loops(self) -> None:
+        for key, pool in list(self._pools.items()):
+            if pool.loop.is_closed():
+                self._pools.pop(key, None)
+
+    def stats(self) -> dict:
+        """连接池参数、DNS 缓存与各连接池的使用情况"""
+        self._prune_closed_loops()
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "connect_timeout": self.connect_timeout,
+            "timeout": self.timeout,
+            "dns": self.dns_cache.stats(),
+            "pools": [
+                {
+                    "proxy": proxy,
+                    "trust_env": trust_env,
+                    "verify_ssl": verify_ssl,
+                    "closed": pool.session.closed,
+                    **asdict(pool.stats),
+                }
+                for (_, proxy, trust_env, verify_ssl), pool in self._pools.items()
+            ],
+        }
+
+    async def close(self) -> None:
+        """关闭当前事件循环中的所有连接池"""
+        loop = asyncio.get_running_loop()
+        for key, pool in list(self._pools.items()):
+            if pool.loop is not loop:
+                continue
+            self._pools.pop(key, None)
+            try:
+                await pool.session.close()
+                await pool.resolver.close()
+            except Exception as e:
+                logger.warning(f"关闭 HTTP 连接池失败: {e}")
+        self.dns_cache.clear()
+
+
+http_client = HTTPClientRegistry()
@@ -10,11 +10,11 @@ import zipfile
 from pathlib import Path
 
 import aiohttp
-import certifi
 import psutil
 from PIL import Image
 
 from .astrbot_path import get_astrbot_data_path, get_astrbot_path, get_astrbot_temp_path
+from .http_client import http_client
 
 logger = logging.getLogger("astrbot")
 
@@ -71,14 +71,7 @@ async def download_image_by_url(
 ) -> str:
     """下载图片, 返回 path"""
     try:
-        ssl_context = ssl.create_default_context(
-            cafile=certifi.where(),
-        )  # 使用 certifi 提供的 CA 证书
-        connector = aiohttp.TCPConnector(ssl=ssl_context)  # 使用 certifi 的根证书
-        async with aiohttp.ClientSession(
-            trust_env=True,
-            connector=connector,
-        ) as session:
+        async with http_client.session() as session:
             if post:
                 async with session.post(url, json=post_data) as resp:
                     if not path:
@@ -104,7 +97,7 @@ async def download_image_by_url(
         ssl_context = ssl.create_default_context()
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             if post:
                 async with session.post(url, json=post_data, ssl=ssl_context) as resp:
                     if not path:
@@ -126,14 +119,7 @@ async def download_image_by_url(
 async def download_file(url: str, path: str, show_progress: bool = False) -> None:
     """从指定 url 下载文件到指定路径 path"""
     try:
-        ssl_context = ssl.create_default_context(
-            cafile=certifi.where(),
-        )  # 使用 certifi 提供的 CA 证书
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        async with aiohttp.ClientSession(
-            trust_env=True,
-            connector=connector,
-        ) as session:
+        async with http_client.session() as session:
             async with session.get(url, timeout=1800) as resp:
                 if resp.status != 200:
                     raise Exception(f"下载文件失败: {resp.status}")
@@ -174,7 +160,7 @@ async def download_file(url: str, path: str, show_progress: bool = False) -> Non
         ssl_context = ssl.create_default_context()
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
-        async with aiohttp.ClientSession() as session:
+        async with http_client.session(trust_env=False) as session:
             async with session.get(url, ssl=ssl_context, timeout=120) as resp:
                 total_size = int(resp.headers.get("content-length", 0))
                 downloaded_size = 0
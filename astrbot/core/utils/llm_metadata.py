@@ -1,9 +1,7 @@
 from typing import Literal, TypedDict
 
-import aiohttp
-
 from astrbot.core import logger
-from astrbot.core.utils.http_ssl import build_tls_connector
+from astrbot.core.utils.http_client import http_client
 
 
 class LLMModalities(TypedDict):
@@ -33,9 +31,7 @@ LLM_METADATAS: dict[str, LLMMetadata] = {}
 async def update_llm_metadata() -> None:
     url = "https://models.dev/api.json"
     try:
-        async with aiohttp.ClientSession(
-            trust_env=True, connector=build_tls_connector()
-        ) as session:
+        async with http_client.session() as session:
             async with session.get(url) as response:
                 data = await response.json()
                 global LLM_METADATAS
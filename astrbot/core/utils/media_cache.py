@@ -0,0 +1,330 @@
+"""多媒体文件缓存
+
+同一张图片在多个会话中被转发、或者作为上下文被反复发送给模型时, 每次都会重新下载、解码、编码。
+MediaCache 以内容寻址的方式缓存这些中间结果:
+
+- 缓存键由来源 (URL、base64 数据或文件内容的哈希) 与变换方式 (例如转换为 opus) 共同决定
+- 缓存文件存放在临时目录下的 media_cache 目录中, 总大小超过上限时按最近最少使用的顺序淘汰
+- TempDirCleaner 清理临时目录时也可能删除缓存文件, 每次清理后会同步缓存索引
+- 相同缓存键的并发请求只会执行一次下载或转换
+- 图片的 base64 编码结果额外在内存中缓存, 避免每次请求模型时重新读取和编码
+
+缓存文件只读, 需要交给调用方自由处理 (例如发送后删除) 的文件通过 checkout 获得一个独立的路径。
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from .astrbot_path import get_astrbot_temp_path
+from .io import download_file, download_image_by_url
+
+logger = logging.getLogger("astrbot")
+
+CACHE_DIR_NAME = "media_cache"
+DEFAULT_MAX_SIZE_MB = 256
+"""缓存文件的总大小上限 (MB), 0 表示不缓存"""
+DEFAULT_URL_TTL = 600
+"""URL 下载结果的有效期 (秒), 0 表示不缓存 URL"""
+BASE64_CACHE_MAX_BYTES = 64 * 1024**2
+"""内存中 base64 编码结果的总大小上限 (字节)"""
+HASH_BLOCK_SIZE = 1024 * 1024
+PART_MARKER = ".part"
+
+
+@dataclass
+class _Entry:
+    path: str
+    size: int
+    created_at: float
+
+
+class MediaCache:
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+        url_ttl: float = DEFAULT_URL_TTL,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024**2)
+        self.url_ttl = url_ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        # TempDirCleaner 在工作线程中调用 prune
+        self._lock = threading.Lock()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._base64: OrderedDict[tuple, str] = OrderedDict()
+        self._base64_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir or os.path.join(get_astrbot_temp_path(), CACHE_DIR_NAME)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def configure(
+        self,
+        *,
+        max_size_mb: float | None = None,
+        url_ttl: float | None = None,
+    ) -> None:
+        if max_size_mb is not None:
+            self.max_bytes = max(0, int(float(max_size_mb) * 1024**2))
+            with self._lock:
+                self._evict()
+        if url_ttl is not None:
+            self.url_ttl = max(0.0, float(url_ttl))
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """由来源与变换方式计算缓存键"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def file_key(self, path: str, transform: str) -> str:
+        """以文件内容的哈希计算缓存键, 内容相同的临时文件共用同一份转换结果"""
+        return self.key(transform, await asyncio.to_thread(_file_digest, path))
+
+    async def fetch(
+        self,
+        key: str,
+        suffix: str,
+        producer: Callable[[str], Awaitable[object]],
+        *,
+        ttl: float | None = None,
+    ) -> str:
+        """获取缓存文件的路径, 未命中时调用 producer 生成。
+
+        Args:
+            key: 缓存键
+            suffix: 缓存文件的扩展名, 部分工具 (如 ffmpeg) 依赖扩展名判断输出格式
+            producer: 接收输出路径并将结果写入该路径的协程函数
+            ttl: 缓存的有效期 (秒), None 表示一直有效
+
+        Returns:
+            缓存文件的路径。该文件由缓存管理, 调用方不应修改或删除它。
+        """
+        if not self.enabled:
+            path = _uncached_path(suffix)
+            await producer(path)
+            return path
+
+        name = f"{key}{suffix}"
+        path = self._lookup(name, ttl)
+        if path is not None:
+            self.hits += 1
+            return path
+        if name in self._inflight:
+            self.hits += 1
+            return await asyncio.shield(self._inflight[name])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            path = await self._produce(name, suffix, producer)
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            self._inflight.pop(name, None)
+
+    async def download(self, url: str, suffix: str = ".jpg", image: bool = True) -> str:
+        """下载 URL 并缓存, 返回缓存文件的路径"""
+
+        async def producer(path: str) -> None:
+            if image:
+                await download_image_by_url(url, path=path)
+            else:
+                await download_file(url, path)
+
+        if self.url_ttl <= 0:
+            path = _uncached_path(suffix)
+            await producer(path)
+            return path
+        return await self.fetch(
+            self.key("url", url),
+            suffix,
+            producer,
+            ttl=self.url_ttl,
+        )
+
+    async def checkout(self, path: str, prefix: str) -> str:
+        """为缓存文件创建一个归调用方所有的副本 (优先使用硬链接), 调用方可以随意删除它。
+
+        不在缓存目录中的文件原样返回。
+        """
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.cache_dir):
+            return os.path.abspath(path)
+        suffix = os.path.splitext(path)[1]
+        target = os.path.join(
+            get_astrbot_temp_path(),
+            f"{prefix}_{uuid.uuid4().hex}{suffix}",
+        )
+        try:
+            os.link(path, target)
+        except OSError:
+            await asyncio.to_thread(shutil.copyfile, path, target)
+        return os.path.abspath(target)
+
+    def base64_of(self, path: str) -> str:
+        """读取文件的 base64 编码 (不带 base64:// 前缀), 编码结果按文件的大小与修改时间在内存中缓存"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        data = self._base64.get(key)
+        if data is not None:
+            self._base64.move_to_end(key)
+            return data
+        with open(path, "rb") as f:
+            data = base64.b64encode(f.read()).decode()
+        if len(data) <= BASE64_CACHE_MAX_BYTES // 4:
+            self._base64[key] = data
+            self._base64_bytes += len(data)
+            while self._base64_bytes > BASE64_CACHE_MAX_BYTES:
+                _, evicted = self._base64.popitem(last=False)
+                self._base64_bytes -= len(evicted)
+        return data
+
+    def discard(self, key: str, suffix: str) -> None:
+        """删除一个缓存条目及其文件"""
+        with self._lock:
+            self._load_index()
+            self._drop(f"{key}{suffix}", remove_file=True)
+
+    def prune(self) -> None:
+        """移除已经被外部删除 (例如被 TempDirCleaner 清理) 的缓存记录"""
+        with self._lock:
+            for name, entry in list(self._entries.items()):
+                if not os.path.exists(entry.path):
+                    self._drop(name)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size": self._total_bytes,
+            "max_size": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "base64_entries": len(self._base64),
+        }
+
+    def _lookup(self, name: str, ttl: float | None) -> str | None:
+        with self._lock:
+            self._load_index()
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            expired = ttl is not None and time.time() - entry.created_at > ttl
+            if expired or not os.path.exists(entry.path):
+                self._drop(name, remove_file=expired)
+                return None
+            self._entries.move_to_end(name)
+            return entry.path
+
+    async def _produce(
+        self,
+        name: str,
+        suffix: str,
+        producer: Callable[[str], Awaitable[object]],
+    ) -> str:
+        cache_dir = self.cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        # 先写入临时文件再改名, 避免其他调用方读到写了一半的文件
+        part_path = os.path.join(cache_dir, f"{uuid.uuid4().hex}{PART_MARKER}{suffix}")
+        try:
+            await producer(part_path)
+            size = os.path.getsize(part_path)
+            if size == 0:
+                raise ValueError("生成的缓存文件为空")
+            path = os.path.join(cache_dir, name)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        with self._lock:
+            self._load_index()
+            self._drop(name)
+            self._entries[name] = _Entry(path=path, size=size, created_at=time.time())
+            self._total_bytes += size
+            self._evict(keep=name)
+        return path
+
+    def _load_index(self) -> None:
+        """首次使用时载入上次运行留下的缓存文件"""
+        if self._loaded:
+            return
+        self._loaded = True
+        cache_dir = self.cache_dir
+        if not os.path.isdir(cache_dir):
+            return
+        files = []
+        for entry in os.scandir(cache_dir):
+            if not entry.is_file() or PART_MARKER in entry.name:
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, entry.name, entry.path, stat.st_size))
+        for mtime, name, path, size in sorted(files):
+            self._entries[name] = _Entry(path=path, size=size, created_at=mtime)
+            self._total_bytes += size
+        self._evict()
+
+    def _drop(self, name: str, remove_file: bool = False) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry.size
+        if remove_file:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _evict(self, keep: str | None = None) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            name = next(iter(self._entries))
+            if name == keep:
+                break
+            self._drop(name, remove_file=True)
+
+
+def _uncached_path(suffix: str) -> str:
+    temp_dir = get_astrbot_temp_path()
+    os.makedirs(temp_dir, exist_ok=True)
+    return os.path.join(temp_dir, f"media_{uuid.uuid4().hex}{suffix}")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+media_cache = MediaCache()
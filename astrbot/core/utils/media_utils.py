@@ -6,11 +6,23 @@
 import asyncio
 import os
 import subprocess
-import uuid
-from pathlib import Path
+from collections.abc import Awaitable, Callable
 
 from astrbot import logger
-from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.media_cache import media_cache
+
+
+async def _convert_with_cache(
+    input_path: str,
+    transform: str,
+    suffix: str,
+    prefix: str,
+    convert: Callable[[str], Awaitable[str]],
+) -> str:
+    """通过媒体缓存执行转换, 内容相同的输入只转换一次, 返回归调用方所有的文件路径"""
+    key = await media_cache.file_key(input_path, transform)
+    cached_path = await media_cache.fetch(key, suffix, convert)
+    return await media_cache.checkout(cached_path, prefix)
 
 
 async def get_media_duration(file_path: str) -> int | None:
@@ -75,11 +87,15 @@ async def convert_audio_to_opus(audio_path: str, output_path: str | None = None)
     if audio_path.lower().endswith(".opus"):
         return audio_path
 
-    # 生成输出文件路径
+    # 未指定输出路径时复用相同输入的转换结果
     if output_path is None:
-        temp_dir = get_astrbot_temp_path()
-        os.makedirs(temp_dir, exist_ok=True)
-        output_path = os.path.join(temp_dir, f"media_audio_{uuid.uuid4().hex}.opus")
+        return await _convert_with_cache(
+            audio_path,
+            "opus",
+            ".opus",
+            "media_audio",
+            lambda path: convert_audio_to_opus(audio_path, path),
+        )
 
     try:
         # 使用ffmpeg转换为opus格式
@@ -154,13 +170,14 @@ async def convert_video_format(
     if video_path.lower().endswith(f".{output_format}"):
         return video_path
 
-    # 生成输出文件路径
+    # 未指定输出路径时复用相同输入的转换结果
     if output_path is None:
-        temp_dir = get_astrbot_temp_path()
-        os.makedirs(temp_dir, exist_ok=True)
-        output_path = os.path.join(
-            temp_dir,
-            f"media_video_{uuid.uuid4().hex}.{output_format}",
+        return await _convert_with_cache(
+            video_path,
+            f"video:{output_format}",
+            f".{output_format}",
+            "media_video",
+            lambda path: convert_video_format(video_path, output_format, path),
         )
 
     try:
@@ -230,9 +247,13 @@ async def convert_audio_format(
         return audio_path
 
     if output_path is None:
-        temp_dir = Path(get_astrbot_temp_path())
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(temp_dir / f"media_audio_{uuid.uuid4().hex}.{output_format}")
+        return await _convert_with_cache(
+            audio_path,
+            f"audio:{output_format}",
+            f".{output_format}",
+            "media_audio",
+            lambda path: convert_audio_format(audio_path, output_format, path),
+        )
 
     args = ["ffmpeg", "-y", "-i", audio_path]
     if output_format == "amr":
@@ -286,9 +307,13 @@ async def extract_video_cover(
 ) -> str:
     """从视频中提取封面图（JPG）。"""
     if output_path is None:
-        temp_dir = Path(get_astrbot_temp_path())
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        output_path = str(temp_dir / f"media_cover_{uuid.uuid4().hex}.jpg")
+        return await _convert_with_cache(
+            video_path,
+            "cover",
+            ".jpg",
+            "media_cover",
+            lambda path: extract_video_cover(video_path, path),
+        )
 
     try:
         process = await asyncio.create_subprocess_exec(
@@ -1,16 +1,27 @@
+import asyncio
+import contextlib
 import os
 import socket
 import sys
 import uuid
-
-import aiohttp
+from datetime import datetime
 
 from astrbot.core import db_helper, logger
 from astrbot.core.config import VERSION
+from astrbot.core.utils.http_client import http_client
+
+STATS_FLUSH_INTERVAL = 5.0
+"""平台消息统计在内存中聚合的最长时间（秒）"""
 
 
 class Metric:
     _iid_cache = None
+    _pending_stats: dict[tuple[datetime, str, str], int] = {}
+    """按 (小时, 平台 ID, 平台类型) 聚合、尚未写入数据库的消息数"""
+    _flush_task: asyncio.Task | None = None
+    """等待写入的后台任务, 开始写入后即清空"""
+    _inflight_writes: set[asyncio.Task] = set()
+    """正在写入数据库的任务。写入的统计已从缓冲区取出, 不随调用方一起取消"""
 
     @staticmethod
     def get_installation_id():
@@ -59,19 +70,91 @@ class Metric:
             kwargs["iid"] = Metric.get_installation_id()
         except Exception:
             pass
-        try:
-            if "adapter_name" in kwargs:
-                await db_helper.insert_platform_stats(
-                    platform_id=kwargs["adapter_name"],
-                    platform_type=kwargs.get("adapter_type", "unknown"),
-                )
-        except Exception as e:
-            logger.error(f"保存指标到数据库失败: {e}")
+        if "adapter_name" in kwargs:
+            Metric._record_platform_stat(
+                kwargs["adapter_name"],
+                kwargs.get("adapter_type", "unknown"),
+            )
 
         try:
-            async with aiohttp.ClientSession(trust_env=True) as session:
-                async with session.post(base_url, json=payload, timeout=3) as response:
-                    if response.status != 200:
-                        pass
+            session = http_client.get_session()
+            async with session.post(base_url, json=payload, timeout=3) as response:
+                if response.status != 200:
+                    pass
         except Exception:
             pass
+
+    @staticmethod
+    def _record_platform_stat(platform_id: str, platform_type: str) -> None:
+        """在内存中累加平台消息数，由后台任务定期批量写入数据库"""
+        hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        key = (hour, platform_id, platform_type)
+        Metric._pending_stats[key] = Metric._pending_stats.get(key, 0) + 1
+        Metric._schedule_flush()
+
+    @staticmethod
+    def _schedule_flush() -> None:
+        if Metric._flush_task is None or Metric._flush_task.done():
+            Metric._flush_task = asyncio.create_task(Metric._delayed_flush())
+
+    @staticmethod
+    async def _delayed_flush() -> None:
+        await asyncio.sleep(STATS_FLUSH_INTERVAL)
+        # 写入期间新增的统计或写入失败时, 可以安排下一次写入
+        Metric._flush_task = None
+        await Metric.flush_platform_stats()
+
+    @staticmethod
+    def _requeue(pending: dict[tuple[datetime, str, str], int]) -> None:
+        for key, count in pending.items():
+            Metric._pending_stats[key] = Metric._pending_stats.get(key, 0) + count
+
+    @staticmethod
+    async def flush_platform_stats() -> None:
+        """将内存中聚合的平台统计在一个事务中写入数据库"""
+        if not Metric._pending_stats:
+            return
+        pending, Metric._pending_stats = Metric._pending_stats, {}
+        write = asyncio.create_task(Metric._write_platform_stats(pending))
+        Metric._inflight_writes.add(write)
+        write.add_done_callback(Metric._inflight_writes.discard)
+        await asyncio.shield(write)
+
+    @staticmethod
+    async def _write_platform_stats(
+        pending: dict[tuple[datetime, str, str], int],
+    ) -> None:
+        try:
+            await db_helper.insert_platform_stats_batch(
+                [
+                    (timestamp, platform_id, platform_type, count)
+                    for (
+                        timestamp,
+                        platform_id,
+                        platform_type,
+                    ), count in pending.items()
+                ],
+            )
+        except asyncio.CancelledError:
+            Metric._requeue(pending)
+            raise
+        except Exception as e:
+            logger.error(f"保存指标到数据库失败: {e}")
+            # 写入失败时放回缓冲区，稍后重新写入
+            Metric._requeue(pending)
+            Metric._schedule_flush()
+
+    @staticmethod
+    async def shutdown() -> None:
+        """写入剩余的平台统计"""
+        task = Metric._flush_task
+        Metric._flush_task = None
+        if task and not task.done() and task is not asyncio.current_task():
+            # 还在等待中的任务没有取出任何统计, 可以直接取消
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        # 正在进行的写入不取消, 等待其完成
+        if Metric._inflight_writes:
+            await asyncio.gather(*Metric._inflight_writes, return_exceptions=True)
+        await Metric.flush_platform_stats()
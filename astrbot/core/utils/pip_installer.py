@@ -11,6 +11,8 @@ import sys
 import threading
 from collections import deque
 
+from packaging.requirements import InvalidRequirement, Requirement
+
 from astrbot.core.utils.astrbot_path import get_astrbot_site_packages_path
 from astrbot.core.utils.runtime_env import is_packaged_desktop_runtime
 
@@ -131,6 +133,58 @@ def _extract_requirement_names(requirements_path: str) -> set[str]:
     return names
 
 
+def _get_installed_version(name: str, search_path: list[str] | None) -> str | None:
+    if search_path is None:
+        try:
+            return importlib_metadata.version(name)
+        except importlib_metadata.PackageNotFoundError:
+            return None
+    for distribution in importlib_metadata.distributions(name=name, path=search_path):
+        return distribution.version
+    return None
+
+
+def find_missing_requirements(
+    requirements_path: str,
+    check_versions: bool = True,
+) -> list[str]:
+    """找出依赖文件中尚未安装或版本不满足要求的依赖。
+
+    只读取已安装包的元数据，不导入任何模块，可以在线程中并发执行。
+    无法解析的行（如 URL、VCS 依赖）只检查是否安装了同名的包。
+    check_versions 为 False 时只返回完全没有安装的依赖。
+    """
+    search_path = None
+    if is_packaged_desktop_runtime():
+        search_path = [get_astrbot_site_packages_path(), *sys.path]
+
+    missing = []
+    with open(requirements_path, encoding="utf-8") as requirements_file:
+        lines = requirements_file.readlines()
+    for raw_requirement in lines:
+        line = re.sub(r"(^|\s)#.*$", "", raw_requirement).strip()
+        if not line or line.startswith("-"):
+            continue
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            requirement_name = _extract_requirement_name(raw_requirement)
+            if requirement_name and (
+                _get_installed_version(requirement_name, search_path) is None
+            ):
+                missing.append(line)
+            continue
+        if requirement.marker and not requirement.marker.evaluate():
+            continue
+        version = _get_installed_version(requirement.name, search_path)
+        if version is None or (
+            check_versions
+            and not requirement.specifier.contains(version, prereleases=True)
+        ):
+            missing.append(line)
+    return missing
+
+
 def _extract_top_level_modules(
     distribution: importlib_metadata.Distribution,
 ) -> set[str]:
@@ -540,6 +594,7 @@ class PipInstaller:
         package_name: str | None = None,
         requirements_path: str | None = None,
         mirror: str | None = None,
+        packages: list[str] | None = None,
     ) -> None:
         args = ["install"]
         requested_requirements: set[str] = set()
@@ -551,6 +606,12 @@ class PipInstaller:
         elif requirements_path:
             args.extend(["-r", requirements_path])
             requested_requirements = _extract_requirement_names(requirements_path)
+        elif packages:
+            args.extend(packages)
+            for package in packages:
+                requirement_name = _extract_requirement_name(package)
+                if requirement_name:
+                    requested_requirements.add(requirement_name)
 
         index_url = mirror or self.pypi_index_url or "https://pypi.org/simple"
         args.extend(["--trusted-host", "mirrors.aliyun.com", "-i", index_url])
@@ -1,7 +1,10 @@
 import asyncio
+import atexit
+import copy
+import logging
 import os
 import threading
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from typing import Any, TypeVar, overload
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -13,8 +16,27 @@ from .astrbot_path import get_astrbot_data_path
 
 _VT = TypeVar("_VT")
 
+logger = logging.getLogger("astrbot")
+
+UMO_CACHE_MAX_SCOPES = 4096
+"""umo 范围下最多缓存的会话数量, 超出后按最近最少使用的顺序淘汰"""
+WRITE_BEHIND_DELAY = 0.5
+"""put 的写入在内存中合并的最长时间 (秒)"""
+
+_MISSING = object()
+_NOT_LOADED = object()
+_CLEAR = object()
+"""待写入变更中表示清空整个 scope_id 的标记, 以 key=_CLEAR 的形式存放"""
+
 
 class SharedPreferences:
+    """偏好设置存储。
+
+    读取时按 (scope, scope_id) 整体从数据库载入并缓存在内存中, 之后对该 scope_id 的读取不再访问数据库。
+    put 只更新缓存并在短时间内合并后批量写入, remove / clear 会等待所有变更写入后再返回。
+    所有写入都在专用的后台事件循环中按顺序执行。
+    """
+
     def __init__(self, db_helper: BaseDatabase, json_storage_path=None) -> None:
         if json_storage_path is None:
             json_storage_path = os.path.join(
@@ -26,6 +48,19 @@ class SharedPreferences:
         self.temporary_cache: dict[str, dict[str, Any]] = defaultdict(dict)
         """automatically clear per 24 hours. Might be helpful in some cases XD"""
 
+        self._cache: dict[tuple[str, str], dict[str, Any]] = {}
+        """(scope, scope_id) -> {key: value}, 已载入的 scope_id 的全部偏好设置"""
+        self._umo_cache: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+        """umo 范围的缓存, 会话数量多, 单独按 LRU 限制大小"""
+        self._pending: OrderedDict[tuple[str, str, Any], Any] = OrderedDict()
+        """尚未写入数据库的变更, 值为 _MISSING 表示删除"""
+        self._flushing: list[tuple[tuple[str, str, Any], Any]] = []
+        """正在写入数据库的变更"""
+        self._generation = 0
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._flush_lock: asyncio.Lock | None = None
+
         self._sync_loop = asyncio.new_event_loop()
         t = threading.Thread(target=self._sync_loop.run_forever, daemon=True)
         t.start()
@@ -35,6 +70,8 @@ class SharedPreferences:
             self._clear_temporary_cache, "interval", hours=24, id="clear_sp_temp_cache"
         )
         self._scheduler.start()
+        # 进程退出前写入尚未写入的变更
+        atexit.register(self._flush_at_exit)
 
     def _clear_temporary_cache(self) -> None:
         self.temporary_cache.clear()
@@ -48,12 +85,13 @@ class SharedPreferences:
     ) -> _VT:
         """获取指定范围和键的偏好设置"""
         if scope_id is not None and key is not None:
-            result = await self.db_helper.get_preference(scope, scope_id, key)
-            if result:
-                ret = result.value["val"]
-            else:
-                ret = default
-            return ret
+            ret = self._get_cached(scope, scope_id, key)
+            if ret is _NOT_LOADED:
+                values = await self._load_scope(scope, scope_id)
+                ret = values.get(key, _MISSING)
+            if ret is _MISSING:
+                return default
+            return _copy_value(ret)
 
     async def range_get_async(
         self,
@@ -64,6 +102,8 @@ class SharedPreferences:
         """获取指定范围的偏好设置
         Note: 返回 Preference 列表，其中的 value 属性是一个 dict，value["val"] 为值。scope_id 和 key 可以为 None，这时返回该范围下所有的偏好设置。
         """
+        # 范围查询直接读取数据库, 先写入尚未写入的变更
+        await self.flush()
         ret = await self.db_helper.get_preferences(scope, scope_id, key)
         return ret
 
@@ -133,13 +173,11 @@ class SharedPreferences:
         return await self.get_async("global", "global", key, default)
 
     async def put_async(self, scope: str, scope_id: str, key: str, value: Any) -> None:
-        """设置指定范围和键的偏好设置"""
-        await self.db_helper.insert_preference_or_update(
-            scope,
-            scope_id,
-            key,
-            {"val": value},
-        )
+        """设置指定范围和键的偏好设置
+
+        值先写入缓存, 随后与其他变更合并写入数据库。
+        """
+        self._enqueue(scope, scope_id, key, _copy_value(value))
 
     async def session_put(self, umo: str, key: str, value: Any) -> None:
         await self.put_async("umo", umo, key, value)
@@ -149,7 +187,8 @@ class SharedPreferences:
 
     async def remove_async(self, scope: str, scope_id: str, key: str) -> None:
         """删除指定范围和键的偏好设置"""
-        await self.db_helper.remove_preference(scope, scope_id, key)
+        self._enqueue(scope, scope_id, key, _MISSING)
+        await self.flush()
 
     async def session_remove(self, umo: str, key: str) -> None:
         await self.remove_async("umo", umo, key)
@@ -160,7 +199,154 @@ class SharedPreferences:
 
     async def clear_async(self, scope: str, scope_id: str) -> None:
         """清空指定范围的所有偏好设置"""
-        await self.db_helper.clear_preferences(scope, scope_id)
+        self._enqueue(scope, scope_id, _CLEAR, _MISSING)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """等待所有尚未写入的变更写入数据库"""
+        future = asyncio.run_coroutine_threadsafe(self._flush(), self._sync_loop)
+        await asyncio.wrap_future(future)
+
+    def _flush_at_exit(self) -> None:
+        if not self._pending or not self._sync_loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._flush(), self._sync_loop).result(
+                timeout=10,
+            )
+        except Exception:
+            pass
+
+    def _bucket(self, scope: str, scope_id: str) -> dict[str, Any] | None:
+        scope_key = (scope, scope_id)
+        if scope == "umo":
+            values = self._umo_cache.get(scope_key)
+            if values is not None:
+                self._umo_cache.move_to_end(scope_key)
+            return values
+        return self._cache.get(scope_key)
+
+    def _get_cached(self, scope: str, scope_id: str, key: str) -> Any:
+        with self._lock:
+            values = self._bucket(scope, scope_id)
+            if values is None:
+                return _NOT_LOADED
+            return values.get(key, _MISSING)
+
+    async def _load_scope(self, scope: str, scope_id: str) -> dict[str, Any]:
+        """从数据库载入一个 scope_id 的全部偏好设置并缓存"""
+        for _ in range(3):
+            generation = self._generation
+            prefs = await self.db_helper.get_preferences(scope, scope_id)
+            with self._lock:
+                values = {pref.key: pref.value["val"] for pref in prefs}
+                self._apply_unflushed(scope, scope_id, values)
+                if self._generation == generation:
+                    self._store_bucket(scope, scope_id, values)
+                    return values
+        # 载入期间一直有写入, 本次结果不缓存
+        return values
+
+    def _apply_unflushed(
+        self,
+        scope: str,
+        scope_id: str,
+        values: dict[str, Any],
+    ) -> None:
+        """将尚未写入数据库的变更应用到从数据库读取的结果上"""
+        for (s, sid, key), value in [*self._flushing, *self._pending.items()]:
+            if s != scope or sid != scope_id:
+                continue
+            if key is _CLEAR:
+                values.clear()
+            elif value is _MISSING:
+                values.pop(key, None)
+            else:
+                values[key] = value
+
+    def _store_bucket(
+        self,
+        scope: str,
+        scope_id: str,
+        values: dict[str, Any],
+    ) -> None:
+        if scope == "umo":
+            self._umo_cache[(scope, scope_id)] = values
+            self._umo_cache.move_to_end((scope, scope_id))
+            while len(self._umo_cache) > UMO_CACHE_MAX_SCOPES:
+                self._umo_cache.popitem(last=False)
+        else:
+            self._cache[(scope, scope_id)] = values
+
+    def _enqueue(self, scope: str, scope_id: str, key: Any, value: Any) -> None:
+        with self._lock:
+            self._generation += 1
+            values = self._bucket(scope, scope_id)
+            if key is _CLEAR:
+                if values is not None:
+                    values.clear()
+                # 清空操作之前对同一 scope_id 的变更不再需要写入
+                for change_key in list(self._pending):
+                    if change_key[:2] == (scope, scope_id):
+                        del self._pending[change_key]
+            elif values is not None:
+                if value is _MISSING:
+                    values.pop(key, None)
+                else:
+                    values[key] = value
+            change_key = (scope, scope_id, key)
+            self._pending.pop(change_key, None)
+            self._pending[change_key] = value
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._sync_loop.call_soon_threadsafe(self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        async def delayed_flush() -> None:
+            await asyncio.sleep(WRITE_BEHIND_DELAY)
+            try:
+                await self._flush()
+            except Exception:
+                # 已记录日志, 变更留在队列中等待下一次写入
+                pass
+
+        self._sync_loop.create_task(delayed_flush())
+
+    async def _flush(self) -> None:
+        """在后台事件循环中按顺序写入变更"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            with self._lock:
+                self._flush_scheduled = False
+                if not self._pending:
+                    return
+                self._flushing = list(self._pending.items())
+                self._pending.clear()
+            changes = [
+                (
+                    scope,
+                    scope_id,
+                    None if key is _CLEAR else key,
+                    None if value is _MISSING else {"val": value},
+                )
+                for (scope, scope_id, key), value in self._flushing
+            ]
+            try:
+                await self.db_helper.apply_preference_changes(changes)
+            except Exception as e:
+                logger.error(f"写入偏好设置失败: {e}")
+                with self._lock:
+                    # 放回队列, 等待下一次写入
+                    for change_key, value in reversed(self._flushing):
+                        if change_key not in self._pending:
+                            self._pending[change_key] = value
+                            self._pending.move_to_end(change_key, last=False)
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = []
 
     # ====
     # DEPRECATED METHODS
@@ -181,8 +367,15 @@ class SharedPreferences:
             raise ValueError(
                 "scope_id and key cannot be None when getting a specific preference.",
             )
+        scope = scope or "unknown"
+        scope_id = scope_id or "unknown"
+        result = self._get_cached(scope, scope_id, key)
+        if result is _MISSING:
+            return default
+        if result is not _NOT_LOADED:
+            return _copy_value(result) if result is not None else default
         result = asyncio.run_coroutine_threadsafe(
-            self.get_async(scope or "unknown", scope_id or "unknown", key, default),
+            self.get_async(scope, scope_id, key, default),
             self._sync_loop,
         ).result()
 
@@ -226,3 +419,10 @@ class SharedPreferences:
             self.clear_async(scope or "unknown", scope_id or "unknown"),
             self._sync_loop,
         ).result()
+
+
+def _copy_value(value: Any) -> Any:
+    """复制可变的值, 避免调用方修改缓存中的对象"""
+    if isinstance(value, (dict, list, set)):
+        return copy.deepcopy(value)
+    return value
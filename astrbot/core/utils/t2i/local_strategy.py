@@ -3,7 +3,10 @@ import os
 import aiohttp
 import ssl
 import certifi
+import weakref
+from bisect import bisect_right
 from io import BytesIO
+from itertools import accumulate
 from typing import List, Tuple
 from abc import ABC, abstractmethod
 from astrbot.core.config import VERSION
@@ -13,11 +16,28 @@ from PIL import ImageFont, Image, ImageDraw
 from astrbot.core.utils.io import save_temp_img
 from astrbot.core.utils.astrbot_path import get_astrbot_data_path
 
+DEFAULT_TILE_HEIGHT = 4096
+"""分块渲染时每张图片的最大高度 (像素)"""
+
+STYLED_FONTS = {
+    "bold": [
+        "msyhbd.ttc",  # 微软雅黑粗体 (Windows)
+        "Arial-Bold.ttf",  # Arial粗体
+        "DejaVuSans-Bold.ttf",  # Linux粗体
+    ],
+    "italic": [
+        "msyhi.ttc",  # 微软雅黑斜体 (Windows)
+        "Arial-Italic.ttf",  # Arial斜体
+        "DejaVuSans-Oblique.ttf",  # Linux斜体
+    ],
+}
+
 
 class FontManager:
     """字体管理类，负责加载和缓存字体"""
 
     _font_cache = {}
+    _styled_font_cache = {}
 
     @classmethod
     def get_font(cls, size: int) -> ImageFont.FreeTypeFont|ImageFont.ImageFont:
@@ -55,52 +75,95 @@ class FontManager:
 
         # 如果所有字体都失败，使用默认字体
         try:
-            default_font = ImageFont.load_default()
-            # PIL默认字体大小固定，这里不缓存
+            default_font = ImageFont.load_default(size)
+            cls._font_cache[size] = default_font
             return default_font
         except Exception:
             raise RuntimeError("无法加载任何字体")
 
+    @classmethod
+    def get_styled_font(
+        cls, size: int, style: str
+    ) -> ImageFont.FreeTypeFont | ImageFont.ImageFont | None:
+        """获取粗体、斜体等样式的字体，系统中没有对应字体时返回 None（同样缓存）"""
+        key = (size, style)
+        if key in cls._styled_font_cache:
+            return cls._styled_font_cache[key]
+
+        font = None
+        for font_name in STYLED_FONTS.get(style, []):
+            try:
+                font = ImageFont.truetype(font_name, size)
+                break
+            except Exception:
+                continue
+        cls._styled_font_cache[key] = font
+        return font
+
 
 class TextMeasurer:
-    """测量文本尺寸的工具类"""
+    """测量文本尺寸的工具类
+
+    每个字体的字符宽度（advance）只测量一次并缓存，换行时由累计宽度二分查找每行能放下的字符数。
+    """
+
+    _advance_cache: "weakref.WeakKeyDictionary[object, dict[str, float]]" = (
+        weakref.WeakKeyDictionary()
+    )
 
     @staticmethod
     def get_text_size(text: str, font: ImageFont.FreeTypeFont|ImageFont.ImageFont) -> tuple[int, int]:
         """获取文本的尺寸"""
 
         # 依赖库Pillow>=11.2.1，不再需要考虑<9.0.0
-        left, top, right, bottom = font.getbbox("Hello world")
+        left, top, right, bottom = font.getbbox(text)
         return int(right - left), int(bottom - top)
 
     @staticmethod
+    def get_text_width(text: str, font: ImageFont.FreeTypeFont|ImageFont.ImageFont) -> int:
+        """获取文本绘制时占用的宽度"""
+        return int(font.getlength(text))
+
+    @classmethod
+    def get_advances(
+        cls, text: str, font: ImageFont.FreeTypeFont|ImageFont.ImageFont
+    ) -> list[float]:
+        """获取每个字符的宽度，同一字体下测量过的字符直接从缓存读取"""
+        advances = cls._advance_cache.get(font)
+        if advances is None:
+            advances = {}
+            cls._advance_cache[font] = advances
+        result = []
+        for ch in text:
+            width = advances.get(ch)
+            if width is None:
+                width = font.getlength(ch)
+                advances[ch] = width
+            result.append(width)
+        return result
+
+    @classmethod
     def split_text_to_fit_width(
-        text: str, font: ImageFont.FreeTypeFont|ImageFont.ImageFont, max_width: int
+        cls, text: str, font: ImageFont.FreeTypeFont|ImageFont.ImageFont, max_width: int
     ) -> list[str]:
         """将文本拆分为多行，确保每行不超过指定宽度"""
         lines = []
         if not text:
             return lines
 
-        remaining_text = text
-        while remaining_text:
-            # 如果文本宽度小于最大宽度，直接添加
-            text_width = TextMeasurer.get_text_size(remaining_text, font)[0]
-            if text_width <= max_width:
-                lines.append(remaining_text)
-                break
-
-            # 尝试逐字计算能放入当前行的最多字符
-            for i in range(len(remaining_text), 0, -1):
-                width = TextMeasurer.get_text_size(remaining_text[:i], font)[0]
-                if width <= max_width:
-                    lines.append(remaining_text[:i])
-                    remaining_text = remaining_text[i:]
-                    break
-            else:
-                # 如果单个字符都放不下，强制放一个字符
-                lines.append(remaining_text[0])
-                remaining_text = remaining_text[1:]
+        cumulative = list(accumulate(cls.get_advances(text, font), initial=0.0))
+        start = 0
+        while start < len(text):
+            # 在累计宽度上二分查找当前行能放下的最多字符
+            end = bisect_right(cumulative, cumulative[start] + max_width, lo=start + 1) - 1
+            if end < len(text):
+                # 字符宽度之和不包含字距调整，按整行的实际宽度校正
+                while end > start + 1 and font.getlength(text[start:end]) > max_width:
+                    end -= 1
+            # 如果单个字符都放不下，强制放一个字符
+            end = max(end, start + 1)
+            lines.append(text[start:end])
+            start = end
 
         return lines
 
@@ -110,6 +173,18 @@ class MarkdownElement(ABC):
 
     def __init__(self, content: str):
         self.content = content
+        self._line_cache: dict[tuple[int, int], list[str]] = {}
+
+    def wrap(
+        self, font: ImageFont.FreeTypeFont|ImageFont.ImageFont, max_width: int
+    ) -> list[str]:
+        """对元素内容换行，结果按字体与宽度缓存，计算高度与绘制时共用同一份布局"""
+        key = (id(font), max_width)
+        lines = self._line_cache.get(key)
+        if lines is None:
+            lines = TextMeasurer.split_text_to_fit_width(self.content, font, max_width)
+            self._line_cache[key] = lines
+        return lines
 
     @abstractmethod
     def calculate_height(self, image_width: int, font_size: int) -> int:
@@ -138,9 +213,7 @@ class TextElement(MarkdownElement):
             return 10  # 空行高度
 
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
         return len(lines) * (font_size + 8)
 
     def render(
@@ -156,9 +229,7 @@ class TextElement(MarkdownElement):
             return y + 10  # 空行
 
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
 
         for line in lines:
             draw.text((x, y), line, font=font, fill=(0, 0, 0))
@@ -170,11 +241,14 @@ class TextElement(MarkdownElement):
 class BoldTextElement(MarkdownElement):
     """粗体文本元素"""
 
+    @staticmethod
+    def _get_font(font_size: int):
+        """返回粗体字体，没有粗体字体时返回 None"""
+        return FontManager.get_styled_font(font_size, "bold")
+
     def calculate_height(self, image_width: int, font_size: int) -> int:
-        font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        font = self._get_font(font_size) or FontManager.get_font(font_size)
+        lines = self.wrap(font, image_width - 20)
         return len(lines) * (font_size + 8)
 
     def render(
@@ -187,46 +261,18 @@ class BoldTextElement(MarkdownElement):
         font_size: int,
     ) -> int:
         # 尝试使用粗体字体，如果没有则绘制两次模拟粗体效果
-        try:
-            bold_fonts = [
-                "msyhbd.ttc",  # 微软雅黑粗体 (Windows)
-                "Arial-Bold.ttf",  # Arial粗体
-                "DejaVuSans-Bold.ttf",  # Linux粗体
-            ]
-
-            bold_font = None
-            for font_name in bold_fonts:
-                try:
-                    bold_font = ImageFont.truetype(font_name, font_size)
-                    break
-                except Exception:
-                    continue
-
-            if bold_font:
-                lines = TextMeasurer.split_text_to_fit_width(
-                    self.content, bold_font, image_width - 20
-                )
-                for line in lines:
-                    draw.text((x, y), line, font=bold_font, fill=(0, 0, 0))
-                    y += font_size + 8
-            else:
-                # 如果没有粗体字体，则绘制两次文本轻微偏移以模拟粗体
-                font = FontManager.get_font(font_size)
-                lines = TextMeasurer.split_text_to_fit_width(
-                    self.content, font, image_width - 20
-                )
-                for line in lines:
-                    draw.text((x, y), line, font=font, fill=(0, 0, 0))
-                    draw.text((x + 1, y), line, font=font, fill=(0, 0, 0))
-                    y += font_size + 8
-        except Exception:
-            # 兜底方案：使用普通字体
+        bold_font = self._get_font(font_size)
+        if bold_font:
+            lines = self.wrap(bold_font, image_width - 20)
+            for line in lines:
+                draw.text((x, y), line, font=bold_font, fill=(0, 0, 0))
+                y += font_size + 8
+        else:
             font = FontManager.get_font(font_size)
-            lines = TextMeasurer.split_text_to_fit_width(
-                self.content, font, image_width - 20
-            )
+            lines = self.wrap(font, image_width - 20)
             for line in lines:
                 draw.text((x, y), line, font=font, fill=(0, 0, 0))
+                draw.text((x + 1, y), line, font=font, fill=(0, 0, 0))
                 y += font_size + 8
 
         return y
@@ -235,11 +281,14 @@ class BoldTextElement(MarkdownElement):
 class ItalicTextElement(MarkdownElement):
     """斜体文本元素"""
 
+    @staticmethod
+    def _get_font(font_size: int):
+        """返回斜体字体，没有斜体字体时返回 None"""
+        return FontManager.get_styled_font(font_size, "italic")
+
     def calculate_height(self, image_width: int, font_size: int) -> int:
-        font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        font = self._get_font(font_size) or FontManager.get_font(font_size)
+        lines = self.wrap(font, image_width - 20)
         return len(lines) * (font_size + 8)
 
     def render(
@@ -252,62 +301,35 @@ class ItalicTextElement(MarkdownElement):
         font_size: int,
     ) -> int:
         # 尝试使用斜体字体，如果没有则使用倾斜变换模拟斜体效果
-        try:
-            italic_fonts = [
-                "msyhi.ttc",  # 微软雅黑斜体 (Windows)
-                "Arial-Italic.ttf",  # Arial斜体
-                "DejaVuSans-Oblique.ttf",  # Linux斜体
-            ]
-
-            italic_font = None
-            for font_name in italic_fonts:
-                try:
-                    italic_font = ImageFont.truetype(font_name, font_size)
-                    break
-                except Exception:
-                    continue
+        italic_font = self._get_font(font_size)
+        if italic_font:
+            lines = self.wrap(italic_font, image_width - 20)
+            for line in lines:
+                draw.text((x, y), line, font=italic_font, fill=(0, 0, 0))
+                y += font_size + 8
+            return y
 
-            if italic_font:
-                lines = TextMeasurer.split_text_to_fit_width(
-                    self.content, italic_font, image_width - 20
-                )
-                for line in lines:
-                    draw.text((x, y), line, font=italic_font, fill=(0, 0, 0))
-                    y += font_size + 8
-            else:
-                # 如果没有斜体字体，使用变换
-                font = FontManager.get_font(font_size)
-                lines = TextMeasurer.split_text_to_fit_width(
-                    self.content, font, image_width - 20
-                )
+        font = FontManager.get_font(font_size)
+        lines = self.wrap(font, image_width - 20)
 
-                for line in lines:
-                    # 先创建一个临时图像用于倾斜处理
-                    text_width, text_height = TextMeasurer.get_text_size(line, font)
-                    text_img = Image.new(
-                        "RGBA", (text_width + 20, text_height + 10), (0, 0, 0, 0)
-                    )
-                    text_draw = ImageDraw.Draw(text_img)
-                    text_draw.text((0, 0), line, font=font, fill=(0, 0, 0, 255))
-
-                    # 倾斜变换，使用仿射变换实现斜体效果
-                    # 变换矩阵: [1, 0.2, 0, 0, 1, 0]
-                    italic_img = text_img.transform(
-                        text_img.size, Image.Transform.AFFINE, (1, 0.2, 0, 0, 1, 0), Image.Resampling.BICUBIC
-                    )
-
-                    # 粘贴到原图像
-                    image.paste(italic_img, (x, y), italic_img)
-                    y += font_size + 8
-        except Exception:
-            # 兜底方案：使用普通字体
-            font = FontManager.get_font(font_size)
-            lines = TextMeasurer.split_text_to_fit_width(
-                self.content, font, image_width - 20
+        for line in lines:
+            # 先创建一个临时图像用于倾斜处理
+            text_width = TextMeasurer.get_text_width(line, font)
+            text_img = Image.new(
+                "RGBA", (text_width + 20, font_size + 10), (0, 0, 0, 0)
             )
-            for line in lines:
-                draw.text((x, y), line, font=font, fill=(0, 0, 0))
-                y += font_size + 8
+            text_draw = ImageDraw.Draw(text_img)
+            text_draw.text((0, 0), line, font=font, fill=(0, 0, 0, 255))
+
+            # 倾斜变换，使用仿射变换实现斜体效果
+            # 变换矩阵: [1, 0.2, 0, 0, 1, 0]
+            italic_img = text_img.transform(
+                text_img.size, Image.Transform.AFFINE, (1, 0.2, 0, 0, 1, 0), Image.Resampling.BICUBIC
+            )
+
+            # 粘贴到原图像
+            image.paste(italic_img, (x, y), italic_img)
+            y += font_size + 8
 
         return y
 
@@ -317,9 +339,7 @@ class UnderlineTextElement(MarkdownElement):
 
     def calculate_height(self, image_width: int, font_size: int) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
         return len(lines) * (font_size + 8)
 
     def render(
@@ -332,16 +352,14 @@ class UnderlineTextElement(MarkdownElement):
         font_size: int,
     ) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
 
         for line in lines:
             # 绘制文本
             draw.text((x, y), line, font=font, fill=(0, 0, 0))
 
             # 绘制下划线
-            text_width, _ = TextMeasurer.get_text_size(line, font)
+            text_width = TextMeasurer.get_text_width(line, font)
             underline_y = y + font_size + 2
             draw.line(
                 (x, underline_y, x + text_width, underline_y), fill=(0, 0, 0), width=1
@@ -357,9 +375,7 @@ class StrikethroughTextElement(MarkdownElement):
 
     def calculate_height(self, image_width: int, font_size: int) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
         return len(lines) * (font_size + 8)
 
     def render(
@@ -372,16 +388,14 @@ class StrikethroughTextElement(MarkdownElement):
         font_size: int,
     ) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
 
         for line in lines:
             # 绘制文本
             draw.text((x, y), line, font=font, fill=(0, 0, 0))
 
             # 绘制删除线
-            text_width, _ = TextMeasurer.get_text_size(line, font)
+            text_width = TextMeasurer.get_text_width(line, font)
             strike_y = y + font_size // 2
             draw.line((x, strike_y, x + text_width, strike_y), fill=(0, 0, 0), width=1)
 
@@ -408,9 +422,7 @@ class HeaderElement(MarkdownElement):
     def calculate_height(self, image_width: int, font_size: int) -> int:
         header_font_size = 42 - (self.level - 1) * 4
         font = FontManager.get_font(header_font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 20
-        )
+        lines = self.wrap(font, image_width - 20)
         return len(lines) * header_font_size + 30  # 包含上下间距和分隔线
 
     def render(
@@ -424,12 +436,15 @@ class HeaderElement(MarkdownElement):
     ) -> int:
         header_font_size = 42 - (self.level - 1) * 4
         font = FontManager.get_font(header_font_size)
+        lines = self.wrap(font, image_width - 20) or [""]
 
         y += 10  # 上间距
-        draw.text((x, y), self.content, font=font, fill=(0, 0, 0))
+        for line in lines:
+            draw.text((x, y), line, font=font, fill=(0, 0, 0))
+            y += header_font_size
 
         # 添加分隔线
-        y += header_font_size + 8
+        y += 8
         draw.line((x, y, image_width - 10, y), fill=(230, 230, 230), width=3)
 
         return y + 10  # 返回包含下间距的新y坐标
@@ -444,9 +459,7 @@ class QuoteElement(MarkdownElement):
 
     def calculate_height(self, image_width: int, font_size: int) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 30
-        )  # 左边留出引用线的空间
+        lines = self.wrap(font, image_width - 30)  # 左边留出引用线的空间
         return len(lines) * (font_size + 6) + 12  # 包含上下间距
 
     def render(
@@ -459,9 +472,7 @@ class QuoteElement(MarkdownElement):
         font_size: int,
     ) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 30
-        )
+        lines = self.wrap(font, image_width - 30)
 
         total_height = len(lines) * (font_size + 6)
 
@@ -488,9 +499,7 @@ class ListItemElement(MarkdownElement):
 
     def calculate_height(self, image_width: int, font_size: int) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 30
-        )  # 左边留出项目符号的空间
+        lines = self.wrap(font, image_width - 30)  # 左边留出项目符号的空间
         return len(lines) * (font_size + 6) + 16  # 包含上下间距
 
     def render(
@@ -503,9 +512,7 @@ class ListItemElement(MarkdownElement):
         font_size: int,
     ) -> int:
         font = FontManager.get_font(font_size)
-        lines = TextMeasurer.split_text_to_fit_width(
-            self.content, font, image_width - 30
-        )
+        lines = self.wrap(font, image_width - 30)
 
         y += 8  # 上间距
 
@@ -529,18 +536,27 @@ class CodeBlockElement(MarkdownElement):
     def __init__(self, content: list[str]):
         super().__init__("\n".join(content))
 
+    def wrap(
+        self, font: ImageFont.FreeTypeFont|ImageFont.ImageFont, max_width: int
+    ) -> list[str]:
+        """代码按原有的行分别换行"""
+        key = (id(font), max_width)
+        wrapped_lines = self._line_cache.get(key)
+        if wrapped_lines is None:
+            wrapped_lines = []
+            for line in self.content.split("\n"):
+                wrapped_lines.extend(
+                    TextMeasurer.split_text_to_fit_width(line, font, max_width)
+                )
+            self._line_cache[key] = wrapped_lines
+        return wrapped_lines
+
     def calculate_height(self, image_width: int, font_size: int) -> int:
         if not self.content:
             return 40  # 空代码块的最小高度
 
         font = FontManager.get_font(font_size)
-        lines = self.content.split("\n")
-        wrapped_lines = []
-
-        for line in lines:
-            wrapped = TextMeasurer.split_text_to_fit_width(line, font, image_width - 40)
-            wrapped_lines.extend(wrapped)
-
+        wrapped_lines = self.wrap(font, image_width - 40)
         return len(wrapped_lines) * (font_size + 4) + 40  # 包含内边距和上下间距
 
     def render(
@@ -553,12 +569,7 @@ class CodeBlockElement(MarkdownElement):
         font_size: int,
     ) -> int:
         font = FontManager.get_font(font_size)
-        lines = self.content.split("\n")
-        wrapped_lines = []
-
-        for line in lines:
-            wrapped = TextMeasurer.split_text_to_fit_width(line, font, image_width - 40)
-            wrapped_lines.extend(wrapped)
+        wrapped_lines = self.wrap(font, image_width - 40)
 
         content_height = len(wrapped_lines) * (font_size + 4)
         total_height = content_height + 30  # 包含内边距
@@ -598,7 +609,7 @@ class InlineCodeElement(MarkdownElement):
         font = FontManager.get_font(font_size)
 
         # 计算文本大小
-        text_width, _ = TextMeasurer.get_text_size(self.content, font)
+        text_width = TextMeasurer.get_text_width(self.content, font)
         text_height = font_size
 
         # 绘制背景
@@ -835,7 +846,13 @@ class MarkdownParser:
 
 
 class MarkdownRenderer:
-    """Markdown渲染器，将元素渲染为图像"""
+    """Markdown渲染器，将元素渲染为图像
+
+    先计算每个元素的高度（换行结果缓存在元素中，绘制时直接复用），再按高度把元素分配到各个分块中绘制。
+    """
+
+    MARGIN = 10
+    FOOTER_HEIGHT = 40
 
     def __init__(
         self,
@@ -850,26 +867,76 @@ class MarkdownRenderer:
     async def render(self, markdown_text: str) -> Image.Image:
         # 解析Markdown文本
         elements = await MarkdownParser.parse(markdown_text)
+        return self.render_elements(elements)[0]
 
-        # 计算总高度
-        total_height = 20  # 初始边距
+    async def render_tiles(
+        self, markdown_text: str, max_tile_height: int = DEFAULT_TILE_HEIGHT
+    ) -> list[Image.Image]:
+        """将长文本渲染为多张高度不超过 max_tile_height 的图片（单个元素超高时独占一张）"""
+        elements = await MarkdownParser.parse(markdown_text)
+        return self.render_elements(elements, max_tile_height)
+
+    def render_elements(
+        self, elements: list[MarkdownElement], max_tile_height: int | None = None
+    ) -> list[Image.Image]:
+        """将解析好的元素绘制为图片，不涉及 IO，可以在线程中执行"""
+        tiles = self.layout(elements, max_tile_height)
+        images = []
+        for index, tile in enumerate(tiles):
+            is_last = index == len(tiles) - 1
+            images.append(self._paint_tile(tile, with_footer=is_last))
+        return images
+
+    def layout(
+        self, elements: list[MarkdownElement], max_tile_height: int | None = None
+    ) -> list[list[tuple[MarkdownElement, int]]]:
+        """计算每个元素的高度并分配到各个分块中"""
+        tiles: list[list[tuple[MarkdownElement, int]]] = [[]]
+        used = 0
+        # 每个分块的上下边距，最后一块还需要为页脚留出空间
+        budget = None
+        if max_tile_height:
+            budget = max_tile_height - self.MARGIN * 2
         for element in elements:
-            total_height += element.calculate_height(self.width, self.font_size)
-
-        # 为页脚添加额外空间
-        footer_height = 40
-        total_height += 20 + footer_height  # 结束边距 + 页脚高度
+            height = element.calculate_height(self.width, self.font_size)
+            if budget is not None and tiles[-1] and used + height > budget:
+                tiles.append([])
+                used = 0
+            tiles[-1].append((element, height))
+            used += height
+        if (
+            budget is not None
+            and len(tiles[-1]) > 1
+            and used + self.MARGIN * 2 + self.FOOTER_HEIGHT > budget
+        ):
+            # 页脚放不下时，把最后一个元素移到新的分块中
+            tiles.append([tiles[-1].pop()])
+        return tiles
+
+    def _paint_tile(
+        self, tile: list[tuple[MarkdownElement, int]], with_footer: bool
+    ) -> Image.Image:
+        content_height = sum(height for _, height in tile)
+        total_height = self.MARGIN * 2 + content_height
+        if with_footer:
+            # 为页脚添加额外空间
+            total_height += self.MARGIN * 2 + self.FOOTER_HEIGHT
 
         # 创建图像
         image = Image.new("RGB", (self.width, max(100, total_height)), self.bg_color)
         draw = ImageDraw.Draw(image)
 
-        # 渲染元素
-        y = 10
-        for element in elements:
-            y = element.render(image, draw, 10, y, self.width, self.font_size)
+        # 渲染元素，每个元素从布局计算出的位置开始绘制
+        y = self.MARGIN
+        for element, height in tile:
+            element.render(image, draw, self.MARGIN, y, self.width, self.font_size)
+            y += height
+
+        if with_footer:
+            self._draw_footer(draw, total_height)
+        return image
 
-        # 添加页脚
+    def _draw_footer(self, draw: ImageDraw.ImageDraw, total_height: int) -> None:
         # 克莱因蓝色，近似RGB为(0, 47, 167)
         klein_blue = (0, 47, 167)
         # 灰色
@@ -883,13 +950,13 @@ class MarkdownRenderer:
         powered_by_text = "Powered by "
         astrbot_text = f"AstrBot v{VERSION}"
 
-        powered_by_width, _ = TextMeasurer.get_text_size(powered_by_text, footer_font)
-        astrbot_width, _ = TextMeasurer.get_text_size(astrbot_text, footer_font)
+        powered_by_width = TextMeasurer.get_text_width(powered_by_text, footer_font)
+        astrbot_width = TextMeasurer.get_text_width(astrbot_text, footer_font)
 
         total_width = powered_by_width + astrbot_width
         x_start = (self.width - total_width) // 2
 
-        footer_y = total_height - footer_height
+        footer_y = total_height - self.FOOTER_HEIGHT
 
         # 绘制"Powered by "（灰色）
         draw.text(
@@ -904,8 +971,6 @@ class MarkdownRenderer:
             fill=klein_blue,
         )
 
-        return image
-
 
 class LocalRenderStrategy(RenderStrategy):
     """本地渲染策略实现"""
@@ -924,3 +989,11 @@ class LocalRenderStrategy(RenderStrategy):
 
         # 保存图像并返回路径/URL
         return save_temp_img(image)
+
+    async def render_tiles(
+        self, text: str, max_tile_height: int = DEFAULT_TILE_HEIGHT
+    ) -> list[str]:
+        """将长文本渲染为多张图片，返回各图片的路径"""
+        renderer = MarkdownRenderer(font_size=26, width=800)
+        images = await renderer.render_tiles(text, max_tile_height)
+        return [save_temp_img(image) for image in images]
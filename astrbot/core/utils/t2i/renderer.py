@@ -1,19 +1,92 @@
+"""文本转图片服务
+
+帮助菜单、指令列表这类回复的内容往往完全相同, 每次都重新渲染既浪费时间又会阻塞事件循环。HtmlRenderer 在
+渲染策略之上提供:
+
+- 以 (渲染方式, 渲染端点, 模板内容, 文本) 的哈希为键的渲染结果缓存, 模板或端点变更后不会命中旧的结果。图片文件保存在多媒体缓存中 (受 media_cache_max_size 限制),
+  网络渲染返回的图片 URL 在内存中缓存 t2i_cache_ttl 秒
+- 本地渲染的 Pillow 绘制在有界的线程池中执行, 不会阻塞事件循环
+- 每次渲染的耗时统计, 渲染过慢时输出提示
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
 from astrbot.core.log import LogManager
+from astrbot.core.utils.io import save_temp_img
+from astrbot.core.utils.media_cache import media_cache
 
-from .local_strategy import LocalRenderStrategy
+from .local_strategy import (
+    DEFAULT_TILE_HEIGHT,
+    LocalRenderStrategy,
+    MarkdownParser,
+    MarkdownRenderer,
+)
 from .network_strategy import NetworkRenderStrategy
 
 logger = LogManager.GetLogger(log_name="astrbot")
 
+DEFAULT_RENDER_WORKERS = 2
+"""本地渲染线程池的大小"""
+DEFAULT_URL_CACHE_TTL = 600
+"""网络渲染返回的图片 URL 的缓存有效期 (秒), 0 表示不缓存"""
+URL_CACHE_MAX_ENTRIES = 256
+SLOW_RENDER_SECONDS = 3
+
+
+@dataclass
+class RenderStats:
+    renders: int = 0
+    """实际执行的渲染次数"""
+    cache_hits: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+    def record(self, elapsed: float) -> None:
+        self.renders += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self.last_seconds = elapsed
+
 
 class HtmlRenderer:
     def __init__(self, endpoint_url: str | None = None) -> None:
         self.network_strategy = NetworkRenderStrategy(endpoint_url)
         self.local_strategy = LocalRenderStrategy()
+        self.render_workers = DEFAULT_RENDER_WORKERS
+        self.url_cache_ttl = DEFAULT_URL_CACHE_TTL
+        self._executor: ThreadPoolExecutor | None = None
+        self._url_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._stats = {"local": RenderStats(), "network": RenderStats()}
 
     async def initialize(self) -> None:
         await self.network_strategy.initialize()
 
+    def configure(
+        self,
+        *,
+        render_workers: int | None = None,
+        url_cache_ttl: float | None = None,
+    ) -> None:
+        if render_workers is not None:
+            render_workers = max(1, int(render_workers))
+            if render_workers != self.render_workers and self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.render_workers = render_workers
+        if url_cache_ttl is not None:
+            self.url_cache_ttl = max(0.0, float(url_cache_ttl))
+            if not self.url_cache_ttl:
+                self._url_cache.clear()
+
     async def render_custom_template(
         self,
         tmpl_str: str,
@@ -47,15 +120,190 @@ class HtmlRenderer:
         """使用默认文转图模板。"""
         if use_network:
             try:
-                return await self.network_strategy.render(
-                    text,
-                    return_url=return_url,
-                    template_name=template_name,
+                return await self._render_network(text, return_url, template_name)
+            except BaseException as e:
+                logger.error(
+                    f"Failed to render image via AstrBot API: {e}. Falling back to local rendering.",
                 )
+        return (await self._render_local(text, max_tile_height=None))[0]
+
+    async def render_t2i_images(
+        self,
+        text: str,
+        use_network: bool = True,
+        template_name: str | None = None,
+        max_tile_height: int = DEFAULT_TILE_HEIGHT,
+    ) -> list[str]:
+        """使用默认文转图模板渲染, 返回一张或多张图片的 URL 或文件路径。
+
+        网络渲染返回图片 URL; 本地渲染会把过长的文本分成多张高度不超过 max_tile_height 的图片。
+        """
+        if use_network:
+            try:
+                return [await self._render_network(text, True, template_name)]
             except BaseException as e:
                 logger.error(
                     f"Failed to render image via AstrBot API: {e}. Falling back to local rendering.",
                 )
-                return await self.local_strategy.render(text)
+        return await self._render_local(text, max_tile_height=max_tile_height)
+
+    def stats(self) -> dict:
+        """各渲染方式的耗时与缓存命中统计"""
+        return {
+            "render_workers": self.render_workers,
+            "url_cache_entries": len(self._url_cache),
+            **{
+                name: {
+                    **asdict(stats),
+                    "avg_seconds": stats.total_seconds / stats.renders
+                    if stats.renders
+                    else 0.0,
+                }
+                for name, stats in self._stats.items()
+            },
+        }
+
+    async def _render_network(
+        self,
+        text: str,
+        return_url: bool,
+        template_name: str | None,
+    ) -> str:
+        stats = self._stats["network"]
+        # 模板可以在 WebUI 中修改, 以模板内容而不是模板名计算缓存键
+        template = await self.network_strategy.get_template(template_name or "base")
+        key = media_cache.key(
+            "t2i",
+            "network",
+            self.network_strategy.BASE_RENDER_URL,
+            template,
+            text,
+        )
+
+        if return_url:
+            cached = self._url_cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._url_cache.move_to_end(key)
+                stats.cache_hits += 1
+                return cached[1]
+            url = await self._timed(
+                "network",
+                self.network_strategy.render(
+                    text,
+                    return_url=True,
+                    template_name=template_name,
+                ),
+            )
+            if self.url_cache_ttl > 0:
+                self._url_cache[key] = (time.monotonic() + self.url_cache_ttl, url)
+                self._url_cache.move_to_end(key)
+                while len(self._url_cache) > URL_CACHE_MAX_ENTRIES:
+                    self._url_cache.popitem(last=False)
+            return url
+
+        produced = False
+
+        async def producer(path: str) -> None:
+            nonlocal produced
+            produced = True
+            downloaded = await self._timed(
+                "network",
+                self.network_strategy.render(
+                    text,
+                    return_url=False,
+                    template_name=template_name,
+                ),
+            )
+            shutil.move(downloaded, path)
+
+        path = await media_cache.fetch(key, ".jpg", producer)
+        if not produced:
+            stats.cache_hits += 1
+        return await media_cache.checkout(path, "t2i")
+
+    async def _render_local(
+        self,
+        text: str,
+        max_tile_height: int | None,
+    ) -> list[str]:
+        stats = self._stats["local"]
+        key = media_cache.key("t2i", "local", str(max_tile_height), text)
+        produced = False
+        drawn: list | None = None
+
+        async def producer(manifest_path: str) -> None:
+            nonlocal produced, drawn
+            produced = True
+            images = await self._timed("local", self._draw_local(text, max_tile_height))
+            drawn = images
+            # 每张图片单独存入缓存, 清单文件记录它们的文件名
+            names = []
+            for index, image in enumerate(images):
+                tile_path = await media_cache.fetch(
+                    media_cache.key(key, str(index)),
+                    ".jpg",
+                    lambda path, image=image: self._run_in_pool(
+                        image.save, path, "JPEG"
+                    ),
+                )
+                names.append(os.path.basename(tile_path))
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(names, f)
+
+        if media_cache.enabled:
+            for _ in range(2):
+                manifest = await media_cache.fetch(key, ".json", producer)
+                with open(manifest, encoding="utf-8") as f:
+                    names = json.load(f)
+                paths = [os.path.join(media_cache.cache_dir, name) for name in names]
+                if all(os.path.exists(path) for path in paths):
+                    if not produced:
+                        stats.cache_hits += 1
+                    return [await media_cache.checkout(path, "t2i") for path in paths]
+                media_cache.discard(key, ".json")
+                if produced:
+                    # 刚渲染的图片也没能全部留在缓存中, 说明缓存容量不足, 不再重试
+                    break
+                # 部分图片已被淘汰, 重新渲染
+
+        # 缓存被禁用或容量不足以保存全部图片
+        images = drawn
+        if images is None:
+            images = await self._timed("local", self._draw_local(text, max_tile_height))
+        return [await self._run_in_pool(save_temp_img, image) for image in images]
+
+    async def _draw_local(self, text: str, max_tile_height: int | None) -> list:
+        # 解析时需要下载 Markdown 中的图片, 在事件循环中完成; 排版与绘制交给线程池
+        elements = await MarkdownParser.parse(text)
+        renderer = MarkdownRenderer(font_size=26, width=800)
+        return await self._run_in_pool(
+            renderer.render_elements, elements, max_tile_height
+        )
+
+    async def _run_in_pool(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.render_workers,
+                thread_name_prefix="t2i-render",
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    async def _timed(self, strategy: str, coro):
+        stats = self._stats[strategy]
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except BaseException:
+            stats.errors += 1
+            raise
+        elapsed = time.perf_counter() - start
+        stats.record(elapsed)
+        if elapsed > SLOW_RENDER_SECONDS:
+            logger.warning(
+                f"文本转图片 ({strategy}) 耗时 {elapsed:.2f} 秒，如果觉得很慢可以使用 /t2i 关闭文本转图片模式。",
+            )
         else:
-            return await self.local_strategy.render(text)
+            logger.debug(f"文本转图片 ({strategy}) 耗时 {elapsed:.3f} 秒")
+        return result
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from astrbot import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.media_cache import media_cache
 
 
 def parse_size_to_bytes(value: str | int | float | None) -> int:
@@ -116,6 +117,8 @@ class TempDirCleaner:
                 break
 
         self._cleanup_empty_dirs()
+        # 被删除的文件可能属于媒体缓存, 同步缓存索引
+        media_cache.prune()
 
         logger.warning(
             f"Temp dir exceeded limit ({total_size} > {limit}). "
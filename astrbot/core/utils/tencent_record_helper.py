@@ -1,5 +1,6 @@
 import asyncio
 import base64
+import json
 import os
 import subprocess
 import tempfile
@@ -8,6 +9,7 @@ from io import BytesIO
 
 from astrbot.core import logger
 from astrbot.core.utils.astrbot_path import get_astrbot_temp_path
+from astrbot.core.utils.media_cache import media_cache
 
 
 async def tencent_silk_to_wav(silk_path: str, output_path: str) -> str:
@@ -105,6 +107,8 @@ async def convert_to_pcm_wav(input_path: str, output_path: str) -> str:
 async def audio_to_tencent_silk_base64(audio_path: str) -> tuple[str, float]:
     """将 MP3/WAV 文件转为 Tencent Silk 并返回 base64 编码与时长（秒）。
 
+    相同内容的音频只编码一次, 结果保存在媒体缓存中。
+
     参数:
     - audio_path: 输入音频文件路径（.mp3 或 .wav）
 
@@ -113,10 +117,29 @@ async def audio_to_tencent_silk_base64(audio_path: str) -> tuple[str, float]:
     - duration: 音频时长（秒）
     """
     try:
-        import pilk
+        import pilk  # noqa: F401
     except ImportError as e:
         raise Exception("未安装 pilk: pip install pilk") from e
 
+    key = await media_cache.file_key(audio_path, "tencent_silk")
+    cached_path = await media_cache.fetch(
+        key,
+        ".json",
+        lambda path: _encode_tencent_silk(audio_path, path),
+    )
+    with open(cached_path, encoding="utf-8") as f:
+        result = json.load(f)
+
+    if os.path.splitext(audio_path)[1].lower() != ".wav" and os.path.exists(audio_path):
+        # 删除原文件
+        os.remove(audio_path)
+    return result["silk_b64"], result["duration"]  # 已是秒
+
+
+async def _encode_tencent_silk(audio_path: str, output_path: str) -> None:
+    """将音频编码为 Tencent Silk, 并将 base64 编码与时长以 JSON 格式写入 output_path"""
+    import pilk
+
     temp_dir = get_astrbot_temp_path()
     os.makedirs(temp_dir, exist_ok=True)
 
@@ -131,10 +154,9 @@ async def audio_to_tencent_silk_base64(audio_path: str) -> tuple[str, float]:
 
     if ext != ".wav":
         await convert_to_pcm_wav(audio_path, temp_wav)
-        # 删除原文件
-        os.remove(audio_path)
         wav_path = temp_wav
     else:
+        os.remove(temp_wav)
         wav_path = audio_path
 
     with wave.open(wav_path, "rb") as wav_file:
@@ -160,7 +182,8 @@ async def audio_to_tencent_silk_base64(audio_path: str) -> tuple[str, float]:
             silk_bytes = await asyncio.to_thread(f.read)
             silk_b64 = base64.b64encode(silk_bytes).decode("utf-8")
 
-        return silk_b64, duration  # 已是秒
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"silk_b64": silk_b64, "duration": duration}, f)
     finally:
         if os.path.exists(wav_path) and wav_path != audio_path:
             os.remove(wav_path)
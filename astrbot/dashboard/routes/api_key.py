@@ -1,21 +1,149 @@
+import asyncio
 import hashlib
 import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
 from quart import g, request
 
+from astrbot.core import logger
 from astrbot.core.db import BaseDatabase
 from astrbot.core.utils.datetime_utils import normalize_datetime_utc
 
 from .route import Response, Route, RouteContext
 
 ALL_OPEN_API_SCOPES = ("chat", "config", "file", "im")
+AUTH_CACHE_TTL = 60
+"""已验证的 API Key 在内存中缓存的时间 (秒)"""
+AUTH_CACHE_MAX_ENTRIES = 1024
+TOUCH_FLUSH_INTERVAL = 30
+"""合并写入 last_used_at 的间隔 (秒)"""
+
+
+def hash_api_key(raw_key: str) -> str:
+    """计算 API Key 在数据库中保存的哈希 (PBKDF2, 开销较大)"""
+    return hashlib.pbkdf2_hmac(
+        "sha256",
+        raw_key.encode("utf-8"),
+        b"astrbot_api_key",
+        100_000,
+    ).hex()
+
+
+@dataclass
+class VerifiedApiKey:
+    key_id: str
+    scopes: list[str] | None
+    expires_at: datetime | None
+    verified_at: float
+
+
+class ApiKeyAuthenticator:
+    """Open API 的 API Key 校验
+
+    - 校验通过的 Key 以原始 Key 的 SHA-256 摘要为索引缓存一段时间, 缓存命中时不再计算 PBKDF2、不再查询数据库
+    - 需要计算 PBKDF2 时放到线程中执行, 避免阻塞事件循环
+    - 吊销或删除 Key 时立即使对应的缓存失效
+    - last_used_at 的更新在内存中合并, 定期批量写入数据库
+    """
+
+    def __init__(
+        self,
+        db: BaseDatabase,
+        cache_ttl: float = AUTH_CACHE_TTL,
+        flush_interval: float = TOUCH_FLUSH_INTERVAL,
+    ) -> None:
+        self.db = db
+        self.cache_ttl = cache_ttl
+        self.flush_interval = flush_interval
+        self._cache: OrderedDict[bytes, VerifiedApiKey] = OrderedDict()
+        # 每次失效时递增, 用于丢弃失效之前开始的校验结果
+        self._generation = 0
+        self._last_used: dict[str, datetime] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    async def authenticate(self, raw_key: str) -> VerifiedApiKey | None:
+        """校验 API Key, 无效时返回 None"""
+        digest = hashlib.sha256(raw_key.encode("utf-8")).digest()
+        cached = self._cache.get(digest)
+        now = time.monotonic()
+        if cached is not None:
+            if now - cached.verified_at <= self.cache_ttl and not self._expired(cached):
+                self._cache.move_to_end(digest)
+                self._touch(cached.key_id)
+                return cached
+            self._cache.pop(digest, None)
+
+        generation = self._generation
+        key_hash = await asyncio.to_thread(hash_api_key, raw_key)
+        api_key = await self.db.get_active_api_key_by_hash(key_hash)
+        if not api_key:
+            return None
+
+        verified = VerifiedApiKey(
+            key_id=api_key.key_id,
+            scopes=api_key.scopes if isinstance(api_key.scopes, list) else None,
+            expires_at=normalize_datetime_utc(api_key.expires_at),
+            verified_at=now,
+        )
+        if generation == self._generation:
+            self._cache[digest] = verified
+            while len(self._cache) > AUTH_CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        self._touch(verified.key_id)
+        return verified
+
+    def invalidate(self, key_id: str | None = None) -> None:
+        """使缓存失效, key_id 为 None 时清空全部缓存"""
+        self._generation += 1
+        for digest, cached in list(self._cache.items()):
+            if key_id is None or cached.key_id == key_id:
+                self._cache.pop(digest, None)
+
+    def forget(self, key_id: str) -> None:
+        """Key 被删除后丢弃它尚未写入的使用记录"""
+        self.invalidate(key_id)
+        self._last_used.pop(key_id, None)
+
+    async def flush(self) -> None:
+        """立即写入尚未保存的 last_used_at"""
+        if not self._last_used:
+            return
+        last_used, self._last_used = self._last_used, {}
+        try:
+            await self.db.touch_api_keys(last_used)
+        except Exception:
+            # 写入失败时保留记录, 下次再写入, 较新的使用时间优先
+            for key_id, used_at in last_used.items():
+                self._last_used.setdefault(key_id, used_at)
+            raise
+
+    @staticmethod
+    def _expired(cached: VerifiedApiKey) -> bool:
+        return bool(
+            cached.expires_at and cached.expires_at <= datetime.now(timezone.utc)
+        )
+
+    def _touch(self, key_id: str) -> None:
+        self._last_used[key_id] = datetime.now(timezone.utc)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"更新 API Key 使用时间失败: {e}")
 
 
 class ApiKeyRoute(Route):
     def __init__(self, context: RouteContext, db: BaseDatabase) -> None:
         super().__init__(context)
         self.db = db
+        self.authenticator = ApiKeyAuthenticator(db)
         self.routes = {
             "/apikey/list": ("GET", self.list_api_keys),
             "/apikey/create": ("POST", self.create_api_key),
@@ -37,12 +165,7 @@ class ApiKeyRoute(Route):
 
     @staticmethod
     def _hash_key(raw_key: str) -> str:
-        return hashlib.pbkdf2_hmac(
-            "sha256",
-            raw_key.encode("utf-8"),
-            b"astrbot_api_key",
-            100_000,
-        ).hex()
+        return hash_api_key(raw_key)
 
     @staticmethod
     def _serialize_api_key(key) -> dict:
@@ -103,7 +226,7 @@ class ApiKeyRoute(Route):
             )
 
         raw_key = f"abk_{secrets.token_urlsafe(32)}"
-        key_hash = self._hash_key(raw_key)
+        key_hash = await asyncio.to_thread(self._hash_key, raw_key)
         key_prefix = raw_key[:12]
         created_by = g.get("username", "unknown")
 
@@ -127,6 +250,7 @@ class ApiKeyRoute(Route):
             return Response().error("Missing key: key_id").__dict__
 
         success = await self.db.revoke_api_key(key_id)
+        self.authenticator.invalidate(key_id)
         if not success:
             return Response().error("API key not found").__dict__
         return Response().ok().__dict__
@@ -138,6 +262,7 @@ class ApiKeyRoute(Route):
             return Response().error("Missing key: key_id").__dict__
 
         success = await self.db.delete_api_key(key_id)
+        self.authenticator.forget(key_id)
         if not success:
             return Response().error("API key not found").__dict__
         return Response().ok().__dict__
@@ -371,6 +371,7 @@ class ConfigRoute(Route):
             "/config/provider/check_one": ("GET", self.check_one_provider_status),
             "/config/provider/list": ("GET", self.get_provider_config_list),
             "/config/provider/model_list": ("GET", self.get_provider_model_list),
+            "/config/provider/load_timings": ("GET", self.get_provider_load_timings),
             "/config/provider/get_embedding_dim": ("POST", self.get_embedding_dim),
             "/config/provider_sources/models": (
                 "GET",
@@ -743,7 +744,7 @@ class ConfigRoute(Route):
         logger.info(f"API call: /config/provider/check_one id={provider_id}")
         try:
             prov_mgr = self.core_lifecycle.provider_manager
-            target = prov_mgr.inst_map.get(provider_id)
+            target = await prov_mgr.get_provider_by_id(provider_id)
 
             if not target:
                 logger.warning(
@@ -800,6 +801,26 @@ class ConfigRoute(Route):
                 provider_list.append(provider)
         return Response().ok(provider_list).__dict__
 
+    async def get_provider_load_timings(self):
+        """获取各提供商载入的耗时（毫秒）和状态，按总耗时降序排列"""
+        prov_mgr = self.core_lifecycle.provider_manager
+        timings = []
+        for timing in prov_mgr.load_timings.values():
+            total = timing["import"] + timing["instantiate"] + timing["initialize"]
+            timings.append({**timing, "total": round(total, 1)})
+        timings.sort(key=lambda item: item["total"], reverse=True)
+        return (
+            Response()
+            .ok(
+                {
+                    "lazy_load": prov_mgr.lazy_load,
+                    "init_concurrency": prov_mgr.init_concurrency,
+                    "providers": timings,
+                },
+            )
+            .__dict__
+        )
+
     async def get_provider_model_list(self):
         """获取指定提供商的模型列表"""
         provider_id = request.args.get("provider_id", None)
@@ -807,7 +828,7 @@ class ConfigRoute(Route):
             return Response().error("缺少参数 provider_id").__dict__
 
         prov_mgr = self.core_lifecycle.provider_manager
-        provider = prov_mgr.inst_map.get(provider_id, None)
+        provider = await prov_mgr.get_provider_by_id(provider_id)
         if not provider:
             return Response().error(f"未找到 ID 为 {provider_id} 的提供商").__dict__
         if not isinstance(provider, Provider):
@@ -50,6 +50,7 @@ class ConversationRoute(Route):
             platforms = request.args.get("platforms", "")
             message_types = request.args.get("message_types", "")
             search_query = request.args.get("search", "")
+            cursor = request.args.get("cursor", "") or None
             exclude_ids = request.args.get("exclude_ids", "")
             exclude_platforms = request.args.get("exclude_platforms", "")
 
@@ -70,15 +71,19 @@ class ConversationRoute(Route):
                 (
                     conversations,
                     total_count,
-                ) = await self.conv_mgr.get_filtered_conversations(
+                    next_cursor,
+                ) = await self.conv_mgr.get_filtered_conversation_summaries(
                     page=page,
                     page_size=page_size,
                     platforms=platform_list,
                     message_types=message_type_list,
                     search_query=search_query,
+                    cursor=cursor,
                     exclude_ids=exclude_id_list,
                     exclude_platforms=exclude_platform_list,
                 )
+            except ValueError as e:
+                return Response().error(str(e)).__dict__
             except Exception as e:
                 logger.error(f"数据库查询出错: {e!s}\n{traceback.format_exc()}")
                 return Response().error(f"数据库查询出错: {e!s}").__dict__
@@ -95,6 +100,7 @@ class ConversationRoute(Route):
                     "page_size": page_size,
                     "total": total_count,
                     "total_pages": total_pages,
+                    "next_cursor": next_cursor,
                 },
             }
             return Response().ok(result).__dict__
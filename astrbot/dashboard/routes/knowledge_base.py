@@ -6,7 +6,6 @@ import traceback
 import uuid
 from typing import Any
 
-import aiofiles
 from quart import request
 
 from astrbot.core import logger
@@ -37,6 +36,7 @@ class KnowledgeBaseRoute(Route):
         self.retrieval_manager = None
         self.upload_progress = {}  # 存储上传进度 {task_id: {status, file_index, file_total, stage, current, total}}
         self.upload_tasks = {}  # 存储后台上传任务 {task_id: {"status", "result", "error"}}
+        self.upload_task_handles: dict[str, asyncio.Task] = {}  # 可取消的文件上传任务
 
         # 注册路由
         self.routes = {
@@ -53,6 +53,7 @@ class KnowledgeBaseRoute(Route):
             "/kb/document/import": ("POST", self.import_documents),
             "/kb/document/upload/url": ("POST", self.upload_document_from_url),
             "/kb/document/upload/progress": ("GET", self.get_upload_progress),
+            "/kb/document/upload/cancel": ("POST", self.cancel_upload),
             "/kb/document/get": ("GET", self.get_document),
             "/kb/document/delete": ("POST", self.delete_document),
             # # 块管理
@@ -63,6 +64,7 @@ class KnowledgeBaseRoute(Route):
             # "/kb/media/delete": ("POST", self.delete_media),
             # 检索
             "/kb/retrieve": ("POST", self.retrieve),
+            "/kb/retrieve/cache_stats": ("GET", self.get_retrieval_cache_stats),
         }
         self.register_routes()
 
@@ -116,6 +118,9 @@ class KnowledgeBaseRoute(Route):
 
     def _make_progress_callback(self, task_id: str, file_idx: int, file_name: str):
         async def _callback(stage: str, current: int, total: int) -> None:
+            files = self.upload_progress.get(task_id, {}).get("files")
+            if files:
+                files[file_idx].update(stage=stage, current=current, total=total)
             self._update_progress(
                 task_id,
                 status="processing",
@@ -152,45 +157,73 @@ class KnowledgeBaseRoute(Route):
                 "total": 100,
             }
 
-            uploaded_docs = []
-            failed_docs = []
-
-            for file_idx, file_info in enumerate(files_to_upload):
-                try:
-                    # 更新整体进度
-                    self._update_progress(
-                        task_id,
-                        status="processing",
-                        file_index=file_idx,
-                        file_name=file_info["file_name"],
-                        stage="parsing",
-                        current=0,
-                        total=100,
-                    )
-
-                    # 创建进度回调函数
-                    progress_callback = self._make_progress_callback(
-                        task_id, file_idx, file_info["file_name"]
-                    )
-
-                    doc = await kb_helper.upload_document(
-                        file_name=file_info["file_name"],
-                        file_content=file_info["file_content"],
-                        file_type=file_info["file_type"],
-                        chunk_size=chunk_size,
-                        chunk_overlap=chunk_overlap,
-                        batch_size=batch_size,
-                        tasks_limit=tasks_limit,
-                        max_retries=max_retries,
-                        progress_callback=progress_callback,
-                    )
-
-                    uploaded_docs.append(doc.model_dump())
-                except Exception as e:
-                    logger.error(f"上传文档 {file_info['file_name']} 失败: {e}")
-                    failed_docs.append(
-                        {"file_name": file_info["file_name"], "error": str(e)},
-                    )
+            self.upload_progress[task_id]["files"] = [
+                {
+                    "file_name": file_info["file_name"],
+                    "status": "waiting",
+                    "stage": "waiting",
+                    "current": 0,
+                    "total": 100,
+                }
+                for file_info in files_to_upload
+            ]
+            # 多个文件同时处理, 文档解析在解析进程池中并行执行
+            parser_pool = kb_helper.parser_pool
+            semaphore = asyncio.Semaphore(max(1, parser_pool.max_workers))
+            outcomes: list[tuple[bool, Any]] = [(False, None)] * len(files_to_upload)
+
+            async def upload_one(file_idx: int, file_info: dict) -> None:
+                file_progress = self.upload_progress[task_id]["files"][file_idx]
+                async with semaphore:
+                    try:
+                        file_progress["status"] = "processing"
+                        # 更新整体进度
+                        self._update_progress(
+                            task_id,
+                            status="processing",
+                            file_index=file_idx,
+                            file_name=file_info["file_name"],
+                            stage="parsing",
+                            current=0,
+                            total=100,
+                        )
+
+                        # 创建进度回调函数
+                        progress_callback = self._make_progress_callback(
+                            task_id, file_idx, file_info["file_name"]
+                        )
+
+                        doc = await kb_helper.upload_document(
+                            file_name=file_info["file_name"],
+                            file_content=file_info.get("file_content"),
+                            file_path=file_info.get("file_path"),
+                            file_type=file_info["file_type"],
+                            chunk_size=chunk_size,
+                            chunk_overlap=chunk_overlap,
+                            batch_size=batch_size,
+                            tasks_limit=tasks_limit,
+                            max_retries=max_retries,
+                            progress_callback=progress_callback,
+                        )
+
+                        file_progress["status"] = "completed"
+                        outcomes[file_idx] = (True, doc.model_dump())
+                    except Exception as e:
+                        logger.error(f"上传文档 {file_info['file_name']} 失败: {e}")
+                        file_progress["status"] = "failed"
+                        outcomes[file_idx] = (
+                            False,
+                            {"file_name": file_info["file_name"], "error": str(e)},
+                        )
+
+            await asyncio.gather(
+                *(
+                    upload_one(file_idx, file_info)
+                    for file_idx, file_info in enumerate(files_to_upload)
+                ),
+            )
+            uploaded_docs = [value for ok, value in outcomes if ok]
+            failed_docs = [value for ok, value in outcomes if not ok]
 
             # 更新任务完成状态
             result = {
@@ -204,10 +237,24 @@ class KnowledgeBaseRoute(Route):
 
             self._set_task_result(task_id, "completed", result=result)
 
+        except asyncio.CancelledError:
+            logger.info(f"后台上传任务 {task_id} 已取消")
+            self._set_task_result(task_id, "cancelled")
         except Exception as e:
             logger.error(f"后台上传任务 {task_id} 失败: {e}")
             logger.error(traceback.format_exc())
             self._set_task_result(task_id, "failed", error=str(e))
+        finally:
+            self.upload_task_handles.pop(task_id, None)
+            self._remove_temp_files(files_to_upload)
+
+    @staticmethod
+    def _remove_temp_files(files_to_upload: list) -> None:
+        """清理上传时保存的临时文件"""
+        for file_info in files_to_upload:
+            temp_file_path = file_info.get("file_path")
+            if temp_file_path and os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
 
     async def _background_import_task(
         self,
@@ -342,6 +389,9 @@ class KnowledgeBaseRoute(Route):
         - top_k_dense: 密集检索数量 (可选, 默认50)
         - top_k_sparse: 稀疏检索数量 (可选, 默认50)
         - top_m_final: 最终返回数量 (可选, 默认5)
+        - index_type: 向量索引类型 flat/ivf_flat/ivf_pq/hnsw (可选, 默认 flat)
+        - index_nprobe: IVF 索引检索时探查的聚类数量 (可选, 默认16)
+        - index_ef_search: HNSW 索引检索时的候选队列长度 (可选, 默认64)
         """
         try:
             kb_manager = self._get_kb_manager()
@@ -359,6 +409,9 @@ class KnowledgeBaseRoute(Route):
             top_k_dense = data.get("top_k_dense")
             top_k_sparse = data.get("top_k_sparse")
             top_m_final = data.get("top_m_final")
+            index_type = data.get("index_type")
+            index_nprobe = data.get("index_nprobe")
+            index_ef_search = data.get("index_ef_search")
 
             # pre-check embedding dim
             if not embedding_provider_id:
@@ -413,6 +466,9 @@ class KnowledgeBaseRoute(Route):
                 top_k_dense=top_k_dense,
                 top_k_sparse=top_k_sparse,
                 top_m_final=top_m_final,
+                index_type=index_type,
+                index_nprobe=index_nprobe,
+                index_ef_search=index_ef_search,
             )
             kb = kb_helper.kb
 
@@ -466,6 +522,9 @@ class KnowledgeBaseRoute(Route):
         - top_k_dense: 密集检索数量 (可选)
         - top_k_sparse: 稀疏检索数量 (可选)
         - top_m_final: 最终返回数量 (可选)
+        - index_type: 向量索引类型 flat/ivf_flat/ivf_pq/hnsw (可选)
+        - index_nprobe: IVF 索引检索时探查的聚类数量 (可选)
+        - index_ef_search: HNSW 索引检索时的候选队列长度 (可选)
         """
         try:
             kb_manager = self._get_kb_manager()
@@ -485,6 +544,9 @@ class KnowledgeBaseRoute(Route):
             top_k_dense = data.get("top_k_dense")
             top_k_sparse = data.get("top_k_sparse")
             top_m_final = data.get("top_m_final")
+            index_type = data.get("index_type")
+            index_nprobe = data.get("index_nprobe")
+            index_ef_search = data.get("index_ef_search")
 
             # 检查是否至少提供了一个更新字段
             if all(
@@ -500,6 +562,9 @@ class KnowledgeBaseRoute(Route):
                     top_k_dense,
                     top_k_sparse,
                     top_m_final,
+                    index_type,
+                    index_nprobe,
+                    index_ef_search,
                 ]
             ):
                 return Response().error("至少需要提供一个更新字段").__dict__
@@ -516,6 +581,9 @@ class KnowledgeBaseRoute(Route):
                 top_k_dense=top_k_dense,
                 top_k_sparse=top_k_sparse,
                 top_m_final=top_m_final,
+                index_type=index_type,
+                index_nprobe=index_nprobe,
+                index_ef_search=index_ef_search,
             )
 
             if not kb_helper:
@@ -655,6 +723,7 @@ class KnowledgeBaseRoute(Route):
         返回:
         - task_id: 任务ID，用于查询上传进度和结果
         """
+        files_to_upload = []  # 存储待上传的文件信息列表
         try:
             kb_manager = self._get_kb_manager()
 
@@ -666,7 +735,6 @@ class KnowledgeBaseRoute(Route):
             batch_size = 32
             tasks_limit = 3
             max_retries = 3
-            files_to_upload = []  # 存储待上传的文件信息列表
 
             if content_type and "multipart/form-data" not in content_type:
                 return (
@@ -710,31 +778,24 @@ class KnowledgeBaseRoute(Route):
                 )
                 await file.save(temp_file_path)
 
-                try:
-                    # 异步读取文件内容
-                    async with aiofiles.open(temp_file_path, "rb") as f:
-                        file_content = await f.read()
-
-                    # 提取文件类型
-                    file_type = (
-                        file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
-                    )
+                # 提取文件类型
+                file_type = (
+                    file_name.rsplit(".", 1)[-1].lower() if "." in file_name else ""
+                )
 
-                    files_to_upload.append(
-                        {
-                            "file_name": file_name,
-                            "file_content": file_content,
-                            "file_type": file_type,
-                        },
-                    )
-                finally:
-                    # 清理临时文件
-                    if os.path.exists(temp_file_path):
-                        os.remove(temp_file_path)
+                # 临时文件由后台任务流式读取, 处理完成后删除
+                files_to_upload.append(
+                    {
+                        "file_name": file_name,
+                        "file_path": temp_file_path,
+                        "file_type": file_type,
+                    },
+                )
 
             # 获取知识库
             kb_helper = await kb_manager.get_kb(kb_id)
             if not kb_helper:
+                self._remove_temp_files(files_to_upload)
                 return Response().error("知识库不存在").__dict__
 
             # 生成任务ID
@@ -744,7 +805,7 @@ class KnowledgeBaseRoute(Route):
             self._init_task(task_id, status="pending")
 
             # 启动后台任务
-            asyncio.create_task(
+            self.upload_task_handles[task_id] = asyncio.create_task(
                 self._background_upload_task(
                     task_id=task_id,
                     kb_helper=kb_helper,
@@ -770,8 +831,10 @@ class KnowledgeBaseRoute(Route):
             )
 
         except ValueError as e:
+            self._remove_temp_files(files_to_upload)
             return Response().error(str(e)).__dict__
         except Exception as e:
+            self._remove_temp_files(files_to_upload)
             logger.error(f"上传文档失败: {e}")
             logger.error(traceback.format_exc())
             return Response().error(f"上传文档失败: {e!s}").__dict__
@@ -863,6 +926,31 @@ class KnowledgeBaseRoute(Route):
             logger.error(traceback.format_exc())
             return Response().error(f"导入文档失败: {e!s}").__dict__
 
+    async def cancel_upload(self):
+        """取消文件上传任务
+
+        尚未完成的文档停止解析与向量化, 已写入的文本块会被删除, 已完成的文档保留。
+
+        Body:
+        - task_id: 任务 ID (必填)
+        """
+        try:
+            data = await request.json
+            task_id = data.get("task_id")
+            if not task_id:
+                return Response().error("缺少参数 task_id").__dict__
+
+            task = self.upload_task_handles.get(task_id)
+            if not task or task.done():
+                return Response().error("找不到进行中的上传任务").__dict__
+
+            task.cancel()
+            return Response().ok({"task_id": task_id}, "任务已取消").__dict__
+        except Exception as e:
+            logger.error(f"取消上传任务失败: {e}")
+            logger.error(traceback.format_exc())
+            return Response().error(f"取消上传任务失败: {e!s}").__dict__
+
     async def get_upload_progress(self):
         """获取上传进度和结果
 
@@ -874,6 +962,7 @@ class KnowledgeBaseRoute(Route):
         - processing: 任务处理中
         - completed: 任务完成
         - failed: 任务失败
+        - cancelled: 任务已取消
         """
         try:
             task_id = request.args.get("task_id")
@@ -1063,6 +1152,15 @@ class KnowledgeBaseRoute(Route):
 
     # ===== 检索 API =====
 
+    async def get_retrieval_cache_stats(self):
+        """获取查询向量缓存与检索结果缓存的命中统计"""
+        try:
+            kb_manager = self._get_kb_manager()
+            return Response().ok(kb_manager.retrieval_manager.cache_stats()).__dict__
+        except Exception as e:
+            logger.error(f"获取检索缓存统计失败: {e}")
+            return Response().error(f"获取检索缓存统计失败: {e!s}").__dict__
+
     async def retrieve(self):
         """检索知识库
 
@@ -69,6 +69,7 @@ class PluginRoute(Route):
             "/plugin/source/get": ("GET", self.get_custom_source),
             "/plugin/source/save": ("POST", self.save_custom_source),
             "/plugin/source/get-failed-plugins": ("GET", self.get_failed_plugins),
+            "/plugin/load-timings": ("GET", self.get_plugin_load_timings),
         }
         self.core_lifecycle = core_lifecycle
         self.plugin_manager = plugin_manager
@@ -400,6 +401,28 @@ class PluginRoute(Route):
         """专门获取加载失败的插件列表(字典格式)"""
         return Response().ok(self.plugin_manager.failed_plugin_dict).__dict__
 
+    async def get_plugin_load_timings(self):
+        """获取最近一次载入插件时各阶段的耗时（毫秒），按总耗时降序排列"""
+        timings = []
+        for timing in self.plugin_manager.load_timings.values():
+            total = sum(
+                timing[stage]
+                for stage in (
+                    "dependency",
+                    "import",
+                    "config",
+                    "instantiate",
+                    "initialize",
+                )
+            )
+            timings.append({**timing, "total": round(total, 1)})
+        timings.sort(key=lambda item: item["total"], reverse=True)
+        return (
+            Response()
+            .ok({"mode": self.plugin_manager.startup_mode, "plugins": timings})
+            .__dict__
+        )
+
     async def get_plugin_handlers_info(self, handler_full_names: list[str]):
         """解析插件行为"""
         handlers = []
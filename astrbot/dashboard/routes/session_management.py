@@ -162,6 +162,7 @@ class SessionManagementRoute(Route):
 
             # 获取可用的 providers 和 personas
             provider_manager = self.core_lifecycle.provider_manager
+            await provider_manager.ensure_providers_loaded()
             persona_mgr = self.core_lifecycle.persona_mgr
 
             available_personas = [
@@ -522,6 +523,7 @@ class SessionManagementRoute(Route):
 
             # 获取可用的 providers
             provider_manager = self.core_lifecycle.provider_manager
+            await provider_manager.ensure_providers_loaded()
             available_chat_providers = [
                 {"id": p.meta().id, "name": p.meta().id, "model": p.meta().model}
                 for p in provider_manager.provider_insts
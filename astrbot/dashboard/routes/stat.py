@@ -10,13 +10,15 @@ import aiohttp
 import psutil
 from quart import request
 
-from astrbot.core import DEMO_MODE, logger
+from astrbot.core import DEMO_MODE, html_renderer, logger
 from astrbot.core.config import VERSION
 from astrbot.core.core_lifecycle import AstrBotCoreLifecycle
 from astrbot.core.db import BaseDatabase
 from astrbot.core.db.migration.helper import check_migration_needed_v4
 from astrbot.core.utils.astrbot_path import get_astrbot_path
+from astrbot.core.utils.http_client import http_client
 from astrbot.core.utils.io import get_dashboard_version
+from astrbot.core.utils.media_cache import media_cache
 from astrbot.core.utils.version_comparator import VersionComparator
 
 from .route import Response, Route, RouteContext
@@ -150,6 +152,10 @@ class StatRoute(Route):
                     "cpu_percent": round(cpu_percent, 1),
                     "thread_count": thread_count,
                     "start_time": self.core_lifecycle.start_time,
+                    "event_bus": self.core_lifecycle.event_bus.stats(),
+                    "http_pools": http_client.stats(),
+                    "media_cache": media_cache.stats(),
+                    "t2i": html_renderer.stats(),
                 },
             )
 
@@ -1,5 +1,4 @@
 import asyncio
-import hashlib
 import logging
 import os
 import socket
@@ -168,19 +167,13 @@ class AstrBotDashboard:
                 r = jsonify(Response().error("Missing API key").__dict__)
                 r.status_code = 401
                 return r
-            key_hash = hashlib.pbkdf2_hmac(
-                "sha256",
-                raw_key.encode("utf-8"),
-                b"astrbot_api_key",
-                100_000,
-            ).hex()
-            api_key = await self.db.get_active_api_key_by_hash(key_hash)
+            api_key = await self.api_key_route.authenticator.authenticate(raw_key)
             if not api_key:
                 r = jsonify(Response().error("Invalid API key").__dict__)
                 r.status_code = 401
                 return r
 
-            if isinstance(api_key.scopes, list):
+            if api_key.scopes is not None:
                 scopes = api_key.scopes
             else:
                 scopes = list(ALL_OPEN_API_SCOPES)
@@ -193,7 +186,6 @@ class AstrBotDashboard:
             g.api_key_id = api_key.key_id
             g.api_key_scopes = scopes
             g.username = f"api_key:{api_key.key_id}"
-            await self.db.touch_api_key(api_key.key_id)
             return None
 
         allowed_endpoints = [
@@ -422,4 +414,8 @@ class AstrBotDashboard:
 
     async def shutdown_trigger(self) -> None:
         await self.shutdown_event.wait()
+        try:
+            await self.api_key_route.authenticator.flush()
+        except Exception as e:
+            logger.warning(f"保存 API Key 使用时间失败: {e}")
         logger.info("AstrBot WebUI 已经被优雅地关闭")
@@ -50,6 +50,7 @@ async def generate_tsne_visualization(
             return None
 
         kb = kb_helper.kb
+        await kb_helper.flush_index()
         index_path = kb_helper.kb_dir / "index.faiss"
 
         # 读取 FAISS 索引
@@ -81,7 +82,7 @@ async def generate_tsne_visualization(
                 index.reconstruct(i, vectors[i])
 
         # 获取查询向量
-        vec_db: FaissVecDB = kb_helper.vec_db  # type: ignore
+        vec_db: FaissVecDB = await kb_helper.get_vec_db()
         embedding_provider = vec_db.embedding_provider
         query_embedding = await embedding_provider.get_embedding(query)
         query_vector = np.array([query_embedding], dtype=np.float32)
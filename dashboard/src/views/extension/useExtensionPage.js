@@ -461,6 +461,7 @@ export const useExtensionPage = () => {
   };
   
   const failedPluginsDict = ref({});
+  const pluginLoadTimings = ref([]);
   const failedPluginItems = computed(() =>
     buildFailedPluginItems(failedPluginsDict.value),
   );
@@ -473,6 +474,9 @@ export const useExtensionPage = () => {
       
       const failRes = await axios.get("/api/plugin/source/get-failed-plugins");    
       failedPluginsDict.value = failRes.data.data || {};
+
+      const timingRes = await axios.get("/api/plugin/load-timings");
+      pluginLoadTimings.value = timingRes.data.data?.plugins || [];
       
       checkUpdate();
     } catch (err) {
@@ -1537,6 +1541,7 @@ export const useExtensionPage = () => {
     onLoadingDialogResult,
     failedPluginsDict,
     failedPluginItems,
+    pluginLoadTimings,
     getExtensions,
     handleReloadAllFailed,
     reloadFailedPlugin,
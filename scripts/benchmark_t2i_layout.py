@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local text-to-image layout engine on long replies.
+
+Compares the previous line wrapping (trying every prefix from longest to
+shortest, run once for the height and again for drawing) with the cached,
+binary-search based layout, and reports end-to-end render times.
+
+Usage: python scripts/benchmark_t2i_layout.py [--chars 5000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from astrbot.core.utils.t2i.local_strategy import (  # noqa: E402
+    FontManager,
+    MarkdownParser,
+    MarkdownRenderer,
+    TextMeasurer,
+)
+
+WORDS = [
+    "AstrBot",
+    "插件",
+    "消息",
+    "平台",
+    "provider",
+    "会话",
+    "配置",
+    "knowledge",
+    "base",
+    "模型",
+    "response",
+    "渲染",
+]
+
+
+def make_reply(chars: int, seed: int = 0) -> str:
+    """Build a markdown reply mixing paragraphs, lists, quotes and code."""
+    rng = random.Random(seed)
+    blocks = []
+    size = 0
+    while size < chars:
+        kind = rng.random()
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 90)))
+        if kind < 0.6:
+            block = sentence
+        elif kind < 0.75:
+            block = f"- {sentence}"
+        elif kind < 0.85:
+            block = f"> {sentence}"
+        else:
+            block = (
+                "```\n"
+                + "\n".join(sentence[i : i + 120] for i in range(0, len(sentence), 120))
+                + "\n```"
+            )
+        blocks.append(block)
+        size += len(block)
+    return "\n".join(blocks)
+
+
+def legacy_wrap(text: str, font, max_width: int) -> list[str]:
+    """The previous wrapping algorithm, measuring the actual text."""
+    lines = []
+    remaining_text = text
+    while remaining_text:
+        if font.getlength(remaining_text) <= max_width:
+            lines.append(remaining_text)
+            break
+        for i in range(len(remaining_text), 0, -1):
+            if font.getlength(remaining_text[:i]) <= max_width:
+                lines.append(remaining_text[:i])
+                remaining_text = remaining_text[i:]
+                break
+        else:
+            lines.append(remaining_text[0])
+            remaining_text = remaining_text[1:]
+    return lines
+
+
+def timeit(func, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chars", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    text = make_reply(args.chars)
+    font = FontManager.get_font(26)
+    paragraphs = text.split("\n")
+    print(f"reply: {len(text)} chars, {len(paragraphs)} lines")
+
+    def run_legacy():
+        # 旧实现在计算高度与绘制时各换行一次
+        for _ in range(2):
+            for paragraph in paragraphs:
+                legacy_wrap(paragraph, font, 780)
+
+    def run_layout():
+        for paragraph in paragraphs:
+            TextMeasurer.split_text_to_fit_width(paragraph, font, 780)
+
+    legacy = timeit(run_legacy, args.rounds)
+    layout = timeit(run_layout, args.rounds)
+    print(f"line wrapping   legacy: {legacy * 1000:8.1f} ms")
+    print(f"line wrapping   layout: {layout * 1000:8.1f} ms  ({legacy / layout:.1f}x)")
+
+    elements = await MarkdownParser.parse(text)
+    renderer = MarkdownRenderer()
+
+    def render_single():
+        for element in elements:
+            element._line_cache.clear()
+        renderer.render_elements(elements)
+
+    def render_tiles():
+        for element in elements:
+            element._line_cache.clear()
+        renderer.render_elements(elements, max_tile_height=4096)
+
+    single = timeit(render_single, args.rounds)
+    tiles = timeit(render_tiles, args.rounds)
+    images = renderer.render_elements(elements, max_tile_height=4096)
+    print(f"render (single image): {single * 1000:8.1f} ms")
+    print(
+        f"render (tiled):        {tiles * 1000:8.1f} ms  "
+        f"({len(images)} tiles, heights {[image.height for image in images]})"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
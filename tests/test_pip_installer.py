@@ -2,7 +2,7 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from astrbot.core.utils.pip_installer import PipInstaller
+from astrbot.core.utils.pip_installer import PipInstaller, find_missing_requirements
 
 
 @pytest.mark.asyncio
@@ -39,3 +39,29 @@ async def test_install_targets_site_packages_for_desktop_client(monkeypatch, tmp
     assert str(site_packages_path) in recorded_args
     assert prepend_sys_path_calls == [str(site_packages_path), str(site_packages_path)]
     assert ensure_preferred_calls == [(str(site_packages_path), {"demo-package"})]
+
+
+def test_find_missing_requirements_checks_installed_versions(tmp_path):
+    requirements_path = tmp_path / "requirements.txt"
+    requirements_path.write_text(
+        "\n".join(
+            [
+                "# comment",
+                "-i https://pypi.org/simple",
+                "pytest>=1.0  # installed",
+                "pytest<1.0",
+                "astrbot-missing-test-package==1.0",
+                'astrbot-other-missing-package; python_version < "3"',
+            ],
+        ),
+        encoding="utf-8",
+    )
+
+    assert find_missing_requirements(str(requirements_path)) == [
+        "pytest<1.0",
+        "astrbot-missing-test-package==1.0",
+    ]
+    assert find_missing_requirements(
+        str(requirements_path),
+        check_versions=False,
+    ) == ["astrbot-missing-test-package==1.0"]
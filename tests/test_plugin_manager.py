@@ -1,17 +1,18 @@
 import sys
 from asyncio import Queue
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 import pytest_asyncio
 
 from astrbot.core.config.astrbot_config import AstrBotConfig
 from astrbot.core.db.sqlite import SQLiteDatabase
+from astrbot.core.star import star_manager
 from astrbot.core.star.context import Context
 from astrbot.core.star.star import star_map, star_registry
 from astrbot.core.star.star_handler import star_handlers_registry
-from astrbot.core.star.star_manager import PluginManager
+from astrbot.core.star.star_manager import PLUGIN_STARTUP_CONCURRENT, PluginManager
 
 
 def _clear_module_cache() -> None:
@@ -233,3 +234,88 @@ async def test_uninstall_nonexistent_plugin(plugin_manager_pm: PluginManager):
     """Tests that uninstalling a non-existent plugin raises an exception."""
     with pytest.raises(Exception):
         await plugin_manager_pm.uninstall_plugin("non_existent_plugin")
+
+
+def _write_startup_plugin(plugin_dir: Path, name: str, hooked: bool) -> None:
+    plugin_dir.mkdir(parents=True, exist_ok=True)
+    (plugin_dir / "metadata.yaml").write_text(
+        f"name: {name}\nauthor: AstrBot Team\ndesc: test\nversion: 1.0.0\n",
+        encoding="utf-8",
+    )
+    lines = [
+        "from astrbot.api import star",
+        "from astrbot.api.event import filter",
+        "",
+        "class Main(star.Star):",
+        "    initialized = False",
+        "",
+        "    async def initialize(self):",
+        "        Main.initialized = True",
+    ]
+    if hooked:
+        lines += [
+            "",
+            "    @filter.on_astrbot_loaded()",
+            "    async def on_loaded(self):",
+            "        pass",
+        ]
+    (plugin_dir / "main.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_startup_defers_plugins_without_startup_hooks(
+    plugin_manager_pm: PluginManager,
+    monkeypatch,
+):
+    plugin_path = Path(plugin_manager_pm.plugin_store_path)
+    _write_startup_plugin(plugin_path / "startup_hooked", "startup_hooked", True)
+    _write_startup_plugin(plugin_path / "startup_plain", "startup_plain", False)
+    (plugin_path / "startup_plain" / "requirements.txt").write_text(
+        "pytest\nastrbot-missing-test-package==1.0\n",
+        encoding="utf-8",
+    )
+    install = AsyncMock()
+    monkeypatch.setattr(star_manager.pip_installer, "install", install)
+    plugin_manager_pm.startup_mode = PLUGIN_STARTUP_CONCURRENT
+
+    try:
+        success, _ = await plugin_manager_pm.reload(startup=True)
+        assert success is True
+        install.assert_awaited_once_with(
+            packages=["astrbot-missing-test-package==1.0"],
+        )
+
+        hooked = sys.modules["data.plugins.startup_hooked.main"].Main
+        plain = sys.modules["data.plugins.startup_plain.main"].Main
+        assert hooked.initialized is True
+        assert plain.initialized is False
+        timings = plugin_manager_pm.load_timings
+        assert timings["startup_hooked"]["status"] == "loaded"
+        assert timings["startup_plain"]["status"] == "deferred"
+        assert timings["startup_plain"]["dependency"] > 0
+
+        await plugin_manager_pm.initialize_deferred_plugins()
+
+        assert plain.initialized is True
+        assert timings["startup_plain"]["status"] == "loaded"
+        assert timings["startup_plain"]["deferred"] is True
+    finally:
+        _clear_registry("startup_hooked")
+        _clear_registry("startup_plain")
+
+
+@pytest.mark.asyncio
+async def test_sequential_startup_initializes_plugins_while_loading(
+    plugin_manager_pm: PluginManager,
+):
+    plugin_path = Path(plugin_manager_pm.plugin_store_path)
+    _write_startup_plugin(plugin_path / "startup_plain", "startup_plain", False)
+
+    try:
+        await plugin_manager_pm.reload(startup=True)
+
+        plain = sys.modules["data.plugins.startup_plain.main"].Main
+        assert plain.initialized is True
+        assert plugin_manager_pm.load_timings["startup_plain"]["deferred"] is False
+    finally:
+        _clear_registry("startup_plain")
@@ -1,5 +1,7 @@
+import asyncio
 import os
 import sys
+import time
 from unittest.mock import AsyncMock
 
 import pytest
@@ -536,6 +538,182 @@ async def test_follow_up_ticket_not_consumed_when_no_next_tool_call(
     assert ticket.consumed is False
 
 
+class MockMultiToolProvider(MockProvider):
+    """第一次请求时在同一条消息中发起多个工具调用"""
+
+    def __init__(self, tool_names: list[str]):
+        super().__init__()
+        self.tool_names = tool_names
+
+    async def text_chat(self, **kwargs) -> LLMResponse:
+        self.call_count += 1
+        if self.call_count > 1:
+            return LLMResponse(role="assistant", completion_text="这是我的最终回答")
+        return LLMResponse(
+            role="assistant",
+            tools_call_name=list(self.tool_names),
+            tools_call_args=[{"query": name} for name in self.tool_names],
+            tools_call_ids=[f"call_{name}" for name in self.tool_names],
+        )
+
+
+class MockDelayedToolExecutor:
+    """按工具名延迟返回，并记录同时运行的工具调用数"""
+
+    def __init__(self, delays: dict[str, float]):
+        self.delays = delays
+        self.running: set[str] = set()
+        self.max_running = 0
+        self.overlaps: dict[str, set[str]] = {}
+
+    def execute(self, tool, run_context, **tool_args):
+        async def generator():
+            from mcp.types import CallToolResult, TextContent
+
+            self.overlaps.setdefault(tool.name, set()).update(self.running)
+            for name in self.running:
+                self.overlaps.setdefault(name, set()).add(tool.name)
+            self.running.add(tool.name)
+            self.max_running = max(self.max_running, len(self.running))
+            try:
+                await asyncio.sleep(self.delays.get(tool.name, 0))
+            finally:
+                self.running.discard(tool.name)
+            yield CallToolResult(
+                content=[TextContent(type="text", text=f"{tool.name} 的结果")]
+            )
+
+        return generator()
+
+
+class RecordingHooks(MockHooks):
+    def __init__(self):
+        super().__init__()
+        self.started: list[str] = []
+        self.ended: list[str] = []
+
+    async def on_tool_start(self, run_context, tool, tool_args):
+        self.started.append(tool.name)
+
+    async def on_tool_end(self, run_context, tool, tool_args, tool_result):
+        self.ended.append(tool.name)
+
+
+def _make_tool_set(names: list[str], serial: tuple[str, ...] = ()) -> ToolSet:
+    return ToolSet(
+        tools=[
+            FunctionTool(
+                name=name,
+                description=name,
+                parameters={
+                    "type": "object",
+                    "properties": {"query": {"type": "string"}},
+                },
+                run_serially=name in serial,
+            )
+            for name in names
+        ]
+    )
+
+
+async def _run_tool_step(names, delays, serial=(), **reset_kwargs):
+    runner = ToolLoopAgentRunner()
+    request = ProviderRequest(
+        prompt="请帮我查询信息",
+        func_tool=_make_tool_set(names, serial),
+        contexts=[],
+    )
+    executor = MockDelayedToolExecutor(delays)
+    hooks = RecordingHooks()
+    await runner.reset(
+        provider=MockMultiToolProvider(names),
+        request=request,
+        run_context=ContextWrapper(context=None),
+        tool_executor=executor,
+        agent_hooks=hooks,
+        streaming=False,
+        **reset_kwargs,
+    )
+    start = time.perf_counter()
+    responses = [resp async for resp in runner.step()]
+    elapsed = time.perf_counter() - start
+    return request, responses, executor, hooks, elapsed
+
+
+@pytest.mark.asyncio
+async def test_parallel_tool_calls_run_concurrently_in_order():
+    names = ["tool_a", "tool_b", "tool_c"]
+    request, responses, executor, hooks, elapsed = await _run_tool_step(
+        names,
+        {"tool_a": 0.3, "tool_b": 0.1, "tool_c": 0.2},
+        parallel_tool_calls=True,
+    )
+
+    assert executor.max_running == 3
+    assert elapsed < 0.5
+    assert sorted(hooks.started) == names
+    assert sorted(hooks.ended) == names
+
+    # 先按顺序输出全部 tool_call，再按调用顺序输出每个调用的结果
+    chains = [(r.type, r.data["chain"].chain[0].data["id"]) for r in responses]
+    assert chains == [
+        ("tool_call", "call_tool_a"),
+        ("tool_call", "call_tool_b"),
+        ("tool_call", "call_tool_c"),
+        ("tool_call_result", "call_tool_a"),
+        ("tool_call_result", "call_tool_b"),
+        ("tool_call_result", "call_tool_c"),
+    ]
+    blocks = request.tool_calls_result[0].tool_calls_result
+    assert [b.tool_call_id for b in blocks] == [f"call_{n}" for n in names]
+    assert [b.content for b in blocks] == [f"{n} 的结果" for n in names]
+
+
+@pytest.mark.asyncio
+async def test_parallel_tool_calls_respect_concurrency_cap():
+    names = ["tool_a", "tool_b", "tool_c", "tool_d"]
+    _, _, executor, _, _ = await _run_tool_step(
+        names,
+        dict.fromkeys(names, 0.05),
+        parallel_tool_calls=True,
+        max_parallel_tool_calls=2,
+    )
+    assert executor.max_running == 2
+
+
+@pytest.mark.asyncio
+async def test_parallel_tool_calls_run_serial_tools_alone():
+    names = ["tool_a", "tool_serial", "tool_b", "tool_c"]
+    request, _, executor, _, _ = await _run_tool_step(
+        names,
+        dict.fromkeys(names, 0.05),
+        serial=("tool_serial",),
+        parallel_tool_calls=True,
+    )
+    assert executor.overlaps["tool_serial"] == set()
+    assert executor.overlaps["tool_b"] == {"tool_c"}
+    blocks = request.tool_calls_result[0].tool_calls_result
+    assert [b.tool_call_id for b in blocks] == [f"call_{n}" for n in names]
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_sequentially_by_default():
+    names = ["tool_a", "tool_b"]
+    request, responses, executor, hooks, _ = await _run_tool_step(
+        names,
+        dict.fromkeys(names, 0.02),
+    )
+    assert executor.max_running == 1
+    assert hooks.started == names
+    assert [r.type for r in responses] == [
+        "tool_call",
+        "tool_call",
+        "tool_call_result",
+    ]
+    blocks = request.tool_calls_result[0].tool_calls_result
+    assert [b.tool_call_id for b in blocks] == [f"call_{n}" for n in names]
+
+
 if __name__ == "__main__":
     # 运行测试
     pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""Tests for the cached Open API key authenticator."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+
+from astrbot.core.db.sqlite import SQLiteDatabase
+from astrbot.dashboard.routes import api_key
+from astrbot.dashboard.routes.api_key import ApiKeyAuthenticator, hash_api_key
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "keys.db"))
+    await db.initialize()
+    yield db
+    await db.engine.dispose()
+
+
+async def _create_key(db, raw_key="abk_test", **kwargs):
+    return await db.create_api_key(
+        name="test",
+        key_hash=hash_api_key(raw_key),
+        key_prefix=raw_key[:12],
+        scopes=["chat"],
+        created_by="tester",
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_verified_keys_skip_hashing_and_lookup(db, monkeypatch):
+    key = await _create_key(db)
+    auth = ApiKeyAuthenticator(db, flush_interval=3600)
+    lookup = AsyncMock(wraps=db.get_active_api_key_by_hash)
+    monkeypatch.setattr(db, "get_active_api_key_by_hash", lookup)
+    hashes = 0
+    original_hash = api_key.hash_api_key
+
+    def counting_hash(raw_key):
+        nonlocal hashes
+        hashes += 1
+        return original_hash(raw_key)
+
+    monkeypatch.setattr(api_key, "hash_api_key", counting_hash)
+
+    for _ in range(5):
+        verified = await auth.authenticate("abk_test")
+        assert verified.key_id == key.key_id
+        assert verified.scopes == ["chat"]
+    assert await auth.authenticate("abk_wrong") is None
+
+    assert hashes == 2
+    assert lookup.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_forces_revalidation(db):
+    key = await _create_key(db)
+    auth = ApiKeyAuthenticator(db, flush_interval=3600)
+    assert await auth.authenticate("abk_test") is not None
+
+    await db.revoke_api_key(key.key_id)
+    assert await auth.authenticate("abk_test") is not None  # 仍在缓存中
+    auth.invalidate(key.key_id)
+    assert await auth.authenticate("abk_test") is None
+
+
+@pytest.mark.asyncio
+async def test_cached_keys_expire_with_the_key(db):
+    await _create_key(
+        db, expires_at=datetime.now(timezone.utc) + timedelta(milliseconds=200)
+    )
+    auth = ApiKeyAuthenticator(db, flush_interval=3600)
+    assert await auth.authenticate("abk_test") is not None
+
+    await asyncio.sleep(0.3)
+    assert await auth.authenticate("abk_test") is None
+
+
+@pytest.mark.asyncio
+async def test_last_used_updates_are_batched(db, monkeypatch):
+    key = await _create_key(db)
+    other = await _create_key(db, raw_key="abk_other")
+    touch = AsyncMock(wraps=db.touch_api_keys)
+    monkeypatch.setattr(db, "touch_api_keys", touch)
+    auth = ApiKeyAuthenticator(db, flush_interval=0.5)
+
+    for _ in range(10):
+        await auth.authenticate("abk_test")
+    await auth.authenticate("abk_other")
+    touch.assert_not_awaited()
+    await asyncio.sleep(1)
+
+    touch.assert_awaited_once()
+    assert set(touch.await_args.args[0]) == {key.key_id, other.key_id}
+    stored = await db.get_api_key_by_id(key.key_id)
+    assert stored.last_used_at is not None
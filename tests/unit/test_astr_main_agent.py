@@ -81,6 +81,7 @@ def mock_conversation():
     conv.cid = "conv-id"
     conv.persona_id = None
     conv.history = "[]"
+    conv.get_history_messages.return_value = []
     return conv
 
 
@@ -102,6 +103,7 @@ def _new_mock_conversation(cid: str = "conv-id") -> MagicMock:
     conv.cid = cid
     conv.persona_id = None
     conv.history = "[]"
+    conv.get_history_messages.return_value = []
     return conv
 
 
@@ -236,7 +238,7 @@ class TestGetSessionConv:
             mock_event.unified_msg_origin
         )
         conv_mgr.get_conversation.assert_called_once_with(
-            mock_event.unified_msg_origin, "existing-conv-id"
+            mock_event.unified_msg_origin, "existing-conv-id", history_turns=None
         )
 
     @pytest.mark.asyncio
@@ -250,6 +252,7 @@ class TestGetSessionConv:
         mock_conversation.cid = "new-conv-id"
         mock_conversation.persona_id = None
         mock_conversation.history = "[]"
+        mock_conversation.get_history_messages.return_value = []
         conv_mgr.get_conversation = AsyncMock(return_value=mock_conversation)
 
         result = await module._get_session_conv(mock_event, mock_context)
@@ -271,6 +274,7 @@ class TestGetSessionConv:
         mock_conversation.cid = "retry-conv-id"
         mock_conversation.persona_id = None
         mock_conversation.history = "[]"
+        mock_conversation.get_history_messages.return_value = []
         conv_mgr.get_conversation.side_effect = [None, mock_conversation]
 
         result = await module._get_session_conv(mock_event, mock_context)
@@ -0,0 +1,113 @@
+"""Tests for the metadata-only conversation listing and keyset pagination."""
+
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlmodel import text
+
+from astrbot.core.conversation_mgr import STORAGE_MESSAGE_LOG, ConversationManager
+
+UMO = "test:FriendMessage:user"
+
+
+def _messages(count: int) -> list[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        for i in range(count)
+    ]
+
+
+@pytest_asyncio.fixture
+async def db(temp_db):
+    await temp_db.initialize()
+    return temp_db
+
+
+@pytest.mark.asyncio
+async def test_summaries_report_message_count_without_history(db):
+    mgr = ConversationManager(db, storage=STORAGE_MESSAGE_LOG)
+    json_conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=_messages(3),
+        title="json",
+    )
+    log_conv = await db.create_conversation(user_id=UMO, platform_id="test")
+    await mgr.update_conversation(UMO, log_conv.conversation_id, history=_messages(4))
+    # 截断: 水位线之前的两条消息不再计入
+    conv = await mgr.get_conversation(UMO, log_conv.conversation_id)
+    await mgr.update_conversation(
+        UMO,
+        log_conv.conversation_id,
+        history=_messages(4)[2:] + _messages(2),
+        conversation=conv,
+    )
+
+    summaries = {s.cid: s for s in await mgr.get_conversation_summaries(UMO)}
+    assert summaries[json_conv.conversation_id].message_count == 3
+    assert summaries[json_conv.conversation_id].title == "json"
+    assert summaries[log_conv.conversation_id].message_count == 4
+    assert not hasattr(summaries[log_conv.conversation_id], "history")
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_visits_every_conversation_once(db):
+    mgr = ConversationManager(db)
+    same_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    created = []
+    for i in range(7):
+        conv = await db.create_conversation(
+            user_id=UMO,
+            platform_id="test",
+            # 前四个对话的创建时间相同, 由 inner_conversation_id 决定顺序
+            created_at=same_time
+            if i < 4
+            else datetime(2025, 1, i, tzinfo=timezone.utc),
+        )
+        created.append(conv.conversation_id)
+
+    pages = []
+    cursor = None
+    while True:
+        convs, total, cursor = await mgr.get_filtered_conversation_summaries(
+            page_size=3,
+            cursor=cursor,
+        )
+        pages.append([c.cid for c in convs])
+        if cursor is None:
+            break
+
+    assert total == 7
+    assert [len(page) for page in pages] == [3, 3, 1]
+    listed = [cid for page in pages for cid in page]
+    assert sorted(listed) == sorted(created)
+    offset_pages = []
+    for page in range(1, 4):
+        convs, _, _ = await mgr.get_filtered_conversation_summaries(
+            page=page,
+            page_size=3,
+        )
+        offset_pages.extend(c.cid for c in convs)
+    assert listed == offset_pages
+
+    with pytest.raises(ValueError):
+        await mgr.get_filtered_conversation_summaries(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_message_count_is_backfilled_for_existing_databases(db):
+    conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=_messages(5),
+    )
+    async with db.engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE conversations DROP COLUMN message_count"))
+
+    await db.initialize()
+
+    rows = await db.get_conversation_summaries(user_id=UMO)
+    assert [(row.conversation_id, row.message_count) for row in rows] == [
+        (conv.conversation_id, 5),
+    ]
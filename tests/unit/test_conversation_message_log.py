@@ -0,0 +1,212 @@
+"""Tests for the append-only conversation message log storage."""
+
+import json
+from dataclasses import asdict
+
+import pytest
+import pytest_asyncio
+
+from astrbot.core.conversation_mgr import (
+    STORAGE_JSON,
+    STORAGE_MESSAGE_LOG,
+    ConversationManager,
+    _diff_history,
+)
+from astrbot.core.db.po import Conversation
+
+UMO = "test:FriendMessage:user"
+
+
+def _turn(i: int) -> list[dict]:
+    return [
+        {"role": "user", "content": f"question {i}"},
+        {"role": "assistant", "content": f"answer {i}"},
+    ]
+
+
+def _turns(start: int, end: int) -> list[dict]:
+    return [msg for i in range(start, end) for msg in _turn(i)]
+
+
+@pytest_asyncio.fixture
+async def db(temp_db):
+    await temp_db.initialize()
+    return temp_db
+
+
+async def _create(db, content=None) -> str:
+    conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=content,
+    )
+    return conv.conversation_id
+
+
+async def _log_seqs(db, cid) -> list[int]:
+    return [row.seq for row in await db.get_conversation_messages(cid)]
+
+
+def test_diff_history_detects_append_truncation_and_compression():
+    base = _turns(0, 3)
+    assert _diff_history(base, 0, base + _turn(3)) == (0, None, _turn(3))
+    # 截断: 丢弃最早的两条消息
+    assert _diff_history(base, 0, base[2:] + _turn(3)) == (2, [], _turn(3))
+    # 压缩: 摘要替换最早的四条消息
+    summary = [
+        {"role": "user", "content": "summary"},
+        {"role": "assistant", "content": "ok"},
+    ]
+    assert _diff_history(base, 0, summary + base[4:] + _turn(3)) == (
+        4,
+        summary,
+        _turn(3),
+    )
+    # 整体改写
+    assert _diff_history(base, 0, _turn(9)) is None
+
+
+@pytest.mark.asyncio
+async def test_turns_are_appended_without_rewriting(db):
+    mgr = ConversationManager(db, storage=STORAGE_MESSAGE_LOG)
+    cid = await _create(db)
+
+    for i in range(3):
+        conv = await mgr.get_conversation(UMO, cid)
+        history = json.loads(conv.history) + _turn(i)
+        await mgr.update_conversation(
+            UMO, cid, history=history, token_usage=10 + i, conversation=conv
+        )
+
+    rows = await db.get_conversation_messages(cid)
+    assert [row.payload for row in rows] == _turns(0, 3)
+    assert [row.seq for row in rows] == list(range(6))
+    conv_v2 = await db.get_conversation_by_id(cid)
+    assert conv_v2.content == []
+    assert conv_v2.token_usage == 12
+
+    assert "_message_log" not in asdict(conv)
+
+    # 同一对象再次保存时只追加新的消息
+    await mgr.update_conversation(UMO, cid, history=_turns(0, 4), conversation=conv)
+    assert await _log_seqs(db, cid) == list(range(8))
+
+
+@pytest.mark.asyncio
+async def test_truncation_and_compression_move_the_watermark(db):
+    mgr = ConversationManager(db, storage=STORAGE_MESSAGE_LOG)
+    cid = await _create(db)
+    await mgr.update_conversation(UMO, cid, history=_turns(0, 3))
+
+    conv = await mgr.get_conversation(UMO, cid)
+    await mgr.update_conversation(UMO, cid, history=_turns(1, 4), conversation=conv)
+    conv_v2 = await db.get_conversation_by_id(cid)
+    assert conv_v2.history_watermark == 2
+    assert await _log_seqs(db, cid) == list(range(8))
+
+    summary = [
+        {"role": "user", "content": "summary"},
+        {"role": "assistant", "content": "ok"},
+    ]
+    conv = await mgr.get_conversation(UMO, cid)
+    history = summary + _turns(3, 5)
+    await mgr.update_conversation(UMO, cid, history=history, conversation=conv)
+
+    conv_v2 = await db.get_conversation_by_id(cid)
+    assert conv_v2.history_watermark == 6
+    assert conv_v2.history_prefix == summary
+    assert await _log_seqs(db, cid) == list(range(10))
+    conv = await mgr.get_conversation(UMO, cid)
+    assert json.loads(conv.history) == history
+
+
+@pytest.mark.asyncio
+async def test_tail_read_loads_whole_turns_and_keeps_the_summary(db):
+    mgr = ConversationManager(db, storage=STORAGE_MESSAGE_LOG)
+    cid = await _create(db)
+    tool_turn = [
+        {"role": "user", "content": "question 5"},
+        {"role": "assistant", "content": "", "tool_calls": [{"id": "call"}]},
+        {"role": "tool", "content": "result", "tool_call_id": "call"},
+        {"role": "assistant", "content": "answer 5"},
+    ]
+    await mgr.update_conversation(UMO, cid, history=_turns(0, 5) + tool_turn)
+
+    # 按用户消息划分轮次, 带工具调用的一轮不会被截断
+    conv = await mgr.get_conversation(UMO, cid, history_turns=2)
+    assert conv.get_history_messages() == _turn(4) + tool_turn
+
+    history = _turn(4) + tool_turn + _turn(6)
+    await mgr.update_conversation(UMO, cid, history=history, conversation=conv)
+    conv_v2 = await db.get_conversation_by_id(cid)
+    assert conv_v2.history_watermark == 0
+    conv = await mgr.get_conversation(UMO, cid)
+    assert conv.get_history_messages() == _turns(0, 5) + tool_turn + _turn(6)
+
+    summary = [
+        {"role": "user", "content": "summary"},
+        {"role": "assistant", "content": "ok"},
+    ]
+    history = summary + tool_turn + _turn(6)
+    await mgr.update_conversation(UMO, cid, history=history, conversation=conv)
+
+    # 只读取尾部时, 压缩得到的摘要仍然保留在开头
+    conv = await mgr.get_conversation(UMO, cid, history_turns=1)
+    assert conv.get_history_messages() == summary + _turn(6)
+    history = summary + _turn(6) + _turn(7)
+    await mgr.update_conversation(UMO, cid, history=history, conversation=conv)
+    conv = await mgr.get_conversation(UMO, cid)
+    assert json.loads(conv.history) == summary + tool_turn + _turn(6) + _turn(7)
+
+
+def test_conversation_history_is_serialized_on_demand():
+    conv = Conversation(platform_id="test", user_id=UMO, cid="cid")
+    messages = _turn(0)
+    conv.set_history_messages(messages)
+
+    contexts = conv.get_history_messages()
+    contexts.append({"role": "user", "content": "new"})
+    assert contexts is not messages
+    assert json.loads(conv.history) == _turn(0)
+    assert asdict(conv)["history"] == conv.history
+
+    conv.history = json.dumps(_turn(1))
+    assert conv.get_history_messages() == _turn(1)
+
+
+@pytest.mark.asyncio
+async def test_json_history_is_migrated_in_both_directions(db):
+    cid = await _create(db, content=_turns(0, 2))
+
+    mgr = ConversationManager(db, storage=STORAGE_MESSAGE_LOG)
+    conv = await mgr.get_conversation(UMO, cid)
+    await mgr.update_conversation(UMO, cid, history=_turns(0, 3), conversation=conv)
+    conv_v2 = await db.get_conversation_by_id(cid)
+    assert conv_v2.content == []
+    assert conv_v2.history_watermark == 0
+    assert await _log_seqs(db, cid) == list(range(6))
+
+    await mgr.add_message_pair(cid, *_turn(3))
+    assert await _log_seqs(db, cid) == list(range(8))
+
+    json_mgr = ConversationManager(db, storage=STORAGE_JSON)
+    conv = await json_mgr.get_conversation(UMO, cid)
+    assert json.loads(conv.history) == _turns(0, 4)
+    await json_mgr.add_message_pair(cid, *_turn(4))
+
+    conv_v2 = await db.get_conversation_by_id(cid)
+    assert conv_v2.content == _turns(0, 5)
+    assert conv_v2.history_watermark is None
+    assert await _log_seqs(db, cid) == []
+
+
+@pytest.mark.asyncio
+async def test_deleting_conversation_removes_its_messages(db):
+    mgr = ConversationManager(db, storage=STORAGE_MESSAGE_LOG)
+    cid = await _create(db)
+    await mgr.update_conversation(UMO, cid, history=_turns(0, 2))
+
+    await db.delete_conversations_by_user_id(UMO)
+
+    assert await db.get_conversation_by_id(cid) is None
+    assert await _log_seqs(db, cid) == []
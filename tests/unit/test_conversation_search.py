@@ -0,0 +1,219 @@
+"""Tests for the FTS5 conversation search index."""
+
+import pytest
+import pytest_asyncio
+from sqlmodel import text
+
+from astrbot.core.db.sqlite import CONVERSATION_SEARCH_TABLE
+
+UMO = "test:GroupMessage:group"
+
+
+def _messages(*texts: str) -> list[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": content}
+        for i, content in enumerate(texts)
+    ]
+
+
+@pytest_asyncio.fixture
+async def db(temp_db):
+    await temp_db.initialize()
+    assert temp_db.conversation_search_enabled
+    return temp_db
+
+
+async def _search(db, query: str) -> list[str]:
+    convs, _ = await db.get_filtered_conversations(search_query=query)
+    return [conv.conversation_id for conv in convs]
+
+
+@pytest.mark.asyncio
+async def test_search_matches_titles_and_message_text(db):
+    weather = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=_messages("今天天气怎么样", "今天是晴天"),
+    )
+    parts = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Describe this picture"},
+                    {"type": "image_url", "image_url": {"url": "base64://..."}},
+                ],
+            },
+        ],
+    )
+    titled = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        title="旅行计划",
+    )
+
+    assert await _search(db, "天气怎么") == [weather.conversation_id]
+    # 少于 3 个字符的查询词
+    assert await _search(db, "晴天") == [weather.conversation_id]
+    assert await _search(db, "PICTURE") == [parts.conversation_id]
+    assert await _search(db, "旅行") == [titled.conversation_id]
+    assert await _search(db, "base64") == []
+
+    await db.update_conversation(titled.conversation_id, title="出差安排")
+    assert await _search(db, "旅行") == []
+    assert await _search(db, "出差安排") == [titled.conversation_id]
+
+    await db.delete_conversation(weather.conversation_id)
+    assert await _search(db, "晴天") == []
+
+
+@pytest.mark.asyncio
+async def test_search_indexes_message_log_and_ranks_results(db):
+    once = await db.create_conversation(user_id=UMO, platform_id="test")
+    often = await db.create_conversation(user_id=UMO, platform_id="test")
+    await db.append_conversation_messages(
+        once.conversation_id,
+        _messages("deploy the bot", "ok"),
+        reset_history=True,
+    )
+    await db.append_conversation_messages(
+        often.conversation_id,
+        _messages("deploy again", "deploy finished, deploy log attached"),
+        reset_history=True,
+    )
+
+    assert await _search(db, "deploy") == [
+        often.conversation_id,
+        once.conversation_id,
+    ]
+
+    # 整体改写历史会清除消息日志中的索引
+    await db.update_conversation(often.conversation_id, content=_messages("hello"))
+    assert await _search(db, "deploy") == [once.conversation_id]
+
+
+@pytest.mark.asyncio
+async def test_existing_conversations_are_indexed_on_first_initialize(db):
+    conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=_messages("需要建立索引的历史消息"),
+    )
+    async with db.engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {CONVERSATION_SEARCH_TABLE}"))
+
+    await db.initialize()
+
+    assert await _search(db, "建立索引") == [conv.conversation_id]
+
+
+@pytest.mark.asyncio
+async def test_session_search_uses_title_index(db):
+    conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        title="周报总结",
+    )
+    await db.insert_preference_or_update(
+        "umo",
+        UMO,
+        "sel_conv_id",
+        {"val": conv.conversation_id},
+    )
+
+    sessions, total = await db.get_session_conversations(search_query="周报总结")
+    assert total == 1
+    assert sessions[0]["conversation_id"] == conv.conversation_id
+    sessions, total = await db.get_session_conversations(search_query="月报")
+    assert (sessions, total) == ([], 0)
+
+
+async def _index_size(db) -> int:
+    async with db.engine.connect() as conn:
+        result = await conn.execute(
+            text(f"SELECT count(*) FROM {CONVERSATION_SEARCH_TABLE}")
+        )
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_appending_to_content_only_indexes_new_messages(db):
+    history = _messages("first question", "first answer")
+    conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        content=history,
+    )
+    assert await _index_size(db) == 2
+    # 删除已有消息的索引行, 追加消息后不会被重新建立
+    async with db.engine.begin() as conn:
+        await conn.execute(
+            text(
+                f"DELETE FROM {CONVERSATION_SEARCH_TABLE} "
+                "WHERE rowid = (SELECT min(rowid) FROM conversation_search)"
+            )
+        )
+
+    history += _messages("second question", "second answer")
+    await db.update_conversation(conv.conversation_id, content=history)
+    assert await _search(db, "first question") == []
+    assert await _search(db, "second answer") == [conv.conversation_id]
+    assert await _index_size(db) == 3
+
+    # 改写历史会重新建立该对话的全部索引
+    await db.update_conversation(conv.conversation_id, content=history[2:])
+    assert await _search(db, "first answer") == []
+    assert await _search(db, "second question") == [conv.conversation_id]
+    assert await _index_size(db) == 2
+
+
+@pytest.mark.asyncio
+async def test_messages_before_the_watermark_are_removed_from_the_index(db):
+    conv = await db.create_conversation(user_id=UMO, platform_id="test")
+    await db.append_conversation_messages(
+        conv.conversation_id,
+        _messages("old topic", "old reply", "new topic", "new reply"),
+        reset_history=True,
+    )
+    await db.append_conversation_messages(
+        conv.conversation_id,
+        [],
+        watermark=2,
+        history_prefix=[{"role": "user", "content": "summary of the old topic"}],
+    )
+
+    assert await _search(db, "old reply") == []
+    assert await _search(db, "summary of") == [conv.conversation_id]
+    assert await _search(db, "new reply") == [conv.conversation_id]
+
+
+@pytest.mark.asyncio
+async def test_legacy_index_is_rebuilt(db):
+    conv = await db.create_conversation(
+        user_id=UMO,
+        platform_id="test",
+        title="旧版索引",
+        content=_messages("legacy history"),
+    )
+    async with db.engine.begin() as conn:
+        await conn.execute(text(f"DELETE FROM {CONVERSATION_SEARCH_TABLE}"))
+        await conn.execute(
+            text(
+                "CREATE TRIGGER conversations_search_update "
+                "AFTER UPDATE OF title ON conversations BEGIN SELECT 1; END"
+            )
+        )
+
+    await db.initialize()
+
+    assert await _search(db, "legacy history") == [conv.conversation_id]
+    assert await _search(db, "旧版索引") == [conv.conversation_id]
+    async with db.engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT 1 FROM sqlite_master WHERE name = 'conversations_search_update'"
+            )
+        )
+        assert result.first() is None
@@ -304,6 +304,7 @@ class TestAstrBotCoreLifecycleInitialize:
 
         mock_plugin_manager = MagicMock()
         mock_plugin_manager.reload = AsyncMock()
+        mock_plugin_manager.initialize_deferred_plugins = AsyncMock()
 
         mock_pipeline_scheduler = MagicMock()
         mock_pipeline_scheduler.initialize = AsyncMock()
@@ -0,0 +1,124 @@
+"""Tests for ordered, deduplicated and cached batch embedding."""
+
+import asyncio
+import random
+
+import pytest
+
+from astrbot.core.db.vec_db.faiss_impl.vec_db import FaissVecDB
+from astrbot.core.provider.provider import EmbeddingProvider
+
+DIM = 4
+
+
+def _vector(text: str) -> list[float]:
+    value = float(int(text.split()[-1]))
+    return [value, 1.0, 0.0, 0.0]
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, fail_on: set[str] | None = None, rate_limited: int = 0):
+        super().__init__({"id": "fake", "embedding_model": "fake-model"}, {})
+        self.fail_on = fail_on or set()
+        self.rate_limited = rate_limited
+        self.calls: list[list[str]] = []
+
+    async def get_embedding(self, text: str) -> list[float]:
+        return _vector(text)
+
+    async def get_embeddings(self, text: list[str]) -> list[list[float]]:
+        self.calls.append(list(text))
+        # 让批次以乱序完成
+        await asyncio.sleep(random.random() * 0.01)
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise RuntimeError("Error code: 429 - Too Many Requests")
+        if self.fail_on & set(text):
+            raise RuntimeError("upstream error")
+        return [_vector(t) for t in text]
+
+    def get_dim(self) -> int:
+        return DIM
+
+    @property
+    def embedded(self) -> list[str]:
+        return [text for call in self.calls for text in call]
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    sleep = asyncio.sleep
+
+    async def fast_sleep(delay, *args, **kwargs):
+        await sleep(min(delay, 0.001), *args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "sleep", fast_sleep)
+
+
+@pytest.mark.asyncio
+async def test_results_follow_input_order_and_duplicates_are_embedded_once():
+    provider = FakeEmbeddingProvider()
+    texts = [f"chunk {i}" for i in range(40)] + ["chunk 3", "chunk 7"]
+
+    vectors = await provider.get_embeddings_batch(texts, batch_size=3, tasks_limit=4)
+
+    assert vectors == [_vector(t) for t in texts]
+    assert sorted(provider.embedded) == sorted(set(texts))
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_batches_are_split_and_retried(no_backoff):
+    provider = FakeEmbeddingProvider(rate_limited=1)
+    texts = [f"chunk {i}" for i in range(8)]
+
+    vectors = await provider.get_embeddings_batch(
+        texts,
+        batch_size=8,
+        tasks_limit=2,
+    )
+
+    assert vectors == [_vector(t) for t in texts]
+    assert [len(call) for call in provider.calls] == [8, 4, 4]
+
+
+@pytest.mark.asyncio
+async def test_vec_db_reuses_cached_embeddings_and_resumes_failed_uploads(
+    tmp_path,
+    no_backoff,
+):
+    texts = [f"chunk {i}" for i in range(12)]
+    provider = FakeEmbeddingProvider(fail_on={"chunk 10"})
+    vec_db = FaissVecDB(
+        str(tmp_path / "doc.db"),
+        str(tmp_path / "index.faiss"),
+        provider,
+    )
+    await vec_db.initialize()
+
+    with pytest.raises(Exception, match="1 个批次处理失败"):
+        await vec_db.insert_batch(texts, batch_size=4, tasks_limit=1, max_retries=2)
+    assert await vec_db.count_documents() == 0
+
+    # 重新上传时只请求上次失败的批次
+    provider.fail_on.clear()
+    provider.calls.clear()
+    progress = []
+
+    async def on_progress(current, total):
+        progress.append((current, total))
+
+    int_ids = await vec_db.insert_batch(
+        texts,
+        batch_size=4,
+        progress_callback=on_progress,
+    )
+    assert provider.embedded == texts[8:]
+    assert progress[-1] == (12, 12)
+    assert len(int_ids) == 12
+
+    # 内容未变化的文本块不再请求 Embedding Provider
+    provider.calls.clear()
+    await vec_db.insert_batch(texts[:5])
+    assert provider.calls == []
+    assert vec_db.embedding_storage.vector_count == 17
+    await vec_db.close()
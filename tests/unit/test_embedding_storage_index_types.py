@@ -0,0 +1,138 @@
+"""Tests for configurable FAISS index types in EmbeddingStorage."""
+
+import threading
+
+import faiss
+import numpy as np
+import pytest
+
+from astrbot.core.db.vec_db.faiss_impl.embedding_storage import EmbeddingStorage
+from astrbot.core.db.vec_db.faiss_impl.index_factory import IndexConfig
+
+DIM = 16
+
+
+def _vectors(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((n, DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def _top1(storage: EmbeddingStorage, vector: np.ndarray) -> int:
+    _, indices = await storage.search(vector.reshape(1, -1).copy(), 1)
+    return int(indices[0][0])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("index_type", ["ivf_flat", "ivf_pq", "hnsw"])
+async def test_migrates_from_flat_after_threshold(tmp_path, index_type):
+    path = str(tmp_path / "index.faiss")
+    config = IndexConfig(index_type=index_type, migrate_threshold=200)
+    storage = EmbeddingStorage(DIM, path, index_config=config)
+    vectors = _vectors(300)
+
+    await storage.insert_batch(vectors[:100], list(range(100)))
+    assert storage.index_type == "flat"
+    assert not storage.is_rebuilding
+
+    await storage.insert_batch(vectors[100:], list(range(100, 300)))
+    assert storage.is_rebuilding
+    await storage.wait_for_rebuild()
+
+    assert storage.index_type == index_type
+    assert storage.vector_count == 300
+    if index_type != "ivf_pq":
+        assert await _top1(storage, vectors[42]) == 42
+
+    reloaded = EmbeddingStorage(DIM, path, index_config=config)
+    assert reloaded.index_type == index_type
+
+
+@pytest.mark.asyncio
+async def test_mutations_during_rebuild_are_replayed(tmp_path):
+    config = IndexConfig(index_type="ivf_flat", migrate_threshold=100)
+    storage = EmbeddingStorage(DIM, str(tmp_path / "index.faiss"), config)
+    vectors = _vectors(160)
+
+    await storage.insert_batch(vectors[:150], list(range(150)))
+    assert storage.is_rebuilding
+    await storage.insert_batch(vectors[150:], list(range(150, 160)))
+    await storage.delete([0, 1])
+    await storage.wait_for_rebuild()
+
+    assert storage.index_type == "ivf_flat"
+    assert storage.vector_count == 158
+    assert await _top1(storage, vectors[155]) == 155
+    assert await _top1(storage, vectors[0]) != 0
+
+
+@pytest.mark.asyncio
+async def test_rebuild_snapshot_is_taken_off_the_event_loop(tmp_path, monkeypatch):
+    clone_threads = []
+    original_clone_index = faiss.clone_index
+
+    def clone_index(index):
+        clone_threads.append(threading.current_thread())
+        return original_clone_index(index)
+
+    monkeypatch.setattr(faiss, "clone_index", clone_index)
+    config = IndexConfig(index_type="ivf_flat", migrate_threshold=100)
+    storage = EmbeddingStorage(DIM, str(tmp_path / "index.faiss"), config)
+
+    await storage.insert_batch(_vectors(150), list(range(150)))
+    await storage.wait_for_rebuild()
+
+    assert storage.index_type == "ivf_flat"
+    assert clone_threads
+    assert threading.main_thread() not in clone_threads
+
+
+@pytest.mark.asyncio
+async def test_hnsw_delete_uses_tombstones_until_compaction(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    config = IndexConfig(index_type="hnsw", migrate_threshold=10)
+    storage = EmbeddingStorage(DIM, path, config)
+    vectors = _vectors(100)
+    await storage.insert_batch(vectors, list(range(100)))
+    await storage.wait_for_rebuild()
+    assert storage.index_type == "hnsw"
+
+    await storage.delete([7])
+    assert storage.vector_count == 99
+    assert not storage.is_rebuilding
+    assert await _top1(storage, vectors[7]) != 7
+
+    # Re-using a deleted id must not resurrect the old vector
+    await storage.insert(vectors[50], 7)
+    assert await _top1(storage, vectors[50]) in (7, 50)
+    assert await _top1(storage, vectors[7]) != 7
+
+    await storage.flush()
+    reloaded = EmbeddingStorage(DIM, path, config)
+    assert reloaded.vector_count == 100
+    assert await _top1(reloaded, vectors[7]) != 7
+
+    await storage.delete(list(range(20, 40)))
+    assert storage.is_rebuilding
+    await storage.wait_for_rebuild()
+    assert storage.index.ntotal == storage.vector_count == 80
+
+
+@pytest.mark.asyncio
+async def test_switching_back_to_flat(tmp_path):
+    config = IndexConfig(index_type="hnsw", migrate_threshold=10)
+    storage = EmbeddingStorage(DIM, str(tmp_path / "index.faiss"), config)
+    vectors = _vectors(50)
+    await storage.insert_batch(vectors, list(range(50)))
+    await storage.wait_for_rebuild()
+
+    storage.set_index_config(IndexConfig(index_type="flat"))
+    await storage.wait_for_rebuild()
+
+    assert storage.index_type == "flat"
+    assert await _top1(storage, vectors[3]) == 3
+
+
+def test_rejects_unknown_index_type():
+    with pytest.raises(ValueError):
+        IndexConfig(index_type="annoy")
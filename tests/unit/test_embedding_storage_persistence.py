@@ -0,0 +1,109 @@
+"""Tests for debounced FAISS index persistence and WAL recovery."""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from astrbot.core.db.vec_db.faiss_impl.embedding_storage import EmbeddingStorage
+from astrbot.core.db.vec_db.faiss_impl.index_factory import IndexConfig
+
+DIM = 8
+
+
+def _vectors(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((n, DIM), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _crash(storage: EmbeddingStorage) -> None:
+    """Simulate a process crash: drop pending flushes without persisting."""
+    if storage._flush_task:
+        storage._flush_task.cancel()
+    storage.wal.close()
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_flushed_in_batches(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    storage = EmbeddingStorage(DIM, path, flush_interval=0.05)
+    vectors = _vectors(10)
+
+    for i in range(10):
+        await storage.insert(vectors[i], i)
+    assert not os.path.exists(path)
+
+    await asyncio.sleep(0.2)
+    assert EmbeddingStorage(DIM, path).vector_count == 10
+    assert not storage.wal.has_records()
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_threshold_triggers_immediate_flush(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    storage = EmbeddingStorage(DIM, path, flush_interval=60, flush_threshold=50)
+
+    await storage.insert_batch(_vectors(60), list(range(60)))
+    await asyncio.sleep(0.1)
+    assert EmbeddingStorage(DIM, path).vector_count == 60
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_recover_replays_wal_after_crash(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    vectors = _vectors(30)
+    storage = EmbeddingStorage(DIM, path, flush_interval=60)
+    await storage.insert_batch(vectors[:20], list(range(20)))
+    await storage.flush()
+    await storage.insert_batch(vectors[20:], list(range(20, 30)))
+    await storage.delete([0, 1, 2])
+    _crash(storage)
+
+    recovered = EmbeddingStorage(DIM, path, flush_interval=60)
+    assert recovered.vector_count == 20
+    assert await recovered.recover() == 2
+    assert recovered.vector_count == 27
+    _, indices = await recovered.search(vectors[25].reshape(1, -1).copy(), 1)
+    assert indices[0][0] == 25
+    assert not recovered.wal.has_records()
+    assert EmbeddingStorage(DIM, path).vector_count == 27
+    await recovered.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_is_idempotent_when_index_was_already_written(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    vectors = _vectors(5)
+    storage = EmbeddingStorage(DIM, path, flush_interval=60)
+    await storage.insert_batch(vectors, list(range(5)))
+    # Index file written, but the WAL was not cleaned up before the crash
+    storage._write_files(storage.index, set())
+    _crash(storage)
+
+    recovered = EmbeddingStorage(DIM, path, flush_interval=60)
+    await recovered.recover()
+    assert recovered.vector_count == 5
+    await recovered.close()
+
+
+@pytest.mark.asyncio
+async def test_hnsw_recovery_keeps_deleted_vectors_hidden(tmp_path):
+    path = str(tmp_path / "index.faiss")
+    config = IndexConfig(index_type="hnsw", migrate_threshold=10)
+    vectors = _vectors(40)
+    storage = EmbeddingStorage(DIM, path, config, flush_interval=60)
+    await storage.insert_batch(vectors, list(range(40)))
+    await storage.wait_for_rebuild()
+    await storage.delete([3])
+    _crash(storage)
+
+    recovered = EmbeddingStorage(DIM, path, config, flush_interval=60)
+    await recovered.recover()
+    assert recovered.vector_count == 39
+    _, indices = await recovered.search(vectors[3].reshape(1, -1).copy(), 1)
+    assert indices[0][0] != 3
+    await recovered.close()
@@ -6,7 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from astrbot.core.event_bus import EventBus
+from astrbot.core.event_bus import EventBus, EventQueue
 
 
 @pytest.fixture
@@ -699,3 +699,172 @@ class TestEventFiltering:
 
             # Verify error was logged for missing scheduler
             mock_logger.error.assert_called_once()
+
+
+def _make_event(umo: str, text: str = "Hello"):
+    event = MagicMock()
+    event.unified_msg_origin = umo
+    event.get_platform_id.return_value = "platform"
+    event.get_platform_name.return_value = "Platform"
+    event.get_sender_name.return_value = "User"
+    event.get_sender_id.return_value = "user123"
+    event.get_message_outline.return_value = text
+    event.text = text
+    return event
+
+
+class TestBoundedDispatch:
+    """Tests for the bounded-concurrency dispatcher mode."""
+
+    @staticmethod
+    async def _run(bus, done: asyncio.Event):
+        task = asyncio.create_task(bus.dispatch())
+        try:
+            await asyncio.wait_for(done.wait(), timeout=2.0)
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    @pytest.mark.asyncio
+    async def test_session_events_run_in_order_and_sessions_in_parallel(
+        self, mock_pipeline_scheduler, mock_config_manager
+    ):
+        queue = EventQueue()
+        bus = EventBus(
+            event_queue=queue,
+            pipeline_scheduler_mapping={"test-conf-id": mock_pipeline_scheduler},
+            astrbot_config_mgr=mock_config_manager,
+            max_concurrency=4,
+        )
+        running: dict[str, int] = {}
+        max_running = 0
+        order: list[str] = []
+        done = asyncio.Event()
+
+        async def execute(event):
+            nonlocal max_running
+            umo = event.unified_msg_origin
+            running[umo] = running.get(umo, 0) + 1
+            assert running[umo] == 1, "同一会话的事件不应并发处理"
+            max_running = max(max_running, sum(running.values()))
+            await asyncio.sleep(0.02)
+            order.append(event.text)
+            running[umo] -= 1
+            if len(order) == 6:
+                done.set()
+
+        mock_pipeline_scheduler.execute.side_effect = execute
+        for i in range(3):
+            queue.put_nowait(_make_event("a", f"a{i}"))
+            queue.put_nowait(_make_event("b", f"b{i}"))
+
+        await self._run(bus, done)
+
+        assert [t for t in order if t.startswith("a")] == ["a0", "a1", "a2"]
+        assert [t for t in order if t.startswith("b")] == ["b0", "b1", "b2"]
+        assert max_running == 2
+        stats = bus.stats()
+        assert stats["processed"] == 6
+        assert stats["queue"]["depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_global_concurrency_limit(
+        self, mock_pipeline_scheduler, mock_config_manager
+    ):
+        queue = EventQueue()
+        bus = EventBus(
+            event_queue=queue,
+            pipeline_scheduler_mapping={"test-conf-id": mock_pipeline_scheduler},
+            astrbot_config_mgr=mock_config_manager,
+            max_concurrency=2,
+        )
+        running = 0
+        max_running = 0
+        finished = 0
+        done = asyncio.Event()
+
+        async def execute(event):  # noqa: ARG001
+            nonlocal running, max_running, finished
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            finished += 1
+            if finished == 5:
+                done.set()
+
+        mock_pipeline_scheduler.execute.side_effect = execute
+        for i in range(5):
+            queue.put_nowait(_make_event(f"session-{i}"))
+
+        await self._run(bus, done)
+        assert max_running == 2
+
+    @pytest.mark.asyncio
+    async def test_follow_up_bypasses_session_queue(
+        self, mock_pipeline_scheduler, mock_config_manager
+    ):
+        queue = EventQueue()
+        bus = EventBus(
+            event_queue=queue,
+            pipeline_scheduler_mapping={"test-conf-id": mock_pipeline_scheduler},
+            astrbot_config_mgr=mock_config_manager,
+            max_concurrency=1,
+        )
+        follow_up_received = asyncio.Event()
+        done = asyncio.Event()
+
+        async def execute(event):
+            if event.text == "first":
+                # 模拟正在运行的 Agent 等待用户追问
+                with patch(
+                    "astrbot.core.event_bus.has_active_runner", return_value=True
+                ):
+                    queue.put_nowait(_make_event("a", "second"))
+                    await asyncio.wait_for(follow_up_received.wait(), timeout=1.0)
+                done.set()
+            else:
+                follow_up_received.set()
+
+        mock_pipeline_scheduler.execute.side_effect = execute
+        queue.put_nowait(_make_event("a", "first"))
+
+        await self._run(bus, done)
+        assert bus.stats()["bypassed"] == 1
+
+
+class TestEventQueue:
+    """Tests for the bounded event queue."""
+
+    def test_drop_oldest(self):
+        queue = EventQueue(maxsize=2, overflow_policy="drop_oldest")
+        for item in ("a", "b", "c"):
+            queue.put_nowait(item)
+        assert [queue.get_nowait(), queue.get_nowait()] == ["b", "c"]
+        assert queue.stats()["dropped"] == 1
+
+    def test_reject(self):
+        queue = EventQueue(maxsize=2, overflow_policy="reject")
+        for item in ("a", "b", "c"):
+            queue.put_nowait(item)
+        assert [queue.get_nowait(), queue.get_nowait()] == ["a", "b"]
+        assert queue.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_block_defers_until_space(self):
+        queue = EventQueue(maxsize=1, overflow_policy="block")
+        queue.put_nowait("a")
+        queue.put_nowait("b")
+        assert queue.qsize() == 1
+        assert queue.stats()["blocked"] == 1
+
+        assert await queue.get() == "a"
+        assert await asyncio.wait_for(queue.get(), timeout=1.0) == "b"
+        await asyncio.sleep(0)
+        stats = queue.stats()
+        assert stats["blocked"] == 0
+        assert stats["max_depth"] == 1
+
+    def test_unknown_policy_falls_back_to_block(self):
+        assert EventQueue(overflow_policy="unknown").overflow_policy == "block"
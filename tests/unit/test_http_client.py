@@ -0,0 +1,117 @@
+"""Tests for the shared, pooled HTTP client registry."""
+
+import asyncio
+import socket
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from astrbot.core.utils.http_client import (
+    CachingResolver,
+    DNSCache,
+    HTTPClientRegistry,
+)
+
+
+@pytest_asyncio.fixture
+async def server():
+    async def hello(request):
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", hello)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def registry():
+    registry = HTTPClientRegistry()
+    yield registry
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_shared_per_proxy_configuration(registry):
+    async with registry.session() as session:
+        assert registry.get_session() is session
+    assert not session.closed
+
+    assert registry.get_session(trust_env=False) is not session
+    assert registry.get_session("http://127.0.0.1:7890") is not session
+    assert len(registry.stats()["pools"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused_across_requests(registry, server):
+    url = str(server.make_url("/"))
+    for _ in range(3):
+        async with registry.session(trust_env=False) as session:
+            async with session.get(url) as resp:
+                assert await resp.text() == "ok"
+
+    (pool,) = registry.stats()["pools"]
+    assert pool["requests"] == 3
+    assert pool["in_flight"] == 0
+    assert pool["connections_created"] == 1
+    assert pool["connections_reused"] == 2
+
+
+@pytest.mark.asyncio
+async def test_closed_registry_creates_new_sessions(registry):
+    session = registry.get_session()
+    await registry.close()
+
+    assert session.closed
+    assert registry.stats()["pools"] == []
+    assert registry.get_session() is not session
+
+
+@pytest.mark.asyncio
+async def test_resolver_caches_and_deduplicates_lookups():
+    cache = DNSCache(ttl=60)
+    resolver = CachingResolver(cache)
+    calls = 0
+
+    class SlowResolver:
+        async def resolve(self, host, port, family):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [{"hostname": host, "host": "127.0.0.1", "port": port}]
+
+        async def close(self):
+            pass
+
+    resolver._resolver = SlowResolver()
+    results = await asyncio.gather(
+        *(resolver.resolve("example.com", 443, socket.AF_INET) for _ in range(5)),
+    )
+    await resolver.resolve("example.com", 443, socket.AF_INET)
+
+    assert calls == 1
+    assert all(r == results[0] for r in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_lookup_is_not_cached():
+    cache = DNSCache(ttl=60)
+    resolver = CachingResolver(cache)
+
+    class FailingResolver:
+        async def resolve(self, host, port, family):
+            raise OSError("lookup failed")
+
+        async def close(self):
+            pass
+
+    resolver._resolver = FailingResolver()
+    with pytest.raises(OSError):
+        await resolver.resolve("example.com", 443, socket.AF_INET)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,97 @@
+"""Tests for parsing knowledge base documents in a process pool."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from astrbot.core.knowledge_base.parsers.text_parser import TextParser
+from astrbot.core.knowledge_base.parsers.worker_pool import (
+    CANCEL_FILE,
+    RECORDS_FILE,
+    ParseCancelledError,
+    ParserPool,
+    _parse_to_dir,
+)
+
+TEXT = "".join(f"第{i}行, line {i}\n" for i in range(100000))
+
+
+@pytest_asyncio.fixture
+async def pool(tmp_path):
+    pool = ParserPool(max_workers=1, temp_dir=str(tmp_path / "jobs"))
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    return path
+
+
+@pytest.mark.asyncio
+async def test_pool_streams_the_same_segments_as_in_process(pool, text_file):
+    segments = [s async for s in pool.parse_stream(str(text_file), "doc.txt", "txt")]
+    expected = [s async for s in TextParser().parse_stream(str(text_file), "doc.txt")]
+
+    assert len(segments) > 1
+    assert segments == expected
+    assert pool.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_errors_are_raised_to_the_caller(pool, text_file):
+    with pytest.raises(ValueError, match="暂时不支持的文件格式"):
+        async for _ in pool.parse_stream(str(text_file), "doc.xyz", "xyz"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_abandoned_job_releases_its_worker(pool, text_file, tmp_path):
+    stream = pool.parse_stream(str(text_file), "doc.txt", "txt")
+    await anext(stream)
+    await stream.aclose()
+
+    for _ in range(100):
+        if pool.stats()["running"] == 0 and not list((tmp_path / "jobs").iterdir()):
+            break
+        await asyncio.sleep(0.05)
+    assert pool.stats() == {"max_workers": 1, "running": 0, "queued": 0}
+    assert not list((tmp_path / "jobs").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_at_cancel_marker(text_file, tmp_path):
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+    (job_dir / CANCEL_FILE).touch()
+
+    with pytest.raises(ParseCancelledError):
+        await _parse_to_dir(str(text_file), "doc.txt", "txt", str(job_dir))
+    assert (job_dir / RECORDS_FILE).read_text(encoding="utf-8") == ""
+
+
+@pytest.mark.asyncio
+async def test_disabled_pool_parses_in_process(text_file):
+    pool = ParserPool(max_workers=0)
+    segments = [s async for s in pool.parse_stream(str(text_file), "doc.txt", "txt")]
+    assert "".join(s.text for s in segments) == TEXT
+    assert pool.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_workers_only_import_the_parsers(pool, text_file):
+    async for _ in pool.parse_stream(str(text_file), "doc.txt", "txt"):
+        pass
+
+    # 同一个子进程中查看已导入的 astrbot 模块
+    modules = await asyncio.wrap_future(
+        pool._get_executor().submit(
+            eval, "[m for m in __import__('sys').modules if m.startswith('astrbot')]"
+        )
+    )
+    assert "astrbot.core.knowledge_base.parsers.worker_pool" in modules
+    for module in ("astrbot.core.config", "astrbot.core.db", "astrbot.core.log"):
+        assert module not in modules
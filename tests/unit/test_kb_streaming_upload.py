@@ -0,0 +1,233 @@
+"""Tests for streaming document parsing, chunking and upload."""
+
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+
+import astrbot.core.star  # noqa: F401  # resolves the provider <-> knowledge base import cycle
+from astrbot.core.knowledge_base.chunking.fixed_size import FixedSizeChunker
+from astrbot.core.knowledge_base.chunking.recursive import RecursiveCharacterChunker
+from astrbot.core.knowledge_base.kb_db_sqlite import KBSQLiteDatabase
+from astrbot.core.knowledge_base.kb_helper import KBHelper
+from astrbot.core.knowledge_base.models import KnowledgeBase
+from astrbot.core.knowledge_base.parsers import text_parser
+from astrbot.core.knowledge_base.parsers.text_parser import TextParser
+from astrbot.core.provider.provider import EmbeddingProvider
+
+DIM = 4
+
+TEXT = "".join(
+    f"第{i}段。这是一段用于测试流式分块的文本, 包含 sentence number {i}.\n\n"
+    for i in range(400)
+)
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    def __init__(self) -> None:
+        super().__init__({"id": "fake", "embedding_model": "fake-model"}, {})
+        self.fail_on: str | None = None
+
+    async def get_embedding(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0, 0.0, 0.0]
+
+    async def get_embeddings(self, text: list[str]) -> list[list[float]]:
+        if self.fail_on and any(self.fail_on in t for t in text):
+            raise RuntimeError("upstream error")
+        return [await self.get_embedding(t) for t in text]
+
+    def get_dim(self) -> int:
+        return DIM
+
+
+async def _pieces(text: str):
+    rng = random.Random(0)
+    pos = 0
+    while pos < len(text):
+        step = rng.randint(1, 700)
+        yield text[pos : pos + step]
+        pos += step
+
+
+@pytest.mark.asyncio
+async def test_fixed_size_stream_matches_full_text_chunking():
+    chunker = FixedSizeChunker()
+    expected = await chunker.chunk(TEXT, chunk_size=128, chunk_overlap=16)
+
+    chunks = [
+        chunk
+        async for chunk in chunker.chunk_stream(
+            _pieces(TEXT),
+            chunk_size=128,
+            chunk_overlap=16,
+        )
+    ]
+
+    assert chunks == expected
+
+
+@pytest.mark.asyncio
+async def test_recursive_stream_covers_text_within_chunk_size():
+    chunker = RecursiveCharacterChunker()
+    chunks = [
+        chunk
+        async for chunk in chunker.chunk_stream(
+            _pieces(TEXT),
+            chunk_size=200,
+            chunk_overlap=20,
+        )
+    ]
+
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    joined = "".join(chunks)
+    for i in range(400):
+        assert f"sentence number {i}." in joined
+
+
+@pytest.mark.asyncio
+async def test_text_parser_stream_detects_encoding(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_parser, "STREAM_BLOCK_SIZE", 1000)
+    path = tmp_path / "doc.txt"
+    content = TEXT.encode("gbk")
+    path.write_bytes(content)
+    parser = TextParser()
+
+    segments = [s async for s in parser.parse_stream(str(path), "doc.txt")]
+
+    assert len(segments) > 1
+    assert (
+        "".join(s.text for s in segments)
+        == (await parser.parse(content, "doc.txt")).text
+    )
+    assert segments[-1].current == segments[-1].total == len(content)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["utf-8", "gbk"])
+async def test_text_parser_detects_encoding_from_a_prefix(
+    tmp_path, monkeypatch, encoding
+):
+    monkeypatch.setattr(text_parser, "DETECT_ENCODING_BYTES", 1001)
+    path = tmp_path / "doc.txt"
+    path.write_bytes(TEXT.encode(encoding))
+
+    assert text_parser._detect_encoding(str(path)) == encoding
+
+    # Content that does not match the detected encoding fails the parse
+    path.write_bytes(TEXT.encode(encoding) + "尾".encode("utf-16"))
+    with pytest.raises(ValueError):
+        async for _ in TextParser().parse_stream(str(path), "doc.txt"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_text_parser_switches_encoding_after_an_ascii_prefix(tmp_path):
+    path = tmp_path / "doc.txt"
+    ascii_head = "plain ascii line\n" * (text_parser.DETECT_ENCODING_BYTES // 17 + 100)
+    content = (ascii_head + TEXT).encode("gbk")
+    assert len(ascii_head) > text_parser.DETECT_ENCODING_BYTES
+    path.write_bytes(content)
+    parser = TextParser()
+
+    segments = [s async for s in parser.parse_stream(str(path), "doc.txt")]
+
+    assert "".join(s.text for s in segments) == ascii_head + TEXT
+    assert (await parser.parse(content, "doc.txt")).text == ascii_head + TEXT
+    assert segments[-1].current == segments[-1].total == len(content)
+
+
+@pytest_asyncio.fixture
+async def helper(tmp_path):
+    kb_db = KBSQLiteDatabase(str(tmp_path / "kb.db"))
+    await kb_db.initialize()
+    kb = KnowledgeBase(kb_id="kb", kb_name="kb", embedding_provider_id="ep")
+    async with kb_db.get_db() as session, session.begin():
+        session.add(kb)
+    provider_manager = MagicMock()
+    provider_manager.get_provider_by_id = AsyncMock(
+        return_value=FakeEmbeddingProvider(),
+    )
+    helper = KBHelper(
+        kb_db=kb_db,
+        kb=kb,
+        provider_manager=provider_manager,
+        kb_root_dir=str(tmp_path / "kbs"),
+        chunker=FixedSizeChunker(),
+    )
+    yield helper
+    await helper.terminate()
+    await kb_db.close()
+
+
+@pytest.mark.asyncio
+async def test_streaming_upload_inserts_chunks_in_windows(helper, tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_text(TEXT, encoding="utf-8")
+    expected = await helper.chunker.chunk(TEXT, chunk_size=256, chunk_overlap=32)
+    progress = []
+
+    async def on_progress(stage, current, total):
+        progress.append((stage, current, total))
+
+    doc = await helper.upload_document(
+        file_name="doc.md",
+        file_content=None,
+        file_type="md",
+        chunk_size=256,
+        chunk_overlap=32,
+        batch_size=4,
+        tasks_limit=2,
+        progress_callback=on_progress,
+        file_path=str(path),
+    )
+
+    assert doc.chunk_count == len(expected)
+    assert doc.file_size == len(TEXT.encode("utf-8"))
+    chunks = await helper.get_chunks_by_doc_id(doc.doc_id, limit=None)
+    chunks.sort(key=lambda c: c["chunk_index"])
+    assert [c["content"] for c in chunks] == expected
+    assert [c["chunk_index"] for c in chunks] == list(range(len(expected)))
+    assert sum(stage == "embedding" for stage, _, _ in progress) > 1
+
+
+@pytest.mark.asyncio
+async def test_failed_streaming_upload_removes_inserted_chunks(
+    helper, tmp_path, monkeypatch
+):
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    ep = await helper.get_ep()
+    ep.fail_on = "sentence number 300."
+    closed = []
+    parse_stream = TextParser.parse_stream
+
+    async def tracked_parse_stream(self, file_path, file_name):
+        try:
+            async for segment in parse_stream(self, file_path, file_name):
+                yield segment
+        finally:
+            closed.append(file_name)
+
+    monkeypatch.setattr(TextParser, "parse_stream", tracked_parse_stream)
+    monkeypatch.setattr(text_parser, "STREAM_BLOCK_SIZE", 1000)
+
+    with pytest.raises(Exception):
+        await helper.upload_document(
+            file_name="doc.txt",
+            file_content=None,
+            file_type="txt",
+            chunk_size=256,
+            chunk_overlap=32,
+            batch_size=4,
+            tasks_limit=1,
+            max_retries=1,
+            file_path=str(path),
+        )
+
+    vec_db = await helper.get_vec_db()
+    assert await vec_db.count_documents() == 0
+    assert await helper.list_documents() == []
+    assert helper.sparse_index.doc_count == 0
+    # 解析器的生成器在上传失败时立即关闭
+    assert closed == ["doc.txt"]
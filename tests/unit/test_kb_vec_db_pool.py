@@ -0,0 +1,130 @@
+"""Tests for lazily loaded, LRU-evicted knowledge base vector stores."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+
+import astrbot.core.star  # noqa: F401  # resolves the provider <-> knowledge base import cycle
+from astrbot.core.knowledge_base.chunking.recursive import RecursiveCharacterChunker
+from astrbot.core.knowledge_base.kb_helper import KBHelper
+from astrbot.core.knowledge_base.models import KnowledgeBase
+from astrbot.core.knowledge_base.vec_db_pool import VecDBPool
+
+DIM = 16
+
+
+def _provider_manager():
+    embedding_provider = MagicMock()
+    embedding_provider.get_dim.return_value = DIM
+    provider_manager = MagicMock()
+    provider_manager.get_provider_by_id = AsyncMock(return_value=embedding_provider)
+    return provider_manager
+
+
+def _helper(tmp_path, name: str, pool: VecDBPool | None = None) -> KBHelper:
+    return KBHelper(
+        kb_db=MagicMock(),
+        kb=KnowledgeBase(kb_id=name, kb_name=name, embedding_provider_id="ep"),
+        provider_manager=_provider_manager(),
+        kb_root_dir=str(tmp_path),
+        chunker=RecursiveCharacterChunker(),
+        vec_db_pool=pool,
+    )
+
+
+async def _populate(helper: KBHelper, n: int = 50) -> np.ndarray:
+    vectors = np.random.default_rng(0).random((n, DIM), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vec_db = await helper.get_vec_db()
+    await vec_db.embedding_storage.insert_batch(vectors, list(range(n)))
+    await helper.terminate()
+    return vectors
+
+
+@pytest.mark.asyncio
+async def test_vec_db_is_loaded_lazily_with_mmap(tmp_path):
+    vectors = await _populate(_helper(tmp_path, "kb"))
+
+    helper = _helper(tmp_path, "kb")
+    await helper.initialize()
+    assert helper.vec_db is None
+
+    vec_db = await helper.get_vec_db()
+    storage = vec_db.embedding_storage
+    assert storage.is_mmapped
+    assert storage.vector_count == 50
+    _, indices = await storage.search(vectors[7:8].copy(), 1)
+    assert indices[0][0] == 7
+
+    # Writes promote the memory-mapped index to a regular in-memory index
+    await storage.delete([7])
+    assert not storage.is_mmapped
+    assert storage.vector_count == 49
+    await helper.terminate()
+    assert helper.vec_db is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_vec_db_is_evicted(tmp_path):
+    for name in ("a", "b", "c"):
+        await _populate(_helper(tmp_path, name))
+
+    pool = VecDBPool()
+    pool.memory_budget = 1
+    a, b, c = (_helper(tmp_path, name, pool) for name in ("a", "b", "c"))
+
+    await a.get_vec_db()
+    await b.get_vec_db()
+    assert a.vec_db is None
+    assert pool.loaded_kb_ids == ["b"]
+
+    # A vector store in use is never evicted
+    async with b.use_vec_db():
+        await c.get_vec_db()
+        assert b.vec_db is not None
+    assert pool.loaded_kb_ids == ["b", "c"]
+
+    await a.get_vec_db()
+    assert pool.loaded_kb_ids == ["a"]
+    for helper in (a, b, c):
+        await helper.terminate()
+    assert pool.loaded_kb_ids == []
+
+
+@pytest.mark.asyncio
+async def test_unlimited_budget_keeps_everything_loaded(tmp_path):
+    pool = VecDBPool(memory_budget_mb=0)
+    helpers = [_helper(tmp_path, name, pool) for name in ("a", "b")]
+    for helper in helpers:
+        await helper.get_vec_db()
+    assert pool.loaded_kb_ids == ["a", "b"]
+    for helper in helpers:
+        await helper.terminate()
+
+
+@pytest.mark.asyncio
+async def test_enforce_budget_skips_vec_dbs_unloaded_concurrently():
+    pool = VecDBPool()
+    pool.memory_budget = 1
+    helpers = {}
+    for name in ("a", "b", "c"):
+        helper = MagicMock()
+        helper.kb.kb_id = name
+        helper.vec_db_in_use = False
+        helper.vec_db_memory_usage.return_value = 1
+        helpers[name] = helper
+        pool.touch(helper)
+
+    async def unload_a():
+        # b is unloaded by another task while a is being unloaded
+        pool.discard("a")
+        pool.discard("b")
+
+    helpers["a"].unload_vec_db = AsyncMock(side_effect=unload_a)
+    helpers["b"].unload_vec_db = AsyncMock()
+
+    await pool.enforce_budget()
+
+    helpers["b"].unload_vec_db.assert_not_awaited()
+    assert pool.loaded_kb_ids == ["c"]
@@ -0,0 +1,141 @@
+"""Tests for the compiled keyword content safety strategy."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from astrbot.core.message.components import Plain
+from astrbot.core.message.message_event_result import (
+    MessageChain,
+    MessageEventResult,
+    ResultContentType,
+)
+from astrbot.core.pipeline.content_safety_check.stage import ContentSafetyCheckStage
+from astrbot.core.pipeline.content_safety_check.strategies.keywords import (
+    AhoCorasick,
+    KeywordsStrategy,
+)
+from astrbot.core.pipeline.content_safety_check.strategies.strategy import (
+    StrategySelector,
+)
+from astrbot.core.pipeline.result_decorate.stage import ResultDecorateStage
+
+
+def test_literal_keywords_report_the_matched_term():
+    strategy = KeywordsStrategy(["apple", "pineapple", "敏感词"])
+
+    assert strategy.check("hello world") == (True, "")
+    ok, info = strategy.check("I like pineapples")
+    assert not ok
+    assert "pineapple" in info or "apple" in info
+    assert strategy.check("这里有敏感词")[1].endswith("敏感词")
+
+
+def test_automaton_finds_keywords_that_are_suffixes_of_other_paths():
+    automaton = AhoCorasick(["he", "she", "hers", "abcd", "bc"])
+
+    assert automaton.search("ushers")[0] == "she"
+    assert automaton.search("xabcx")[0] == "bc"
+    assert automaton.search("nothing")[0] is None
+
+
+def test_regex_keywords_keep_re_search_semantics():
+    strategy = KeywordsStrategy([r"\d{6,}", "foo.*bar", r"(a)\1", "(?i)secret"])
+
+    assert strategy.check("call 12345") == (True, "")
+    assert strategy.check("call 1234567")[1].endswith(r"\d{6,}")
+    assert not strategy.check("foo and bar")[0]
+    assert not strategy.check("xaax")[0]
+    assert not strategy.check("a SECRET")[0]
+
+
+def test_invalid_regex_is_matched_literally():
+    strategy = KeywordsStrategy(["bad(", ""])
+
+    assert strategy.check("anything") == (True, "")
+    assert not strategy.check("a bad( pattern")[0]
+
+
+def test_matchers_are_shared_and_rebuilt_when_keywords_change():
+    first = KeywordsStrategy(["x", "y"])
+    second = KeywordsStrategy(["x", "y"])
+    assert first.matcher is second.matcher
+
+    first.update_keywords(["z"])
+    assert first.matcher is not second.matcher
+    assert first.check("x") == (True, "")
+    assert not first.check("z")[0]
+
+
+def test_stream_checker_matches_keywords_split_across_chunks():
+    checker = KeywordsStrategy(["forbidden", r"\d{4}"]).create_stream_checker()
+
+    assert checker.feed("this is for") == (True, "")
+    assert not checker.feed("bidden text")[0]
+
+    checker = KeywordsStrategy([r"\d{4}"]).create_stream_checker()
+    assert checker.feed("code 12")[0]
+    assert not checker.feed("34")[0]
+
+
+def _safety_stage() -> ContentSafetyCheckStage:
+    stage = ContentSafetyCheckStage()
+    stage.strategy_selector = StrategySelector(
+        {
+            "internal_keywords": {"enable": True, "extra_keywords": ["badword"]},
+            "baidu_aip": {"enable": False},
+        },
+    )
+    return stage
+
+
+def _texts(chains: list[MessageChain]) -> list[str]:
+    return ["".join(c.text for c in ch.chain if isinstance(c, Plain)) for ch in chains]
+
+
+@pytest.mark.asyncio
+async def test_guard_stream_stops_forwarding_after_a_match():
+    stage = _safety_stage()
+    consumed = []
+
+    async def stream():
+        for text in ("hello ", "bad", "word here", "more"):
+            consumed.append(text)
+            yield MessageChain().message(text)
+
+    chains = [chain async for chain in stage.guard_stream(None, stream())]
+    texts = _texts(chains)
+
+    assert texts[:2] == ["hello ", "bad"]
+    assert "已被屏蔽" in texts[2]
+    assert len(texts) == 3
+    assert consumed == ["hello ", "bad", "word here", "more"]
+
+
+@pytest.mark.asyncio
+async def test_result_decorate_stage_guards_streaming_results():
+    stage = ResultDecorateStage()
+    stage.content_safe_check_reply = True
+    stage.content_safe_check_stage = _safety_stage()
+
+    async def stream():
+        for text in ("hello ", "badword", "more"):
+            yield MessageChain().message(text)
+
+    original = stream()
+    result = (
+        MessageEventResult()
+        .set_result_content_type(ResultContentType.STREAMING_RESULT)
+        .set_async_stream(original)
+    )
+    event = MagicMock()
+    event.get_result.return_value = result
+
+    async for _ in stage.process(event):
+        pass
+
+    assert result.async_stream is not original
+    texts = _texts([chain async for chain in result.async_stream])
+    assert texts[0] == "hello "
+    assert "已被屏蔽" in texts[1]
+    assert len(texts) == 2
@@ -0,0 +1,149 @@
+"""Tests for the content-addressed media cache."""
+
+import asyncio
+import base64
+import os
+
+import pytest
+
+from astrbot.core.message import components
+from astrbot.core.message.components import Image
+from astrbot.core.utils import media_utils
+from astrbot.core.utils.media_cache import MediaCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASTRBOT_ROOT", str(tmp_path))
+    os.makedirs(tmp_path / "data" / "temp")
+    cache = MediaCache()
+    monkeypatch.setattr(components, "media_cache", cache)
+    monkeypatch.setattr(media_utils, "media_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_produce_once(cache):
+    calls = 0
+
+    async def producer(path):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        with open(path, "wb") as f:
+            f.write(b"data")
+
+    key = cache.key("url", "https://example.com/a.jpg")
+    paths = await asyncio.gather(
+        *(cache.fetch(key, ".jpg", producer) for _ in range(5))
+    )
+
+    assert calls == 1
+    assert len(set(paths)) == 1
+    assert await cache.fetch(key, ".jpg", producer) == paths[0]
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted(cache):
+    cache.configure(max_size_mb=250 / 1024**2)
+
+    async def write(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+
+    a = await cache.fetch("a", ".bin", write)
+    b = await cache.fetch("b", ".bin", write)
+    await cache.fetch("a", ".bin", write)  # 访问 a, b 成为最久未使用的条目
+    await cache.fetch("c", ".bin", write)
+
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+    assert cache.stats()["size"] == 200
+
+
+@pytest.mark.asyncio
+async def test_expired_url_entries_are_fetched_again(cache):
+    calls = 0
+
+    async def write(path):
+        nonlocal calls
+        calls += 1
+        with open(path, "wb") as f:
+            f.write(b"data")
+
+    await cache.fetch("url", ".jpg", write, ttl=60)
+    await cache.fetch("url", ".jpg", write, ttl=60)
+    await cache.fetch("url", ".jpg", write, ttl=0)
+
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_base64_image_is_decoded_once_and_checked_out_per_caller(cache):
+    image = Image.fromBytes(b"\xff\xd8fake jpeg")
+
+    first = await image.convert_to_file_path()
+    second = await image.convert_to_file_path()
+    os.remove(first)
+
+    assert first != second
+    with open(second, "rb") as f:
+        assert f.read() == b"\xff\xd8fake jpeg"
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["misses"] == 1
+    # 调用方删除自己的副本不影响缓存
+    assert await image.convert_to_file_path() != second
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_conversions_reuse_results_for_identical_content(cache, tmp_path):
+    calls = 0
+
+    async def convert(path):
+        nonlocal calls
+        calls += 1
+        with open(path, "wb") as f:
+            f.write(b"converted")
+        return path
+
+    sources = []
+    for name in ("a.mp3", "b.mp3"):
+        source = tmp_path / name
+        source.write_bytes(b"same audio")
+        sources.append(str(source))
+
+    outputs = [
+        await media_utils._convert_with_cache(
+            s, "opus", ".opus", "media_audio", convert
+        )
+        for s in sources
+    ]
+
+    assert calls == 1
+    assert outputs[0] != outputs[1]
+    assert all(o.endswith(".opus") for o in outputs)
+
+
+def test_base64_of_reencodes_modified_files(cache, tmp_path):
+    path = tmp_path / "img.jpg"
+    path.write_bytes(b"one")
+    assert cache.base64_of(str(path)) == base64.b64encode(b"one").decode()
+
+    path.write_bytes(b"three")
+    assert cache.base64_of(str(path)) == base64.b64encode(b"three").decode()
+
+
+@pytest.mark.asyncio
+async def test_prune_forgets_files_removed_externally(cache):
+    async def write(path):
+        with open(path, "wb") as f:
+            f.write(b"data")
+
+    path = await cache.fetch("a", ".bin", write)
+    os.remove(path)
+    cache.prune()
+
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["size"] == 0
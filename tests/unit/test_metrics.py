@@ -0,0 +1,124 @@
+"""Tests for the buffered platform statistics writer in Metric."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlmodel import select
+
+from astrbot.core.db.po import PlatformStat
+from astrbot.core.utils import metrics
+from astrbot.core.utils.metrics import Metric
+
+
+@pytest_asyncio.fixture
+async def stats_db(temp_db, monkeypatch):
+    await temp_db.initialize()
+    monkeypatch.setattr(metrics, "db_helper", temp_db)
+    monkeypatch.setattr(Metric, "_pending_stats", {})
+    monkeypatch.setattr(Metric, "_flush_task", None)
+    monkeypatch.setattr(Metric, "_inflight_writes", set())
+    yield temp_db
+    if Metric._flush_task and not Metric._flush_task.done():
+        Metric._flush_task.cancel()
+
+
+async def _load_counts(db) -> dict[str, int]:
+    async with db.get_db() as session:
+        result = await session.execute(select(PlatformStat))
+        return {s.platform_id: s.count for s in result.scalars().all()}
+
+
+def _hour() -> datetime:
+    return datetime.now().replace(minute=0, second=0, microsecond=0)
+
+
+@pytest.mark.asyncio
+async def test_platform_stats_are_aggregated_in_memory(stats_db):
+    for _ in range(3):
+        Metric._record_platform_stat("qq", "aiocqhttp")
+    Metric._record_platform_stat("tg", "telegram")
+
+    assert Metric._pending_stats == {
+        (_hour(), "qq", "aiocqhttp"): 3,
+        (_hour(), "tg", "telegram"): 1,
+    }
+    assert await stats_db.count_platform_stats() == 0
+
+    await Metric.flush_platform_stats()
+
+    assert Metric._pending_stats == {}
+    assert await _load_counts(stats_db) == {"qq": 3, "tg": 1}
+
+
+@pytest.mark.asyncio
+async def test_batched_flush_accumulates_existing_rows(stats_db):
+    await stats_db.insert_platform_stats("qq", "aiocqhttp", count=2)
+
+    Metric._record_platform_stat("qq", "aiocqhttp")
+    await Metric.flush_platform_stats()
+    Metric._record_platform_stat("qq", "aiocqhttp")
+    await Metric.shutdown()
+
+    assert await _load_counts(stats_db) == {"qq": 4}
+    assert Metric._flush_task is None
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_pending_stats(stats_db, monkeypatch):
+    async def failing_batch(stats):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(stats_db, "insert_platform_stats_batch", failing_batch)
+    Metric._record_platform_stat("qq", "aiocqhttp")
+    await Metric.flush_platform_stats()
+    Metric._record_platform_stat("qq", "aiocqhttp")
+
+    assert Metric._pending_stats == {(_hour(), "qq", "aiocqhttp"): 2}
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_an_in_flight_write(stats_db, monkeypatch):
+    monkeypatch.setattr(metrics, "STATS_FLUSH_INTERVAL", 0)
+    insert_batch = stats_db.insert_platform_stats_batch
+    writing = asyncio.Event()
+
+    async def slow_batch(stats):
+        writing.set()
+        await asyncio.sleep(0.05)
+        await insert_batch(stats)
+
+    monkeypatch.setattr(stats_db, "insert_platform_stats_batch", slow_batch)
+    Metric._record_platform_stat("qq", "aiocqhttp")
+    await writing.wait()
+    Metric._record_platform_stat("qq", "aiocqhttp")
+    await Metric.shutdown()
+
+    assert await _load_counts(stats_db) == {"qq": 2}
+    assert Metric._pending_stats == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried(stats_db, monkeypatch):
+    monkeypatch.setattr(metrics, "STATS_FLUSH_INTERVAL", 0.01)
+    insert_batch = stats_db.insert_platform_stats_batch
+    attempts = 0
+
+    async def flaky_batch(stats):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("database is locked")
+        await insert_batch(stats)
+
+    monkeypatch.setattr(stats_db, "insert_platform_stats_batch", flaky_batch)
+    Metric._record_platform_stat("qq", "aiocqhttp")
+    for _ in range(100):
+        if attempts >= 2 and not Metric._inflight_writes:
+            break
+        await asyncio.sleep(0.01)
+
+    assert attempts == 2
+    assert await _load_counts(stats_db) == {"qq": 1}
+    assert Metric._pending_stats == {}
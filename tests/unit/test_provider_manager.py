@@ -0,0 +1,215 @@
+"""Tests for concurrent and lazy provider initialization."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import astrbot.core.star  # noqa: F401  # resolves the provider <-> knowledge base import cycle
+from astrbot.core.provider import manager as manager_module
+from astrbot.core.provider.entities import ProviderType
+from astrbot.core.provider.func_tool_manager import MCPInitSummary
+from astrbot.core.provider.manager import ProviderManager
+from astrbot.core.provider.provider import EmbeddingProvider, Provider, TTSProvider
+from astrbot.core.provider.register import (
+    provider_cls_map,
+    provider_registry,
+    register_provider_adapter,
+)
+from astrbot.core.star.context import Context
+
+CHAT_TYPE = "test_chat_completion"
+TTS_TYPE = "test_slow_tts"
+EMBEDDING_TYPE = "test_embedding"
+
+
+class FakeChatProvider(Provider):
+    async def text_chat(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_current_key(self) -> str:
+        return ""
+
+    def set_key(self, key: str) -> None:
+        pass
+
+    async def get_models(self) -> list[str]:
+        return []
+
+
+class SlowTTSProvider(TTSProvider):
+    running = 0
+    max_running = 0
+
+    async def initialize(self) -> None:
+        SlowTTSProvider.running += 1
+        SlowTTSProvider.max_running = max(
+            SlowTTSProvider.max_running,
+            SlowTTSProvider.running,
+        )
+        await asyncio.sleep(self.provider_config["delay"])
+        SlowTTSProvider.running -= 1
+
+    async def get_audio(self, text: str) -> str:
+        return ""
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    async def get_embedding(self, text: str) -> list[float]:
+        return [0.0]
+
+    async def get_embeddings(self, text: list[str]) -> list[list[float]]:
+        return [[0.0] for _ in text]
+
+    def get_dim(self) -> int:
+        return 1
+
+
+@pytest.fixture(autouse=True)
+def fake_adapters(monkeypatch):
+    for type_name, cls, provider_type in (
+        (CHAT_TYPE, FakeChatProvider, ProviderType.CHAT_COMPLETION),
+        (TTS_TYPE, SlowTTSProvider, ProviderType.TEXT_TO_SPEECH),
+        (EMBEDDING_TYPE, FakeEmbeddingProvider, ProviderType.EMBEDDING),
+    ):
+        register_provider_adapter(type_name, "test", provider_type)(cls)
+    SlowTTSProvider.running = SlowTTSProvider.max_running = 0
+    monkeypatch.setattr(manager_module.sp, "get_async", AsyncMock(return_value=None))
+    monkeypatch.setattr(
+        manager_module.sp, "range_get_async", AsyncMock(return_value=[])
+    )
+    yield
+    for type_name in (CHAT_TYPE, TTS_TYPE, EMBEDDING_TYPE):
+        provider_registry.remove(provider_cls_map.pop(type_name))
+
+
+def _provider(provider_id: str, type_name: str, provider_type: str, **extra) -> dict:
+    return {
+        "id": provider_id,
+        "type": type_name,
+        "provider_type": provider_type,
+        "enable": True,
+        **extra,
+    }
+
+
+def _manager(providers: list[dict], monkeypatch, **config) -> ProviderManager:
+    conf = {
+        "provider": providers,
+        "provider_settings": {},
+        "provider_tts_settings": {},
+        **config,
+    }
+    acm = MagicMock()
+    acm.confs = {"default": conf}
+    manager = ProviderManager(acm, MagicMock(), MagicMock())
+    monkeypatch.setattr(
+        manager.llm_tools,
+        "init_mcp_clients",
+        AsyncMock(return_value=MCPInitSummary(total=0, success=0, failed=[])),
+    )
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_providers_initialize_concurrently_and_register_in_config_order(
+    monkeypatch,
+):
+    providers = [
+        _provider(f"tts_{i}", TTS_TYPE, "text_to_speech", delay=0.05 - i * 0.01)
+        for i in range(5)
+    ]
+    manager = _manager(providers, monkeypatch, provider_init_concurrency=2)
+
+    await manager.initialize()
+
+    assert SlowTTSProvider.max_running == 2
+    assert [p.provider_config["id"] for p in manager.tts_provider_insts] == [
+        f"tts_{i}" for i in range(5)
+    ]
+    assert manager.curr_tts_provider_inst is manager.inst_map["tts_0"]
+    assert all(t["status"] == "loaded" for t in manager.load_timings.values())
+    assert manager.load_timings["tts_0"]["initialize"] >= 40
+
+
+@pytest.mark.asyncio
+async def test_lazy_providers_load_on_first_use(monkeypatch):
+    providers = [
+        _provider("chat", CHAT_TYPE, "chat_completion"),
+        _provider("tts_default", TTS_TYPE, "text_to_speech", delay=0),
+        _provider("tts_other", TTS_TYPE, "text_to_speech", delay=0),
+        _provider("embedding", EMBEDDING_TYPE, "embedding"),
+    ]
+    manager = _manager(
+        providers,
+        monkeypatch,
+        provider_lazy_load=True,
+        provider_tts_settings={"provider_id": "tts_default"},
+    )
+
+    await manager.initialize()
+
+    assert set(manager.inst_map) == {"chat", "tts_default"}
+    assert manager.load_timings["tts_other"]["status"] == "lazy"
+    assert manager.get_using_provider(ProviderType.CHAT_COMPLETION).meta().id == "chat"
+
+    # 不需要异步初始化的提供商可以通过同步接口载入
+    embedding = manager.get_provider_instance("embedding")
+    assert isinstance(embedding, FakeEmbeddingProvider)
+    assert manager.embedding_provider_insts == [embedding]
+
+    tts = await manager.get_provider_by_id("tts_other")
+    assert isinstance(tts, SlowTTSProvider)
+    assert manager.load_timings["tts_other"]["status"] == "loaded"
+    assert await manager.get_provider_by_id("tts_other") is tts
+    assert len(manager.tts_provider_insts) == 2
+
+
+@pytest.mark.asyncio
+async def test_terminating_a_lazy_provider_drops_its_config(monkeypatch):
+    providers = [
+        _provider("chat", CHAT_TYPE, "chat_completion"),
+        _provider("embedding", EMBEDDING_TYPE, "embedding"),
+    ]
+    manager = _manager(providers, monkeypatch, provider_lazy_load=True)
+    await manager.initialize()
+
+    await manager.terminate_provider("embedding")
+
+    assert await manager.get_provider_by_id("embedding") is None
+    assert "embedding" not in manager.load_timings
+
+
+@pytest.mark.asyncio
+async def test_lazy_providers_can_be_listed_and_switched_to(monkeypatch):
+    providers = [
+        _provider("chat", CHAT_TYPE, "chat_completion"),
+        _provider("chat_other", CHAT_TYPE, "chat_completion"),
+        _provider("tts_default", TTS_TYPE, "text_to_speech", delay=0),
+        _provider("tts_other", TTS_TYPE, "text_to_speech", delay=0),
+    ]
+    manager = _manager(
+        providers,
+        monkeypatch,
+        provider_lazy_load=True,
+        provider_settings={"default_provider_id": "chat"},
+        provider_tts_settings={"provider_id": "tts_default"},
+    )
+    monkeypatch.setattr(manager_module.sp, "put_async", AsyncMock())
+    await manager.initialize()
+    assert set(manager.inst_map) == {"chat", "tts_default"}
+
+    # 同步枚举会载入懒加载的提供商, 与 /provider 指令看到的列表一致
+    context = SimpleNamespace(provider_manager=manager)
+    chat_ids = [p.meta().id for p in Context.get_all_providers(context)]
+    assert chat_ids == ["chat", "chat_other"]
+
+    await manager.ensure_providers_loaded(ProviderType.TEXT_TO_SPEECH)
+    tts_ids = [p.meta().id for p in Context.get_all_tts_providers(context)]
+    assert tts_ids == ["tts_default", "tts_other"]
+
+    await manager.set_provider(chat_ids[1], ProviderType.CHAT_COMPLETION)
+    assert manager.curr_provider_inst is manager.inst_map["chat_other"]
+    await manager.set_provider(tts_ids[1], ProviderType.TEXT_TO_SPEECH)
+    assert manager.curr_tts_provider_inst is manager.inst_map["tts_other"]
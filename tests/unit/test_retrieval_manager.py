@@ -0,0 +1,194 @@
+"""Tests for concurrent retrieval in RetrievalManager."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import astrbot.core.star  # noqa: F401  # resolves the provider <-> knowledge base import cycle
+from astrbot.core.knowledge_base.retrieval.manager import RetrievalManager
+
+DELAY = 0.2
+
+
+class FakeEmbeddingProvider:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get_model(self) -> str:
+        return "fake-embedding"
+
+    async def get_embedding(self, text: str) -> list[float]:
+        self.calls += 1
+        await asyncio.sleep(DELAY)
+        return [1.0, 0.0]
+
+
+class FakeVecDB:
+    def __init__(self, embedding_provider: FakeEmbeddingProvider) -> None:
+        self.embedding_provider = embedding_provider
+        self.rerank_provider = None
+        self.query_embeddings = []
+
+    async def retrieve(self, query_embedding=None, **kwargs):
+        self.query_embeddings.append(query_embedding)
+        await asyncio.sleep(DELAY)
+        return []
+
+
+def _kb_options(vec_dbs: dict[str, FakeVecDB]) -> dict:
+    return {
+        kb_id: {"vec_db": vec_db, "top_k_dense": 5} for kb_id, vec_db in vec_dbs.items()
+    }
+
+
+def _manager(sparse_delay: float = 0.0) -> RetrievalManager:
+    async def sparse_retrieve(**kwargs):
+        sparse_retriever.calls += 1
+        await asyncio.sleep(sparse_delay)
+        return []
+
+    sparse_retriever = MagicMock()
+    sparse_retriever.calls = 0
+    sparse_retriever.retrieve = sparse_retrieve
+    rank_fusion = MagicMock()
+    rank_fusion.fuse = AsyncMock(return_value=[])
+    kb_db = MagicMock()
+    kb_db.get_documents_with_metadata_batch = AsyncMock(return_value={})
+    return RetrievalManager(sparse_retriever, rank_fusion, kb_db)
+
+
+@pytest.mark.asyncio
+async def test_query_is_embedded_once_per_provider():
+    provider_a, provider_b = FakeEmbeddingProvider(), FakeEmbeddingProvider()
+    vec_dbs = {
+        "kb1": FakeVecDB(provider_a),
+        "kb2": FakeVecDB(provider_a),
+        "kb3": FakeVecDB(provider_b),
+    }
+
+    start = time.perf_counter()
+    await _manager()._dense_retrieve("hello", list(vec_dbs), _kb_options(vec_dbs))
+    elapsed = time.perf_counter() - start
+
+    assert provider_a.calls == 1
+    assert provider_b.calls == 1
+    assert all(db.query_embeddings == [[1.0, 0.0]] for db in vec_dbs.values())
+    # One embedding round plus one concurrent search round
+    assert elapsed < DELAY * 3
+
+
+@pytest.mark.asyncio
+async def test_failed_embedding_only_skips_affected_bases():
+    class BrokenProvider(FakeEmbeddingProvider):
+        async def get_embedding(self, text: str) -> list[float]:
+            raise RuntimeError("boom")
+
+    vec_dbs = {
+        "ok": FakeVecDB(FakeEmbeddingProvider()),
+        "broken": FakeVecDB(BrokenProvider()),
+    }
+    await _manager()._dense_retrieve("hello", list(vec_dbs), _kb_options(vec_dbs))
+    assert vec_dbs["ok"].query_embeddings == [[1.0, 0.0]]
+    assert vec_dbs["broken"].query_embeddings == []
+
+
+def _helpers(provider: FakeEmbeddingProvider, kb_ids: list[str]) -> dict:
+    helpers = {}
+    for version, kb_id in enumerate(kb_ids):
+        vec_db = FakeVecDB(provider)
+
+        @asynccontextmanager
+        async def use_vec_db(vec_db=vec_db):
+            yield vec_db
+
+        helper = MagicMock()
+        helper.use_vec_db = use_vec_db
+        helper.kb.top_k_dense = 5
+        helper.version = version
+        helpers[kb_id] = helper
+    return helpers
+
+
+@pytest.mark.asyncio
+async def test_dense_and_sparse_legs_run_concurrently():
+    provider = FakeEmbeddingProvider()
+    helpers = _helpers(provider, ["kb1", "kb2"])
+
+    start = time.perf_counter()
+    await _manager(sparse_delay=DELAY * 2).retrieve(
+        "hello",
+        list(helpers),
+        helpers,
+    )
+    elapsed = time.perf_counter() - start
+
+    # Dense leg (embed + search) and sparse leg both take ~2 * DELAY
+    assert elapsed < DELAY * 3
+    assert provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_query_embeddings_are_cached():
+    provider = FakeEmbeddingProvider()
+    vec_dbs = {"kb": FakeVecDB(provider)}
+    manager = _manager()
+
+    await manager._dense_retrieve("what is  astrbot", ["kb"], _kb_options(vec_dbs))
+    await manager._dense_retrieve(" what is astrbot ", ["kb"], _kb_options(vec_dbs))
+
+    assert provider.calls == 1
+    stats = manager.cache_stats()["query_embedding"]
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_result_cache_is_invalidated_by_kb_version():
+    provider = FakeEmbeddingProvider()
+    helpers = _helpers(provider, ["kb"])
+    manager = _manager()
+
+    await manager.retrieve("hello", ["kb"], helpers)
+    await manager.retrieve("hello", ["kb"], helpers)
+    assert manager.sparse_retriever.calls == 1
+
+    helpers["kb"].version += 1
+    await manager.retrieve("hello", ["kb"], helpers)
+    assert manager.sparse_retriever.calls == 2
+    assert manager.cache_stats()["retrieval_result"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_results_are_not_cached_when_a_base_fails():
+    class BrokenVecDB(FakeVecDB):
+        async def retrieve(self, query_embedding=None, **kwargs):
+            raise RuntimeError("index unavailable")
+
+    provider = FakeEmbeddingProvider()
+    helpers = _helpers(provider, ["ok", "broken", "unloadable"])
+    broken = BrokenVecDB(provider)
+
+    @asynccontextmanager
+    async def use_broken_vec_db():
+        yield broken
+
+    @asynccontextmanager
+    async def use_unloadable_vec_db():
+        raise RuntimeError("load failed")
+        yield
+
+    helpers["broken"].use_vec_db = use_broken_vec_db
+    helpers["unloadable"].use_vec_db = use_unloadable_vec_db
+    manager = _manager()
+
+    for kb_ids in (["ok", "broken"], ["ok", "unloadable"]):
+        await manager.retrieve("hello", kb_ids, helpers)
+        await manager.retrieve("hello", kb_ids, helpers)
+    assert manager.sparse_retriever.calls == 4
+    assert manager.cache_stats()["retrieval_result"]["hits"] == 0
+
+    await manager.retrieve("hello", ["ok"], helpers)
+    await manager.retrieve("hello", ["ok"], helpers)
+    assert manager.cache_stats()["retrieval_result"]["hits"] == 1
@@ -0,0 +1,105 @@
+"""Tests for the cached, write-behind SharedPreferences."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+
+from astrbot.core.db.sqlite import SQLiteDatabase
+from astrbot.core.utils import shared_preferences
+from astrbot.core.utils.shared_preferences import SharedPreferences
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / "sp.db"))
+    await db.initialize()
+    yield db
+    await db.engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sp(db, tmp_path):
+    sp = SharedPreferences(db, json_storage_path=str(tmp_path / "sp.json"))
+    yield sp
+    await sp.flush()
+    sp._scheduler.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_cache_after_first_load(sp, db, monkeypatch):
+    await db.insert_preference_or_update("umo", "u1", "sel_conv_id", {"val": "c1"})
+    get_preferences = AsyncMock(wraps=db.get_preferences)
+    monkeypatch.setattr(db, "get_preferences", get_preferences)
+
+    assert await sp.session_get("u1", "sel_conv_id") == "c1"
+    assert await sp.session_get("u1", "sel_conv_id") == "c1"
+    assert await sp.session_get("u1", "missing", "default") == "default"
+    assert sp.get("sel_conv_id", scope="umo", scope_id="u1") == "c1"
+
+    assert get_preferences.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_puts_are_visible_immediately_and_written_in_one_batch(
+    sp, db, monkeypatch
+):
+    apply_changes = AsyncMock(wraps=db.apply_preference_changes)
+    monkeypatch.setattr(db, "apply_preference_changes", apply_changes)
+
+    for i in range(10):
+        await sp.put_async("plugin", "p", "counter", i)
+    await sp.put_async("plugin", "p", "other", {"a": [1]})
+
+    assert await sp.get_async("plugin", "p", "counter") == 9
+    await sp.flush()
+
+    apply_changes.assert_awaited_once()
+    assert len(apply_changes.await_args.args[0]) == 2
+    pref = await db.get_preference("plugin", "p", "counter")
+    assert pref.value == {"val": 9}
+
+
+@pytest.mark.asyncio
+async def test_returned_values_do_not_alias_the_cache(sp):
+    value = {"items": [1]}
+    await sp.global_put("conf", value)
+    value["items"].append(2)
+
+    got = await sp.global_get("conf")
+    got["items"].append(3)
+
+    assert await sp.global_get("conf") == {"items": [1]}
+
+
+@pytest.mark.asyncio
+async def test_remove_and_clear_keep_cache_and_database_coherent(sp, db):
+    await sp.session_put("u1", "a", 1)
+    await sp.session_put("u1", "b", 2)
+    await sp.session_remove("u1", "a")
+
+    assert await sp.session_get("u1", "a") is None
+    assert await db.get_preference("umo", "u1", "a") is None
+    assert (await db.get_preference("umo", "u1", "b")).value == {"val": 2}
+
+    await sp.clear_async("umo", "u1")
+    await sp.session_put("u1", "c", 3)
+
+    assert await sp.session_get("u1", "b") is None
+    assert [p.key for p in await sp.range_get_async("umo", "u1")] == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_unloaded_scopes_see_pending_writes(sp, db, monkeypatch):
+    await db.insert_preference_or_update("umo", "u2", "a", {"val": "old"})
+    monkeypatch.setattr(shared_preferences, "UMO_CACHE_MAX_SCOPES", 1)
+
+    await sp.session_put("u2", "a", "new")
+    await sp.session_put("u2", "b", "added")
+    assert await sp.session_get("u2", "a") == "new"
+
+    # 淘汰 u2 后重新载入, 尚未写入的变更依然可见
+    await sp.session_get("u3", "a")
+    assert ("umo", "u2") not in sp._umo_cache
+    assert await sp.session_get("u2", "a") == "new"
+    assert await sp.session_get("u2", "b") == "added"
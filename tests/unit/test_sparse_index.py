@@ -0,0 +1,151 @@
+"""Tests for the persistent BM25 sparse index."""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+
+from astrbot.core.db.vec_db.faiss_impl.document_storage import DocumentStorage
+from astrbot.core.knowledge_base.retrieval.sparse_index import SparseIndex
+
+
+@pytest_asyncio.fixture
+async def document_storage(tmp_path):
+    storage = DocumentStorage(str(tmp_path / "doc.db"))
+    await storage.initialize()
+    yield storage
+    await storage.close()
+
+
+async def _insert_chunks(storage: DocumentStorage, kb_doc_id: str, texts: list[str]):
+    return await storage.insert_documents_batch(
+        [f"{kb_doc_id}-{i}" for i in range(len(texts))],
+        texts,
+        [
+            {"kb_id": "kb", "kb_doc_id": kb_doc_id, "chunk_index": i}
+            for i in range(len(texts))
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_build_from_storage_and_search(tmp_path, document_storage):
+    ids = await _insert_chunks(
+        document_storage,
+        "doc-a",
+        ["apple banana", "cherry durian", "apple apple pie"],
+    )
+    index = SparseIndex(str(tmp_path / "sparse_index.msgpack"), stopwords=set())
+
+    await index.ensure_ready(document_storage)
+
+    assert index.doc_count == 3
+    hits = index.search("apple", top_k=5)
+    assert [int_id for int_id, _ in hits] == [ids[2], ids[0]]
+    assert (tmp_path / "sparse_index.msgpack").exists()
+
+
+@pytest.mark.asyncio
+async def test_incremental_updates_are_persisted(tmp_path, document_storage):
+    path = str(tmp_path / "sparse_index.msgpack")
+    ids_a = await _insert_chunks(document_storage, "doc-a", ["alpha beta"])
+    index = SparseIndex(path, stopwords=set())
+    await index.ensure_ready(document_storage)
+
+    ids_b = await _insert_chunks(document_storage, "doc-b", ["gamma", "gamma delta"])
+    await index.add_documents(ids_b, ["gamma", "gamma delta"], ["doc-b", "doc-b"])
+    assert {int_id for int_id, _ in index.search("gamma", 5)} == set(ids_b)
+
+    await index.remove_documents([ids_a[0]])
+    assert index.search("alpha", 5) == []
+    await index.flush()
+
+    reloaded = SparseIndex(path, stopwords=set())
+    await document_storage.delete_documents({"kb_doc_id": "doc-a"})
+    await reloaded.ensure_ready(document_storage)
+    assert reloaded.doc_count == 2
+    assert {int_id for int_id, _ in reloaded.search("gamma", 5)} == set(ids_b)
+
+    await reloaded.remove_by_kb_doc_id("doc-b")
+    assert reloaded.doc_count == 0
+    assert reloaded.search("gamma", 5) == []
+    await reloaded.unload()
+    await index.unload()
+
+
+@pytest.mark.asyncio
+async def test_incremental_updates_are_written_once(
+    tmp_path, document_storage, monkeypatch
+):
+    path = str(tmp_path / "sparse_index.msgpack")
+    await _insert_chunks(document_storage, "doc-a", ["alpha"])
+    index = SparseIndex(path, stopwords=set(), flush_interval=0.01)
+    await index.ensure_ready(document_storage)
+
+    writes = []
+    write_file = index._write_file
+    monkeypatch.setattr(
+        index, "_write_file", lambda payload: writes.append(write_file(payload))
+    )
+    for i in range(10):
+        await index.add_documents([100 + i], [f"word{i}"], ["doc-b"])
+    await index.remove_documents([100])
+    assert writes == []
+
+    await asyncio.sleep(0.1)
+    assert len(writes) == 1
+    reloaded = SparseIndex(path, stopwords=set())
+    assert await reloaded._load_locked()
+    assert reloaded.doc_count == 10
+
+
+@pytest.mark.asyncio
+async def test_unsaved_changes_are_rebuilt_after_a_crash(tmp_path, document_storage):
+    path = str(tmp_path / "sparse_index.msgpack")
+    ids = await _insert_chunks(document_storage, "doc-a", ["alpha", "beta"])
+    index = SparseIndex(path, stopwords=set())
+    await index.ensure_ready(document_storage)
+
+    # Replace a chunk without changing the chunk count, then "crash" before the flush
+    await document_storage.delete_documents({"kb_doc_id": "doc-a"})
+    ids = await _insert_chunks(document_storage, "doc-a", ["gamma", "beta"])
+    await index.remove_by_kb_doc_id("doc-a")
+    await index.add_documents(ids, ["gamma", "beta"], ["doc-a", "doc-a"])
+    index._cancel_flush_task()
+
+    reloaded = SparseIndex(path, stopwords=set())
+    await reloaded.ensure_ready(document_storage)
+    assert [int_id for int_id, _ in reloaded.search("gamma", 5)] == [ids[0]]
+    await reloaded.unload()
+    assert not (tmp_path / "sparse_index.msgpack.dirty").exists()
+
+
+@pytest.mark.asyncio
+async def test_out_of_sync_index_is_rebuilt(tmp_path, document_storage):
+    path = str(tmp_path / "sparse_index.msgpack")
+    await _insert_chunks(document_storage, "doc-a", ["one"])
+    index = SparseIndex(path, stopwords=set())
+    await index.ensure_ready(document_storage)
+
+    # Chunks written while the index was not maintained (e.g. a backup import)
+    await _insert_chunks(document_storage, "doc-b", ["two", "three"])
+
+    reloaded = SparseIndex(path, stopwords=set())
+    await reloaded.ensure_ready(document_storage)
+    assert reloaded.doc_count == 3
+    docs = await document_storage.get_documents(
+        metadata_filters={},
+        ids=[int_id for int_id, _ in reloaded.search("three", 5)],
+    )
+    assert json.loads(docs[0]["metadata"])["kb_doc_id"] == "doc-b"
+
+
+@pytest.mark.asyncio
+async def test_mutations_before_first_build_are_skipped(tmp_path):
+    index = SparseIndex(str(tmp_path / "sparse_index.msgpack"), stopwords=set())
+
+    await index.add_documents([1], ["text"], ["doc"])
+
+    assert not index.loaded
+    assert not (tmp_path / "sparse_index.msgpack").exists()
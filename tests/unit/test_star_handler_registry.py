@@ -0,0 +1,141 @@
+"""Tests for precomputed handler lists and the command prefix index."""
+
+import pytest
+
+from astrbot.core.star.filter.command import CommandFilter
+from astrbot.core.star.filter.command_group import CommandGroupFilter
+from astrbot.core.star.filter.regex import RegexFilter
+from astrbot.core.star.star import StarMetadata, star_map
+from astrbot.core.star.star_handler import (
+    EventType,
+    StarHandlerMetadata,
+    StarHandlerRegistry,
+)
+
+MODULE_PATH = "tests.fake_plugin.main"
+
+
+async def _handler(self, event, arg: str = ""):
+    pass
+
+
+def _make_handler(
+    name: str,
+    event_type: EventType = EventType.AdapterMessageEvent,
+    priority: int = 0,
+) -> StarHandlerMetadata:
+    return StarHandlerMetadata(
+        event_type=event_type,
+        handler_full_name=f"{MODULE_PATH}_{name}",
+        handler_name=name,
+        handler_module_path=MODULE_PATH,
+        handler=_handler,
+        event_filters=[],
+        extras_configs={"priority": priority},
+    )
+
+
+def _command_handler(name: str, command: str, **kwargs) -> StarHandlerMetadata:
+    md = _make_handler(name, **kwargs)
+    md.event_filters.append(CommandFilter(command, handler_md=md))
+    return md
+
+
+@pytest.fixture
+def plugin(monkeypatch):
+    metadata = StarMetadata(name="fake_plugin", module_path=MODULE_PATH)
+    monkeypatch.setitem(star_map, MODULE_PATH, metadata)
+    return metadata
+
+
+def test_handlers_are_grouped_by_event_type_and_priority(plugin):
+    registry = StarHandlerRegistry()
+    low = _make_handler("low", priority=1)
+    high = _make_handler("high", priority=10)
+    other = _make_handler("other", event_type=EventType.OnLLMRequestEvent)
+    for handler in (low, other, high):
+        registry.append(handler)
+
+    assert registry.get_handlers_by_event_type(EventType.AdapterMessageEvent) == [
+        high,
+        low,
+    ]
+    assert registry.get_handlers_by_event_type(EventType.OnLLMRequestEvent) == [other]
+
+    registry.remove(high)
+    assert registry.get_handlers_by_event_type(EventType.AdapterMessageEvent) == [low]
+
+
+def test_activation_change_requires_invalidation(plugin):
+    registry = StarHandlerRegistry()
+    handler = _make_handler("h")
+    registry.append(handler)
+    assert registry.get_handlers_by_event_type(EventType.AdapterMessageEvent) == [
+        handler
+    ]
+
+    plugin.activated = False
+    registry.invalidate()
+    assert registry.get_handlers_by_event_type(EventType.AdapterMessageEvent) == []
+    assert registry.get_handlers_by_event_type(
+        EventType.AdapterMessageEvent,
+        only_activated=False,
+    ) == [handler]
+
+
+def test_plugin_whitelist_is_applied(plugin):
+    registry = StarHandlerRegistry()
+    handler = _make_handler("h")
+    registry.append(handler)
+
+    assert (
+        registry.get_handlers_by_event_type(
+            EventType.AdapterMessageEvent,
+            plugins_name=["another_plugin"],
+        )
+        == []
+    )
+    assert registry.get_handlers_by_event_type(
+        EventType.AdapterMessageEvent,
+        plugins_name=["fake_plugin"],
+    ) == [handler]
+
+
+def test_command_index_matches_by_prefix(plugin):
+    registry = StarHandlerRegistry()
+    help_cmd = _command_handler("help", "help")
+    helper_cmd = _command_handler("helper", "helper")
+    group = _make_handler("group")
+    group.event_filters.append(CommandGroupFilter("admin"))
+    regex = _make_handler("regex")
+    regex.event_filters.append(RegexFilter(r"^hello"))
+    for handler in (help_cmd, helper_cmd, group, regex):
+        registry.append(handler)
+
+    index = registry.get_command_index()
+    matched = index.match("helper now")
+    assert index.may_match(help_cmd, matched)
+    assert index.may_match(helper_cmd, matched)
+    assert not index.may_match(group, matched)
+    # 非指令 Handler 不受索引约束
+    assert index.may_match(regex, matched)
+
+    matched = index.match("admin list")
+    assert index.may_match(group, matched)
+    assert not index.may_match(help_cmd, matched)
+
+
+def test_command_index_follows_renamed_commands(plugin):
+    registry = StarHandlerRegistry()
+    handler = _command_handler("cmd", "old")
+    registry.append(handler)
+    assert registry.get_command_index().match("old") == {handler.handler_full_name}
+
+    command_filter = handler.event_filters[0]
+    command_filter.command_name = "new"
+    command_filter._cmpl_cmd_names = None
+    registry.invalidate()
+
+    index = registry.get_command_index()
+    assert index.match("old") == set()
+    assert index.match("new arg") == {handler.handler_full_name}
@@ -0,0 +1,94 @@
+"""Tests for the local text-to-image layout engine."""
+
+import pytest
+
+from astrbot.core.utils.t2i.local_strategy import (
+    FontManager,
+    MarkdownParser,
+    MarkdownRenderer,
+    TextElement,
+    TextMeasurer,
+)
+
+
+@pytest.fixture
+def font():
+    return FontManager.get_font(26)
+
+
+def _brute_force_wrap(text, font, max_width):
+    lines = []
+    while text:
+        for i in range(len(text), 0, -1):
+            if font.getlength(text[:i]) <= max_width:
+                break
+        i = max(i, 1)
+        lines.append(text[:i])
+        text = text[i:]
+    return lines
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "short",
+        "The quick brown fox jumps over the lazy dog. " * 12,
+        "WWWWiiiiiAVAVAVAV" * 20,
+        "中文文本与English混排，测试换行是否正确。" * 15,
+    ],
+)
+def test_wrapping_matches_prefix_search(font, text):
+    lines = TextMeasurer.split_text_to_fit_width(text, font, 400)
+
+    assert "".join(lines) == text
+    assert lines == _brute_force_wrap(text, font, 400)
+
+
+def test_text_size_measures_the_given_text(font):
+    short = TextMeasurer.get_text_size("Hi", font)[0]
+    long = TextMeasurer.get_text_size("Hello world, this is longer", font)[0]
+
+    assert short < long
+
+
+def test_element_layout_is_computed_once(monkeypatch):
+    calls = 0
+    original = TextMeasurer.split_text_to_fit_width
+
+    def counting(text, font, max_width):
+        nonlocal calls
+        calls += 1
+        return original(text, font, max_width)
+
+    monkeypatch.setattr(TextMeasurer, "split_text_to_fit_width", counting)
+    renderer = MarkdownRenderer()
+    element = TextElement("some text " * 50)
+
+    renderer.render_elements([element])
+
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_long_replies_are_rendered_into_bounded_tiles():
+    text = "\n".join(f"第 {i} 段：" + "内容" * 60 for i in range(80))
+    renderer = MarkdownRenderer()
+
+    single = await renderer.render(text)
+    tiles = await renderer.render_tiles(text, max_tile_height=2000)
+
+    assert len(tiles) > 1
+    assert all(tile.height <= 2000 for tile in tiles)
+    assert all(tile.width == single.width for tile in tiles)
+    # 分块只增加每块的上下边距
+    margins = 2 * MarkdownRenderer.MARGIN * (len(tiles) - 1)
+    assert sum(tile.height for tile in tiles) == single.height + margins
+
+
+@pytest.mark.asyncio
+async def test_oversized_element_gets_its_own_tile():
+    elements = await MarkdownParser.parse("intro\n```\n" + "code\n" * 100 + "```\nend")
+
+    tiles = MarkdownRenderer().layout(elements, max_tile_height=500)
+
+    assert [len(tile) for tile in tiles] == [1, 1, 1]
@@ -0,0 +1,154 @@
+"""Tests for the cached text-to-image rendering service."""
+
+import os
+import threading
+
+import pytest
+
+from astrbot.core.utils.media_cache import MediaCache
+from astrbot.core.utils.t2i import renderer as renderer_module
+from astrbot.core.utils.t2i.local_strategy import MarkdownRenderer
+from astrbot.core.utils.t2i.renderer import HtmlRenderer
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASTRBOT_ROOT", str(tmp_path))
+    os.makedirs(tmp_path / "data" / "temp")
+    cache = MediaCache()
+    monkeypatch.setattr(renderer_module, "media_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def html_renderer(cache):
+    return HtmlRenderer()
+
+
+@pytest.mark.asyncio
+async def test_identical_texts_are_rendered_once(html_renderer, monkeypatch):
+    threads = []
+    original = MarkdownRenderer.render_elements
+
+    def render_elements(self, elements, max_tile_height=None):
+        threads.append(threading.current_thread())
+        return original(self, elements, max_tile_height)
+
+    monkeypatch.setattr(MarkdownRenderer, "render_elements", render_elements)
+    text = "# 帮助\n" + "\n".join(f"- /cmd{i} 指令说明" for i in range(20))
+
+    first = await html_renderer.render_t2i(text, use_network=False)
+    second = await html_renderer.render_t2i(text, use_network=False)
+    os.remove(first)
+
+    assert first != second
+    assert os.path.exists(second)
+    assert len(threads) == 1
+    # Pillow 绘制在线程池中执行
+    assert threads[0] is not threading.main_thread()
+    stats = html_renderer.stats()["local"]
+    assert stats["renders"] == 1
+    assert stats["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_long_local_replies_are_split_into_cached_tiles(html_renderer):
+    text = "\n".join(f"第 {i} 段：" + "内容" * 60 for i in range(80))
+
+    tiles = await html_renderer.render_t2i_images(
+        text, use_network=False, max_tile_height=2000
+    )
+    again = await html_renderer.render_t2i_images(
+        text, use_network=False, max_tile_height=2000
+    )
+
+    assert len(tiles) > 1
+    assert len(again) == len(tiles)
+    assert html_renderer.stats()["local"]["renders"] == 1
+
+
+@pytest.mark.asyncio
+async def test_evicted_tiles_are_rendered_again(html_renderer, cache):
+    text = "some reply " * 40
+    await html_renderer.render_t2i_images(text, use_network=False)
+    for name in os.listdir(cache.cache_dir):
+        if name.endswith(".jpg"):
+            os.remove(os.path.join(cache.cache_dir, name))
+
+    paths = await html_renderer.render_t2i_images(text, use_network=False)
+
+    assert all(os.path.exists(path) for path in paths)
+    assert html_renderer.stats()["local"]["renders"] == 2
+
+
+@pytest.mark.asyncio
+async def test_tiles_that_do_not_fit_in_the_cache_are_rendered_once(
+    html_renderer, cache
+):
+    cache.configure(max_size_mb=0.01)
+    text = "\n".join(f"第 {i} 段：" + "内容" * 60 for i in range(80))
+
+    tiles = await html_renderer.render_t2i_images(
+        text, use_network=False, max_tile_height=2000
+    )
+
+    assert len(tiles) > 1
+    assert all(os.path.exists(path) for path in tiles)
+    assert html_renderer.stats()["local"]["renders"] == 1
+
+
+@pytest.mark.asyncio
+async def test_network_cache_follows_template_and_endpoint(html_renderer):
+    calls = []
+
+    async def render(text, return_url=False, template_name=None):
+        calls.append(text)
+        return f"https://t2i.example.com/{len(calls)}"
+
+    strategy = html_renderer.network_strategy
+    strategy.render = render
+
+    assert await html_renderer.render_t2i("hello", return_url=True) == (
+        "https://t2i.example.com/1"
+    )
+    strategy.template_manager.update_template("base", "<p>{{ text }}</p>")
+    assert await html_renderer.render_t2i("hello", return_url=True) == (
+        "https://t2i.example.com/2"
+    )
+    strategy.BASE_RENDER_URL = "https://t2i.example.org/text2img"
+    assert await html_renderer.render_t2i("hello", return_url=True) == (
+        "https://t2i.example.com/3"
+    )
+    assert await html_renderer.render_t2i("hello", return_url=True) == (
+        "https://t2i.example.com/3"
+    )
+
+
+@pytest.mark.asyncio
+async def test_network_urls_are_cached_and_fall_back_to_local(html_renderer):
+    calls = []
+
+    async def render(text, return_url=False, template_name=None):
+        calls.append(text)
+        if text == "broken":
+            raise RuntimeError("endpoint down")
+        return f"https://t2i.example.com/{len(calls)}"
+
+    html_renderer.network_strategy.render = render
+
+    assert await html_renderer.render_t2i_images("hello") == [
+        "https://t2i.example.com/1"
+    ]
+    assert await html_renderer.render_t2i_images("hello") == [
+        "https://t2i.example.com/1"
+    ]
+    html_renderer.configure(url_cache_ttl=0)
+    assert await html_renderer.render_t2i_images("hello") == [
+        "https://t2i.example.com/2"
+    ]
+
+    (path,) = await html_renderer.render_t2i_images("broken")
+    assert os.path.exists(path)
+    stats = html_renderer.stats()
+    assert stats["network"]["errors"] == 1
+    assert stats["network"]["cache_hits"] == 1